@@ -17,6 +17,7 @@ from rl import readline
 from rl._completion import Completer
 from rl._completion import Completion
 from rl._history import History
+from rl._history import HistoryEntry
 
 # API
 from rl._completion import completer
@@ -24,6 +25,7 @@ from rl._completion import completion
 from rl._completion import generator
 from rl._completion import print_exc
 from rl._history import history
+from rl.readline import PrefixIndex
 
 __all__ = ['completer', 'completion', 'history', 'readline',
-           'generator', 'print_exc']
+           'generator', 'print_exc', 'PrefixIndex']
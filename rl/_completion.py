@@ -105,6 +105,44 @@ class Completer(object):
             readline.set_completer(function)
         return property(get, set, doc=doc)
 
+    @apply
+    def completer_batch():
+        doc="""The batch completion function.
+        The function is called once as ``function(text)`` and should
+        return an iterable of all possible completions for ``text``.
+        If set, it is used instead of :attr:`~rl.Completer.completer`.
+        A function with a true ``prefix_monotone`` attribute is not called
+        again when the word is extended; see :func:`~rl.generator`."""
+        def get(self):
+            return readline.get_completer_batch()
+        def set(self, function):
+            readline.set_completer_batch(function)
+        return property(get, set, doc=doc)
+
+    @apply
+    def cache_size():
+        doc="""The number of completion results to cache. If greater than 0,
+        repeated completion attempts on an unchanged line are answered
+        from the cache without calling the completer. Results are keyed on
+        the line, :attr:`~rl.Completion.begidx`, :attr:`~rl.Completion.endidx`,
+        the completion type, and the completer. Defaults to 0."""
+        def get(self):
+            return readline.get_completion_cache_size()
+        def set(self, int):
+            readline.set_completion_cache_size(int)
+        return property(get, set, doc=doc)
+
+    @apply
+    def cache_ttl():
+        doc="""The number of seconds cached completion results are used.
+        A value of 0 keeps them until they are evicted or the cache is
+        cleared. Defaults to 0."""
+        def get(self):
+            return readline.get_completion_cache_ttl()
+        def set(self, float):
+            readline.set_completion_cache_ttl(float)
+        return property(get, set, doc=doc)
+
     @apply
     def startup_hook():
         doc="""The startup hook function.
@@ -284,6 +322,12 @@ class Completer(object):
         """Parse one line of a readline initialization file."""
         readline.parse_and_bind(line)
 
+    def clear_cache(self):
+        """Remove all cached completion results.
+        Call this when the data the completer draws from changes.
+        The cache is also cleared when a new completer is set."""
+        readline.clear_completion_cache()
+
     # Helpers
 
     def reset(self):
@@ -296,6 +340,9 @@ class Completer(object):
         self.inhibit_completion = False
         self.query_items = 100
         self.completer = None
+        self.completer_batch = None
+        self.cache_size = 0
+        self.cache_ttl = 0.0
         self.startup_hook = None
         self.pre_input_hook = None
         self.word_break_hook = None
@@ -480,6 +527,15 @@ class Completion(object):
         to perform the default action: columnar display of matches."""
         readline.display_match_list(substitution, matches, longest_match_length)
 
+    def display_match_pages(self, matches, longest_match_length=0):
+        """Paged matches display.
+        Like :meth:`~rl.Completion.display_match_list` but ``matches`` may
+        be any iterable, including a generator. Matches are pulled from it
+        one page at a time, so large match sets are neither built nor laid
+        out in full. The user is prompted as configured by
+        :attr:`~rl.Completer.query_items` before the first page."""
+        readline.display_match_pages(matches, longest_match_length)
+
     def redisplay(self, force=False):
         """Update the screen to reflect the current contents of
         :attr:`~rl.Completion.line_buffer`. If ``force`` is True, readline
@@ -518,14 +574,24 @@ class Completion(object):
 completion = Completion()
 
 
-def generator(func):
+def generator(func=None, prefix_monotone=False):
     """Generator function factory.
 
     Takes a function returning a list of matches and returns an
     object implementing the generator protocol readline requires.
     The function is called as ``function(text)`` and should return an
     iterable of matches for ``text``.
+
+    If ``prefix_monotone`` is true, the matches for ``text`` are
+    declared to be the matches for any prefix of ``text`` which start
+    with ``text``. When the word being completed extends the word of
+    the previous completion, readline then filters the previous matches
+    instead of calling the function again. Use as
+    ``@generator(prefix_monotone=True)``.
     """
+    if func is None:
+        return functools.partial(generator, prefix_monotone=prefix_monotone)
+
     cached = threading.local()
 
     def generator_func(*args):
@@ -544,7 +610,10 @@ def generator(func):
     if not hasattr(func, '__name__'):
         assignments = [x for x in assignments if x != '__name__']
 
-    return functools.wraps(func, assignments)(generator_func)
+    generator_func = functools.wraps(func, assignments)(generator_func)
+    if prefix_monotone:
+        generator_func.prefix_monotone = True
+    return generator_func
 
 
 def print_exc(func):
@@ -1,5 +1,8 @@
 """Readline history support."""
 
+import atexit
+import threading
+
 from rl import readline
 from rl.utils import apply
 
@@ -69,12 +72,67 @@ class History(object):
             readline.set_history_length(max(int, -1))
         return property(get, set, doc=doc)
 
+    @apply
+    def write_timestamps():
+        doc="""Controls whether timestamps are written to history files.
+        Timestamps are written as comment lines, so enabling them sets
+        the history comment character to '#' unless it is already set.
+        Defaults to False."""
+        def get(self):
+            return readline.get_history_write_timestamps()
+        def set(self, bool):
+            readline.set_history_write_timestamps(bool)
+        return property(get, set, doc=doc)
+
+    @apply
+    def dedupe():
+        doc="""Controls how duplicate lines are handled when readline adds
+        lines to the history. One of 'none', 'consecutive', and 'all'.
+        With 'all' a repeated line is moved to the end of the history,
+        and so are lines repeated by a loaded history file.
+        Defaults to 'consecutive'."""
+        def get(self):
+            return readline.get_history_dedupe()
+        def set(self, mode):
+            readline.set_history_dedupe(mode)
+        return property(get, set, doc=doc)
+
+    @apply
+    def search_index():
+        doc="""Controls whether an n-gram index is kept to speed up
+        substring searches with :meth:`~rl.History.search`. The index
+        costs 16 bytes per history entry. Defaults to False."""
+        def get(self):
+            return readline.get_history_search_index()
+        def set(self, bool):
+            readline.set_history_search_index(bool)
+        return property(get, set, doc=doc)
+
+    @apply
+    def archive():
+        doc="""The history archive attached with
+        :meth:`~rl.History.attach_archive`, or None."""
+        def get(self):
+            return readline.get_history_archive()
+        def set(self, archive):
+            readline.set_history_archive(archive)
+        return property(get, set, doc=doc)
+
     def append(self, line):
         """Append a line to the history."""
         readline.add_history(line)
+        _autosave_poke()
+
+    def extend(self, iterable):
+        """Append all lines from an iterable to the history."""
+        readline.add_history_items(iterable)
+        _autosave_poke()
 
     def __getitem__(self, index):
-        """Return the history item at index."""
+        """Return the history item at index, or a list of
+        history items if ``index`` is a slice."""
+        if isinstance(index, slice):
+            return readline.get_history_items(*index.indices(len(self)))
         return readline.get_history_item(self._norm_index(index))
 
     def __setitem__(self, index, line):
@@ -82,8 +140,12 @@ class History(object):
         readline.replace_history_item(self._norm_index(index), line)
 
     def __delitem__(self, index):
-        """Remove the history item at index."""
-        readline.remove_history_item(self._norm_index(index))
+        """Remove the history item at index, or all history items
+        in the slice if ``index`` is a slice."""
+        if isinstance(index, slice):
+            readline.remove_history_items(*index.indices(len(self)))
+        else:
+            readline.remove_history_item(self._norm_index(index))
 
     def __len__(self):
         """The current history length."""
@@ -97,52 +159,261 @@ class History(object):
         """Reverse-iterate over history items (new to old)."""
         return readline.get_history_reverse_iter()
 
+    def lines(self, reverse=False):
+        """Iterate over the lines of the attached archive followed by
+        the history items (old to new), or the other way round if
+        ``reverse`` is True.
+        """
+        archive = self.archive
+        if archive is None:
+            archive = ()
+        if reverse:
+            for line in reversed(self):
+                yield line
+            for i in range(len(archive)-1, -1, -1):
+                yield archive[i]
+        else:
+            for line in archive:
+                yield line
+            for line in self:
+                yield line
+
+    def entries(self, start=0, stop=None):
+        """Iterate over :class:`~rl.HistoryEntry` records for the history
+        items from ``start`` up to ``stop``. Negative indexes count from
+        the end of the history.
+        """
+        start, stop, step = slice(start, stop).indices(len(self))
+        for i, (line, timestamp) in enumerate(
+                readline.get_history_entries(start, stop)):
+            yield HistoryEntry(line, timestamp, start + i)
+
+    def entries_between(self, since, until=None):
+        """Iterate over the history entries with timestamps from ``since``
+        up to, but not including, ``until``. Timestamps are seconds since
+        the epoch. The entries are found by binary search, which expects
+        the history to be in time order.
+        """
+        start = readline.bisect_history_time(since)
+        if until is None:
+            stop = len(self)
+        else:
+            stop = max(start, readline.bisect_history_time(until))
+        return self.entries(start, stop)
+
+    def search(self, pattern, regex=False, reverse=True, limit=-1):
+        """Search the history for lines containing ``pattern``.
+        Returns a list of ``(index, line)`` tuples, newest first unless
+        ``reverse`` is False. If ``regex`` is True, ``pattern`` is a POSIX
+        extended regular expression. A non-negative ``limit`` caps the
+        number of results.
+        Lines of the attached archive count as older than the history
+        and are returned with the key ``('archive', i)`` in place of an
+        index, where ``archive[i]`` is the line.
+        """
+        return readline.search_history(pattern, regex, reverse, limit)
+
+    def snapshot(self):
+        """Return a read-only snapshot of the history.
+        The snapshot is a sequence of history items that also exposes
+        its lines as one NUL-separated bytes buffer. Lines are decoded
+        only when accessed by index.
+        """
+        return readline.get_history_snapshot()
+
     def clear(self):
         """Clear the history."""
         readline.clear_history()
 
-    def read_file(self, filename=None, raise_exc=False):
+    def read_file(self, filename=None, raise_exc=False, stream=False,
+                  from_line=0, to_line=-1, format='text'):
         """Load a readline history file.
         The default filename is ~/.history. If ``raise_exc`` is True,
         IOErrors will be allowed to propagate.
+        If ``stream`` is True, the file is read in chunks and the GIL
+        is released during I/O; a KeyboardInterrupt stops the load
+        and keeps the entries read so far.
+        ``from_line`` and ``to_line`` restrict loading to the entries
+        from ``from_line`` up to but not including ``to_line``.
+        A negative ``to_line`` means the end of the file.
+        If ``format`` is 'binary', a binary history file is loaded
+        (see :meth:`~rl.History.write_file`); ``stream`` is ignored,
+        and the default filename is ~/.history.bin.
+        """
+        _check_format(format)
+        try:
+            if format == 'binary':
+                readline.read_history_binary(filename, from_line, to_line)
+            elif stream:
+                readline.read_history_stream(filename, from_line, to_line)
+            else:
+                readline.read_history_file(filename, from_line, to_line)
+        except IOError:
+            if raise_exc:
+                raise
+
+    def read_tail(self, n, filename=None, raise_exc=False):
+        """Load the newest ``n`` entries of a readline history file.
+        The file is scanned backwards from its end, so the time taken
+        depends on ``n`` rather than on the size of the file.
+        The default filename is ~/.history. If ``raise_exc`` is True,
+        IOErrors will be allowed to propagate.
         """
         try:
-            readline.read_history_file(filename)
+            readline.read_history_tail(n, filename)
         except IOError:
             if raise_exc:
                 raise
 
-    def write_file(self, filename=None, raise_exc=False):
+    def write_file(self, filename=None, raise_exc=False, format='text'):
         """Save a readline history file.
         The default filename is ~/.history. If ``raise_exc`` is True,
         IOErrors will be allowed to propagate.
+        If ``format`` is 'binary', the history is saved as a log of
+        length-prefixed entries plus an index of entry offsets in
+        ``filename + '.idx'``. Binary files keep timestamps, can be
+        mapped into memory with :meth:`~rl.History.open_archive`, and
+        are truncated by rewriting the index only. The default filename
+        of binary files is ~/.history.bin.
         """
+        _check_format(format)
         try:
-            readline.write_history_file(filename)
+            if format == 'binary':
+                readline.write_history_binary(filename)
+            else:
+                readline.write_history_file(filename)
         except IOError:
             if raise_exc:
                 raise
 
-    def append_file(self, numitems, filename=None, raise_exc=False):
+    def append_file(self, numitems, filename=None, raise_exc=False,
+                    format='text'):
         """Append the last ``numitems`` history entries to a readline history file.
         The default filename is ~/.history. If ``raise_exc`` is True,
         IOErrors will be allowed to propagate.
+        If ``format`` is 'binary', the entries are appended to a binary
+        history file and its index; the default filename is
+        ~/.history.bin.
         """
+        _check_format(format)
         try:
-            readline.append_history_file(numitems, filename)
+            if format == 'binary':
+                readline.append_history_binary(numitems, filename)
+            else:
+                readline.append_history_file(numitems, filename)
         except IOError:
             if raise_exc:
                 raise
 
+    def attach_archive(self, filename=None, raise_exc=False):
+        """Attach a binary history file as a read-only archive behind
+        the history. The file is mapped into memory rather than loaded,
+        and its lines are included in :meth:`~rl.History.search`, keyed
+        ``('archive', i)``, and in :meth:`~rl.History.lines`. Readline's
+        incremental search only sees the history; bind the
+        ``reverse-search-archive`` command to search the history and the
+        archive for the text in the line buffer. The default filename is ~/.history.bin.
+        If ``raise_exc`` is True, IOErrors will be allowed to propagate.
+        """
+        try:
+            self.archive = readline.open_history_archive(filename)
+        except IOError:
+            if raise_exc:
+                raise
+
+    def detach_archive(self):
+        """Detach the archive attached with
+        :meth:`~rl.History.attach_archive`."""
+        self.archive = None
+
+    def convert_file(self, source, dest, format, raise_exc=False):
+        """Convert the history file ``source`` to ``dest`` in ``format``.
+        With 'binary', a readline history file is converted to a binary
+        one; with 'text', a binary history file is converted back.
+        Timestamps are kept. The history itself is not changed.
+        If ``raise_exc`` is True, IOErrors will be allowed to propagate.
+        """
+        _check_format(format)
+        try:
+            if format == 'binary':
+                readline.import_history_binary(source, dest)
+            else:
+                readline.export_history_binary(source, dest)
+        except IOError:
+            if raise_exc:
+                raise
+
+    def open_archive(self, filename=None):
+        """Open a binary history file as a read-only sequence of lines.
+        The file is mapped into memory, so indexing reads a single
+        entry regardless of the size of the file. The ``entry(index)``
+        method returns a ``(line, timestamp)`` tuple.
+        The default filename is ~/.history.bin.
+        """
+        return readline.open_history_archive(filename)
+
+    def sync_file(self, filename=None, raise_exc=False):
+        """Merge the history with a readline history file shared by
+        several processes. Entries other processes saved since the last
+        sync are added to the history, and entries added since the last
+        sync are saved to the file. Loading the file with
+        :meth:`~rl.History.read_file` or :meth:`~rl.History.read_tail`
+        counts as a sync. The file is locked, read once, and
+        replaced atomically. The default filename is ~/.history.
+        If ``raise_exc`` is True, IOErrors will be allowed to propagate.
+        """
+        try:
+            readline.sync_history_file(filename)
+        except IOError:
+            if raise_exc:
+                raise
+
+    def autosave(self, filename=None, interval=5.0, max_pending=100):
+        """Save new history entries to a readline history file in the
+        background. A writer thread appends the entries added since its
+        last flush every ``interval`` seconds, or sooner when
+        ``max_pending`` entries are waiting, including lines added by
+        readline itself.
+        The GIL is released while the file is written. The file is
+        truncated to :attr:`~rl.History.max_file` on the final flush,
+        which happens at :meth:`~rl.History.stop_autosave` or at exit.
+        Entries a failed flush could not write are retried on the next
+        one.
+        The default filename is ~/.history.
+        """
+        global _autosaver
+        self.stop_autosave()
+        _autosaver = _AutoSaver(filename, interval, max_pending)
+
+    def stop_autosave(self, raise_exc=False):
+        """Stop the writer thread started by :meth:`~rl.History.autosave`
+        and flush the remaining entries. If ``raise_exc`` is True,
+        IOErrors will be allowed to propagate; that includes the last
+        error of the writer thread, even if the final flush succeeded.
+        """
+        global _autosaver
+        saver, _autosaver = _autosaver, None
+        if saver is not None:
+            try:
+                saver.stop()
+            except IOError:
+                if raise_exc:
+                    raise
+
     # Helpers
 
     def reset(self):
         """Clear the history and reset all variables to their built-in
         defaults. Used in tests."""
+        self.stop_autosave()
         self.clear()
         self.auto = True
         self.max_entries = -1
         self.max_file = -1
+        self.dedupe = 'consecutive'
+        self.write_timestamps = False
+        self.search_index = False
+        self.archive = None
 
     def _norm_index(self, index):
         """Support negative indexes."""
@@ -156,5 +427,115 @@ class History(object):
             raise IndexError('history index out of range')
         return index
 
+
+def _check_format(format):
+    if format not in ('text', 'binary'):
+        raise ValueError('format must be one of: text, binary')
+
+
+class HistoryEntry(object):
+    """A history entry as returned by :meth:`History.entries`.
+    The ``timestamp`` is in seconds since the epoch, or None if the
+    entry has no timestamp.
+    """
+
+    __slots__ = ('line', 'timestamp', 'index')
+
+    def __init__(self, line, timestamp, index):
+        self.line = line
+        self.timestamp = timestamp
+        self.index = index
+
+    def __repr__(self):
+        return 'HistoryEntry(%r, %r, %r)' % (self.line, self.timestamp, self.index)
+
+    def __eq__(self, other):
+        if not isinstance(other, HistoryEntry):
+            return NotImplemented
+        return (self.line, self.timestamp, self.index) == \
+               (other.line, other.timestamp, other.index)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+
+class _AutoSaver(object):
+    """Writer thread used by :meth:`History.autosave`."""
+
+    def __init__(self, filename, interval, max_pending):
+        self.filename = filename
+        self.interval = interval
+        self.max_pending = max_pending
+        self.mark = readline.get_history_position()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = False
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='rl-autosave')
+        self.thread.daemon = True
+        self.thread.start()
+        # Lines added by readline itself
+        readline.set_history_added_hook(self.poke)
+
+    def pending(self):
+        return readline.get_history_position() - self.mark
+
+    def poke(self):
+        if self.pending() >= self.max_pending:
+            self.wakeup.set()
+
+    def flush(self, final=False):
+        with self.lock:
+            position = readline.get_history_position()
+            if position < self.mark:
+                # The history was cleared
+                self.mark = position - readline.get_current_history_length()
+            self.mark = readline.append_history_since(self.mark, self.filename)
+            length = readline.get_history_length()
+            if final and length >= 0:
+                readline.truncate_history_file(length, self.filename)
+
+    def run(self):
+        while not self.stopped:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            if self.stopped:
+                break
+            try:
+                self.flush()
+            except IOError as e:
+                # Raised by stop()
+                self.error = e
+
+    def stop(self):
+        if readline.get_history_added_hook() == self.poke:
+            readline.set_history_added_hook(None)
+        self.stopped = True
+        self.wakeup.set()
+        self.thread.join()
+        self.flush(final=True)
+        if self.error is not None:
+            raise self.error
+
+
+_autosaver = None
+
+
+def _autosave_poke():
+    saver = _autosaver
+    if saver is not None:
+        saver.poke()
+
+
+@atexit.register
+def _autosave_exit():
+    history.stop_autosave()
+
+
 history = History()
 
@@ -0,0 +1,417 @@
+#include "Python.h"
+#include <stdlib.h>
+#include <string.h>
+#include <strings.h>
+#include <time.h>
+
+/* GNU Readline definitions */
+#undef HAVE_CONFIG_H  /* Else readline/chardefs.h includes strings.h */
+#define _FUNCTION_DEF /* Else readline/rltypedefs.h defines old-style types */
+#ifdef __STDC__
+#define PREFER_STDARG /* Use ANSI C function prototypes */
+#define USE_VARARGS
+#endif
+#include <readline/readline.h>
+
+/* Custom definitions */
+#include "stringarray.h"
+#include "compcache.h"
+
+/* Readline internals */
+extern int _rl_completion_case_fold;
+
+
+/*************************** Completion Cache ****************************/
+
+/* Pressing TAB repeatedly on an unchanged line asks the completer for
+   the same matches again. With the cache enabled, the match array
+   returned to readline is stored together with the completion variables
+   the completer may have changed. An entry is found by the line, the
+   word boundaries, the completion type, and the completer object, and is
+   served by copying it without entering the interpreter. Entries expire
+   after ttl seconds; the least recently used entry is evicted when the
+   cache is full. The cache knows nothing about the completer's data
+   source and must be cleared when it changes. */
+
+typedef struct {
+	int append_character;
+	int suppress_append;
+	int suppress_quote;
+	int filename_completion_desired;
+	int filename_quoting_desired;
+	int attempted_completion_over;
+} compvars;
+
+typedef struct {
+	char *line;
+	int start;
+	int end;
+	int type;
+	PyObject *completer;
+	double stamp;
+	stringarray matches;
+	compvars vars;
+} cacheentry;
+
+static struct {
+	cacheentry *entries;	/* Most recently used first */
+	Py_ssize_t size;
+	Py_ssize_t maxsize;
+	double ttl;
+} cache = {NULL, 0, 0, 0.0};
+
+/* Matches of the last completion of a prefix-monotone completer */
+static struct {
+	cacheentry entry;
+	char *text;		/* Word the matches were computed for */
+	int valid;
+} previous = {{NULL}, NULL, 0};
+
+
+static double
+now(void)
+{
+	struct timespec ts;
+
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+
+static char **
+copy_matches(char **matches, Py_ssize_t size)
+{
+	char **copy;
+	Py_ssize_t i;
+
+	copy = calloc(size+1, sizeof(char*));
+	if (copy == NULL)
+		return NULL;
+	for (i = 0; i < size; i++) {
+		copy[i] = strdup(matches[i]);
+		if (copy[i] == NULL) {
+			StringArray_Free(copy);
+			return NULL;
+		}
+	}
+	return copy;
+}
+
+
+static void
+save_vars(compvars *vars)
+{
+	vars->append_character = rl_completion_append_character;
+	vars->suppress_append = rl_completion_suppress_append;
+	vars->suppress_quote = rl_completion_suppress_quote;
+	vars->filename_completion_desired = rl_filename_completion_desired;
+	vars->filename_quoting_desired = rl_filename_quoting_desired;
+	vars->attempted_completion_over = rl_attempted_completion_over;
+}
+
+
+static void
+restore_vars(compvars *vars)
+{
+	rl_completion_append_character = vars->append_character;
+	rl_completion_suppress_append = vars->suppress_append;
+	rl_completion_suppress_quote = vars->suppress_quote;
+	rl_filename_completion_desired = vars->filename_completion_desired;
+	rl_filename_quoting_desired = vars->filename_quoting_desired;
+	rl_attempted_completion_over = vars->attempted_completion_over;
+}
+
+
+static void
+entry_clear(cacheentry *entry)
+{
+	free(entry->line);
+	StringArray_Free(entry->matches.strings);
+	Py_DECREF(entry->completer);
+}
+
+
+static void
+cache_remove(Py_ssize_t index)
+{
+	entry_clear(&cache.entries[index]);
+	cache.size--;
+	memmove(cache.entries + index, cache.entries + index + 1,
+		(cache.size - index) * sizeof(cacheentry));
+}
+
+
+static void
+cache_to_front(Py_ssize_t index)
+{
+	cacheentry entry;
+
+	if (index == 0)
+		return;
+	entry = cache.entries[index];
+	memmove(cache.entries + 1, cache.entries, index * sizeof(cacheentry));
+	cache.entries[0] = entry;
+}
+
+
+int
+CompletionCache_Enabled(void)
+{
+	return cache.maxsize > 0;
+}
+
+
+void
+CompletionCache_Clear(void)
+{
+	while (cache.size > 0)
+		cache_remove(cache.size - 1);
+	CompletionCache_Forget();
+}
+
+
+int
+CompletionCache_SetMaxSize(Py_ssize_t maxsize)
+{
+	cacheentry *entries;
+
+	if (maxsize < 0)
+		maxsize = 0;
+	while (cache.size > maxsize)
+		cache_remove(cache.size - 1);
+	if (maxsize == 0) {
+		PyMem_Free(cache.entries);
+		cache.entries = NULL;
+	}
+	else {
+		entries = PyMem_Realloc(cache.entries, maxsize * sizeof(cacheentry));
+		if (entries == NULL) {
+			PyErr_NoMemory();
+			return -1;
+		}
+		cache.entries = entries;
+	}
+	cache.maxsize = maxsize;
+	return 0;
+}
+
+
+Py_ssize_t
+CompletionCache_GetMaxSize(void)
+{
+	return cache.maxsize;
+}
+
+
+void
+CompletionCache_SetTTL(double ttl)
+{
+	cache.ttl = ttl > 0.0 ? ttl : 0.0;
+}
+
+
+double
+CompletionCache_GetTTL(void)
+{
+	return cache.ttl;
+}
+
+
+char **
+CompletionCache_Lookup(PyObject *completer, const char *line,
+		       int start, int end, int type)
+/* Return a copy of the cached matches and restore the completion
+   variables, or NULL if there is no entry. Must be called with the
+   GIL held. */
+{
+	cacheentry *entry;
+	double t = now();
+	Py_ssize_t i;
+	char **matches;
+
+	for (i = 0; i < cache.size; ) {
+		entry = &cache.entries[i];
+		if (cache.ttl > 0.0 && t - entry->stamp > cache.ttl) {
+			cache_remove(i);
+			continue;
+		}
+		if (entry->completer == completer &&
+		    entry->start == start && entry->end == end &&
+		    entry->type == type && strcmp(entry->line, line) == 0)
+			break;
+		i++;
+	}
+	if (i == cache.size)
+		return NULL;
+
+	matches = copy_matches(entry->matches.strings, entry->matches.size);
+	if (matches == NULL)
+		return NULL;
+
+	restore_vars(&entry->vars);
+	cache_to_front(i);
+	return matches;
+}
+
+
+void
+CompletionCache_Store(PyObject *completer, const char *line,
+		      int start, int end, int type, char **matches)
+/* Store a copy of matches and the current completion variables.
+   Must be called with the GIL held. */
+{
+	cacheentry entry;
+
+	if (cache.maxsize == 0 || matches == NULL)
+		return;
+
+	entry.line = strdup(line);
+	if (entry.line == NULL)
+		return;
+	entry.matches.size = StringArray_Size(matches);
+	entry.matches.strings = copy_matches(matches, entry.matches.size);
+	if (entry.matches.strings == NULL) {
+		free(entry.line);
+		return;
+	}
+	entry.start = start;
+	entry.end = end;
+	entry.type = type;
+	entry.completer = completer;
+	Py_INCREF(completer);
+	entry.stamp = now();
+	save_vars(&entry.vars);
+
+	if (cache.size == cache.maxsize)
+		cache_remove(cache.size - 1);
+	cache.entries[cache.size++] = entry;
+	cache_to_front(cache.size - 1);
+}
+
+
+/* Narrowing
+ *
+ * A completer can declare itself prefix-monotone: the matches for a
+ * word are those matches for any prefix of the word which start with
+ * the word itself. When such a completer is asked to complete a word
+ * that extends the word of the previous completion, in an otherwise
+ * unchanged line, the previous matches are filtered instead of calling
+ * the completer again.
+ */
+
+void
+CompletionCache_Forget(void)
+/* Must be called with the GIL held. */
+{
+	if (previous.valid) {
+		entry_clear(&previous.entry);
+		free(previous.text);
+		previous.text = NULL;
+		previous.valid = 0;
+	}
+}
+
+
+static int
+same_context(const char *line, int start, int end)
+/* True if line only differs from the previous line inside the word */
+{
+	const char *old = previous.entry.line;
+
+	if (start != previous.entry.start || end < previous.entry.end)
+		return 0;
+	if (strncmp(old, line, start) != 0)
+		return 0;
+	return strcmp(old + previous.entry.end, line + end) == 0;
+}
+
+
+int
+CompletionCache_Narrow(PyObject *completer, const char *line,
+		       int start, int end, const char *text,
+		       stringarray *matches)
+/* Filter the previous matches for text. Returns 1 and stores the
+   matches if they could be narrowed, 0 if the completer must be
+   called. Readline takes ownership of the strings. */
+{
+	size_t n = strlen(text);
+	char **strings;
+	char **p;
+	Py_ssize_t j;
+
+	if (!previous.valid || previous.entry.completer != completer)
+		return 0;
+	if (strncmp(previous.text, text, strlen(previous.text)) != 0)
+		return 0;
+	if (!same_context(line, start, end))
+		return 0;
+
+	strings = StringArray_New(previous.entry.matches.size);
+	if (strings == NULL) {
+		PyErr_Clear();
+		return 0;
+	}
+	for (p = previous.entry.matches.strings, j = 0; *p; p++) {
+		if ((_rl_completion_case_fold ? strncasecmp(*p, text, n) :
+						strncmp(*p, text, n)) != 0)
+			continue;
+		strings[j] = strdup(*p);
+		if (strings[j] == NULL) {
+			StringArray_Free(strings);
+			return 0;
+		}
+		j++;
+	}
+	matches->strings = strings;
+	matches->size = j;
+	restore_vars(&previous.entry.vars);
+	return 1;
+}
+
+
+void
+CompletionCache_Remember(PyObject *completer, const char *line,
+			 int start, int end, const char *text, char **matches)
+/* Remember the matches readline received for text. Must be called
+   with the GIL held. */
+{
+	cacheentry entry;
+	Py_ssize_t size;
+
+	CompletionCache_Forget();
+	if (matches == NULL)
+		return;
+
+	/* Skip the common prefix readline put in front */
+	size = StringArray_Size(matches);
+	if (size > 1) {
+		matches++;
+		size--;
+	}
+	entry.line = strdup(line);
+	if (entry.line == NULL)
+		return;
+	previous.text = strdup(text);
+	if (previous.text == NULL) {
+		free(entry.line);
+		return;
+	}
+	entry.matches.size = size;
+	entry.matches.strings = copy_matches(matches, size);
+	if (entry.matches.strings == NULL) {
+		free(entry.line);
+		free(previous.text);
+		previous.text = NULL;
+		return;
+	}
+	entry.start = start;
+	entry.end = end;
+	entry.type = 0;
+	entry.completer = completer;
+	Py_INCREF(completer);
+	entry.stamp = now();
+	save_vars(&entry.vars);
+
+	previous.entry = entry;
+	previous.valid = 1;
+}
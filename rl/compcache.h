@@ -0,0 +1,27 @@
+#ifndef __COMPCACHE_H__
+#define __COMPCACHE_H__
+
+#include "Python.h"
+#include "stringarray.h"
+
+int CompletionCache_Enabled(void);
+void CompletionCache_Clear(void);
+int CompletionCache_SetMaxSize(Py_ssize_t maxsize);
+Py_ssize_t CompletionCache_GetMaxSize(void);
+void CompletionCache_SetTTL(double ttl);
+double CompletionCache_GetTTL(void);
+
+char **CompletionCache_Lookup(PyObject *completer, const char *line,
+			      int start, int end, int type);
+void CompletionCache_Store(PyObject *completer, const char *line,
+			   int start, int end, int type, char **matches);
+
+int CompletionCache_Narrow(PyObject *completer, const char *line,
+			   int start, int end, const char *text,
+			   stringarray *matches);
+void CompletionCache_Remember(PyObject *completer, const char *line,
+			      int start, int end, const char *text,
+			      char **matches);
+void CompletionCache_Forget(void);
+
+#endif /* __COMPCACHE_H__ */
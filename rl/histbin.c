@@ -0,0 +1,1390 @@
+#include "Python.h"
+#include <errno.h>
+#include <fcntl.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/time.h>
+#include <sys/types.h>
+#include <regex.h>
+#include <time.h>
+#include <unistd.h>
+
+/* GNU Readline definitions */
+#undef HAVE_CONFIG_H  /* Else readline/chardefs.h includes strings.h */
+#define _FUNCTION_DEF /* Else readline/rltypedefs.h defines old-style types */
+#ifdef __STDC__
+#define PREFER_STDARG /* Use ANSI C function prototypes */
+#define USE_VARARGS
+#endif
+#include <readline/readline.h>
+#include <readline/history.h>
+
+/* Custom definitions */
+#include "unicode.h"
+#include "histio.h"
+#include "histindex.h"
+#include "histbin.h"
+
+/* Defined in readline.c */
+extern long long _py_entry_time(HIST_ENTRY *entry);
+
+/* Python 3 compatibility */
+#if (PY_MAJOR_VERSION >= 3)
+#define PyInt_FromSsize_t PyLong_FromSsize_t
+#define PyString_FromString PyUnicode_DECODE
+#define PyString_FromStringAndSize PyUnicode_DECODE_SIZE
+#endif
+
+
+/*********************** Binary History Files **************************/
+
+/* A binary history file is an append-only log of length-prefixed
+   records plus an index of fixed-width record offsets, stored next
+   to the log with the suffix ".idx". Both files start with a magic
+   string and the same identifier, so a log and an index that do not
+   belong together are detected. Integers are little-endian.
+
+     log:    "RLHLOG1\0" id:u64 { length:u32 timestamp:i64 line NUL }...
+     index:  "RLHIDX1\0" id:u64 { offset:u64 }...
+
+   Entry i is located through offset i of the index, so both files
+   can be mapped into memory and reading an entry touches one page
+   of each. Lines are NUL-terminated and usable in place.
+
+   Entries are appended to the log first and to the index second.
+   Dropping the oldest entries rewrites the index only; the log is
+   compacted once more than half of it is unreferenced. Rewritten
+   files are renamed into place, so a reader that mapped the old
+   files keeps a consistent view. The log is renamed before the
+   index; an index left behind by a writer that failed in between
+   is rebuilt from the log. */
+
+#define LOG_MAGIC "RLHLOG1"
+#define IDX_MAGIC "RLHIDX1"
+#define HEADER_SIZE 16
+#define RECORD_HEADER 12
+#define RECORD_SIZE(len) (RECORD_HEADER + (len) + 1)
+#define OFFSET_SIZE 8
+
+/* Return codes of the functions that run without the GIL */
+#define BIN_ERRNO -1		/* errno is set */
+#define BIN_NOMEMORY -2
+#define BIN_BADFILE -3		/* Not a binary history file */
+#define BIN_MISMATCH -4		/* Index does not belong to the log */
+
+
+static void
+put_u32(unsigned char *p, uint32_t v)
+{
+	int i;
+
+	for (i = 0; i < 4; i++)
+		p[i] = (unsigned char)(v >> (8*i));
+}
+
+
+static void
+put_u64(unsigned char *p, uint64_t v)
+{
+	int i;
+
+	for (i = 0; i < 8; i++)
+		p[i] = (unsigned char)(v >> (8*i));
+}
+
+
+static uint32_t
+get_u32(const unsigned char *p)
+{
+	uint32_t v = 0;
+	int i;
+
+	for (i = 3; i >= 0; i--)
+		v = (v << 8) | p[i];
+	return v;
+}
+
+
+static uint64_t
+get_u64(const unsigned char *p)
+{
+	uint64_t v = 0;
+	int i;
+
+	for (i = 7; i >= 0; i--)
+		v = (v << 8) | p[i];
+	return v;
+}
+
+
+static uint64_t
+new_id(void)
+{
+	static uint64_t counter = 0;
+	struct timeval tv;
+
+	gettimeofday(&tv, NULL);
+	/* Zero marks an invalid header */
+	return (((uint64_t)tv.tv_sec << 32) ^ ((uint64_t)tv.tv_usec << 12) ^
+		((uint64_t)getpid() << 40) ^ ++counter) | 1;
+}
+
+
+static void
+write_header(unsigned char *p, const char *magic, uint64_t id)
+{
+	memcpy(p, magic, 8);
+	put_u64(p + 8, id);
+}
+
+
+/* Returns the id or 0 if the header is not valid */
+
+static uint64_t
+check_header(const unsigned char *p, size_t size, const char *magic)
+{
+	if (p == NULL || size < HEADER_SIZE || memcmp(p, magic, 8) != 0)
+		return 0;
+	return get_u64(p + 8);
+}
+
+
+/* Return the path of ~/.history.bin, returns NULL with an exception set.
+   Binary files have their own default, so ~/.history stays a text
+   file. */
+
+static char *
+default_name(void)
+{
+	char *path, *name;
+
+	path = HistoryFile_DefaultName();
+	if (path == NULL)
+		return NULL;
+	name = realloc(path, strlen(path) + 5);
+	if (name == NULL) {
+		free(path);
+		PyErr_NoMemory();
+		return NULL;
+	}
+	strcat(name, ".bin");
+	return name;
+}
+
+
+static char *
+index_name(const char *filename)
+{
+	char *name;
+
+	name = malloc(strlen(filename) + 5);
+	if (name != NULL) {
+		strcpy(name, filename);
+		strcat(name, ".idx");
+	}
+	return name;
+}
+
+
+static long long
+parse_stamp(const char *ts)
+{
+	if (ts == NULL || ts[0] == '\0')
+		return 0;
+	return strtoll(ts + 1, NULL, 10);
+}
+
+
+/* Set an exception from a return code */
+
+static void
+set_error(int rc, const char *filename)
+{
+	switch (rc) {
+	case BIN_NOMEMORY:
+		PyErr_NoMemory();
+		break;
+	case BIN_BADFILE:
+		PyErr_Format(PyExc_IOError,
+			"%s: not a binary history file", filename);
+		break;
+	case BIN_MISMATCH:
+		PyErr_Format(PyExc_IOError,
+			"%s: history index does not match the log", filename);
+		break;
+	default:
+		PyErr_SetFromErrnoWithFilename(PyExc_IOError, (char *)filename);
+	}
+}
+
+
+static int
+write_all(int fd, const unsigned char *buffer, size_t size, off_t offset)
+{
+	ssize_t w;
+	size_t done = 0;
+
+	while (done < size) {
+		w = pwrite(fd, buffer + done, size - done, offset + done);
+		if (w < 0 && errno == EINTR)
+			continue;
+		if (w < 0)
+			return BIN_ERRNO;
+		done += w;
+	}
+	return 0;
+}
+
+
+static int
+read_all(int fd, unsigned char *buffer, size_t size, off_t offset)
+{
+	ssize_t r;
+	size_t done = 0;
+
+	while (done < size) {
+		r = pread(fd, buffer + done, size - done, offset + done);
+		if (r < 0 && errno == EINTR)
+			continue;
+		if (r < 0)
+			return BIN_ERRNO;
+		if (r == 0)
+			return BIN_BADFILE;
+		done += r;
+	}
+	return 0;
+}
+
+
+/* Write the buffer to a temporary file and rename it over filename */
+
+static int
+replace_file(const char *filename, const unsigned char *buffer, size_t size,
+	     mode_t mode)
+{
+	char *tmpname;
+	int fd, rc, saved_errno;
+
+	tmpname = malloc(strlen(filename) + 32);
+	if (tmpname == NULL)
+		return BIN_NOMEMORY;
+	sprintf(tmpname, "%s.tmp%ld", filename, (long)getpid());
+
+	fd = open(tmpname, O_WRONLY | O_CREAT | O_TRUNC, mode);
+	if (fd < 0) {
+		free(tmpname);
+		return BIN_ERRNO;
+	}
+	rc = write_all(fd, buffer, size, 0);
+	if (close(fd) < 0)
+		rc = BIN_ERRNO;
+	if (rc == 0 && rename(tmpname, filename) < 0)
+		rc = BIN_ERRNO;
+	if (rc < 0) {
+		saved_errno = errno;
+		unlink(tmpname);
+		errno = saved_errno;
+	}
+	free(tmpname);
+	return rc;
+}
+
+
+/* Records in memory, either whole files with headers or a batch
+   to append at file offset base */
+
+typedef struct {
+	unsigned char *log;
+	unsigned char *idx;
+	size_t logpos;
+	size_t idxpos;
+	uint64_t base;		/* File offset of log[0] */
+} binbuf;
+
+
+static int
+binbuf_init(binbuf *b, Py_ssize_t n, size_t linebytes, uint64_t id, uint64_t base)
+{
+	size_t header = id ? HEADER_SIZE : 0;
+
+	b->log = malloc(header + n * RECORD_SIZE(0) + linebytes);
+	b->idx = malloc(header + n * OFFSET_SIZE + 1);
+	b->logpos = b->idxpos = header;
+	b->base = base;
+	if (b->log == NULL || b->idx == NULL) {
+		free(b->log);
+		free(b->idx);
+		b->log = b->idx = NULL;
+		return BIN_NOMEMORY;
+	}
+	if (id) {
+		write_header(b->log, LOG_MAGIC, id);
+		write_header(b->idx, IDX_MAGIC, id);
+	}
+	return 0;
+}
+
+
+static void
+binbuf_add(binbuf *b, const char *line, size_t len, long long ts)
+{
+	put_u64(b->idx + b->idxpos, b->base + b->logpos);
+	b->idxpos += OFFSET_SIZE;
+	put_u32(b->log + b->logpos, (uint32_t)len);
+	put_u64(b->log + b->logpos + 4, (uint64_t)ts);
+	memcpy(b->log + b->logpos + RECORD_HEADER, line, len);
+	b->log[b->logpos + RECORD_HEADER + len] = '\0';
+	b->logpos += RECORD_SIZE(len);
+}
+
+
+static void
+binbuf_free(binbuf *b)
+{
+	free(b->log);
+	free(b->idx);
+}
+
+
+/* Copy the newest count history entries, or all if count is
+   negative, holding the history mutex. A non-zero id makes whole
+   files with headers. */
+
+static int
+binbuf_from_history(binbuf *b, Py_ssize_t count, uint64_t id, uint64_t base)
+{
+	HIST_ENTRY **hist;
+	size_t linebytes = 0;
+	Py_ssize_t first, i;
+	int rc;
+
+	HistoryFile_Lock();
+	hist = history_list();
+	if (hist == NULL || count > history_length || count < 0)
+		count = hist ? history_length : 0;
+	first = (hist ? history_length : 0) - count;
+	for (i = first; i < first + count; i++)
+		linebytes += strlen(hist[i]->line);
+	rc = binbuf_init(b, count, linebytes, id, base);
+	if (rc == 0) {
+		for (i = first; i < first + count; i++)
+			binbuf_add(b, hist[i]->line, strlen(hist[i]->line),
+				   _py_entry_time(hist[i]));
+	}
+	HistoryFile_Unlock();
+	return rc;
+}
+
+
+/* Replace the log, then the index */
+
+static int
+replace_files(const char *filename, const char *idxname, binbuf *b, mode_t mode)
+{
+	int rc;
+
+	rc = replace_file(filename, b->log, b->logpos, mode);
+	if (rc == 0)
+		rc = replace_file(idxname, b->idx, b->idxpos, mode);
+	return rc;
+}
+
+
+/* Write a new index for the locked log. Every rewrite of the log
+   renames the log first and the index second; if writing the index
+   failed, the log holds exactly the entries of the lost index. A
+   record cut short by an interrupted append ends the scan. Runs
+   without the GIL. */
+
+static int
+rebuild_index(int fd, const char *idxname, uint64_t logsize, mode_t mode)
+{
+	unsigned char *log, *idx;
+	uint64_t id, offset;
+	uint32_t l;
+	size_t n = 0;
+	int rc;
+
+	log = malloc(logsize + 1);
+	if (log == NULL)
+		return BIN_NOMEMORY;
+	rc = read_all(fd, log, logsize, 0);
+	if (rc < 0)
+		goto done;
+	id = check_header(log, logsize, LOG_MAGIC);
+	if (id == 0) {
+		rc = BIN_BADFILE;
+		goto done;
+	}
+
+	/* Every record takes at least RECORD_SIZE(0) bytes */
+	idx = malloc(HEADER_SIZE + (logsize / RECORD_SIZE(0) + 1) * OFFSET_SIZE);
+	if (idx == NULL) {
+		rc = BIN_NOMEMORY;
+		goto done;
+	}
+	write_header(idx, IDX_MAGIC, id);
+	for (offset = HEADER_SIZE; offset + RECORD_HEADER < logsize; ) {
+		l = get_u32(log + offset);
+		if (l >= logsize - offset - RECORD_HEADER ||
+		    log[offset + RECORD_HEADER + l] != '\0')
+			break;
+		put_u64(idx + HEADER_SIZE + n * OFFSET_SIZE, offset);
+		n++;
+		offset += RECORD_SIZE(l);
+	}
+	rc = replace_file(idxname, idx, HEADER_SIZE + n * OFFSET_SIZE, mode);
+	free(idx);
+  done:
+	free(log);
+	return rc;
+}
+
+
+/* Keep the newest max_entries of a file that has grown to logsize,
+   by rewriting the index or, if most of the log is unreferenced, by
+   compacting both files. Runs without the GIL. */
+
+static int
+truncate_files(int fd, int idxfd, const char *filename, const char *idxname,
+	       uint64_t id, Py_ssize_t count, Py_ssize_t max_entries,
+	       uint64_t logsize, mode_t mode)
+{
+	binbuf b;
+	unsigned char *offsets;
+	uint64_t first, shift;
+	Py_ssize_t i;
+	int rc;
+
+	offsets = malloc(max_entries * OFFSET_SIZE + 1);
+	if (offsets == NULL)
+		return BIN_NOMEMORY;
+	rc = read_all(idxfd, offsets, max_entries * OFFSET_SIZE,
+		      HEADER_SIZE + (count - max_entries) * OFFSET_SIZE);
+	if (rc < 0)
+		goto done;
+	first = max_entries > 0 ? get_u64(offsets) : logsize;
+	if (first < HEADER_SIZE || first > logsize) {
+		rc = BIN_BADFILE;
+		goto done;
+	}
+
+	if (first - HEADER_SIZE <= logsize - first) {
+		/* Drop the oldest offsets only */
+		b.log = NULL;
+		b.idx = malloc(HEADER_SIZE + max_entries * OFFSET_SIZE);
+		if (b.idx == NULL) {
+			rc = BIN_NOMEMORY;
+			goto done;
+		}
+		write_header(b.idx, IDX_MAGIC, id);
+		memcpy(b.idx + HEADER_SIZE, offsets, max_entries * OFFSET_SIZE);
+		rc = replace_file(idxname, b.idx, HEADER_SIZE + max_entries * OFFSET_SIZE, mode);
+	}
+	else {
+		/* Compact the log and shift the offsets */
+		b.log = malloc(HEADER_SIZE + (logsize - first) + 1);
+		b.idx = malloc(HEADER_SIZE + max_entries * OFFSET_SIZE);
+		if (b.log == NULL || b.idx == NULL) {
+			rc = BIN_NOMEMORY;
+			goto cleanup;
+		}
+		id = new_id();
+		write_header(b.log, LOG_MAGIC, id);
+		write_header(b.idx, IDX_MAGIC, id);
+		rc = read_all(fd, b.log + HEADER_SIZE, logsize - first, first);
+		if (rc < 0)
+			goto cleanup;
+		shift = first - HEADER_SIZE;
+		for (i = 0; i < max_entries; i++) {
+			put_u64(b.idx + HEADER_SIZE + i * OFFSET_SIZE,
+				get_u64(offsets + i * OFFSET_SIZE) - shift);
+		}
+		b.logpos = HEADER_SIZE + (logsize - first);
+		b.idxpos = HEADER_SIZE + max_entries * OFFSET_SIZE;
+		rc = replace_files(filename, idxname, &b, mode);
+	}
+  cleanup:
+	binbuf_free(&b);
+  done:
+	free(offsets);
+	return rc;
+}
+
+
+/* Append the batch to the locked log and its index. Runs without
+   the GIL. */
+
+static int
+append_files(int fd, struct stat *st, const char *filename, const char *idxname,
+	     binbuf *b, Py_ssize_t n, Py_ssize_t max_entries)
+{
+	unsigned char header[HEADER_SIZE];
+	struct stat idxst;
+	uint64_t id;
+	Py_ssize_t count;
+	int idxfd, tries, rc;
+
+	rc = read_all(fd, header, HEADER_SIZE, 0);
+	if (rc < 0)
+		return rc;
+	id = check_header(header, HEADER_SIZE, LOG_MAGIC);
+	if (id == 0)
+		return BIN_BADFILE;
+
+	for (tries = 0; ; tries++) {
+		idxfd = open(idxname, O_RDWR);
+		if (idxfd < 0)
+			return BIN_ERRNO;
+		if (fstat(idxfd, &idxst) < 0) {
+			rc = BIN_ERRNO;
+			goto done;
+		}
+		rc = read_all(idxfd, header, HEADER_SIZE, 0);
+		if (rc < 0)
+			goto done;
+		if (check_header(header, HEADER_SIZE, IDX_MAGIC) == id)
+			break;
+		close(idxfd);
+		/* The index is stale; the log is locked, so it stays that way */
+		if (tries > 0)
+			return BIN_MISMATCH;
+		rc = rebuild_index(fd, idxname, st->st_size, st->st_mode & 07777);
+		if (rc < 0)
+			return rc;
+	}
+	/* A partial offset left by an interrupted append is overwritten */
+	count = (idxst.st_size - HEADER_SIZE) / OFFSET_SIZE;
+
+	rc = write_all(fd, b->log, b->logpos, st->st_size);
+	if (rc == 0)
+		rc = write_all(idxfd, b->idx, b->idxpos,
+			       HEADER_SIZE + count * OFFSET_SIZE);
+	if (rc < 0)
+		goto done;
+	count += n;
+	if (max_entries >= 0 && count > max_entries) {
+		rc = truncate_files(fd, idxfd, filename, idxname, id, count,
+				    max_entries, st->st_size + b->logpos,
+				    st->st_mode & 07777);
+	}
+  done:
+	close(idxfd);
+	return rc;
+}
+
+
+/* Map a whole file read-only. Returns -1 with errno set. */
+
+static int
+map_file(const char *filename, unsigned char **addr, size_t *size)
+{
+	struct stat st;
+	void *p = NULL;
+	int fd;
+
+	*addr = NULL;
+	*size = 0;
+	fd = open(filename, O_RDONLY);
+	if (fd < 0)
+		return -1;
+	if (fstat(fd, &st) < 0)
+		goto error;
+	if (!S_ISREG(st.st_mode)) {
+		errno = EINVAL;
+		goto error;
+	}
+	if (st.st_size > 0) {
+		p = mmap(NULL, st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+		if (p == MAP_FAILED)
+			goto error;
+	}
+	close(fd);
+	*addr = p;
+	*size = st.st_size;
+	return 0;
+  error:
+	close(fd);
+	return -1;
+}
+
+
+static void
+binmap_close(binmap *map)
+{
+	if (map->log != NULL)
+		munmap(map->log, map->logsize);
+	if (map->idx != NULL)
+		munmap(map->idx, map->idxsize);
+	map->log = map->idx = NULL;
+	map->logsize = map->idxsize = 0;
+	map->size = 0;
+}
+
+
+/* Map the log and index once. Called without the GIL. */
+
+static int
+map_files(const char *filename, const char *idxname, binmap *map,
+	  const char **failed)
+{
+	uint64_t id;
+
+	*failed = filename;
+	if (map_file(filename, &map->log, &map->logsize) < 0)
+		return BIN_ERRNO;
+	if (map_file(idxname, &map->idx, &map->idxsize) < 0) {
+		*failed = idxname;
+		return BIN_ERRNO;
+	}
+	id = check_header(map->log, map->logsize, LOG_MAGIC);
+	if (id == 0 || check_header(map->idx, map->idxsize, IDX_MAGIC) == 0)
+		return BIN_BADFILE;
+	if (check_header(map->idx, map->idxsize, IDX_MAGIC) != id) {
+		binmap_close(map);
+		return BIN_MISMATCH;
+	}
+	map->size = (map->idxsize - HEADER_SIZE) / OFFSET_SIZE;
+	return 0;
+}
+
+
+/* Rebuild a stale index under the file lock and map again. Returns
+   -1 with an exception set if the lock cannot be taken. */
+
+static int
+map_rebuilt(const char *filename, const char *idxname, binmap *map,
+	    const char **failed)
+{
+	struct stat st;
+	int fd, rc;
+
+	fd = HistoryFile_LockFile(filename, &st);
+	if (fd < 0)
+		return -1;
+	Py_BEGIN_ALLOW_THREADS
+	rc = map_files(filename, idxname, map, failed);
+	if (rc == BIN_MISMATCH) {
+		*failed = idxname;
+		rc = rebuild_index(fd, idxname, st.st_size, st.st_mode & 07777);
+		if (rc == 0)
+			rc = map_files(filename, idxname, map, failed);
+	}
+	Py_END_ALLOW_THREADS
+	close(fd);
+	return rc;
+}
+
+
+/* Map a log and its index. A writer renames the log before the
+   index, so a mismatch is retried a few times. If it persists, the
+   writer failed between the two renames and the index is rebuilt
+   from the log. Returns -1 with an exception set. */
+
+int
+HistoryBinary_Map(const char *filename, binmap *map)
+{
+	struct timespec delay = {0, 10000000};	/* 10 ms */
+	char *path = NULL, *idxname = NULL;
+	const char *failed;
+	int tries, rc = BIN_MISMATCH;
+
+	map->log = map->idx = NULL;
+	map->logsize = map->idxsize = 0;
+	map->size = 0;
+
+	if (filename == NULL) {
+		path = default_name();
+		if (path == NULL)
+			return -1;
+		filename = path;
+	}
+	idxname = index_name(filename);
+	if (idxname == NULL) {
+		free(path);
+		PyErr_NoMemory();
+		return -1;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	for (tries = 0; tries < 10; tries++) {
+		if (tries > 0)
+			nanosleep(&delay, NULL);
+		rc = map_files(filename, idxname, map, &failed);
+		if (rc != BIN_MISMATCH)
+			break;
+	}
+	Py_END_ALLOW_THREADS
+
+	if (rc == BIN_MISMATCH)
+		rc = map_rebuilt(filename, idxname, map, &failed);
+	if (rc < 0) {
+		if (rc != -1 || !PyErr_Occurred())
+			set_error(rc, failed);
+		binmap_close(map);
+	}
+	free(idxname);
+	free(path);
+	return rc < 0 ? -1 : 0;
+}
+
+
+static int
+record_at(binmap *map, Py_ssize_t index, const char **line, size_t *len,
+	  long long *ts)
+{
+	uint64_t offset;
+	uint32_t l;
+
+	offset = get_u64(map->idx + HEADER_SIZE + index * OFFSET_SIZE);
+	if (offset < HEADER_SIZE || offset > map->logsize - RECORD_HEADER)
+		return -1;
+	l = get_u32(map->log + offset);
+	if (l >= map->logsize - offset - RECORD_HEADER ||
+	    map->log[offset + RECORD_HEADER + l] != '\0')
+		return -1;
+	*ts = (long long)get_u64(map->log + offset + 4);
+	*line = (const char *)map->log + offset + RECORD_HEADER;
+	*len = l;
+	return 0;
+}
+
+
+/* Locate entry index. Returns -1 with an exception set. */
+
+int
+HistoryBinary_Record(binmap *map, Py_ssize_t index, const char **line,
+		     size_t *len, long long *ts)
+{
+	if (record_at(map, index, line, len, ts) < 0) {
+		PyErr_SetString(PyExc_IOError, "corrupt binary history file");
+		return -1;
+	}
+	return 0;
+}
+
+
+/* Return the line of entry index or NULL if the file is corrupt.
+   Does not need the GIL. */
+
+const char *
+HistoryBinary_Line(binmap *map, Py_ssize_t index)
+{
+	const char *line;
+	size_t len;
+	long long ts;
+
+	if (record_at(map, index, &line, &len, &ts) < 0)
+		return NULL;
+	return line;
+}
+
+
+PyObject *
+HistoryBinary_Read(const char *filename, Py_ssize_t from_line, Py_ssize_t to_line)
+{
+	binmap map;
+	const char *line;
+	char stamp[32];
+	size_t len;
+	long long ts;
+	Py_ssize_t i;
+	int rc = -1;
+
+	if (HistoryBinary_Map(filename, &map) < 0)
+		return NULL;
+	if (from_line < 0)
+		from_line = 0;
+	if (to_line < 0 || to_line > map.size)
+		to_line = map.size;
+
+	for (i = from_line; i < to_line; i++) {
+		if (HistoryBinary_Record(&map, i, &line, &len, &ts) < 0)
+			goto done;
+		add_history(line);
+		if (ts) {
+			sprintf(stamp, "%c%lld",
+				history_comment_char ? history_comment_char : '#', ts);
+			add_history_time(stamp);
+		}
+		HistoryIndex_BulkAdded();
+	}
+	rc = 0;
+  done:
+	binmap_close(&map);
+	if (rc < 0)
+		return NULL;
+	Py_RETURN_NONE;
+}
+
+
+PyObject *
+HistoryBinary_Write(const char *filename, int max_entries)
+{
+	binbuf b;
+	struct stat st;
+	char *path = NULL, *idxname = NULL;
+	int fd = -1, rc;
+
+	if (filename == NULL) {
+		path = default_name();
+		if (path == NULL)
+			return NULL;
+		filename = path;
+	}
+	idxname = index_name(filename);
+	if (idxname == NULL) {
+		free(path);
+		return PyErr_NoMemory();
+	}
+	/* Serialize with appending processes */
+	fd = HistoryFile_LockFile(filename, &st);
+	if (fd < 0)
+		goto error;
+
+	rc = binbuf_from_history(&b, max_entries, new_id(), 0);
+	if (rc == 0) {
+		Py_BEGIN_ALLOW_THREADS
+		rc = replace_files(filename, idxname, &b, st.st_mode & 07777);
+		Py_END_ALLOW_THREADS
+		binbuf_free(&b);
+	}
+	if (rc < 0) {
+		set_error(rc, filename);
+		goto error;
+	}
+	close(fd);
+	free(idxname);
+	free(path);
+	Py_RETURN_NONE;
+  error:
+	if (fd >= 0)
+		close(fd);
+	free(idxname);
+	free(path);
+	return NULL;
+}
+
+
+PyObject *
+HistoryBinary_Append(const char *filename, int n, int max_entries)
+{
+	binbuf b;
+	struct stat st;
+	char *path = NULL, *idxname = NULL;
+	int fd = -1, rc;
+
+	if (filename == NULL) {
+		path = default_name();
+		if (path == NULL)
+			return NULL;
+		filename = path;
+	}
+	idxname = index_name(filename);
+	if (idxname == NULL) {
+		free(path);
+		return PyErr_NoMemory();
+	}
+	fd = HistoryFile_LockFile(filename, &st);
+	if (fd < 0)
+		goto error;
+
+	if (n < 0)
+		n = 0;
+	if (max_entries >= 0 && n > max_entries)
+		n = max_entries;
+	if (st.st_size == 0) {
+		/* A new file */
+		rc = binbuf_from_history(&b, n, new_id(), 0);
+		if (rc == 0) {
+			Py_BEGIN_ALLOW_THREADS
+			rc = replace_files(filename, idxname, &b, st.st_mode & 07777);
+			Py_END_ALLOW_THREADS
+			binbuf_free(&b);
+		}
+	}
+	else {
+		rc = binbuf_from_history(&b, n, 0, st.st_size);
+		if (rc == 0) {
+			n = b.idxpos / OFFSET_SIZE;
+			Py_BEGIN_ALLOW_THREADS
+			rc = append_files(fd, &st, filename, idxname, &b, n, max_entries);
+			Py_END_ALLOW_THREADS
+			binbuf_free(&b);
+		}
+	}
+	if (rc < 0) {
+		set_error(rc, rc == BIN_ERRNO && errno == ENOENT ? idxname : filename);
+		goto error;
+	}
+	close(fd);
+	free(idxname);
+	free(path);
+	Py_RETURN_NONE;
+  error:
+	if (fd >= 0)
+		close(fd);
+	free(idxname);
+	free(path);
+	return NULL;
+}
+
+
+/* Convert a text history file to a binary one */
+
+PyObject *
+HistoryBinary_Import(const char *source, const char *dest)
+{
+	binbuf b;
+	histrecord *recs = NULL;
+	struct stat st;
+	char *buffer = NULL, *idxname = NULL;
+	size_t linebytes = 0;
+	Py_ssize_t n, i;
+	int fd = -1, rc;
+
+	n = HistoryFile_ReadRecords(source, &buffer, &recs);
+	if (n < 0)
+		return NULL;
+	idxname = index_name(dest);
+	if (idxname == NULL) {
+		PyErr_NoMemory();
+		goto error;
+	}
+	fd = HistoryFile_LockFile(dest, &st);
+	if (fd < 0)
+		goto error;
+
+	for (i = 0; i < n; i++)
+		linebytes += strlen(recs[i].line);
+	rc = binbuf_init(&b, n, linebytes, new_id(), 0);
+	if (rc == 0) {
+		for (i = 0; i < n; i++)
+			binbuf_add(&b, recs[i].line, strlen(recs[i].line),
+				   parse_stamp(recs[i].ts));
+		Py_BEGIN_ALLOW_THREADS
+		rc = replace_files(dest, idxname, &b, st.st_mode & 07777);
+		Py_END_ALLOW_THREADS
+		binbuf_free(&b);
+	}
+	if (rc < 0) {
+		set_error(rc, dest);
+		goto error;
+	}
+	close(fd);
+	free(idxname);
+	free(recs);
+	free(buffer);
+	Py_RETURN_NONE;
+  error:
+	if (fd >= 0)
+		close(fd);
+	free(idxname);
+	free(recs);
+	free(buffer);
+	return NULL;
+}
+
+
+/* Convert a binary history file to a text one. Timestamps are
+   written whenever an entry has one. */
+
+PyObject *
+HistoryBinary_Export(const char *source, const char *dest)
+{
+	binmap map;
+	struct stat st;
+	const char *line;
+	unsigned char *buffer = NULL;
+	char *p;
+	char comment_char;
+	size_t len, size = 0;
+	long long ts;
+	Py_ssize_t i;
+	int fd = -1, rc;
+
+	if (HistoryBinary_Map(source, &map) < 0)
+		return NULL;
+	comment_char = history_comment_char ? history_comment_char : '#';
+
+	for (i = 0; i < map.size; i++) {
+		if (HistoryBinary_Record(&map, i, &line, &len, &ts) < 0)
+			goto error;
+		size += len + 1 + (ts ? 24 : 0);
+	}
+	buffer = malloc(size + 1);
+	if (buffer == NULL) {
+		PyErr_NoMemory();
+		goto error;
+	}
+	p = (char *)buffer;
+	for (i = 0; i < map.size; i++) {
+		HistoryBinary_Record(&map, i, &line, &len, &ts);
+		if (ts)
+			p += sprintf(p, "%c%lld\n", comment_char, ts);
+		memcpy(p, line, len);
+		p += len;
+		*p++ = '\n';
+	}
+
+	fd = HistoryFile_LockFile(dest, &st);
+	if (fd < 0)
+		goto error;
+	Py_BEGIN_ALLOW_THREADS
+	rc = replace_file(dest, buffer, p - (char *)buffer, st.st_mode & 07777);
+	Py_END_ALLOW_THREADS
+	if (rc < 0) {
+		set_error(rc, dest);
+		goto error;
+	}
+	close(fd);
+	free(buffer);
+	binmap_close(&map);
+	Py_RETURN_NONE;
+  error:
+	if (fd >= 0)
+		close(fd);
+	free(buffer);
+	binmap_close(&map);
+	return NULL;
+}
+
+
+/*********************** History Archive **************************/
+
+/* A read-only view of a binary history file. Both files are mapped
+   into memory; indexing reads one offset and decodes one line. */
+
+typedef struct {
+	PyObject_HEAD
+	binmap map;
+} archiveobject;
+
+
+PyObject *
+HistoryArchive_New(const char *filename)
+{
+	archiveobject *self;
+
+	self = PyObject_New(archiveobject, &PyHistArchive_Type);
+	if (self == NULL)
+		return NULL;
+	if (HistoryBinary_Map(filename, &self->map) < 0) {
+		Py_DECREF(self);
+		return NULL;
+	}
+	return (PyObject *)self;
+}
+
+
+static void
+archive_dealloc(archiveobject *self)
+{
+	binmap_close(&self->map);
+	PyObject_Del(self);
+}
+
+
+static Py_ssize_t
+archive_length(archiveobject *self)
+{
+	return self->map.size;
+}
+
+
+static PyObject *
+archive_item(archiveobject *self, Py_ssize_t index)
+{
+	const char *line;
+	size_t len;
+	long long ts;
+
+	if (index < 0 || index >= self->map.size) {
+		PyErr_SetString(PyExc_IndexError, "archive index out of range");
+		return NULL;
+	}
+	if (HistoryBinary_Record(&self->map, index, &line, &len, &ts) < 0)
+		return NULL;
+	return PyString_FromStringAndSize(line, len);
+}
+
+
+static int
+archive_norm_index(archiveobject *self, PyObject *item, Py_ssize_t *index)
+{
+	if (!PyIndex_Check(item)) {
+		PyErr_SetString(PyExc_TypeError, "an integer is required");
+		return -1;
+	}
+	*index = PyNumber_AsSsize_t(item, PyExc_IndexError);
+	if (*index == -1 && PyErr_Occurred())
+		return -1;
+	if (*index < 0)
+		*index += self->map.size;
+	if (*index < 0 || *index >= self->map.size) {
+		PyErr_SetString(PyExc_IndexError, "archive index out of range");
+		return -1;
+	}
+	return 0;
+}
+
+
+static PyObject *
+archive_subscript(archiveobject *self, PyObject *item)
+{
+	Py_ssize_t index;
+
+	if (archive_norm_index(self, item, &index) < 0)
+		return NULL;
+	return archive_item(self, index);
+}
+
+
+static PyObject *
+archive_entry(archiveobject *self, PyObject *item)
+{
+	const char *line;
+	size_t len;
+	long long ts;
+	Py_ssize_t index;
+
+	if (archive_norm_index(self, item, &index) < 0)
+		return NULL;
+	if (HistoryBinary_Record(&self->map, index, &line, &len, &ts) < 0)
+		return NULL;
+	if (ts == 0)
+		return Py_BuildValue("(NO)", PyString_FromStringAndSize(line, len), Py_None);
+	return Py_BuildValue("(NL)", PyString_FromStringAndSize(line, len), ts);
+}
+
+PyDoc_STRVAR(doc_entry,
+"entry(index) -> (line, timestamp)\n\
+Return the line and timestamp of the entry at ``index``.\n\
+The timestamp is None if the entry has none.");
+
+
+static PyMethodDef archive_methods[] = {
+	{"entry", (PyCFunction)archive_entry, METH_O, doc_entry},
+	{0, 0}
+};
+
+static PySequenceMethods archive_as_sequence = {
+	(lenfunc)archive_length,			/* sq_length */
+	0,						/* sq_concat */
+	0,						/* sq_repeat */
+	(ssizeargfunc)archive_item,			/* sq_item */
+};
+
+static PyMappingMethods archive_as_mapping = {
+	(lenfunc)archive_length,			/* mp_length */
+	(binaryfunc)archive_subscript,			/* mp_subscript */
+	0,						/* mp_ass_subscript */
+};
+
+PyDoc_STRVAR(doc_archive,
+"Read-only view of a binary history file.\n\
+The file and its index are mapped into memory; indexing reads\n\
+and decodes a single entry.");
+
+PyTypeObject PyHistArchive_Type = {
+#if (PY_VERSION_HEX < 0x02060000)
+	PyObject_HEAD_INIT(&PyType_Type)
+	0,						/* ob_size */
+#else
+	PyVarObject_HEAD_INIT(&PyType_Type, 0)
+#endif
+	"historyarchive",				/* tp_name */
+	sizeof(archiveobject),				/* tp_basicsize */
+	0,						/* tp_itemsize */
+	/* methods */
+	(destructor)archive_dealloc,			/* tp_dealloc */
+	0,						/* tp_print */
+	0,						/* tp_getattr */
+	0,						/* tp_setattr */
+	0,						/* tp_compare */
+	0,						/* tp_repr */
+	0,						/* tp_as_number */
+	&archive_as_sequence,				/* tp_as_sequence */
+	&archive_as_mapping,				/* tp_as_mapping */
+	0,						/* tp_hash */
+	0,						/* tp_call */
+	0,						/* tp_str */
+	PyObject_GenericGetAttr,			/* tp_getattro */
+	0,						/* tp_setattro */
+	0,						/* tp_as_buffer */
+	Py_TPFLAGS_DEFAULT,				/* tp_flags */
+	doc_archive,					/* tp_doc */
+	0,						/* tp_traverse */
+	0,						/* tp_clear */
+	0,						/* tp_richcompare */
+	0,						/* tp_weaklistoffset */
+	0,						/* tp_iter */
+	0,						/* tp_iternext */
+	archive_methods,				/* tp_methods */
+	0,						/* tp_members */
+};
+
+
+/*********************** Attached Archive **************************/
+
+/* An archive attached to the history is searched as a cold tier
+   behind the in-memory entries. Its lines are used in place, so
+   searching it allocates nothing per entry. Archive entry i is
+   reported with the key ('archive', i) rather than a history index,
+   and counts as older than every in-memory entry. */
+
+#define SEARCH_CHUNK 65536
+
+static PyObject *attached = NULL;
+
+
+int
+HistoryArchive_Attach(PyObject *archive)
+{
+	PyObject *old;
+
+	if (archive == Py_None)
+		archive = NULL;
+	if (archive != NULL && !PyObject_TypeCheck(archive, &PyHistArchive_Type)) {
+		PyErr_SetString(PyExc_TypeError, "a history archive is required");
+		return -1;
+	}
+	Py_XINCREF(archive);
+	/* The search command reads the archive without the GIL */
+	HistoryFile_Lock();
+	old = attached;
+	attached = archive;
+	HistoryFile_Unlock();
+	Py_XDECREF(old);
+	return 0;
+}
+
+
+PyObject *
+HistoryArchive_Attached(void)
+{
+	return attached;
+}
+
+
+/* Append (('archive', index), line) tuples for matching archive
+   entries to list. The key cannot be mistaken for a history index.
+   The archive is scanned in chunks with the GIL released; signals
+   are checked in between. Returns -1 with an exception set. */
+
+int
+HistoryArchive_Search(PyObject *list, const char *pattern, regex_t *re,
+		      int reverse, Py_ssize_t limit)
+{
+	archiveobject *archive = (archiveobject *)attached;
+	const char *line = NULL;
+	PyObject *item;
+	Py_ssize_t n, k = 0, i, end, found;
+	int corrupt, rc = -1;
+
+	if (archive == NULL)
+		return 0;
+	Py_INCREF(archive);
+	n = archive->map.size;
+
+	while (k < n) {
+		if (limit >= 0 && PyList_GET_SIZE(list) >= limit)
+			break;
+		end = k + SEARCH_CHUNK < n ? k + SEARCH_CHUNK : n;
+		found = -1;
+		corrupt = 0;
+		Py_BEGIN_ALLOW_THREADS
+		for (; k < end; k++) {
+			i = reverse ? n-1-k : k;
+			line = HistoryBinary_Line(&archive->map, i);
+			if (line == NULL) {
+				corrupt = 1;
+				break;
+			}
+			if (re != NULL ? regexec(re, line, 0, NULL, 0) == 0 :
+			    strstr(line, pattern) != NULL) {
+				found = i;
+				k++;
+				break;
+			}
+		}
+		Py_END_ALLOW_THREADS
+		if (corrupt) {
+			PyErr_SetString(PyExc_IOError, "corrupt binary history file");
+			goto done;
+		}
+		if (found >= 0) {
+			item = Py_BuildValue("((sn)N)", "archive", found,
+					     PyString_FromString(line));
+			if (item == NULL || PyList_Append(list, item) < 0) {
+				Py_XDECREF(item);
+				goto done;
+			}
+			Py_DECREF(item);
+		}
+		else if (PyErr_CheckSignals() < 0)
+			goto done;
+	}
+	rc = 0;
+  done:
+	Py_DECREF(archive);
+	return rc;
+}
+
+
+/* A bindable command that searches the history and then the archive
+   for the text in the line buffer, newest first. Repeating it finds
+   older matches. Readline's incremental search only sees the
+   in-memory history. */
+
+static struct {
+	char *pattern;
+	Py_ssize_t pos;		/* Position of the last match, -1 for none */
+} rsearch = {NULL, -1};
+
+
+int
+HistoryArchive_ReverseSearch(int count, int key)
+{
+	HIST_ENTRY **hist;
+	binmap *map = NULL;
+	const char *line = NULL;
+	Py_ssize_t a, m, c;
+
+	if (rl_last_func != HistoryArchive_ReverseSearch || rsearch.pattern == NULL) {
+		free(rsearch.pattern);
+		rsearch.pattern = strdup(rl_line_buffer);
+		rsearch.pos = -1;
+		if (rsearch.pattern == NULL) {
+			rl_ding();
+			return 1;
+		}
+	}
+
+	HistoryFile_Lock();
+	hist = history_list();
+	m = hist ? history_length : 0;
+	if (attached != NULL)
+		map = &((archiveobject *)attached)->map;
+	a = map ? map->size : 0;
+	c = (rsearch.pos < 0 || rsearch.pos > a + m) ? a + m : rsearch.pos;
+	while (--c >= 0) {
+		line = c >= a ? hist[c-a]->line : HistoryBinary_Line(map, c);
+		if (line != NULL && strstr(line, rsearch.pattern) != NULL)
+			break;
+	}
+	if (c >= 0) {
+		rl_replace_line(line, 0);
+		rl_point = rl_end;
+		rsearch.pos = c;
+	}
+	HistoryFile_Unlock();
+
+	if (c < 0)
+		rl_ding();
+	return 0;
+}
@@ -0,0 +1,37 @@
+#ifndef __HISTBIN_H__
+#define __HISTBIN_H__
+
+#include "Python.h"
+#include <sys/types.h>
+#include <regex.h>
+
+typedef struct {
+	unsigned char *log;	/* Mapped log */
+	size_t logsize;
+	unsigned char *idx;	/* Mapped index */
+	size_t idxsize;
+	Py_ssize_t size;	/* Number of entries */
+} binmap;
+
+int HistoryBinary_Map(const char *filename, binmap *map);
+int HistoryBinary_Record(binmap *map, Py_ssize_t index, const char **line,
+			 size_t *len, long long *ts);
+const char *HistoryBinary_Line(binmap *map, Py_ssize_t index);
+
+PyObject *HistoryBinary_Read(const char *filename, Py_ssize_t from_line,
+			     Py_ssize_t to_line);
+PyObject *HistoryBinary_Write(const char *filename, int max_entries);
+PyObject *HistoryBinary_Append(const char *filename, int n, int max_entries);
+PyObject *HistoryBinary_Import(const char *source, const char *dest);
+PyObject *HistoryBinary_Export(const char *source, const char *dest);
+
+extern PyTypeObject PyHistArchive_Type;
+
+PyObject *HistoryArchive_New(const char *filename);
+int HistoryArchive_Attach(PyObject *archive);
+PyObject *HistoryArchive_Attached(void);
+int HistoryArchive_Search(PyObject *list, const char *pattern, regex_t *re,
+			  int reverse, Py_ssize_t limit);
+int HistoryArchive_ReverseSearch(int count, int key);
+
+#endif /* __HISTBIN_H__ */
@@ -0,0 +1,746 @@
+#include "Python.h"
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/types.h>
+#include <regex.h>
+
+/* GNU Readline definitions */
+#undef HAVE_CONFIG_H  /* Else readline/chardefs.h includes strings.h */
+#define _FUNCTION_DEF /* Else readline/rltypedefs.h defines old-style types */
+#ifdef __STDC__
+#define PREFER_STDARG /* Use ANSI C function prototypes */
+#define USE_VARARGS
+#endif
+#include <readline/history.h>
+
+/* Custom definitions */
+#include "unicode.h"
+#include "histindex.h"
+#include "histbin.h"
+
+/* Defined in readline.c */
+extern void _py_free_history_entry(HIST_ENTRY *entry);
+
+/* Python 3 compatibility */
+#if (PY_MAJOR_VERSION >= 3)
+#define PyString_FromString PyUnicode_DECODE
+#endif
+
+
+/*********************** History Index **************************/
+
+/* The index keeps a 128-bit trigram signature for every history
+   entry. A line can only contain a pattern if its signature covers
+   all bits of the pattern's signature, which lets the search skip
+   most lines without looking at them.
+
+   The index is updated by the functions in this module that change
+   the history. Changes made by readline itself are detected at search
+   time: entries are remembered by address, line address, and a hash
+   of the line, and the signature of a slot is recomputed when any of
+   them has changed. Readline replaces entries while the user moves
+   through the history, and malloc readily hands back the addresses
+   it just freed, so the addresses alone prove nothing. */
+
+typedef struct {
+	uint64_t lo;
+	uint64_t hi;
+} histsig;
+
+typedef struct {
+	HIST_ENTRY *entry;	/* NULL if the slot is empty */
+	const char *line;
+	uint64_t hash;		/* line_hash() of the line */
+} histkey;
+
+static struct {
+	int enabled;		/* True if the index is maintained */
+	int valid;		/* False if the index must be rebuilt */
+	histkey *keys;		/* Entry each signature was computed for */
+	histsig *sigs;		/* Signatures, parallel to keys */
+	Py_ssize_t size;	/* Number of indexed entries */
+	Py_ssize_t allocated;	/* Number of allocated slots */
+} histindex = {0, 0, NULL, NULL, 0, 0};
+
+
+/* Table of history lines for removing duplicates, see below */
+
+#define TOMBSTONE ((HIST_ENTRY *)1)
+
+typedef struct {
+	uint64_t hash;
+	HIST_ENTRY *entry;	/* NULL if empty, TOMBSTONE if deleted */
+} ddslot;
+
+static struct {
+	int mode;		/* One of the DEDUPE_* constants */
+	int valid;		/* False if the table must be rebuilt */
+	ddslot *slots;
+	size_t size;		/* Number of slots, a power of two */
+	size_t used;		/* Slots holding entries or tombstones */
+	Py_ssize_t dropped;	/* Number of entries removed as duplicates */
+} dedupe = {DEDUPE_CONSECUTIVE, 0, NULL, 0, 0, 0};
+
+
+static void
+sig_compute(const char *line, histsig *sig)
+{
+	const unsigned char *p = (const unsigned char *)line;
+	uint32_t h;
+
+	sig->lo = sig->hi = 0;
+	if (p[0] == '\0' || p[1] == '\0')
+		return;
+	for (; p[2] != '\0'; p++) {
+		h = ((uint32_t)p[0] << 16 | (uint32_t)p[1] << 8 | p[2]);
+		h = (h * 2654435761u) >> 25;
+		if (h < 64)
+			sig->lo |= (uint64_t)1 << h;
+		else
+			sig->hi |= (uint64_t)1 << (h - 64);
+	}
+}
+
+
+static int
+index_resize(Py_ssize_t size)
+{
+	histkey *keys;
+	histsig *sigs;
+	Py_ssize_t allocated;
+
+	if (size <= histindex.allocated)
+		return 0;
+	allocated = size + (size >> 3) + 64;
+	keys = realloc(histindex.keys, allocated * sizeof(histkey));
+	if (keys == NULL)
+		return -1;
+	histindex.keys = keys;
+	sigs = realloc(histindex.sigs, allocated * sizeof(histsig));
+	if (sigs == NULL)
+		return -1;
+	histindex.sigs = sigs;
+	histindex.allocated = allocated;
+	return 0;
+}
+
+
+/* FNV-1a hash of a line */
+
+static uint64_t
+line_hash(const char *line)
+{
+	const unsigned char *p = (const unsigned char *)line;
+	uint64_t h = 14695981039346656037u;
+
+	for (; *p; p++) {
+		h ^= *p;
+		h *= 1099511628211u;
+	}
+	return h;
+}
+
+
+/* Compute the signature of slot i for entry */
+
+static void
+index_set(Py_ssize_t i, HIST_ENTRY *entry)
+{
+	histindex.keys[i].entry = entry;
+	histindex.keys[i].line = entry->line;
+	histindex.keys[i].hash = line_hash(entry->line);
+	sig_compute(entry->line, &histindex.sigs[i]);
+}
+
+
+/* True if the signature of slot i was computed for entry's line */
+
+static int
+index_current(Py_ssize_t i, HIST_ENTRY *entry)
+{
+	histkey *key = &histindex.keys[i];
+
+	return key->entry == entry && key->line == entry->line &&
+	       key->hash == line_hash(entry->line);
+}
+
+
+static void
+index_free(void)
+{
+	free(histindex.keys);
+	free(histindex.sigs);
+	histindex.keys = NULL;
+	histindex.sigs = NULL;
+	histindex.size = 0;
+	histindex.allocated = 0;
+	histindex.valid = 0;
+}
+
+
+/* Line the index up with the history array. New slots are marked
+   empty and filled in by the search loop. Returns -1 if out of memory. */
+
+static int
+index_sync(void)
+{
+	HIST_ENTRY **hist = history_list();
+	Py_ssize_t n = hist ? history_length : 0;
+	Py_ssize_t d, i;
+
+	if (histindex.valid && n > 0 && histindex.size > 0 &&
+	    histindex.keys[0].entry != hist[0]) {
+		/* Entries dropped from the front of a stifled history */
+		for (d = 1; d < histindex.size; d++) {
+			if (histindex.keys[d].entry == hist[0])
+				break;
+		}
+		if (d < histindex.size) {
+			memmove(histindex.keys, histindex.keys + d,
+				(histindex.size - d) * sizeof(histkey));
+			memmove(histindex.sigs, histindex.sigs + d,
+				(histindex.size - d) * sizeof(histsig));
+			histindex.size -= d;
+		}
+		else {
+			histindex.valid = 0;
+		}
+	}
+	if (!histindex.valid)
+		histindex.size = 0;
+
+	if (index_resize(n) < 0) {
+		histindex.valid = 0;
+		return -1;
+	}
+	for (i = histindex.size; i < n; i++)
+		histindex.keys[i].entry = NULL;
+	histindex.size = n;
+	histindex.valid = 1;
+	return 0;
+}
+
+
+void
+HistoryIndex_Enable(int enable)
+{
+	if (!enable)
+		index_free();
+	histindex.enabled = enable;
+}
+
+
+int
+HistoryIndex_IsEnabled(void)
+{
+	return histindex.enabled;
+}
+
+
+void
+HistoryIndex_Added(void)
+{
+	HIST_ENTRY **hist = history_list();
+	Py_ssize_t n = hist ? history_length : 0;
+
+	dedupe.valid = 0;
+	if (!histindex.valid)
+		return;
+	if (n == histindex.size + 1) {
+		if (index_resize(n) < 0) {
+			histindex.valid = 0;
+			return;
+		}
+	}
+	else if (n == histindex.size && n > 0 && histindex.keys[0].entry != hist[0]) {
+		/* The oldest entry made room in a stifled history */
+		memmove(histindex.keys, histindex.keys + 1,
+			(n - 1) * sizeof(histkey));
+		memmove(histindex.sigs, histindex.sigs + 1,
+			(n - 1) * sizeof(histsig));
+	}
+	else {
+		if (n != histindex.size)
+			histindex.valid = 0;
+		return;
+	}
+	index_set(n-1, hist[n-1]);
+	histindex.size = n;
+}
+
+
+void
+HistoryIndex_Removed(Py_ssize_t index)
+{
+	dedupe.valid = 0;
+	if (!histindex.valid)
+		return;
+	if (index < 0 || index >= histindex.size ||
+	    histindex.size - 1 != history_length) {
+		histindex.valid = 0;
+		return;
+	}
+	memmove(histindex.keys + index, histindex.keys + index + 1,
+		(histindex.size - index - 1) * sizeof(histkey));
+	memmove(histindex.sigs + index, histindex.sigs + index + 1,
+		(histindex.size - index - 1) * sizeof(histsig));
+	histindex.size--;
+}
+
+
+void
+HistoryIndex_Replaced(Py_ssize_t index)
+{
+	HIST_ENTRY **hist = history_list();
+
+	dedupe.valid = 0;
+	if (!histindex.valid)
+		return;
+	if (index < 0 || index >= histindex.size || index >= history_length) {
+		histindex.valid = 0;
+		return;
+	}
+	index_set(index, hist[index]);
+}
+
+
+void
+HistoryIndex_Invalidate(void)
+{
+	histindex.valid = 0;
+	dedupe.valid = 0;
+}
+
+
+/*********************** Duplicate Lines **************************/
+
+/* In "all" mode a hash table maps the lines of the history to their
+   entries, so a repeated line is found without comparing it to every
+   entry. The table is rebuilt when the history was changed behind its
+   back; the hooks above mark it invalid. Lines are hashed with
+   line_hash(). */
+
+
+/* Return the slot holding line, or -1 */
+
+static Py_ssize_t
+dd_find(const char *line, uint64_t hash)
+{
+	size_t mask = dedupe.size - 1;
+	size_t i;
+
+	if (dedupe.size == 0)
+		return -1;
+	for (i = hash & mask; dedupe.slots[i].entry != NULL; i = (i + 1) & mask) {
+		if (dedupe.slots[i].entry != TOMBSTONE &&
+		    dedupe.slots[i].hash == hash &&
+		    strcmp(dedupe.slots[i].entry->line, line) == 0)
+			return (Py_ssize_t)i;
+	}
+	return -1;
+}
+
+
+static int
+dd_resize(size_t size)
+{
+	ddslot *old = dedupe.slots;
+	size_t oldsize = dedupe.size;
+	size_t i, j, mask;
+
+	dedupe.slots = calloc(size, sizeof(ddslot));
+	if (dedupe.slots == NULL) {
+		dedupe.slots = old;
+		return -1;
+	}
+	dedupe.size = size;
+	dedupe.used = 0;
+	mask = size - 1;
+	for (i = 0; i < oldsize; i++) {
+		if (old[i].entry == NULL || old[i].entry == TOMBSTONE)
+			continue;
+		for (j = old[i].hash & mask; dedupe.slots[j].entry != NULL; j = (j + 1) & mask)
+			;
+		dedupe.slots[j] = old[i];
+		dedupe.used++;
+	}
+	free(old);
+	return 0;
+}
+
+
+/* Map the line of entry to entry. Returns -1 if out of memory. */
+
+static int
+dd_insert(HIST_ENTRY *entry, uint64_t hash)
+{
+	size_t mask, i;
+	Py_ssize_t slot;
+	size_t size;
+
+	slot = dd_find(entry->line, hash);
+	if (slot >= 0) {
+		dedupe.slots[slot].entry = entry;
+		return 0;
+	}
+	if ((dedupe.used + 1) * 2 > dedupe.size) {
+		/* Resizing also drops the tombstones */
+		for (size = 64; size < (dedupe.used + 1) * 4; size *= 2)
+			;
+		if (dd_resize(size) < 0)
+			return -1;
+	}
+	mask = dedupe.size - 1;
+	for (i = hash & mask; dedupe.slots[i].entry != NULL &&
+	     dedupe.slots[i].entry != TOMBSTONE; i = (i + 1) & mask)
+		;
+	if (dedupe.slots[i].entry == NULL)
+		dedupe.used++;
+	dedupe.slots[i].hash = hash;
+	dedupe.slots[i].entry = entry;
+	return 0;
+}
+
+
+static void
+dd_remove(HIST_ENTRY *entry)
+{
+	Py_ssize_t slot = dd_find(entry->line, line_hash(entry->line));
+
+	if (slot >= 0 && dedupe.slots[slot].entry == entry)
+		dedupe.slots[slot].entry = TOMBSTONE;
+}
+
+
+static void
+dd_clear(void)
+{
+	free(dedupe.slots);
+	dedupe.slots = NULL;
+	dedupe.size = 0;
+	dedupe.used = 0;
+	dedupe.valid = 0;
+}
+
+
+/* Map every line to its newest entry */
+
+static int
+dd_rebuild(void)
+{
+	HIST_ENTRY **hist = history_list();
+	Py_ssize_t n = hist ? history_length : 0;
+	Py_ssize_t i;
+
+	dd_clear();
+	for (i = 0; i < n; i++) {
+		if (dd_insert(hist[i], line_hash(hist[i]->line)) < 0) {
+			dd_clear();
+			return -1;
+		}
+	}
+	dedupe.valid = 1;
+	return 0;
+}
+
+
+void
+HistoryIndex_SetDedupe(int mode)
+{
+	if (mode != DEDUPE_ALL)
+		dd_clear();
+	dedupe.mode = mode;
+}
+
+
+int
+HistoryIndex_GetDedupe(void)
+{
+	return dedupe.mode;
+}
+
+
+Py_ssize_t
+HistoryIndex_Position(void)
+{
+	return history_base + (history_list() ? history_length : 0) + dedupe.dropped;
+}
+
+
+/* A full stifled history drops its oldest entry when a line is added.
+   Do it here so the entry is freed with its undo list. */
+
+static void
+drop_oldest(void)
+{
+	HIST_ENTRY *entry;
+
+	if (history_is_stifled() && history_length > 0 &&
+	    history_length >= history_max_entries) {
+		entry = remove_history(0);
+		if (entry != NULL) {
+			_py_free_history_entry(entry);
+			history_base++;
+		}
+	}
+}
+
+
+/* Add a line to the history according to the dedupe mode. Does not
+   use the Python API and may be called without holding the GIL. */
+
+void
+HistoryIndex_AddLine(const char *line)
+{
+	HIST_ENTRY **hist = history_list();
+	HIST_ENTRY *old;
+	Py_ssize_t n = hist ? history_length : 0;
+	Py_ssize_t slot, i;
+	uint64_t hash;
+
+	if (dedupe.mode == DEDUPE_CONSECUTIVE && n > 0 &&
+	    strcmp(hist[n-1]->line, line) == 0)
+		return;
+	if (dedupe.mode != DEDUPE_ALL || (!dedupe.valid && dd_rebuild() < 0)) {
+		drop_oldest();
+		add_history(line);
+		return;
+	}
+
+	hash = line_hash(line);
+	slot = dd_find(line, hash);
+	if (slot >= 0) {
+		old = dedupe.slots[slot].entry;
+		if (hist[n-1] == old)
+			return;
+		/* Move the line to the end */
+		for (i = n-1; i >= 0 && hist[i] != old; i--)
+			;
+		if (i >= 0) {
+			dedupe.slots[slot].entry = TOMBSTONE;
+			_py_free_history_entry(remove_history(i));
+			dedupe.dropped++;
+		}
+	}
+	hist = history_list();
+	if (hist && history_is_stifled() && history_length > 0 &&
+	    history_length >= history_max_entries)
+		dd_remove(hist[0]);
+	drop_oldest();
+
+	add_history(line);
+	hist = history_list();
+	if (hist == NULL || history_length == 0)
+		return;
+	if (dd_insert(hist[history_length-1], hash) < 0)
+		dd_clear();
+}
+
+
+/* Remove duplicates after loading a file. Only applies in "all" mode,
+   where the entries added since history position since are handled
+   like lines added one by one: the newest of repeated lines is kept,
+   and an older entry is dropped if a loaded line repeats it. Repeats
+   among the older entries are left alone. */
+
+void
+HistoryIndex_Dedupe(Py_ssize_t since)
+{
+	HIST_ENTRY **hist = history_list();
+	Py_ssize_t n = hist ? history_length : 0;
+	Py_ssize_t first, i, j;
+	uint64_t hash;
+
+	if (dedupe.mode != DEDUPE_ALL || n == 0)
+		return;
+	first = n - (HistoryIndex_Position() - since);
+	if (first < 0)
+		first = 0;
+	if (first >= n)
+		return;
+
+	/* The table only holds the loaded lines */
+	dd_clear();
+	for (i = n-1; i >= 0; i--) {
+		hash = line_hash(hist[i]->line);
+		if (dd_find(hist[i]->line, hash) >= 0) {
+			_py_free_history_entry(hist[i]);
+			hist[i] = NULL;
+		}
+		else if (i >= first && dd_insert(hist[i], hash) < 0) {
+			/* Keep the remaining entries */
+			break;
+		}
+	}
+	dd_clear();
+
+	for (i = j = 0; i < n; i++) {
+		if (hist[i] != NULL)
+			hist[j++] = hist[i];
+	}
+	for (i = j; i < n; i++)
+		hist[i] = NULL;
+	history_length = j;
+	dedupe.dropped += n - j;
+	histindex.valid = 0;
+}
+
+
+/*********************** Bulk Adds **************************/
+
+/* When a stifled history is full, add_history() drops the oldest
+   entry by moving all others down one slot, which makes adding many
+   lines quadratic in the size of the history. Bulk adds lift the
+   limit, let the history grow to twice its size, and then drop the
+   oldest entries with one move. Unlike stifle_history(), dropped
+   entries are freed with their undo lists and history_base keeps
+   counting, so history positions stay valid. */
+
+static struct {
+	int depth;		/* Nesting level of bulk adds */
+	int max;		/* Saved limit, -1 if not stifled */
+} bulk = {0, -1};
+
+
+void
+HistoryIndex_Trim(Py_ssize_t max)
+{
+	HIST_ENTRY **hist = history_list();
+	Py_ssize_t n = hist ? history_length : 0;
+	Py_ssize_t k, i;
+
+	if (max < 0)
+		max = 0;
+	if (n <= max)
+		return;
+	k = n - max;
+	for (i = 0; i < k; i++)
+		_py_free_history_entry(hist[i]);
+	memmove(hist, hist + k, max * sizeof(HIST_ENTRY *));
+	for (i = max; i < n; i++)
+		hist[i] = NULL;
+	history_length = max;
+	history_base += k;
+	if (history_offset > history_length)
+		history_offset = history_length;
+	HistoryIndex_Invalidate();
+}
+
+
+void
+HistoryIndex_BeginBulk(void)
+{
+	if (bulk.depth++ > 0)
+		return;
+	bulk.max = history_is_stifled() ? history_max_entries : -1;
+	unstifle_history();
+}
+
+
+/* Called after adding an entry during a bulk add */
+
+void
+HistoryIndex_BulkAdded(void)
+{
+	if (bulk.depth > 0 && bulk.max >= 0 &&
+	    history_length >= 2 * (Py_ssize_t)bulk.max + 1024)
+		HistoryIndex_Trim(bulk.max);
+}
+
+
+void
+HistoryIndex_EndBulk(void)
+{
+	if (--bulk.depth > 0)
+		return;
+	if (bulk.max >= 0) {
+		HistoryIndex_Trim(bulk.max);
+		stifle_history(bulk.max);
+	}
+	bulk.max = -1;
+}
+
+
+/* Search the history for lines containing a substring or matching
+   a POSIX extended regular expression. Returns a list of
+   (index, line) tuples. Entries of an attached archive are
+   included as (('archive', i), line) tuples, older than the
+   history. */
+
+PyObject *
+HistoryIndex_Search(const char *pattern, int regex, int reverse, Py_ssize_t limit)
+{
+	HIST_ENTRY **hist = history_list();
+	Py_ssize_t n = hist ? history_length : 0;
+	Py_ssize_t i, k;
+	PyObject *list = NULL;
+	PyObject *item;
+	regex_t re;
+	histsig psig = {0, 0};
+	int use_index = 0;
+	int rc;
+	char *line;
+
+	if (regex) {
+		rc = regcomp(&re, pattern, REG_EXTENDED | REG_NOSUB);
+		if (rc != 0) {
+			char buffer[256];
+			regerror(rc, &re, buffer, sizeof(buffer));
+			PyErr_SetString(PyExc_ValueError, buffer);
+			return NULL;
+		}
+	}
+	else if (histindex.enabled && strlen(pattern) >= 3) {
+		/* Fall back to a full scan if the index cannot be kept */
+		use_index = (index_sync() == 0);
+		sig_compute(pattern, &psig);
+	}
+
+	list = PyList_New(0);
+	if (list == NULL)
+		goto done;
+
+	/* The attached archive holds the oldest entries */
+	if (!reverse && HistoryArchive_Search(list, pattern, regex ? &re : NULL,
+					      reverse, limit) < 0) {
+		Py_CLEAR(list);
+		goto done;
+	}
+
+	for (k = 0; k < n; k++) {
+		if (limit >= 0 && PyList_GET_SIZE(list) >= limit)
+			break;
+		i = reverse ? n-1-k : k;
+		line = hist[i]->line;
+		if (use_index) {
+			if (!index_current(i, hist[i]))
+				index_set(i, hist[i]);
+			if ((histindex.sigs[i].lo & psig.lo) != psig.lo ||
+			    (histindex.sigs[i].hi & psig.hi) != psig.hi)
+				continue;
+		}
+		if (regex) {
+			if (regexec(&re, line, 0, NULL, 0) != 0)
+				continue;
+		}
+		else if (strstr(line, pattern) == NULL) {
+			continue;
+		}
+		item = Py_BuildValue("(nN)", i, PyString_FromString(line));
+		if (item == NULL || PyList_Append(list, item) < 0) {
+			Py_XDECREF(item);
+			Py_CLEAR(list);
+			goto done;
+		}
+		Py_DECREF(item);
+	}
+
+	if (reverse && HistoryArchive_Search(list, pattern, regex ? &re : NULL,
+					     reverse, limit) < 0)
+		Py_CLEAR(list);
+  done:
+	if (regex)
+		regfree(&re);
+	return list;
+}
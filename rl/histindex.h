@@ -0,0 +1,32 @@
+#ifndef __HISTINDEX_H__
+#define __HISTINDEX_H__
+
+#include "Python.h"
+
+void HistoryIndex_Enable(int enable);
+int HistoryIndex_IsEnabled(void);
+
+void HistoryIndex_Added(void);
+void HistoryIndex_Removed(Py_ssize_t index);
+void HistoryIndex_Replaced(Py_ssize_t index);
+void HistoryIndex_Invalidate(void);
+
+#define DEDUPE_NONE 0
+#define DEDUPE_CONSECUTIVE 1
+#define DEDUPE_ALL 2
+
+void HistoryIndex_SetDedupe(int mode);
+int HistoryIndex_GetDedupe(void);
+void HistoryIndex_AddLine(const char *line);
+void HistoryIndex_Dedupe(Py_ssize_t since);
+Py_ssize_t HistoryIndex_Position(void);
+
+void HistoryIndex_Trim(Py_ssize_t max);
+void HistoryIndex_BeginBulk(void);
+void HistoryIndex_BulkAdded(void);
+void HistoryIndex_EndBulk(void);
+
+PyObject *HistoryIndex_Search(const char *pattern, int regex, int reverse,
+			      Py_ssize_t limit);
+
+#endif /* __HISTINDEX_H__ */
@@ -0,0 +1,1260 @@
+#include "Python.h"
+#include <ctype.h>
+#include <errno.h>
+#include <fcntl.h>
+#include <pthread.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+/* GNU Readline definitions */
+#undef HAVE_CONFIG_H  /* Else readline/chardefs.h includes strings.h */
+#define _FUNCTION_DEF /* Else readline/rltypedefs.h defines old-style types */
+#ifdef __STDC__
+#define PREFER_STDARG /* Use ANSI C function prototypes */
+#define USE_VARARGS
+#endif
+#include <readline/history.h>
+
+/* Custom definitions */
+#include "histio.h"
+#include "histindex.h"
+
+/* Python 3 compatibility */
+#if (PY_MAJOR_VERSION >= 3)
+#define PyInt_FromSsize_t PyLong_FromSsize_t
+#endif
+
+#define CHUNK_SIZE 65536
+
+static void sync_loaded(const char *filename, off_t offset);
+
+
+/*********************** History File Reader **************************/
+
+/* Reads a history file in fixed-size chunks, releasing the GIL
+   around every read() and checking for signals in between. Lines
+   are parsed like GNU read_history_range() does: timestamp lines
+   belong to the entry that follows them, and multi-line entries
+   are joined if the file was written with timestamps. */
+
+typedef struct {
+	Py_ssize_t from;	/* First entry to add */
+	Py_ssize_t to;		/* Stop before this entry, -1 for all */
+	Py_ssize_t current;	/* Number of entries seen */
+	char *last_ts;		/* Timestamp for the next entry */
+	int first;		/* True before the first line */
+	int reset_comment_char;	/* True if history_comment_char was guessed */
+	int done;		/* True when to has been reached */
+	char *pending;		/* Line continued from the previous chunk */
+	size_t plen;		/* Length of the pending line */
+	size_t palloc;		/* Allocated size of the pending buffer */
+} histreader;
+
+
+static int
+is_timestamp(const char *s)
+{
+	return *s != '\0' && *s == history_comment_char &&
+		isdigit((unsigned char)s[1]);
+}
+
+
+/* Join a line to the most recent history entry */
+
+static int
+append_to_last_entry(const char *line)
+{
+	HIST_ENTRY **hist = history_list();
+	HIST_ENTRY *entry, *old;
+	size_t a, b;
+	char *joined;
+
+	entry = hist[history_length-1];
+	a = strlen(entry->line);
+	b = strlen(line);
+	joined = malloc(a + b + 2);
+	if (joined == NULL)
+		return -1;
+	memcpy(joined, entry->line, a);
+	joined[a] = '\n';
+	memcpy(joined + a + 1, line, b + 1);
+	old = replace_history_entry(history_length-1, joined, entry->data);
+	free(joined);
+	/* The data pointer lives on in the new entry */
+	if (old != NULL)
+		free_history_entry(old);
+	return 0;
+}
+
+
+static int
+process_line(histreader *r, char *line)
+{
+	if (r->first) {
+		r->first = 0;
+		/* Same heuristic as GNU readline */
+		if (history_comment_char == '\0' && line[0] == '#' &&
+		    isdigit((unsigned char)line[1])) {
+			history_comment_char = '#';
+			r->reset_comment_char = 1;
+		}
+		if (is_timestamp(line) && history_write_timestamps)
+			history_multiline_entries++;
+	}
+
+	if (is_timestamp(line)) {
+		free(r->last_ts);
+		r->last_ts = strdup(line);
+		if (r->last_ts == NULL)
+			return -1;
+		return 0;
+	}
+
+	if (r->current < r->from) {
+		/* Skipped entries take their timestamps with them */
+		free(r->last_ts);
+		r->last_ts = NULL;
+		r->current++;
+		return 0;
+	}
+
+	if (*line) {
+		if (r->last_ts == NULL && history_length > 0 && history_multiline_entries) {
+			if (append_to_last_entry(line) < 0)
+				return -1;
+		}
+		else {
+			add_history(line);
+		}
+		if (r->last_ts != NULL) {
+			add_history_time(r->last_ts);
+			free(r->last_ts);
+			r->last_ts = NULL;
+		}
+		HistoryIndex_BulkAdded();
+	}
+	r->current++;
+	if (r->to >= 0 && r->current >= r->to)
+		r->done = 1;
+	return 0;
+}
+
+
+static int
+append_pending(histreader *r, const char *s, size_t n)
+{
+	char *p;
+	size_t size;
+
+	if (r->plen + n + 1 > r->palloc) {
+		size = (r->plen + n + 1) * 2;
+		p = realloc(r->pending, size);
+		if (p == NULL)
+			return -1;
+		r->pending = p;
+		r->palloc = size;
+	}
+	memcpy(r->pending + r->plen, s, n);
+	r->plen += n;
+	r->pending[r->plen] = '\0';
+	return 0;
+}
+
+
+static int
+process_chunk(histreader *r, char *chunk, size_t n)
+{
+	char *p = chunk;
+	char *end = chunk + n;
+	char *nl;
+	char *line;
+	size_t len;
+
+	while (p < end && !r->done) {
+		nl = memchr(p, '\n', end - p);
+		if (nl == NULL)
+			return append_pending(r, p, end - p);
+		if (r->plen > 0) {
+			if (append_pending(r, p, nl - p) < 0)
+				return -1;
+			line = r->pending;
+			len = r->plen;
+			r->plen = 0;
+		}
+		else {
+			*nl = '\0';
+			line = p;
+			len = nl - p;
+		}
+		/* Allow Windows-like \r\n line endings */
+		if (len > 0 && line[len-1] == '\r')
+			line[len-1] = '\0';
+		if (process_line(r, line) < 0)
+			return -1;
+		p = nl + 1;
+	}
+	return 0;
+}
+
+
+/* Return the path of ~/.history, returns NULL with an exception set */
+
+char *
+HistoryFile_DefaultName(void)
+{
+	const char *home;
+	char *path;
+
+	home = getenv("HOME");
+	if (home == NULL)
+		home = ".";
+	path = malloc(strlen(home) + 10);
+	if (path == NULL) {
+		PyErr_NoMemory();
+		return NULL;
+	}
+	strcpy(path, home);
+	strcat(path, "/.history");
+	return path;
+}
+
+
+/* Open a history file for reading, returns -1 with an exception set */
+
+static int
+open_history_file(const char *filename, struct stat *st)
+{
+	char *path = NULL;
+	int fd, saved_errno = 0;
+
+	if (filename == NULL) {
+		path = HistoryFile_DefaultName();
+		if (path == NULL)
+			return -1;
+		filename = path;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	fd = open(filename, O_RDONLY);
+	if (fd >= 0 && fstat(fd, st) < 0) {
+		saved_errno = errno;
+		close(fd);
+		fd = -1;
+		errno = saved_errno;
+	}
+	Py_END_ALLOW_THREADS
+	free(path);
+
+	if (fd >= 0 && !S_ISREG(st->st_mode)) {
+		close(fd);
+		fd = -1;
+		errno = EINVAL;
+	}
+	if (fd < 0)
+		PyErr_SetFromErrno(PyExc_IOError);
+	return fd;
+}
+
+
+/* Read and process chunks from the current file position to the end,
+   returns -1 with an exception set */
+
+static int
+read_chunks(int fd, histreader *r)
+{
+	char *chunk;
+	ssize_t n;
+
+	chunk = malloc(CHUNK_SIZE);
+	if (chunk == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+	while (!r->done) {
+		Py_BEGIN_ALLOW_THREADS
+		n = read(fd, chunk, CHUNK_SIZE);
+		Py_END_ALLOW_THREADS
+		if (n < 0) {
+			if (errno != EINTR) {
+				PyErr_SetFromErrno(PyExc_IOError);
+				goto error;
+			}
+			n = 0;
+		}
+		else if (n == 0) {
+			/* Like GNU readline, ignore an unterminated last line */
+			break;
+		}
+		if (n > 0 && process_chunk(r, chunk, n) < 0) {
+			PyErr_NoMemory();
+			goto error;
+		}
+		/* Allow the load to be interrupted */
+		if (PyErr_CheckSignals() < 0)
+			goto error;
+	}
+	free(chunk);
+	history_lines_read_from_file = r->current;
+	return 0;
+  error:
+	free(chunk);
+	return -1;
+}
+
+
+static void
+reader_init(histreader *r, Py_ssize_t from_line, Py_ssize_t to_line)
+{
+	memset(r, 0, sizeof(histreader));
+	r->from = from_line;
+	r->to = to_line;
+	r->first = 1;
+}
+
+
+static void
+reader_free(histreader *r)
+{
+	if (r->reset_comment_char)
+		history_comment_char = '\0';
+	free(r->last_ts);
+	free(r->pending);
+}
+
+
+PyObject *
+HistoryFile_ReadStream(const char *filename, Py_ssize_t from_line, Py_ssize_t to_line)
+{
+	histreader r;
+	struct stat st;
+	int fd, rc;
+
+	fd = open_history_file(filename, &st);
+	if (fd < 0)
+		return NULL;
+
+	reader_init(&r, from_line, to_line);
+	rc = read_chunks(fd, &r);
+	reader_free(&r);
+	close(fd);
+	if (rc < 0)
+		return NULL;
+	sync_loaded(filename, 0);
+	Py_RETURN_NONE;
+}
+
+
+/* Tail reader */
+
+/* Return true if the line between start and end begins a history
+   entry. Only the first two bytes of the line are looked at; they
+   are taken from the chunk if possible. */
+
+static int
+starts_entry(int fd, const char *chunk, off_t lo, ssize_t got,
+	     off_t start, off_t end, char comment_char)
+{
+	char b[2] = {'\0', '\0'};
+	off_t len = end - start;
+	ssize_t want = len < 2 ? (ssize_t)len : 2;
+
+	if (start >= lo && start + want <= lo + got)
+		memcpy(b, chunk + (start - lo), want);
+	else if (want > 0 && pread(fd, b, want, start) != want)
+		return 0;
+
+	if (comment_char != '\0') {
+		/* With timestamps an entry begins at its timestamp line */
+		return b[0] == comment_char && isdigit((unsigned char)b[1]);
+	}
+	if (len == 0 || (len == 1 && b[0] == '\r'))
+		return 0;
+	return !(b[0] == history_comment_char && b[0] != '\0' &&
+		 isdigit((unsigned char)b[1]));
+}
+
+
+/* Find the offset of the newest n entries by scanning the file
+   backwards. Returns -1 with an exception set. */
+
+static int
+find_tail_offset(int fd, off_t size, Py_ssize_t n, char comment_char, off_t *offset)
+{
+	char *chunk;
+	off_t pos, lo, p;
+	off_t q = -1;	/* Position of the newline ending the current line */
+	ssize_t got, i;
+	Py_ssize_t count = 0;
+
+	*offset = 0;
+	chunk = malloc(CHUNK_SIZE);
+	if (chunk == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+	for (pos = size; pos > 0; pos = lo) {
+		lo = pos > CHUNK_SIZE ? pos - CHUNK_SIZE : 0;
+		Py_BEGIN_ALLOW_THREADS
+		got = pread(fd, chunk, pos - lo, lo);
+		Py_END_ALLOW_THREADS
+		if (got < 0) {
+			if (errno == EINTR) {
+				lo = pos;
+				goto signals;
+			}
+			PyErr_SetFromErrno(PyExc_IOError);
+			goto error;
+		}
+		if (got != pos - lo) {
+			errno = EIO;
+			PyErr_SetFromErrno(PyExc_IOError);
+			goto error;
+		}
+		for (i = got-1; i >= 0; i--) {
+			if (chunk[i] != '\n')
+				continue;
+			p = lo + i;
+			/* The text after the last newline is not a line */
+			if (q >= 0 &&
+			    starts_entry(fd, chunk, lo, got, p+1, q, comment_char) &&
+			    ++count == n) {
+				*offset = p+1;
+				goto done;
+			}
+			q = p;
+		}
+	  signals:
+		if (PyErr_CheckSignals() < 0)
+			goto error;
+	}
+	/* The first line of the file; the offset stays 0 */
+  done:
+	free(chunk);
+	return 0;
+  error:
+	free(chunk);
+	return -1;
+}
+
+
+PyObject *
+HistoryFile_ReadTail(const char *filename, Py_ssize_t n)
+{
+	histreader r;
+	struct stat st;
+	char head[2] = {'\0', '\0'};
+	char comment_char;
+	off_t offset = 0;
+	ssize_t got;
+	int fd, rc = -1;
+
+	fd = open_history_file(filename, &st);
+	if (fd < 0)
+		return NULL;
+	if (n <= 0 || st.st_size == 0) {
+		close(fd);
+		Py_RETURN_NONE;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	got = pread(fd, head, 2, 0);
+	Py_END_ALLOW_THREADS
+	if (got < 0) {
+		PyErr_SetFromErrno(PyExc_IOError);
+		close(fd);
+		return NULL;
+	}
+
+	reader_init(&r, 0, -1);
+	/* Apply the first-line heuristics of the reader to the file head */
+	r.first = 0;
+	if (history_comment_char == '\0' && head[0] == '#' &&
+	    isdigit((unsigned char)head[1])) {
+		history_comment_char = '#';
+		r.reset_comment_char = 1;
+	}
+	comment_char = '\0';
+	if (is_timestamp(head)) {
+		comment_char = history_comment_char;
+		if (history_write_timestamps)
+			history_multiline_entries++;
+	}
+
+	if (find_tail_offset(fd, st.st_size, n, comment_char, &offset) < 0)
+		goto done;
+	if (lseek(fd, offset, SEEK_SET) < 0) {
+		PyErr_SetFromErrno(PyExc_IOError);
+		goto done;
+	}
+	rc = read_chunks(fd, &r);
+  done:
+	reader_free(&r);
+	close(fd);
+	if (rc < 0)
+		return NULL;
+	sync_loaded(filename, offset);
+	Py_RETURN_NONE;
+}
+
+
+/*********************** History File Sync **************************/
+
+/* Merges the history with a file shared by several processes. The
+   file is locked with fcntl(), read once, and rewritten through a
+   temporary file that is renamed over the original. Entries other
+   processes added since the last sync are appended to the history,
+   entries added locally since the last sync are appended to the file.
+
+   The file as of the last sync or load is remembered by its size and
+   a hash of its contents. If the file still starts with those bytes,
+   everything after them is new. If another process rewrote the file,
+   the new entries follow the longest run of remembered entries found
+   in it. */
+
+#define HASH_INIT 14695981039346656037u
+
+static struct {
+	char *filename;		/* File of the last sync */
+	Py_ssize_t mark;	/* History position after the last sync */
+	off_t start;		/* Start of the known part of the file */
+	off_t size;		/* End of the known part of the file */
+	uint64_t digest;	/* Hash of the known part */
+	uint64_t *records;	/* Hashes of the entries in the known part */
+	Py_ssize_t nrecords;
+} syncstate = {NULL, 0, 0, 0, HASH_INIT, NULL, 0};
+
+
+static uint64_t
+hash_update(uint64_t h, const char *s, size_t n)
+{
+	const unsigned char *p = (const unsigned char *)s;
+	const unsigned char *end = p + n;
+
+	for (; p < end; p++) {
+		h ^= *p;
+		h *= 1099511628211u;
+	}
+	return h;
+}
+
+
+/* Hash a record like it is written to the file */
+
+static uint64_t
+record_hash(uint64_t h, histrecord *r)
+{
+	if (r->ts) {
+		h = hash_update(h, r->ts, strlen(r->ts));
+		h = hash_update(h, "\n", 1);
+	}
+	h = hash_update(h, r->line, strlen(r->line));
+	return hash_update(h, "\n", 1);
+}
+
+
+static void
+sync_forget(void)
+{
+	free(syncstate.records);
+	syncstate.records = NULL;
+	syncstate.nrecords = 0;
+	syncstate.start = 0;
+	syncstate.size = 0;
+	syncstate.digest = HASH_INIT;
+}
+
+
+/* Forget the file, too; the next sync treats it as unknown */
+
+static void
+sync_clear(void)
+{
+	sync_forget();
+	free(syncstate.filename);
+	syncstate.filename = NULL;
+}
+
+
+static int
+str_equal(const char *a, const char *b)
+{
+	if (a == NULL || b == NULL)
+		return a == b;
+	return strcmp(a, b) == 0;
+}
+
+
+static int
+sync_set_filename(const char *filename)
+{
+	if (str_equal(syncstate.filename, filename))
+		return 0;
+	free(syncstate.filename);
+	syncstate.filename = strdup(filename);
+	return syncstate.filename == NULL ? -1 : 0;
+}
+
+
+/* Remember the records of the known part of the file */
+
+static int
+sync_remember(histrecord *recs, Py_ssize_t n)
+{
+	Py_ssize_t i;
+
+	free(syncstate.records);
+	syncstate.nrecords = 0;
+	syncstate.records = malloc((n + 1) * sizeof(uint64_t));
+	if (syncstate.records == NULL)
+		return -1;
+	for (i = 0; i < n; i++)
+		syncstate.records[i] = record_hash(HASH_INIT, &recs[i]);
+	syncstate.nrecords = n;
+	return 0;
+}
+
+
+/* Open and lock the file. Another process may have renamed a new
+   file into place while we waited for the lock, in which case the
+   lock is on a stale inode and we try again. */
+
+int
+HistoryFile_LockFile(const char *filename, struct stat *st)
+{
+	struct flock fl;
+	struct stat cur;
+	int fd, rc;
+
+	for (;;) {
+		Py_BEGIN_ALLOW_THREADS
+		fd = open(filename, O_RDWR | O_CREAT, 0600);
+		Py_END_ALLOW_THREADS
+		if (fd < 0)
+			goto error;
+
+		memset(&fl, 0, sizeof(fl));
+		fl.l_type = F_WRLCK;
+		fl.l_whence = SEEK_SET;
+		Py_BEGIN_ALLOW_THREADS
+		rc = fcntl(fd, F_SETLKW, &fl);
+		Py_END_ALLOW_THREADS
+		if (rc < 0) {
+			close(fd);
+			if (errno != EINTR)
+				goto error;
+			if (PyErr_CheckSignals() < 0)
+				return -1;
+			continue;
+		}
+		if (fstat(fd, st) < 0) {
+			close(fd);
+			goto error;
+		}
+		if (!S_ISREG(st->st_mode)) {
+			close(fd);
+			errno = EINVAL;
+			goto error;
+		}
+		if (stat(filename, &cur) == 0 &&
+		    cur.st_dev == st->st_dev && cur.st_ino == st->st_ino)
+			return fd;
+		close(fd);
+	}
+  error:
+	PyErr_SetFromErrno(PyExc_IOError);
+	return -1;
+}
+
+
+/* Read the whole file with one read. Returns NULL with an exception set. */
+
+static char *
+read_whole_file(int fd, off_t size, size_t *len)
+{
+	char *buffer;
+	ssize_t n;
+	size_t got = 0;
+
+	buffer = malloc(size + 1);
+	if (buffer == NULL) {
+		PyErr_NoMemory();
+		return NULL;
+	}
+	while (got < (size_t)size) {
+		Py_BEGIN_ALLOW_THREADS
+		n = read(fd, buffer + got, size - got);
+		Py_END_ALLOW_THREADS
+		if (n < 0 && errno == EINTR)
+			continue;
+		if (n < 0) {
+			PyErr_SetFromErrno(PyExc_IOError);
+			free(buffer);
+			return NULL;
+		}
+		if (n == 0)
+			break;
+		got += n;
+	}
+	buffer[got] = '\0';
+	*len = got;
+	return buffer;
+}
+
+
+/* Split the buffer into records in place. Returns the number of
+   records or -1 if out of memory. */
+
+static Py_ssize_t
+parse_records(char *buffer, size_t len, char comment_char, histrecord **records)
+{
+	histrecord *recs = NULL, *r;
+	Py_ssize_t n = 0, allocated = 0;
+	char *p = buffer, *end = buffer + len, *nl;
+	const char *ts = NULL;
+	size_t l;
+
+	*records = NULL;
+	while (p < end) {
+		nl = memchr(p, '\n', end - p);
+		/* Like GNU readline, ignore an unterminated last line */
+		if (nl == NULL)
+			break;
+		*nl = '\0';
+		l = nl - p;
+		if (l > 0 && p[l-1] == '\r')
+			p[l-1] = '\0';
+		if (comment_char != '\0' && p[0] == comment_char &&
+		    isdigit((unsigned char)p[1])) {
+			ts = p;
+		}
+		else if (*p) {
+			if (n == allocated) {
+				allocated = allocated * 2 + 64;
+				r = realloc(recs, allocated * sizeof(histrecord));
+				if (r == NULL) {
+					free(recs);
+					return -1;
+				}
+				recs = r;
+			}
+			recs[n].ts = ts;
+			recs[n].line = p;
+			n++;
+			ts = NULL;
+		}
+		p = nl + 1;
+	}
+	*records = recs;
+	return n;
+}
+
+
+/* Read and split a whole history file. The records point into the
+   buffer; both must be freed by the caller. Returns -1 with an
+   exception set. */
+
+Py_ssize_t
+HistoryFile_ReadRecords(const char *filename, char **buffer, histrecord **records)
+{
+	struct stat st;
+	char comment_char;
+	size_t len;
+	Py_ssize_t n;
+	int fd;
+
+	*buffer = NULL;
+	*records = NULL;
+	fd = open_history_file(filename, &st);
+	if (fd < 0)
+		return -1;
+	*buffer = read_whole_file(fd, st.st_size, &len);
+	close(fd);
+	if (*buffer == NULL)
+		return -1;
+
+	comment_char = history_comment_char;
+	if (comment_char == '\0' && (*buffer)[0] == '#' &&
+	    isdigit((unsigned char)(*buffer)[1]))
+		comment_char = '#';
+	n = parse_records(*buffer, len, comment_char, records);
+	if (n < 0) {
+		free(*buffer);
+		*buffer = NULL;
+		PyErr_NoMemory();
+	}
+	return n;
+}
+
+
+/* Return the index of the first record another process added since
+   the last sync. The records are searched for the longest run of
+   remembered records, with the earliest match winning a tie; the
+   records after it are new. Returns -1 if out of memory. */
+
+static Py_ssize_t
+find_new_records(histrecord *recs, Py_ssize_t n)
+{
+	uint64_t *h = syncstate.records;
+	Py_ssize_t m = syncstate.nrecords;
+	Py_ssize_t *pi;
+	Py_ssize_t i, j, q, best = 0, first = 0;
+	uint64_t t;
+
+	if (m == 0 || n == 0)
+		return 0;
+	pi = malloc(m * sizeof(Py_ssize_t));
+	if (pi == NULL)
+		return -1;
+
+	/* Match the remembered records backwards from their end against
+	   the file backwards from its end (Knuth-Morris-Pratt) */
+	pi[0] = 0;
+	for (i = 1, q = 0; i < m; i++) {
+		while (q > 0 && h[m-1-q] != h[m-1-i])
+			q = pi[q-1];
+		if (h[m-1-q] == h[m-1-i])
+			q++;
+		pi[i] = q;
+	}
+	for (j = 0, q = 0; j < n; j++) {
+		t = record_hash(HASH_INIT, &recs[n-1-j]);
+		while (q > 0 && h[m-1-q] != t)
+			q = pi[q-1];
+		if (h[m-1-q] == t)
+			q++;
+		if (q > 0 && q >= best) {
+			best = q;
+			first = n - j + q - 1;
+		}
+		if (q == m)
+			q = pi[q-1];
+	}
+	free(pi);
+	return first;
+}
+
+
+static const char *
+record_start(histrecord *r)
+{
+	return r->ts ? r->ts : r->line;
+}
+
+
+static size_t
+record_size(histrecord *r)
+{
+	return (r->ts ? strlen(r->ts) + 1 : 0) + strlen(r->line) + 1;
+}
+
+
+static char *
+record_write(char *p, histrecord *r)
+{
+	size_t l;
+
+	if (r->ts) {
+		l = strlen(r->ts);
+		memcpy(p, r->ts, l);
+		p += l;
+		*p++ = '\n';
+	}
+	l = strlen(r->line);
+	memcpy(p, r->line, l);
+	p += l;
+	*p++ = '\n';
+	return p;
+}
+
+
+static void
+entry_record(HIST_ENTRY *entry, histrecord *r)
+{
+	r->line = entry->line;
+	r->ts = NULL;
+	/* Same rule as write_history() */
+	if (history_write_timestamps && entry->timestamp &&
+	    entry->timestamp[0] != '\0')
+		r->ts = entry->timestamp;
+}
+
+
+/* Write the records to a temporary file in the same directory and
+   rename it over the original, with one write. Returns -1 with an
+   exception set. */
+
+static int
+replace_history_file(const char *filename, struct stat *st,
+		     histrecord *recs, Py_ssize_t n)
+{
+	char *tmpname, *buffer, *p;
+	size_t size = 0;
+	ssize_t w;
+	Py_ssize_t i;
+	int fd, saved_errno, rc = -1;
+
+	for (i = 0; i < n; i++)
+		size += record_size(&recs[i]);
+	tmpname = malloc(strlen(filename) + 32);
+	buffer = malloc(size + 1);
+	if (tmpname == NULL || buffer == NULL) {
+		PyErr_NoMemory();
+		goto done;
+	}
+	p = buffer;
+	for (i = 0; i < n; i++)
+		p = record_write(p, &recs[i]);
+	sprintf(tmpname, "%s.tmp%ld", filename, (long)getpid());
+
+	Py_BEGIN_ALLOW_THREADS
+	fd = open(tmpname, O_WRONLY | O_CREAT | O_TRUNC, st->st_mode & 07777);
+	if (fd >= 0) {
+		size_t done = 0;
+		w = 0;
+		while (done < size) {
+			w = write(fd, buffer + done, size - done);
+			if (w < 0 && errno == EINTR)
+				continue;
+			if (w < 0)
+				break;
+			done += w;
+		}
+		saved_errno = errno;
+		if (close(fd) < 0 && w >= 0) {
+			w = -1;
+			saved_errno = errno;
+		}
+		if (w >= 0 && rename(tmpname, filename) == 0)
+			rc = 0;
+		else {
+			if (w >= 0)
+				saved_errno = errno;
+			unlink(tmpname);
+			errno = saved_errno;
+		}
+	}
+	Py_END_ALLOW_THREADS
+	if (rc < 0)
+		PyErr_SetFromErrno(PyExc_IOError);
+  done:
+	free(tmpname);
+	free(buffer);
+	return rc;
+}
+
+
+/* Remember the part of a file from offset to its end as synced,
+   after it was loaded into the history. If this fails, the next sync
+   treats the file as unknown. */
+
+static void
+sync_loaded(const char *filename, off_t offset)
+{
+	histrecord *recs = NULL;
+	struct stat st;
+	char *buffer = NULL;
+	char *path = NULL;
+	char comment_char;
+	size_t len;
+	Py_ssize_t n;
+	int fd = -1;
+
+	if (filename == NULL) {
+		path = HistoryFile_DefaultName();
+		if (path == NULL)
+			goto error;
+		filename = path;
+	}
+	fd = open_history_file(filename, &st);
+	if (fd < 0)
+		goto error;
+	if (lseek(fd, offset, SEEK_SET) < 0 || st.st_size < offset) {
+		PyErr_SetFromErrno(PyExc_IOError);
+		goto error;
+	}
+	buffer = read_whole_file(fd, st.st_size - offset, &len);
+	if (buffer == NULL)
+		goto error;
+
+	/* Like GNU readline, ignore an unterminated last line */
+	while (len > 0 && buffer[len-1] != '\n')
+		len--;
+	syncstate.digest = hash_update(HASH_INIT, buffer, len);
+	syncstate.start = offset;
+	syncstate.size = offset + len;
+
+	comment_char = history_comment_char;
+	if (comment_char == '\0' && buffer[0] == '#' &&
+	    isdigit((unsigned char)buffer[1]))
+		comment_char = '#';
+	n = parse_records(buffer, len, comment_char, &recs);
+	if (n < 0 || sync_set_filename(filename) < 0 ||
+	    sync_remember(recs, n) < 0) {
+		PyErr_NoMemory();
+		goto error;
+	}
+	syncstate.mark = HistoryIndex_Position();
+	goto done;
+  error:
+	PyErr_Clear();
+	sync_clear();
+  done:
+	if (fd >= 0)
+		close(fd);
+	free(recs);
+	free(buffer);
+	free(path);
+}
+
+
+void
+HistoryFile_Loaded(const char *filename)
+{
+	sync_loaded(filename, 0);
+}
+
+
+PyObject *
+HistoryFile_Sync(const char *filename, int max_entries)
+{
+	HIST_ENTRY **hist;
+	histrecord *recs = NULL, *all = NULL;
+	struct stat st;
+	char *buffer = NULL;
+	char comment_char;
+	size_t len;
+	Py_ssize_t n, first_new, first_local, nlocal, total, skip, since, i;
+	char *path = NULL;
+	int unchanged;
+	int fd, rc = -1;
+
+	if (filename == NULL) {
+		path = HistoryFile_DefaultName();
+		if (path == NULL)
+			return NULL;
+		filename = path;
+	}
+	if (!str_equal(syncstate.filename, filename)) {
+		/* A new file; everything in memory is new to it */
+		sync_forget();
+		syncstate.mark = HistoryIndex_Position() - (history_list() ? history_length : 0);
+	}
+
+	fd = HistoryFile_LockFile(filename, &st);
+	if (fd < 0) {
+		free(path);
+		return NULL;
+	}
+	buffer = read_whole_file(fd, st.st_size, &len);
+	if (buffer == NULL)
+		goto done;
+
+	/* Check whether the known part of the file is unchanged; the
+	   records are split in place, so this comes first */
+	unchanged = (off_t)len >= syncstate.size &&
+		hash_update(HASH_INIT, buffer + syncstate.start,
+			    syncstate.size - syncstate.start) == syncstate.digest;
+
+	comment_char = history_comment_char;
+	if (comment_char == '\0' && buffer[0] == '#' &&
+	    isdigit((unsigned char)buffer[1]))
+		comment_char = '#';
+	n = parse_records(buffer, len, comment_char, &recs);
+	if (n < 0) {
+		PyErr_NoMemory();
+		goto done;
+	}
+
+	/* Entries written by other processes since the last sync */
+	if (unchanged) {
+		for (first_new = 0; first_new < n; first_new++) {
+			if (record_start(&recs[first_new]) - buffer >= syncstate.size)
+				break;
+		}
+	}
+	else {
+		first_new = find_new_records(recs, n);
+		if (first_new < 0) {
+			PyErr_NoMemory();
+			goto done;
+		}
+	}
+
+	/* Local entries are determined before the history grows */
+	hist = history_list();
+	nlocal = HistoryIndex_Position() - syncstate.mark;
+	if (nlocal < 0 || hist == NULL)
+		nlocal = 0;
+	if (nlocal > history_length)
+		nlocal = history_length;
+	first_local = history_length - nlocal;
+
+	all = malloc((n + nlocal + 1) * sizeof(histrecord));
+	if (all == NULL) {
+		PyErr_NoMemory();
+		goto done;
+	}
+	if (n > 0)
+		memcpy(all, recs, n * sizeof(histrecord));
+	for (i = 0; i < nlocal; i++) {
+		entry_record(hist[first_local+i], &all[n+i]);
+	}
+	total = n + nlocal;
+	skip = (max_entries >= 0 && total > max_entries) ? total - max_entries : 0;
+
+	if (replace_history_file(filename, &st, all + skip, total - skip) < 0)
+		goto done;
+
+	/* Remember the file before adding to the history, which may
+	   free the local entries */
+	syncstate.start = 0;
+	syncstate.size = 0;
+	syncstate.digest = HASH_INIT;
+	for (i = skip; i < total; i++) {
+		syncstate.size += record_size(&all[i]);
+		syncstate.digest = record_hash(syncstate.digest, &all[i]);
+	}
+	if (sync_set_filename(filename) < 0 ||
+	    sync_remember(all + skip, total - skip) < 0) {
+		sync_clear();
+		PyErr_NoMemory();
+		goto done;
+	}
+
+	since = HistoryIndex_Position();
+	for (i = first_new; i < n; i++) {
+		add_history(recs[i].line);
+		if (recs[i].ts != NULL)
+			add_history_time(recs[i].ts);
+		HistoryIndex_BulkAdded();
+	}
+	HistoryIndex_Dedupe(since);
+	syncstate.mark = HistoryIndex_Position();
+	rc = 0;
+  done:
+	/* Closing the file releases the lock */
+	close(fd);
+	free(all);
+	free(recs);
+	free(buffer);
+	free(path);
+	if (rc < 0)
+		return NULL;
+	Py_RETURN_NONE;
+}
+
+
+/*********************** History File Writer **************************/
+
+/* Appends the entries added since a history position to a history
+   file. The position keeps counting when a stifled history drops its
+   oldest entries or duplicates are removed. The entries
+   are copied while holding the GIL; the file is written without it.
+   Since readline adds lines to the history without holding the GIL,
+   the copy is also protected by a mutex. */
+
+static pthread_mutex_t history_mutex = PTHREAD_MUTEX_INITIALIZER;
+
+
+void
+HistoryFile_Lock(void)
+{
+	pthread_mutex_lock(&history_mutex);
+}
+
+
+void
+HistoryFile_Unlock(void)
+{
+	pthread_mutex_unlock(&history_mutex);
+}
+
+
+PyObject *
+HistoryFile_Append(const char *filename, Py_ssize_t since)
+{
+	HIST_ENTRY **hist;
+	histrecord rec;
+	char *buffer = NULL, *p;
+	char *path = NULL;
+	size_t size = 0, done = 0;
+	ssize_t w = 0;
+	Py_ssize_t first, end, n, i;
+	int fd = 0, saved_errno = 0;
+
+	if (filename == NULL) {
+		path = HistoryFile_DefaultName();
+		if (path == NULL)
+			return NULL;
+		filename = path;
+	}
+
+	HistoryFile_Lock();
+	hist = history_list();
+	end = HistoryIndex_Position();
+	n = end - since;
+	if (hist == NULL || n <= 0) {
+		HistoryFile_Unlock();
+		free(path);
+		return PyInt_FromSsize_t(end);
+	}
+	if (n > history_length)
+		n = history_length;
+	first = history_length - n;
+	for (i = first; i < history_length; i++) {
+		entry_record(hist[i], &rec);
+		size += record_size(&rec);
+	}
+	buffer = malloc(size + 1);
+	if (buffer == NULL) {
+		HistoryFile_Unlock();
+		free(path);
+		return PyErr_NoMemory();
+	}
+	p = buffer;
+	for (i = first; i < history_length; i++) {
+		entry_record(hist[i], &rec);
+		p = record_write(p, &rec);
+	}
+	HistoryFile_Unlock();
+
+	Py_BEGIN_ALLOW_THREADS
+	fd = open(filename, O_WRONLY | O_APPEND | O_CREAT, 0600);
+	if (fd >= 0) {
+		while (done < size) {
+			w = write(fd, buffer + done, size - done);
+			if (w < 0 && errno == EINTR)
+				continue;
+			if (w < 0)
+				break;
+			done += w;
+		}
+		saved_errno = errno;
+		if (close(fd) < 0 && w >= 0) {
+			w = -1;
+			saved_errno = errno;
+		}
+		errno = saved_errno;
+	}
+	Py_END_ALLOW_THREADS
+	free(buffer);
+	free(path);
+	if (fd < 0 || w < 0)
+		return PyErr_SetFromErrno(PyExc_IOError);
+	return PyInt_FromSsize_t(end);
+}
+
+
+PyObject *
+HistoryFile_Position(void)
+{
+	Py_ssize_t position;
+
+	HistoryFile_Lock();
+	position = HistoryIndex_Position();
+	HistoryFile_Unlock();
+	return PyInt_FromSsize_t(position);
+}
@@ -0,0 +1,28 @@
+#ifndef __HISTIO_H__
+#define __HISTIO_H__
+
+#include "Python.h"
+#include <sys/stat.h>
+
+typedef struct {
+	const char *ts;		/* Timestamp line or NULL */
+	const char *line;
+} histrecord;
+
+PyObject *HistoryFile_ReadStream(const char *filename, Py_ssize_t from_line,
+				 Py_ssize_t to_line);
+PyObject *HistoryFile_ReadTail(const char *filename, Py_ssize_t n);
+PyObject *HistoryFile_Sync(const char *filename, int max_entries);
+void HistoryFile_Loaded(const char *filename);
+PyObject *HistoryFile_Append(const char *filename, Py_ssize_t since);
+PyObject *HistoryFile_Position(void);
+
+char *HistoryFile_DefaultName(void);
+int HistoryFile_LockFile(const char *filename, struct stat *st);
+Py_ssize_t HistoryFile_ReadRecords(const char *filename, char **buffer,
+				   histrecord **records);
+
+void HistoryFile_Lock(void);
+void HistoryFile_Unlock(void);
+
+#endif /* __HISTIO_H__ */
@@ -0,0 +1,336 @@
+#include "Python.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <wchar.h>
+
+/* GNU Readline definitions */
+#undef HAVE_CONFIG_H  /* Else readline/chardefs.h includes strings.h */
+#define _FUNCTION_DEF /* Else readline/rltypedefs.h defines old-style types */
+#ifdef __STDC__
+#define PREFER_STDARG /* Use ANSI C function prototypes */
+#define USE_VARARGS
+#endif
+#include <readline/readline.h>
+
+/* Custom definitions */
+#include "stringarray.h"
+#include "matchpager.h"
+
+#ifndef RUBOUT
+#define RUBOUT 0x7f
+#endif
+
+
+/************************** Paged Match Display **************************/
+
+/* Matches are pulled from a Python iterable one page at a time and
+   printed in columns, like rl_display_match_list does with a complete
+   match list. Only the matches on the current page are held in memory.
+   The column width starts out as the widest match of the first page
+   and grows when a later page contains a wider match, so the width of
+   the whole list is never computed up front. */
+
+typedef struct {
+	PyObject *object;	/* Owner of the encoded match */
+	const char *match;	/* Encoded match */
+	int width;		/* Printed width */
+} pageitem;
+
+typedef struct {
+	PyObject *it;		/* Source iterator */
+	int exhausted;
+	pageitem *items;	/* Pulled but not yet displayed */
+	Py_ssize_t size;
+	Py_ssize_t allocated;
+} pager;
+
+
+static const char *
+printable_part(const char *match)
+/* Filenames are displayed without their directory part */
+{
+	const char *p, *q;
+
+	if (!rl_filename_completion_desired)
+		return match;
+	p = strrchr(match, '/');
+	if (p == NULL)
+		return match;
+	if (p[1] != '\0')
+		return p+1;
+	/* Directory names keep their trailing slash */
+	for (q = p; q > match; q--) {
+		if (q[-1] == '/')
+			return q;
+	}
+	return match;
+}
+
+
+static int
+printed_width(const char *text)
+{
+	const unsigned char *p = (const unsigned char *)text;
+	mbstate_t ps;
+	wchar_t wc;
+	size_t n;
+	int w, width = 0;
+
+	memset(&ps, 0, sizeof(mbstate_t));
+	while (*p) {
+		if (*p < 0x80) {
+			/* Control characters are printed as ^X */
+			width += (*p < 0x20 || *p == RUBOUT) ? 2 : 1;
+			p++;
+			continue;
+		}
+		n = mbrtowc(&wc, (const char *)p, MB_CUR_MAX, &ps);
+		if (n == (size_t)-1 || n == (size_t)-2 || n == 0) {
+			memset(&ps, 0, sizeof(mbstate_t));
+			width++;
+			p++;
+			continue;
+		}
+		w = wcwidth(wc);
+		width += (w < 0) ? 1 : w;
+		p += n;
+	}
+	return width;
+}
+
+
+static int
+pager_fill(pager *self, Py_ssize_t size)
+/* Pull matches until size matches are pending or the iterator
+   is exhausted */
+{
+	PyObject *r, *b;
+	pageitem *items;
+	Py_ssize_t allocated, n;
+	const char *match;
+
+	while (self->size < size && !self->exhausted) {
+		r = PyIter_Next(self->it);
+		if (r == NULL) {
+			if (PyErr_Occurred())
+				return -1;
+			self->exhausted = 1;
+			break;
+		}
+		match = StringArray_EncodeItem(r, &n, &b);
+		if (match == NULL) {
+			Py_DECREF(r);
+			return -1;
+		}
+		/* ASCII strings are used in place */
+		if (b != NULL) {
+			Py_DECREF(r);
+			r = b;
+		}
+		if (self->size == self->allocated) {
+			allocated = self->allocated ? self->allocated * 2 : 256;
+			items = PyMem_Realloc(self->items, allocated * sizeof(pageitem));
+			if (items == NULL) {
+				Py_DECREF(r);
+				PyErr_NoMemory();
+				return -1;
+			}
+			self->items = items;
+			self->allocated = allocated;
+		}
+		self->items[self->size].object = r;
+		self->items[self->size].match = match;
+		self->items[self->size].width = printed_width(printable_part(match));
+		self->size++;
+	}
+	return 0;
+}
+
+
+static void
+pager_consume(pager *self, Py_ssize_t count)
+{
+	Py_ssize_t i;
+
+	if (count == 0)
+		return;
+	for (i = 0; i < count; i++)
+		Py_DECREF(self->items[i].object);
+	self->size -= count;
+	memmove(self->items, self->items + count, self->size * sizeof(pageitem));
+}
+
+
+static int
+read_answer(void)
+/* Return the key typed by the user, or EOF */
+{
+	int c;
+
+	RL_SETSTATE(RL_STATE_MOREINPUT);
+	c = rl_read_key();
+	RL_UNSETSTATE(RL_STATE_MOREINPUT);
+	return c;
+}
+
+
+static int
+variable_is_on(const char *name)
+{
+	char *value = rl_variable_value(name);
+
+	return value != NULL && strcmp(value, "on") == 0;
+}
+
+
+static void
+print_match(pageitem *item, int pad)
+{
+	const char *s = printable_part(item->match);
+	const char *p;
+
+	for (p = s; *p; p++) {
+		if ((unsigned char)*p < 0x20 || *p == RUBOUT) {
+			fwrite(s, 1, p - s, rl_outstream);
+			putc('^', rl_outstream);
+			putc(*p == RUBOUT ? '?' : *p + '@', rl_outstream);
+			s = p+1;
+		}
+	}
+	fwrite(s, 1, p - s, rl_outstream);
+	if (pad > item->width)
+		fprintf(rl_outstream, "%*s", pad - item->width, "");
+}
+
+
+static int
+pager_display(pager *self, int max_length)
+{
+	int screen_height, screen_width;
+	int width, cols, rows, r, c;
+	int paging, horizontal;
+	int lines;
+	Py_ssize_t capacity, count, i;
+
+	rl_get_screen_size(&screen_height, &screen_width);
+	if (screen_height <= 1)
+		screen_height = 24;
+	if (screen_width <= 0)
+		screen_width = 80;
+
+	/* Ask before displaying more than query_items matches */
+	if (rl_completion_query_items > 0) {
+		/* One more tells whether the count is exact */
+		if (pager_fill(self, rl_completion_query_items + 1) < 0)
+			return -1;
+		if (self->size >= rl_completion_query_items) {
+			rl_crlf();
+			if (self->exhausted)
+				fprintf(rl_outstream, "Display all %ld possibilities? (y or n)",
+					(long)self->size);
+			else
+				fprintf(rl_outstream, "Display more than %d possibilities? (y or n)",
+					rl_completion_query_items);
+			fflush(rl_outstream);
+			for (;;) {
+				c = read_answer();
+				if (c == 'y' || c == 'Y' || c == ' ')
+					break;
+				if (c == 'n' || c == 'N' || c == RUBOUT || c == EOF) {
+					rl_crlf();
+					return 0;
+				}
+				rl_ding();
+			}
+		}
+	}
+
+	paging = variable_is_on("page-completions");
+	horizontal = variable_is_on("print-completions-horizontally");
+	width = max_length > 0 ? max_length : 0;
+	lines = screen_height - 1;
+
+	rl_crlf();
+	for (;;) {
+		/* Sample one column of matches to estimate the width */
+		if (pager_fill(self, lines) < 0)
+			return -1;
+		if (self->size == 0)
+			break;
+		capacity = 0;
+		for (;;) {
+			for (i = 0; i < self->size && (capacity == 0 || i < capacity); i++) {
+				if (self->items[i].width > width)
+					width = self->items[i].width;
+			}
+			cols = screen_width / (width + 2);
+			if (cols != 1 && cols * (width + 2) == screen_width)
+				cols--;
+			if (cols < 1)
+				cols = 1;
+			if (capacity == (Py_ssize_t)lines * cols)
+				break;
+			/* Wider matches on the page mean fewer columns */
+			capacity = (Py_ssize_t)lines * cols;
+			if (pager_fill(self, capacity) < 0)
+				return -1;
+		}
+		count = self->size < capacity ? self->size : capacity;
+		rows = (int)((count + cols - 1) / cols);
+
+		for (r = 0; r < rows; r++) {
+			for (c = 0; c < cols; c++) {
+				i = horizontal ? (Py_ssize_t)r * cols + c :
+						 (Py_ssize_t)c * rows + r;
+				if (i >= count)
+					break;
+				print_match(&self->items[i],
+					    (c == cols-1 || i + (horizontal ? 1 : rows) >= count) ?
+					    0 : width + 2);
+			}
+			rl_crlf();
+		}
+		fflush(rl_outstream);
+		pager_consume(self, count);
+
+		if (PyErr_CheckSignals() == -1)
+			return -1;
+		if (pager_fill(self, 1) < 0)
+			return -1;
+		if (self->size == 0)
+			break;
+
+		lines = screen_height - 1;
+		if (paging) {
+			fputs("--More--", rl_outstream);
+			fflush(rl_outstream);
+			c = read_answer();
+			fputs("\r        \r", rl_outstream);
+			if (c == '\r' || c == '\n' || c == 'j')
+				lines = 1;
+			else if (c != ' ' && c != 'y' && c != 'Y')
+				break;
+		}
+	}
+	return 0;
+}
+
+
+int
+MatchPager_Display(PyObject *matches, int max_length)
+{
+	pager self = {NULL, 0, NULL, 0, 0};
+	int result;
+
+	self.it = PyObject_GetIter(matches);
+	if (self.it == NULL)
+		return -1;
+
+	result = pager_display(&self, max_length);
+
+	pager_consume(&self, self.size);
+	PyMem_Free(self.items);
+	Py_DECREF(self.it);
+	return result;
+}
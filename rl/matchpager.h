@@ -0,0 +1,8 @@
+#ifndef __MATCHPAGER_H__
+#define __MATCHPAGER_H__
+
+#include "Python.h"
+
+int MatchPager_Display(PyObject *matches, int max_length);
+
+#endif /* __MATCHPAGER_H__ */
@@ -1,5 +1,6 @@
 #include "Python.h"
 #include "modulestate.h"
+#include "unicode.h"
 
 #if (PY_MAJOR_VERSION < 3)
 readlinestate _py2_readlinestate;
@@ -10,8 +11,10 @@ void readline_init_state(PyObject *module)
 {
 	readlinestate *global = PyModule_GetState(module);
 	global->completer = NULL;
+	global->completer_batch = NULL;
 	global->startup_hook = NULL;
 	global->pre_input_hook = NULL;
+	global->history_added_hook = NULL;
 	global->completion_word_break_hook = NULL;
 	global->char_is_quoted_function = NULL;
 	global->filename_quoting_function = NULL;
@@ -34,8 +37,10 @@ int readline_traverse(PyObject *module, visitproc visit, void *arg)
 		return 0;
 
 	Py_VISIT(global->completer);
+	Py_VISIT(global->completer_batch);
 	Py_VISIT(global->startup_hook);
 	Py_VISIT(global->pre_input_hook);
+	Py_VISIT(global->history_added_hook);
 	Py_VISIT(global->completion_word_break_hook);
 	Py_VISIT(global->char_is_quoted_function);
 	Py_VISIT(global->filename_quoting_function);
@@ -57,8 +62,10 @@ int readline_clear(PyObject *module)
 		return 0;
 
 	Py_CLEAR(global->completer);
+	Py_CLEAR(global->completer_batch);
 	Py_CLEAR(global->startup_hook);
 	Py_CLEAR(global->pre_input_hook);
+	Py_CLEAR(global->history_added_hook);
 	Py_CLEAR(global->completion_word_break_hook);
 	Py_CLEAR(global->char_is_quoted_function);
 	Py_CLEAR(global->filename_quoting_function);
@@ -76,6 +83,7 @@ int readline_clear(PyObject *module)
 void readline_free(void *module)
 {
 	readline_clear((PyObject *) module);
+	PyUnicode_ClearCache();
 }
 
 #endif /* Python 3 */
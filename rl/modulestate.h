@@ -7,8 +7,10 @@
 
 typedef struct {
 	PyObject *completer;
+	PyObject *completer_batch;
 	PyObject *startup_hook;
 	PyObject *pre_input_hook;
+	PyObject *history_added_hook;
 	PyObject *completion_word_break_hook;
 	PyObject *char_is_quoted_function;
 	PyObject *filename_quoting_function;
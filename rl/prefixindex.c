@@ -0,0 +1,719 @@
+#include "Python.h"
+#include <ctype.h>
+#include <limits.h>
+#include <stdlib.h>
+#include <string.h>
+#include <wchar.h>
+#include <wctype.h>
+
+/* Custom definitions */
+#include "stringarray.h"
+#include "unicode.h"
+#include "prefixindex.h"
+
+/* Python 3 compatibility */
+#if (PY_MAJOR_VERSION >= 3)
+#define PyString_FromString PyUnicode_DECODE
+#endif
+
+/* Value of the completion-ignore-case variable */
+extern int _rl_completion_case_fold;
+
+
+/*********************** Prefix Index **************************/
+
+/* The index is an array of words kept sorted by (fold, key).
+   In case-sensitive mode fold is the key itself. All words
+   sharing a prefix form one contiguous run in the array, which
+   is located with two binary searches. */
+
+typedef struct {
+	char *key;	/* Locale-encoded word */
+	char *fold;	/* Case-folded word, points into the key allocation */
+} pientry;
+
+typedef struct {
+	PyObject_HEAD
+	pientry *entries;	/* Sorted array of words */
+	Py_ssize_t size;	/* Number of words */
+	Py_ssize_t allocated;	/* Number of allocated entries */
+	int ignore_case;	/* 1, 0, or -1 to follow readline */
+	PyObject *results;	/* Matches handed out by __call__ */
+} prefixindexobject;
+
+
+/* Fold the case of a string. Characters that would change their
+   byte length when folded are left alone, so the result always
+   has the length of the input. */
+
+static void
+fold_string(char *s)
+{
+	size_t len, n, m;
+	mbstate_t ps, ops;
+	wchar_t wc;
+	char buf[MB_LEN_MAX];
+	char *p;
+
+	if (MB_CUR_MAX == 1) {
+		for (p = s; *p; p++)
+			*p = tolower((unsigned char)*p);
+		return;
+	}
+	len = strlen(s);
+	memset(&ps, 0, sizeof(mbstate_t));
+	for (p = s; *p; p += n) {
+		n = mbrtowc(&wc, p, len - (p - s), &ps);
+		if (n == (size_t)-1 || n == (size_t)-2) {
+			/* Invalid sequence, fold the byte */
+			*p = tolower((unsigned char)*p);
+			memset(&ps, 0, sizeof(mbstate_t));
+			n = 1;
+			continue;
+		}
+		memset(&ops, 0, sizeof(mbstate_t));
+		m = wcrtomb(buf, towlower(wc), &ops);
+		if (m == n)
+			memcpy(p, buf, n);
+	}
+}
+
+
+/* Create an entry holding both the word and its folded form
+   in a single allocation */
+
+static int
+entry_init(pientry *entry, const char *word, int ignore_case)
+{
+	size_t len = strlen(word);
+
+	entry->key = malloc(ignore_case ? 2*len+2 : len+1);
+	if (entry->key == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+	memcpy(entry->key, word, len+1);
+	if (ignore_case) {
+		entry->fold = entry->key + len+1;
+		memcpy(entry->fold, word, len+1);
+		fold_string(entry->fold);
+	}
+	else {
+		entry->fold = entry->key;
+	}
+	return 0;
+}
+
+
+static int
+entry_compare(const void *a, const void *b)
+{
+	const pientry *x = a;
+	const pientry *y = b;
+	int c;
+
+	c = strcmp(x->fold, y->fold);
+	if (c == 0)
+		c = strcmp(x->key, y->key);
+	return c;
+}
+
+
+/* Return the first position not less than (fold, key).
+   If key is NULL only the fold is compared. */
+
+static Py_ssize_t
+pi_bisect(prefixindexobject *self, const char *fold, const char *key)
+{
+	Py_ssize_t lo = 0, hi = self->size, mid;
+	int c;
+
+	while (lo < hi) {
+		mid = lo + (hi - lo) / 2;
+		c = strcmp(self->entries[mid].fold, fold);
+		if (c == 0 && key != NULL)
+			c = strcmp(self->entries[mid].key, key);
+		if (c < 0)
+			lo = mid + 1;
+		else
+			hi = mid;
+	}
+	return lo;
+}
+
+
+/* Return the end of the run of words starting with prefix */
+
+static Py_ssize_t
+pi_bisect_prefix(prefixindexobject *self, const char *prefix, size_t n, Py_ssize_t lo)
+{
+	Py_ssize_t hi = self->size, mid;
+
+	while (lo < hi) {
+		mid = lo + (hi - lo) / 2;
+		if (strncmp(self->entries[mid].fold, prefix, n) <= 0)
+			lo = mid + 1;
+		else
+			hi = mid;
+	}
+	return lo;
+}
+
+
+static int
+pi_resize(prefixindexobject *self, Py_ssize_t newsize)
+{
+	pientry *entries;
+	Py_ssize_t allocated;
+
+	if (newsize <= self->allocated)
+		return 0;
+	allocated = newsize + (newsize >> 3) + 8;
+	entries = realloc(self->entries, allocated * sizeof(pientry));
+	if (entries == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+	self->entries = entries;
+	self->allocated = allocated;
+	return 0;
+}
+
+
+static void
+pi_clear(prefixindexobject *self)
+{
+	Py_ssize_t i;
+
+	for (i = 0; i < self->size; i++)
+		free(self->entries[i].key);
+	free(self->entries);
+	self->entries = NULL;
+	self->size = 0;
+	self->allocated = 0;
+	Py_CLEAR(self->results);
+}
+
+
+/* Insert a word, returns 1 if added, 0 if already present */
+
+static int
+pi_add(prefixindexobject *self, const char *word)
+{
+	pientry entry;
+	Py_ssize_t i;
+
+	if (entry_init(&entry, word, self->ignore_case) < 0)
+		return -1;
+	i = pi_bisect(self, entry.fold, entry.key);
+	if (i < self->size && entry_compare(&self->entries[i], &entry) == 0) {
+		free(entry.key);
+		return 0;
+	}
+	if (pi_resize(self, self->size+1) < 0) {
+		free(entry.key);
+		return -1;
+	}
+	memmove(&self->entries[i+1], &self->entries[i],
+		(self->size - i) * sizeof(pientry));
+	self->entries[i] = entry;
+	self->size++;
+	return 1;
+}
+
+
+/* Remove a word, returns 1 if removed, 0 if not present */
+
+static int
+pi_remove(prefixindexobject *self, const char *word)
+{
+	pientry entry;
+	Py_ssize_t i;
+
+	if (entry_init(&entry, word, self->ignore_case) < 0)
+		return -1;
+	i = pi_bisect(self, entry.fold, entry.key);
+	if (i >= self->size || entry_compare(&self->entries[i], &entry) != 0) {
+		free(entry.key);
+		return 0;
+	}
+	free(entry.key);
+	free(self->entries[i].key);
+	memmove(&self->entries[i], &self->entries[i+1],
+		(self->size - i - 1) * sizeof(pientry));
+	self->size--;
+	return 1;
+}
+
+
+/* Convert a Python string to a locale-encoded C string.
+   The returned object owns the buffer and must be released. */
+
+static PyObject *
+pi_encode(PyObject *word, const char **s)
+{
+#if (PY_MAJOR_VERSION >= 3)
+	PyObject *b = NULL;
+
+	if (!PyUnicode_StrConverter(word, &b))
+		return NULL;
+	*s = PyBytes_AS_STRING(b);
+	return b;
+#else
+	if (!PyArg_Parse(word, "s", s))
+		return NULL;
+	Py_INCREF(word);
+	return word;
+#endif
+}
+
+
+/* Add all words of an iterable using a single sort */
+
+static int
+pi_update(prefixindexobject *self, PyObject *iterable)
+{
+	PyObject *it, *item, *b;
+	const char *s;
+	Py_ssize_t start, i, j;
+
+	it = PyObject_GetIter(iterable);
+	if (it == NULL)
+		return -1;
+
+	start = self->size;
+	while ((item = PyIter_Next(it)) != NULL) {
+		b = pi_encode(item, &s);
+		Py_DECREF(item);
+		if (b == NULL)
+			goto error;
+		if (pi_resize(self, self->size+1) < 0 ||
+		    entry_init(&self->entries[self->size], s, self->ignore_case) < 0) {
+			Py_DECREF(b);
+			goto error;
+		}
+		self->size++;
+		Py_DECREF(b);
+	}
+	if (PyErr_Occurred())
+		goto error;
+	Py_DECREF(it);
+
+	if (self->size == start)
+		return 0;
+
+	/* Sort everything and drop duplicates */
+	qsort(self->entries, self->size, sizeof(pientry), entry_compare);
+	for (i = 1, j = 0; i < self->size; i++) {
+		if (entry_compare(&self->entries[i], &self->entries[j]) == 0)
+			free(self->entries[i].key);
+		else
+			self->entries[++j] = self->entries[i];
+	}
+	self->size = j+1;
+	return 0;
+
+  error:
+	/* Discard the unsorted tail */
+	for (i = start; i < self->size; i++)
+		free(self->entries[i].key);
+	self->size = start;
+	Py_DECREF(it);
+	return -1;
+}
+
+
+/* Store a StringArray of the words starting with text in matches.
+   Used by the completer to serve matches without entering
+   the interpreter. */
+
+int
+PrefixIndex_Complete(PyObject *index, const char *text, stringarray *matches)
+{
+	prefixindexobject *self = (prefixindexobject *)index;
+	char *fold = NULL;
+	const char *prefix = text;
+	size_t n = strlen(text);
+	Py_ssize_t lo, hi, i, j;
+	char **strings;
+	int result = -1;
+	int filter = 0;
+
+	if (self->ignore_case) {
+		fold = strdup(text);
+		if (fold == NULL) {
+			PyErr_NoMemory();
+			return -1;
+		}
+		fold_string(fold);
+		prefix = fold;
+		/* The index is folded but readline asks for exact matches */
+		if (self->ignore_case < 0 && !_rl_completion_case_fold)
+			filter = 1;
+	}
+	lo = pi_bisect(self, prefix, NULL);
+	hi = pi_bisect_prefix(self, prefix, n, lo);
+
+	strings = StringArray_New(hi - lo);
+	if (strings == NULL)
+		goto done;
+
+	for (i = lo, j = 0; i < hi; i++) {
+		if (filter && strncmp(self->entries[i].key, text, n) != 0)
+			continue;
+		strings[j] = strdup(self->entries[i].key);
+		if (strings[j] == NULL) {
+			StringArray_Free(strings);
+			PyErr_NoMemory();
+			goto done;
+		}
+		j++;
+	}
+	matches->strings = strings;
+	matches->size = j;
+	result = 0;
+  done:
+	free(fold);
+	return result;
+}
+
+
+/* Python interface */
+
+static int
+prefixindex_init(prefixindexobject *self, PyObject *args, PyObject *kwds)
+{
+	static char *kwlist[] = {"iterable", "ignore_case", NULL};
+	PyObject *iterable = NULL;
+	PyObject *ignore_case = Py_None;
+	int flag;
+
+	if (!PyArg_ParseTupleAndKeywords(args, kwds, "|OO:PrefixIndex", kwlist,
+					 &iterable, &ignore_case))
+		return -1;
+
+	if (ignore_case == Py_None) {
+		flag = -1;
+	}
+	else {
+		flag = PyObject_IsTrue(ignore_case);
+		if (flag < 0)
+			return -1;
+	}
+	pi_clear(self);
+	self->ignore_case = flag;
+
+	if (iterable != NULL)
+		return pi_update(self, iterable);
+	return 0;
+}
+
+
+static void
+prefixindex_dealloc(prefixindexobject *self)
+{
+	pi_clear(self);
+	Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static PyObject *
+prefixindex_add(prefixindexobject *self, PyObject *word)
+{
+	PyObject *b;
+	const char *s;
+	int r;
+
+	b = pi_encode(word, &s);
+	if (b == NULL)
+		return NULL;
+	r = pi_add(self, s);
+	Py_DECREF(b);
+	if (r < 0)
+		return NULL;
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_add,
+"add(word) -> None\n\
+Add a word to the index.");
+
+
+static PyObject *
+prefixindex_remove(prefixindexobject *self, PyObject *word)
+{
+	PyObject *b;
+	const char *s;
+	int r;
+
+	b = pi_encode(word, &s);
+	if (b == NULL)
+		return NULL;
+	r = pi_remove(self, s);
+	Py_DECREF(b);
+	if (r < 0)
+		return NULL;
+	if (r == 0) {
+		PyErr_SetObject(PyExc_KeyError, word);
+		return NULL;
+	}
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_remove,
+"remove(word) -> None\n\
+Remove a word from the index. Raises KeyError if the word is not present.");
+
+
+static PyObject *
+prefixindex_discard(prefixindexobject *self, PyObject *word)
+{
+	PyObject *b;
+	const char *s;
+	int r;
+
+	b = pi_encode(word, &s);
+	if (b == NULL)
+		return NULL;
+	r = pi_remove(self, s);
+	Py_DECREF(b);
+	if (r < 0)
+		return NULL;
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_discard,
+"discard(word) -> None\n\
+Remove a word from the index if it is present.");
+
+
+static PyObject *
+prefixindex_update(prefixindexobject *self, PyObject *iterable)
+{
+	if (pi_update(self, iterable) < 0)
+		return NULL;
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_update,
+"update(iterable) -> None\n\
+Add all words from an iterable. This is faster than calling\n\
+add() repeatedly.");
+
+
+static PyObject *
+prefixindex_clear(prefixindexobject *self, PyObject *noargs)
+{
+	pi_clear(self);
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_clear,
+"clear() -> None\n\
+Remove all words from the index.");
+
+
+static PyObject *
+pi_complete(prefixindexobject *self, PyObject *text)
+{
+	PyObject *b, *r;
+	const char *s;
+	stringarray matches;
+	int err;
+
+	b = pi_encode(text, &s);
+	if (b == NULL)
+		return NULL;
+	err = PrefixIndex_Complete((PyObject *)self, s, &matches);
+	Py_DECREF(b);
+	if (err == -1)
+		return NULL;
+	r = PyList_FromStringArrayAndSize(matches.strings, matches.size);
+	StringArray_Free(matches.strings);
+	return r;
+}
+
+
+static PyObject *
+prefixindex_complete(prefixindexobject *self, PyObject *text)
+{
+	return pi_complete(self, text);
+}
+
+PyDoc_STRVAR(doc_complete,
+"complete(text) -> list\n\
+Return the sorted list of words starting with ``text``.");
+
+
+static PyObject *
+prefixindex_call(prefixindexobject *self, PyObject *args, PyObject *kwds)
+{
+	static char *kwlist[] = {"text", "state", NULL};
+	PyObject *text;
+	Py_ssize_t state;
+	PyObject *r;
+
+	if (!PyArg_ParseTupleAndKeywords(args, kwds, "On:PrefixIndex", kwlist,
+					 &text, &state))
+		return NULL;
+
+	if (state == 0) {
+		Py_CLEAR(self->results);
+		self->results = pi_complete(self, text);
+		if (self->results == NULL)
+			return NULL;
+	}
+	if (self->results != NULL && state >= 0 &&
+	    state < PyList_GET_SIZE(self->results)) {
+		r = PyList_GET_ITEM(self->results, state);
+		Py_INCREF(r);
+		return r;
+	}
+	Py_RETURN_NONE;
+}
+
+
+static Py_ssize_t
+prefixindex_length(prefixindexobject *self)
+{
+	return self->size;
+}
+
+
+static int
+prefixindex_contains(prefixindexobject *self, PyObject *word)
+{
+	PyObject *b;
+	const char *s;
+	pientry entry;
+	Py_ssize_t i;
+	int r;
+
+	b = pi_encode(word, &s);
+	if (b == NULL)
+		return -1;
+	r = entry_init(&entry, s, self->ignore_case);
+	Py_DECREF(b);
+	if (r < 0)
+		return -1;
+	i = pi_bisect(self, entry.fold, entry.key);
+	r = (i < self->size && entry_compare(&self->entries[i], &entry) == 0);
+	free(entry.key);
+	return r;
+}
+
+
+static PyObject *
+prefixindex_iter(prefixindexobject *self)
+{
+	PyObject *list, *item, *it;
+	Py_ssize_t i;
+
+	/* Iterate over a snapshot so the index may change meanwhile */
+	list = PyList_New(self->size);
+	if (list == NULL)
+		return NULL;
+	for (i = 0; i < self->size; i++) {
+		item = PyString_FromString(self->entries[i].key);
+		if (item == NULL) {
+			Py_DECREF(list);
+			return NULL;
+		}
+		PyList_SET_ITEM(list, i, item);
+	}
+	it = PyObject_GetIter(list);
+	Py_DECREF(list);
+	return it;
+}
+
+
+static PyObject *
+prefixindex_get_ignore_case(prefixindexobject *self, void *closure)
+{
+	if (self->ignore_case < 0)
+		Py_RETURN_NONE;
+	return PyBool_FromLong(self->ignore_case);
+}
+
+
+static PyMethodDef prefixindex_methods[] = {
+	{"add", (PyCFunction)prefixindex_add, METH_O, doc_add},
+	{"remove", (PyCFunction)prefixindex_remove, METH_O, doc_remove},
+	{"discard", (PyCFunction)prefixindex_discard, METH_O, doc_discard},
+	{"update", (PyCFunction)prefixindex_update, METH_O, doc_update},
+	{"clear", (PyCFunction)prefixindex_clear, METH_NOARGS, doc_clear},
+	{"complete", (PyCFunction)prefixindex_complete, METH_O, doc_complete},
+	{0, 0}
+};
+
+static PyGetSetDef prefixindex_getset[] = {
+	{"ignore_case", (getter)prefixindex_get_ignore_case, NULL,
+	 "True, False, or None to follow readline's completion-ignore-case setting.", NULL},
+	{0}
+};
+
+static PySequenceMethods prefixindex_as_sequence = {
+	(lenfunc)prefixindex_length,			/* sq_length */
+	0,						/* sq_concat */
+	0,						/* sq_repeat */
+	0,						/* sq_item */
+	0,						/* sq_slice */
+	0,						/* sq_ass_item */
+	0,						/* sq_ass_slice */
+	(objobjproc)prefixindex_contains,		/* sq_contains */
+};
+
+PyDoc_STRVAR(doc_prefixindex,
+"PrefixIndex([iterable][, ignore_case]) -> index\n\
+Sorted word list for fast prefix completion.\n\
+The index can be installed as :attr:`~rl.Completer.completer`\n\
+directly, in which case matches are looked up without calling\n\
+back into Python. If ``ignore_case`` is None, matching follows\n\
+readline's ``completion-ignore-case`` setting.");
+
+PyTypeObject PyPrefixIndex_Type = {
+#if (PY_VERSION_HEX < 0x02060000)
+	PyObject_HEAD_INIT(&PyType_Type)
+	0,						/* ob_size */
+#else
+	PyVarObject_HEAD_INIT(&PyType_Type, 0)
+#endif
+	"rl.PrefixIndex",				/* tp_name */
+	sizeof(prefixindexobject),			/* tp_basicsize */
+	0,						/* tp_itemsize */
+	/* methods */
+	(destructor)prefixindex_dealloc,		/* tp_dealloc */
+	0,						/* tp_print */
+	0,						/* tp_getattr */
+	0,						/* tp_setattr */
+	0,						/* tp_compare */
+	0,						/* tp_repr */
+	0,						/* tp_as_number */
+	&prefixindex_as_sequence,			/* tp_as_sequence */
+	0,						/* tp_as_mapping */
+	0,						/* tp_hash */
+	(ternaryfunc)prefixindex_call,			/* tp_call */
+	0,						/* tp_str */
+	PyObject_GenericGetAttr,			/* tp_getattro */
+	0,						/* tp_setattro */
+	0,						/* tp_as_buffer */
+	Py_TPFLAGS_DEFAULT,				/* tp_flags */
+	doc_prefixindex,				/* tp_doc */
+	0,						/* tp_traverse */
+	0,						/* tp_clear */
+	0,						/* tp_richcompare */
+	0,						/* tp_weaklistoffset */
+	(getiterfunc)prefixindex_iter,			/* tp_iter */
+	0,						/* tp_iternext */
+	prefixindex_methods,				/* tp_methods */
+	0,						/* tp_members */
+	prefixindex_getset,				/* tp_getset */
+	0,						/* tp_base */
+	0,						/* tp_dict */
+	0,						/* tp_descr_get */
+	0,						/* tp_descr_set */
+	0,						/* tp_dictoffset */
+	(initproc)prefixindex_init,			/* tp_init */
+	0,						/* tp_alloc */
+	PyType_GenericNew,				/* tp_new */
+};
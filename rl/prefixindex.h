@@ -0,0 +1,14 @@
+#ifndef __PREFIXINDEX_H__
+#define __PREFIXINDEX_H__
+
+#include "Python.h"
+#include "stringarray.h"
+
+extern PyTypeObject PyPrefixIndex_Type;
+
+#define PyPrefixIndex_CheckExact(op) (Py_TYPE(op) == &PyPrefixIndex_Type)
+
+int PrefixIndex_Complete(PyObject *index, const char *text,
+			 stringarray *matches);
+
+#endif /* __PREFIXINDEX_H__ */
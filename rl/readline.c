@@ -17,6 +17,7 @@
 #include <errno.h>
 #include <stdlib.h>
 #include <string.h>
+#include <ctype.h>
 #include <sys/time.h>
 
 #if defined(HAVE_SETLOCALE)
@@ -30,8 +31,10 @@
 
 #ifdef SAVE_LOCALE
 #  define RESTORE_LOCALE(sl) { setlocale(LC_CTYPE, sl); free(sl); }
+#  define LEAVE_LOCALE(sl) _py_leave_locale(sl);
 #else
 #  define RESTORE_LOCALE(sl)
+#  define LEAVE_LOCALE(sl)
 #endif
 
 /* GNU Readline definitions */
@@ -51,11 +54,19 @@
 #include "stringarray.h"
 #include "unicode.h"
 #include "iterator.h"
+#include "prefixindex.h"
+#include "snapshot.h"
+#include "histindex.h"
+#include "histio.h"
+#include "histbin.h"
+#include "matchpager.h"
+#include "compcache.h"
 #include "modulestate.h"
 
 /* Python 3 compatibility */
 #if (PY_MAJOR_VERSION >= 3)
 #define PyInt_FromLong PyLong_FromLong
+#define PyInt_FromSsize_t PyLong_FromSsize_t
 #define PyInt_AsLong PyLong_AsInt
 #define PyString_FromString PyUnicode_DECODE
 #endif
@@ -81,6 +92,15 @@
 #endif
 #endif
 
+/* Use poll() for the input loop where it works with terminals */
+#if defined(HAVE_POLL) && defined(HAVE_POLL_H) && \
+    !defined(HAVE_BROKEN_POLL) && !defined(__APPLE__)
+#define USE_POLL
+#include <poll.h>
+#else
+#include <fcntl.h>
+#endif
+
 /* PyLong_AsInt appeared in Python 3.13 */
 #if (PY_VERSION_HEX < 0x030D0000)
 #define PyLong_AsInt _PyLong_AsInt
@@ -171,34 +191,141 @@ The default filename is the last filename used.");
 static PyObject *
 read_history_file(PyObject *self, PyObject *args)
 {
+	Py_ssize_t since;
 	char *s = NULL;
+	int from_line = 0;
+	int to_line = -1;
+	int err;
 	PyObject *b = NULL;
 
 #if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "|O&:read_history_file", PyUnicode_FSOrNoneConverter, &b))
+	if (!PyArg_ParseTuple(args, "|O&ii:read_history_file", PyUnicode_FSOrNoneConverter, &b,
+			      &from_line, &to_line))
 		return NULL;
 	if (b != NULL)
 		s = PyBytes_AsString(b);
 #else
-	if (!PyArg_ParseTuple(args, "|z:read_history_file", &s))
+	if (!PyArg_ParseTuple(args, "|zii:read_history_file", &s, &from_line, &to_line))
 		return NULL;
 #endif
+	HistoryIndex_BeginBulk();
+	since = HistoryIndex_Position();
 	if (s != NULL && *s == '~') {
 		s = tilde_expand(s);
-		errno = read_history(s);
+		err = read_history_range(s, from_line, to_line);
+		if (!err)
+			HistoryFile_Loaded(s);
 		free(s);
 	}
-	else
-		errno = read_history(s);
+	else {
+		err = read_history_range(s, from_line, to_line);
+		if (!err)
+			HistoryFile_Loaded(s);
+	}
 	Py_XDECREF(b);
-	if (errno)
+	HistoryIndex_Invalidate();
+	HistoryIndex_Dedupe(since);
+	HistoryIndex_EndBulk();
+	if (err) {
+		errno = err;
 		return PyErr_SetFromErrno(PyExc_IOError);
+	}
 	Py_RETURN_NONE;
 }
 
 PyDoc_STRVAR(doc_read_history_file,
-"read_history_file([filename]) -> None\n\
+"read_history_file([filename[, from_line[, to_line]]]) -> None\n\
 Load a readline history file.\n\
+The default filename is ~/.history. If given, only lines\n\
+``from_line`` up to but not including ``to_line`` are loaded.");
+
+
+/* Exported function to load a history file in chunks */
+
+static PyObject *
+read_history_stream(PyObject *self, PyObject *args)
+{
+	Py_ssize_t since;
+	char *s = NULL;
+	Py_ssize_t from_line = 0;
+	Py_ssize_t to_line = -1;
+	PyObject *b = NULL;
+	PyObject *r;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "|O&nn:read_history_stream", PyUnicode_FSOrNoneConverter, &b,
+			      &from_line, &to_line))
+		return NULL;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "|znn:read_history_stream", &s, &from_line, &to_line))
+		return NULL;
+#endif
+	HistoryIndex_BeginBulk();
+	since = HistoryIndex_Position();
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryFile_ReadStream(s, from_line, to_line);
+		free(s);
+	}
+	else
+		r = HistoryFile_ReadStream(s, from_line, to_line);
+	Py_XDECREF(b);
+	HistoryIndex_Invalidate();
+	HistoryIndex_Dedupe(since);
+	HistoryIndex_EndBulk();
+	return r;
+}
+
+PyDoc_STRVAR(doc_read_history_stream,
+"read_history_stream([filename[, from_line[, to_line]]]) -> None\n\
+Load a readline history file in chunks, releasing the GIL while\n\
+reading. The default filename is ~/.history. If given, only lines\n\
+``from_line`` up to but not including ``to_line`` are loaded.");
+
+
+/* Exported function to load the end of a history file */
+
+static PyObject *
+read_history_tail(PyObject *self, PyObject *args)
+{
+	Py_ssize_t since;
+	char *s = NULL;
+	Py_ssize_t n;
+	PyObject *b = NULL;
+	PyObject *r;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "n|O&:read_history_tail", &n,
+			      PyUnicode_FSOrNoneConverter, &b))
+		return NULL;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "n|z:read_history_tail", &n, &s))
+		return NULL;
+#endif
+	HistoryIndex_BeginBulk();
+	since = HistoryIndex_Position();
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryFile_ReadTail(s, n);
+		free(s);
+	}
+	else
+		r = HistoryFile_ReadTail(s, n);
+	Py_XDECREF(b);
+	HistoryIndex_Invalidate();
+	HistoryIndex_Dedupe(since);
+	HistoryIndex_EndBulk();
+	return r;
+}
+
+PyDoc_STRVAR(doc_read_history_tail,
+"read_history_tail(n[, filename]) -> None\n\
+Load the newest ``n`` entries of a readline history file. The file\n\
+is scanned backwards from its end, so only the tail is read.\n\
 The default filename is ~/.history.");
 
 
@@ -298,173 +425,519 @@ Append the last ``nelements`` of the history to a readline history file.\n\
 The default filename is ~/.history.");
 
 
-/* Set history file length */
+/* Exported function to truncate a readline history file */
 
-static PyObject*
-set_history_length(PyObject *self, PyObject *args)
+static PyObject *
+truncate_history_file(PyObject *self, PyObject *args)
 {
-	int length = history_file_length;
-	if (!PyArg_ParseTuple(args, "i:set_history_length", &length))
+	int n;
+	char *s = NULL;
+	PyObject *b = NULL;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "i|O&:truncate_history_file", &n, PyUnicode_FSOrNoneConverter, &b))
 		return NULL;
-	history_file_length = length;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "i|z:truncate_history_file", &n, &s))
+		return NULL;
+#endif
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		errno = history_truncate_file(s, n);
+		free(s);
+	}
+	else
+		errno = history_truncate_file(s, n);
+	Py_XDECREF(b);
+	if (errno)
+		return PyErr_SetFromErrno(PyExc_IOError);
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(set_history_length_doc,
-"set_history_length(int) -> None\n\
-Set the maximum number of items written to\n\
-the history file. A negative value inhibits\n\
-history file truncation.");
-
-
-/* Get history file length */
-
-static PyObject*
-get_history_length(PyObject *self, PyObject *noarg)
-{
-	return PyInt_FromLong(history_file_length);
-}
-
-PyDoc_STRVAR(get_history_length_doc,
-"get_history_length() -> int\n\
-Return the maximum number of items written to\n\
-the history file.");
+PyDoc_STRVAR(doc_truncate_history_file,
+"truncate_history_file(nlines[, filename]) -> None\n\
+Truncate a readline history file, keeping the last ``nlines`` lines.\n\
+The default filename is ~/.history.");
 
 
-/* Generic hook function setter */
+/* Append to a history file without holding the GIL during I/O */
 
 static PyObject *
-set_hook(const char *funcname, PyObject **hook_var, PyObject *args)
+append_history_since(PyObject *self, PyObject *args)
 {
-	PyObject *function = Py_None;
-	char buf[80];
-	PyOS_snprintf(buf, sizeof(buf), "|O:set_%.50s", funcname);
-	if (!PyArg_ParseTuple(args, buf, &function))
+	Py_ssize_t since;
+	char *s = NULL;
+	PyObject *b = NULL;
+	PyObject *r;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "n|O&:append_history_since", &since,
+			      PyUnicode_FSOrNoneConverter, &b))
 		return NULL;
-	if (function == Py_None) {
-		Py_CLEAR(*hook_var);
-	}
-	else if (PyCallable_Check(function)) {
-		PyObject *tmp = *hook_var;
-		Py_INCREF(function);
-		*hook_var = function;
-		Py_XDECREF(tmp);
-	}
-	else {
-		PyErr_Format(PyExc_TypeError,
-			     "set_%.50s(func): argument not callable",
-			     funcname);
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "n|z:append_history_since", &since, &s))
 		return NULL;
+#endif
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryFile_Append(s, since);
+		free(s);
 	}
-	Py_RETURN_NONE;
+	else
+		r = HistoryFile_Append(s, since);
+	Py_XDECREF(b);
+	return r;
 }
 
+PyDoc_STRVAR(doc_append_history_since,
+"append_history_since(position[, filename]) -> int\n\
+Append the entries added since the history ``position`` to a readline\n\
+history file and return the current position. The entries are copied\n\
+first and the GIL is released while the file is written. The file is\n\
+not truncated. The default filename is ~/.history.");
 
-/* Exported functions to specify hook functions in Python */
-
-/* Startup hook */
-
-static int
-on_startup_hook(void);
 
+/* Exported function to get the history position */
 
 static PyObject *
-set_startup_hook(PyObject *self, PyObject *args)
+get_history_position(PyObject *self, PyObject *noarg)
 {
-	modulestate *global = PyModule_GetState(self);
-
-	PyObject *result = set_hook("startup_hook", &global->startup_hook, args);
-
-	rl_startup_hook =
-		global->startup_hook ?
-		on_startup_hook : NULL;
-	return result;
+	return HistoryFile_Position();
 }
 
-PyDoc_STRVAR(doc_set_startup_hook,
-"set_startup_hook([function]) -> None\n\
-Set or remove the startup_hook function.\n\
-The function is called with no arguments just\n\
-before readline prints the first prompt.");
+PyDoc_STRVAR(doc_get_history_position,
+"get_history_position() -> int\n\
+Return the current history position. The position grows by one with\n\
+every entry added, also when a stifled history drops its oldest entry.\n\
+Used with :func:`append_history_since`.");
+
 
+/* Merge the history with a history file shared by several processes */
 
 static PyObject *
-get_startup_hook(PyObject *self, PyObject *noargs)
+sync_history_file(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
+	char *s = NULL;
+	PyObject *b = NULL;
+	PyObject *r;
 
-	if (global->startup_hook == NULL) {
-		Py_RETURN_NONE;
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "|O&:sync_history_file", PyUnicode_FSOrNoneConverter, &b))
+		return NULL;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "|z:sync_history_file", &s))
+		return NULL;
+#endif
+	HistoryIndex_BeginBulk();
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryFile_Sync(s, history_file_length);
+		free(s);
 	}
-	Py_INCREF(global->startup_hook);
-	return global->startup_hook;
+	else
+		r = HistoryFile_Sync(s, history_file_length);
+	Py_XDECREF(b);
+	HistoryIndex_Invalidate();
+	HistoryIndex_EndBulk();
+	return r;
 }
 
-PyDoc_STRVAR(doc_get_startup_hook,
-"get_startup_hook() -> function\n\
-Get the current startup_hook function.");
-
-
-/* Pre-input hook */
+PyDoc_STRVAR(doc_sync_history_file,
+"sync_history_file([filename]) -> None\n\
+Merge the history with a readline history file shared by several\n\
+processes. Entries other processes saved since the last sync are\n\
+added to the history, and entries added to the history since the last\n\
+sync are saved to the file. The file is locked while it is rewritten.\n\
+The default filename is ~/.history.");
 
-static int
-on_pre_input_hook(void);
 
+/* Exported functions for binary history files */
 
 static PyObject *
-set_pre_input_hook(PyObject *self, PyObject *args)
+read_history_binary(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
-
-	PyObject *result = set_hook("pre_input_hook", &global->pre_input_hook, args);
+	Py_ssize_t since;
+	char *s = NULL;
+	Py_ssize_t from_line = 0;
+	Py_ssize_t to_line = -1;
+	PyObject *b = NULL;
+	PyObject *r;
 
-	rl_pre_input_hook =
-		global->pre_input_hook ?
-		on_pre_input_hook : NULL;
-	return result;
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "|O&nn:read_history_binary", PyUnicode_FSOrNoneConverter, &b,
+			      &from_line, &to_line))
+		return NULL;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "|znn:read_history_binary", &s, &from_line, &to_line))
+		return NULL;
+#endif
+	HistoryIndex_BeginBulk();
+	since = HistoryIndex_Position();
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryBinary_Read(s, from_line, to_line);
+		free(s);
+	}
+	else
+		r = HistoryBinary_Read(s, from_line, to_line);
+	Py_XDECREF(b);
+	HistoryIndex_Invalidate();
+	HistoryIndex_Dedupe(since);
+	HistoryIndex_EndBulk();
+	return r;
 }
 
-PyDoc_STRVAR(doc_set_pre_input_hook,
-"set_pre_input_hook([function]) -> None\n\
-Set or remove the pre_input_hook function.\n\
-The function is called with no arguments after the first prompt\n\
-has been printed and just before readline starts reading input\n\
-characters.");
+PyDoc_STRVAR(doc_read_history_binary,
+"read_history_binary([filename[, from_line[, to_line]]]) -> None\n\
+Load a binary history file. The default filename is ~/.history.bin.\n\
+If given, only entries ``from_line`` up to but not including\n\
+``to_line`` are loaded; they are located through the index.");
 
 
 static PyObject *
-get_pre_input_hook(PyObject *self, PyObject *noargs)
+write_history_binary(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
+	char *s = NULL;
+	PyObject *b = NULL;
+	PyObject *r;
 
-	if (global->pre_input_hook == NULL) {
-		Py_RETURN_NONE;
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "|O&:write_history_binary", PyUnicode_FSOrNoneConverter, &b))
+		return NULL;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "|z:write_history_binary", &s))
+		return NULL;
+#endif
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryBinary_Write(s, history_file_length);
+		free(s);
 	}
-	Py_INCREF(global->pre_input_hook);
-	return global->pre_input_hook;
+	else
+		r = HistoryBinary_Write(s, history_file_length);
+	Py_XDECREF(b);
+	return r;
 }
 
-PyDoc_STRVAR(doc_get_pre_input_hook,
-"get_pre_input_hook() -> function\n\
-Get the current pre_input_hook function.");
-
-
-/* Display matches hook */
-
-static void
-on_completion_display_matches_hook(char **matches, int num_matches, int max_length);
-
-static void
-default_display_matches_hook(char **matches, int num_matches, int max_length);
+PyDoc_STRVAR(doc_write_history_binary,
+"write_history_binary([filename]) -> None\n\
+Save a binary history file and its index.\n\
+The default filename is ~/.history.bin.");
 
 
 static PyObject *
-set_completion_display_matches_hook(PyObject *self, PyObject *args)
+append_history_binary(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
+	int n;
+	char *s = NULL;
+	PyObject *b = NULL;
+	PyObject *r;
 
-	PyObject *result = set_hook("completion_display_matches_hook",
-			&global->completion_display_matches_hook, args);
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "i|O&:append_history_binary", &n, PyUnicode_FSOrNoneConverter, &b))
+		return NULL;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "i|z:append_history_binary", &n, &s))
+		return NULL;
+#endif
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryBinary_Append(s, n, history_file_length);
+		free(s);
+	}
+	else
+		r = HistoryBinary_Append(s, n, history_file_length);
+	Py_XDECREF(b);
+	return r;
+}
+
+PyDoc_STRVAR(doc_append_history_binary,
+"append_history_binary(nelements[, filename]) -> None\n\
+Append the last ``nelements`` of the history to a binary history file.\n\
+If the file grows beyond the history file length, only its index is\n\
+rewritten. The default filename is ~/.history.bin.");
+
+
+static PyObject *
+_py_convert_history_file(PyObject *args, const char *format,
+			 PyObject *(*convert)(const char *, const char *))
+{
+	char *s = NULL, *d = NULL;
+	char *es = NULL, *ed = NULL;
+	PyObject *bs = NULL, *bd = NULL;
+	PyObject *r;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, format, PyUnicode_FSConverter, &bs,
+			      PyUnicode_FSConverter, &bd))
+		return NULL;
+	s = PyBytes_AsString(bs);
+	d = PyBytes_AsString(bd);
+#else
+	if (!PyArg_ParseTuple(args, format, &s, &d))
+		return NULL;
+#endif
+	if (*s == '~')
+		s = es = tilde_expand(s);
+	if (*d == '~')
+		d = ed = tilde_expand(d);
+	r = convert(s, d);
+	free(es);
+	free(ed);
+	Py_XDECREF(bs);
+	Py_XDECREF(bd);
+	return r;
+}
+
+
+static PyObject *
+import_history_binary(PyObject *self, PyObject *args)
+{
+#if (PY_MAJOR_VERSION >= 3)
+	return _py_convert_history_file(args, "O&O&:import_history_binary",
+					HistoryBinary_Import);
+#else
+	return _py_convert_history_file(args, "ss:import_history_binary",
+					HistoryBinary_Import);
+#endif
+}
+
+PyDoc_STRVAR(doc_import_history_binary,
+"import_history_binary(source, dest) -> None\n\
+Convert the readline history file ``source`` to the binary history\n\
+file ``dest``. Timestamps are kept.");
+
+
+static PyObject *
+export_history_binary(PyObject *self, PyObject *args)
+{
+#if (PY_MAJOR_VERSION >= 3)
+	return _py_convert_history_file(args, "O&O&:export_history_binary",
+					HistoryBinary_Export);
+#else
+	return _py_convert_history_file(args, "ss:export_history_binary",
+					HistoryBinary_Export);
+#endif
+}
+
+PyDoc_STRVAR(doc_export_history_binary,
+"export_history_binary(source, dest) -> None\n\
+Convert the binary history file ``source`` to the readline history\n\
+file ``dest``. Timestamps are written for entries that have one.");
+
+
+static PyObject *
+open_history_archive(PyObject *self, PyObject *args)
+{
+	char *s = NULL;
+	PyObject *b = NULL;
+	PyObject *r;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "|O&:open_history_archive", PyUnicode_FSOrNoneConverter, &b))
+		return NULL;
+	if (b != NULL)
+		s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "|z:open_history_archive", &s))
+		return NULL;
+#endif
+	if (s != NULL && *s == '~') {
+		s = tilde_expand(s);
+		r = HistoryArchive_New(s);
+		free(s);
+	}
+	else
+		r = HistoryArchive_New(s);
+	Py_XDECREF(b);
+	return r;
+}
+
+PyDoc_STRVAR(doc_open_history_archive,
+"open_history_archive([filename]) -> archive\n\
+Map a binary history file into memory and return a read-only\n\
+sequence of its lines. The default filename is ~/.history.bin.");
+
+
+/* Set history file length */
+
+static PyObject*
+set_history_length(PyObject *self, PyObject *args)
+{
+	int length = history_file_length;
+	if (!PyArg_ParseTuple(args, "i:set_history_length", &length))
+		return NULL;
+	history_file_length = length;
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(set_history_length_doc,
+"set_history_length(int) -> None\n\
+Set the maximum number of items written to\n\
+the history file. A negative value inhibits\n\
+history file truncation.");
+
+
+/* Get history file length */
+
+static PyObject*
+get_history_length(PyObject *self, PyObject *noarg)
+{
+	return PyInt_FromLong(history_file_length);
+}
+
+PyDoc_STRVAR(get_history_length_doc,
+"get_history_length() -> int\n\
+Return the maximum number of items written to\n\
+the history file.");
+
+
+/* Generic hook function setter */
+
+static PyObject *
+set_hook(const char *funcname, PyObject **hook_var, PyObject *args)
+{
+	PyObject *function = Py_None;
+	char buf[80];
+	PyOS_snprintf(buf, sizeof(buf), "|O:set_%.50s", funcname);
+	if (!PyArg_ParseTuple(args, buf, &function))
+		return NULL;
+	if (function == Py_None) {
+		Py_CLEAR(*hook_var);
+	}
+	else if (PyCallable_Check(function)) {
+		PyObject *tmp = *hook_var;
+		Py_INCREF(function);
+		*hook_var = function;
+		Py_XDECREF(tmp);
+	}
+	else {
+		PyErr_Format(PyExc_TypeError,
+			     "set_%.50s(func): argument not callable",
+			     funcname);
+		return NULL;
+	}
+	Py_RETURN_NONE;
+}
+
+
+/* Exported functions to specify hook functions in Python */
+
+/* Startup hook */
+
+static int
+on_startup_hook(void);
+
+
+static PyObject *
+set_startup_hook(PyObject *self, PyObject *args)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("startup_hook", &global->startup_hook, args);
+
+	rl_startup_hook =
+		global->startup_hook ?
+		on_startup_hook : NULL;
+	return result;
+}
+
+PyDoc_STRVAR(doc_set_startup_hook,
+"set_startup_hook([function]) -> None\n\
+Set or remove the startup_hook function.\n\
+The function is called with no arguments just\n\
+before readline prints the first prompt.");
+
+
+static PyObject *
+get_startup_hook(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->startup_hook == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->startup_hook);
+	return global->startup_hook;
+}
+
+PyDoc_STRVAR(doc_get_startup_hook,
+"get_startup_hook() -> function\n\
+Get the current startup_hook function.");
+
+
+/* Pre-input hook */
+
+static int
+on_pre_input_hook(void);
+
+
+static PyObject *
+set_pre_input_hook(PyObject *self, PyObject *args)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("pre_input_hook", &global->pre_input_hook, args);
+
+	rl_pre_input_hook =
+		global->pre_input_hook ?
+		on_pre_input_hook : NULL;
+	return result;
+}
+
+PyDoc_STRVAR(doc_set_pre_input_hook,
+"set_pre_input_hook([function]) -> None\n\
+Set or remove the pre_input_hook function.\n\
+The function is called with no arguments after the first prompt\n\
+has been printed and just before readline starts reading input\n\
+characters.");
+
+
+static PyObject *
+get_pre_input_hook(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->pre_input_hook == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->pre_input_hook);
+	return global->pre_input_hook;
+}
+
+PyDoc_STRVAR(doc_get_pre_input_hook,
+"get_pre_input_hook() -> function\n\
+Get the current pre_input_hook function.");
+
+
+/* Display matches hook */
+
+static void
+on_completion_display_matches_hook(char **matches, int num_matches, int max_length);
+
+static void
+default_display_matches_hook(char **matches, int num_matches, int max_length);
+
+
+static PyObject *
+set_completion_display_matches_hook(PyObject *self, PyObject *args)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("completion_display_matches_hook",
+			&global->completion_display_matches_hook, args);
 
 	rl_completion_display_matches_hook =
 		global->completion_display_matches_hook ?
@@ -512,6 +985,7 @@ set_completer(PyObject *self, PyObject *args)
 {
 	modulestate *global = PyModule_GetState(self);
 
+	CompletionCache_Clear();
 	return set_hook("completer", &global->completer, args);
 }
 
@@ -541,30 +1015,140 @@ PyDoc_STRVAR(doc_get_completer,
 Get the current completion entry function.");
 
 
-/* Get/set the completion type for the scope of the tab-completion */
+/* Exported functions to specify a batch completer in Python */
 
 static PyObject *
-get_completion_type(PyObject *self, PyObject *noarg)
+set_completer_batch(PyObject *self, PyObject *args)
 {
-#if (PY_MAJOR_VERSION >= 3)
-	return PyUnicode_DECODE_CHAR(rl_completion_type);
-#else
-	if (!rl_completion_type)
-		return PyString_FromString("");
-	return PyString_FromFormat("%c", rl_completion_type);
-#endif
+	modulestate *global = PyModule_GetState(self);
+
+	CompletionCache_Clear();
+	return set_hook("completer_batch", &global->completer_batch, args);
 }
 
-PyDoc_STRVAR(doc_get_completion_type,
-"get_completion_type() -> string\n\
-Get the type of completion being attempted.");
+PyDoc_STRVAR(doc_set_completer_batch,
+"set_completer_batch([function]) -> None\n\
+Set or remove the batch completion function.\n\
+The function is called once as ``function(text)`` and should return\n\
+an iterable of possible completions for ``text``. If set, it is used\n\
+instead of the completion entry function.");
 
 
 static PyObject *
-set_completion_type(PyObject *self, PyObject *args)
+get_completer_batch(PyObject *self, PyObject *noargs)
 {
-	char *s;
-	PyObject *b = NULL;
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->completer_batch == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->completer_batch);
+	return global->completer_batch;
+}
+
+PyDoc_STRVAR(doc_get_completer_batch,
+"get_completer_batch() -> function\n\
+Get the current batch completion function.");
+
+
+/* Completion cache */
+
+static PyObject *
+set_completion_cache_size(PyObject *self, PyObject *args)
+{
+	Py_ssize_t size;
+
+	if (!PyArg_ParseTuple(args, "n:set_completion_cache_size", &size))
+		return NULL;
+	if (CompletionCache_SetMaxSize(size) == -1)
+		return NULL;
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_set_completion_cache_size,
+"set_completion_cache_size(int) -> None\n\
+Set the number of completion results to cache. Repeated completion\n\
+attempts on an unchanged line are then answered from the cache\n\
+without calling the completer. Defaults to 0, which disables the\n\
+cache.");
+
+
+static PyObject *
+get_completion_cache_size(PyObject *self, PyObject *noarg)
+{
+	return PyInt_FromSsize_t(CompletionCache_GetMaxSize());
+}
+
+PyDoc_STRVAR(doc_get_completion_cache_size,
+"get_completion_cache_size() -> int\n\
+Get the number of completion results to cache.");
+
+
+static PyObject *
+set_completion_cache_ttl(PyObject *self, PyObject *args)
+{
+	double ttl;
+
+	if (!PyArg_ParseTuple(args, "d:set_completion_cache_ttl", &ttl))
+		return NULL;
+	CompletionCache_SetTTL(ttl);
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_set_completion_cache_ttl,
+"set_completion_cache_ttl(seconds) -> None\n\
+Set how long cached completion results are used. A value of 0\n\
+keeps them until they are evicted or the cache is cleared.\n\
+Defaults to 0.");
+
+
+static PyObject *
+get_completion_cache_ttl(PyObject *self, PyObject *noarg)
+{
+	return PyFloat_FromDouble(CompletionCache_GetTTL());
+}
+
+PyDoc_STRVAR(doc_get_completion_cache_ttl,
+"get_completion_cache_ttl() -> float\n\
+Get how long cached completion results are used, in seconds.");
+
+
+static PyObject *
+clear_completion_cache(PyObject *self, PyObject *noarg)
+{
+	CompletionCache_Clear();
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_clear_completion_cache,
+"clear_completion_cache() -> None\n\
+Remove all cached completion results.");
+
+
+/* Get/set the completion type for the scope of the tab-completion */
+
+static PyObject *
+get_completion_type(PyObject *self, PyObject *noarg)
+{
+#if (PY_MAJOR_VERSION >= 3)
+	return PyUnicode_DECODE_CHAR(rl_completion_type);
+#else
+	if (!rl_completion_type)
+		return PyString_FromString("");
+	return PyString_FromFormat("%c", rl_completion_type);
+#endif
+}
+
+PyDoc_STRVAR(doc_get_completion_type,
+"get_completion_type() -> string\n\
+Get the type of completion being attempted.");
+
+
+static PyObject *
+set_completion_type(PyObject *self, PyObject *args)
+{
+	char *s;
+	PyObject *b = NULL;
 
 #if (PY_MAJOR_VERSION >= 3)
 	if (!PyArg_ParseTuple(args, "O&:set_completion_type", PyUnicode_StrConverter, &b))
@@ -696,7 +1280,7 @@ Set the readline word delimiters for tab-completion.");
    https://bugs.python.org/issue9450
    https://bugs.python.org/issue12186 */
 
-static void
+void
 _py_free_history_entry(HIST_ENTRY *entry)
 {
 	UNDO_LIST *undo_list;
@@ -738,6 +1322,7 @@ py_remove_history(PyObject *self, PyObject *args)
 	}
 	/* free memory allocated for the history entry */
 	_py_free_history_entry(entry);
+	HistoryIndex_Removed(entry_number);
 
 	Py_RETURN_NONE;
 }
@@ -779,6 +1364,7 @@ py_replace_history(PyObject *self, PyObject *args)
 	}
 	/* free memory allocated for the old history entry */
 	_py_free_history_entry(old_entry);
+	HistoryIndex_Replaced(entry_number);
 
 	Py_XDECREF(b);
 	Py_RETURN_NONE;
@@ -809,6 +1395,7 @@ py_add_history(PyObject *self, PyObject *args)
 		return NULL;
 #endif
 	add_history(line);
+	HistoryIndex_Added();
 	Py_XDECREF(b);
 	Py_RETURN_NONE;
 }
@@ -876,1193 +1463,1182 @@ Return the entire history as a Python list. \
 Element 0 of the list is the beginning of time.");
 
 
-/* Exported function returning an iterator over the history */
+/* Compute the number of items in a normalized slice */
 
-static PyObject *
-get_history_iter(PyObject *self, PyObject *noarg)
+static Py_ssize_t
+_py_slice_length(Py_ssize_t start, Py_ssize_t stop, Py_ssize_t step)
 {
-	return HistoryIterator_New();
+	if (step < 0) {
+		if (stop < start)
+			return (start - stop - 1) / (-step) + 1;
+	}
+	else if (start < stop) {
+		return (stop - start - 1) / step + 1;
+	}
+	return 0;
 }
 
-PyDoc_STRVAR(doc_get_history_iter,
-"get_history_iter() -> iterator\n\
-Return a forward iterator over the history (oldest to newest).");
 
+/* Validate slice indices as returned by slice.indices() */
+
+static int
+_py_check_slice(Py_ssize_t *start, Py_ssize_t *stop, Py_ssize_t step)
+{
+	Py_ssize_t lo, hi;
+
+	if (step == 0) {
+		PyErr_SetString(PyExc_ValueError, "slice step cannot be zero");
+		return -1;
+	}
+	/* Clamp to the history bounds like slice.indices() does */
+	lo = step < 0 ? -1 : 0;
+	hi = step < 0 ? history_length-1 : history_length;
+	if (*start < lo)
+		*start = lo;
+	if (*start > hi)
+		*start = hi;
+	if (*stop < lo)
+		*stop = lo;
+	if (*stop > hi)
+		*stop = hi;
+	return 0;
+}
 
-/* Exported function returning a reverse iterator over the history */
+
+/* Exported function to get a slice of the history */
 
 static PyObject *
-get_history_reverse_iter(PyObject *self, PyObject *noarg)
+get_history_items(PyObject *self, PyObject *args)
 {
-	return HistoryReverseIterator_New();
+	Py_ssize_t start, stop, step, n, i;
+	HIST_ENTRY **hist;
+	PyObject *list;
+	PyObject *s;
+
+	if (!PyArg_ParseTuple(args, "nnn:get_history_items", &start, &stop, &step))
+		return NULL;
+	if (_py_check_slice(&start, &stop, step) < 0)
+		return NULL;
+
+	n = _py_slice_length(start, stop, step);
+	list = PyList_New(n);
+	if (list == NULL)
+		return NULL;
+
+	hist = history_list();
+	for (i = 0; i < n; i++, start += step) {
+		s = PyString_FromString(hist[start]->line);
+		if (s == NULL)
+			goto error;
+		PyList_SET_ITEM(list, i, s);
+	}
+	return list;
+  error:
+	Py_DECREF(list);
+	return NULL;
 }
 
-PyDoc_STRVAR(doc_get_history_reverse_iter,
-"get_history_reverse_iter() -> iterator\n\
-Return a reverse iterator over the history (newest to oldest).");
+PyDoc_STRVAR(doc_get_history_items,
+"get_history_items(start, stop, step) -> list\n\
+Return the history items in the given slice. The arguments are\n\
+expected to be normalized as returned by slice.indices().");
 
 
-/* Exported function to get current length of history */
+/* Exported functions to access history timestamps */
 
-static PyObject *
-get_current_history_length(PyObject *self, PyObject *noarg)
+/* history_get_time() compares the stamp against history_comment_char,
+   which readline resets after guessing it from a history file. Parse
+   the stamp ourselves so entries keep their time regardless. */
+
+long long
+_py_entry_time(HIST_ENTRY *entry)
 {
-	return PyInt_FromLong(history_length);
+	const char *s = entry->timestamp;
+	long long t = 0;
+
+	/* The lead byte is the comment char in effect when the stamp was
+	   made, NUL included, as in history_get_time() */
+	if (s == NULL || isdigit((unsigned char)s[0]) ||
+	    !isdigit((unsigned char)s[1]))
+		return 0;
+	for (s++; isdigit((unsigned char)*s); s++)
+		t = t * 10 + (*s - '0');
+	return t;
 }
 
-PyDoc_STRVAR(doc_get_current_history_length,
-"get_current_history_length() -> int\n\
-Return the current (not the maximum) length of history.");
 
+static PyObject *
+_py_history_time(HIST_ENTRY *entry)
+{
+	long long t = _py_entry_time(entry);
+
+	if (t == 0)
+		Py_RETURN_NONE;
+	return PyLong_FromLongLong(t);
+}
 
-/* Exported function to clear the current history */
 
 static PyObject *
-py_clear_history(PyObject *self, PyObject *noarg)
-/* Reimplemented here to avoid a memory leak in GNU Readline. */
+get_history_entries(PyObject *self, PyObject *args)
 {
+	Py_ssize_t start, stop, n, i;
 	HIST_ENTRY **hist;
-	Py_ssize_t i;
+	PyObject *list;
+	PyObject *item;
+
+	if (!PyArg_ParseTuple(args, "nn:get_history_entries", &start, &stop))
+		return NULL;
+	if (_py_check_slice(&start, &stop, 1) < 0)
+		return NULL;
+
+	n = _py_slice_length(start, stop, 1);
+	list = PyList_New(n);
+	if (list == NULL)
+		return NULL;
 
 	hist = history_list();
-	for (i = 0; i < history_length; i++) {
-		_py_free_history_entry(hist[i]);
-		hist[i] = (HIST_ENTRY *)NULL;
+	for (i = 0; i < n; i++) {
+		item = Py_BuildValue("(NN)",
+				     PyString_FromString(hist[start+i]->line),
+				     _py_history_time(hist[start+i]));
+		if (item == NULL)
+			goto error;
+		PyList_SET_ITEM(list, i, item);
 	}
-	history_length = 0;
-	clear_history();
-	Py_RETURN_NONE;
+	return list;
+  error:
+	Py_DECREF(list);
+	return NULL;
 }
 
-PyDoc_STRVAR(doc_clear_history,
-"clear_history() -> None\n\
-Clear the current readline history.");
-
-
-/* Enable or disable automatic history */
-
-static int should_auto_add_history = 1;
+PyDoc_STRVAR(doc_get_history_entries,
+"get_history_entries(start, stop) -> list\n\
+Return (line, timestamp) tuples for the history items from ``start``\n\
+up to ``stop``. The timestamp is in seconds since the epoch, or None\n\
+if the entry has none. The arguments are expected to be normalized\n\
+as returned by slice.indices().");
 
 
 static PyObject *
-get_auto_history(PyObject *self, PyObject *noarg)
+bisect_history_time(PyObject *self, PyObject *args)
 {
-	return PyBool_FromLong(should_auto_add_history);
+	double t;
+	Py_ssize_t lo = 0, hi, mid;
+	HIST_ENTRY **hist;
+
+	if (!PyArg_ParseTuple(args, "d:bisect_history_time", &t))
+		return NULL;
+
+	hist = history_list();
+	hi = hist ? history_length : 0;
+	while (lo < hi) {
+		mid = lo + (hi - lo) / 2;
+		if ((double)_py_entry_time(hist[mid]) < t)
+			lo = mid + 1;
+		else
+			hi = mid;
+	}
+	return PyInt_FromSsize_t(lo);
 }
 
-PyDoc_STRVAR(doc_get_auto_history,
-"get_auto_history() -> bool\n\
-True if automatic history is enabled.");
+PyDoc_STRVAR(doc_bisect_history_time,
+"bisect_history_time(timestamp) -> int\n\
+Return the index of the first history item with a timestamp not\n\
+earlier than ``timestamp``. The history is expected to be in time\n\
+order; entries without a timestamp count as 0.");
 
 
+/* True if history_comment_char was set for writing timestamps */
+static int timestamp_comment_char = 0;
+
 static PyObject *
-set_auto_history(PyObject *self, PyObject *args)
+set_history_write_timestamps(PyObject *self, PyObject *args)
 {
-	int value;
+	HIST_ENTRY **hist;
+	int value, i;
 
-	if (!PyArg_ParseTuple(args, "i:set_auto_history", &value)) {
+	if (!PyArg_ParseTuple(args, "i:set_history_write_timestamps", &value))
 		return NULL;
+	history_write_timestamps = value ? 1 : 0;
+
+	/* Timestamps begin with history_comment_char, and write_history()
+	   skips those beginning with a null byte */
+	if (value && history_comment_char == '\0') {
+		history_comment_char = '#';
+		timestamp_comment_char = 1;
+		hist = history_list();
+		for (i = 0; hist && i < history_length; i++) {
+			if (hist[i]->timestamp && hist[i]->timestamp[0] == '\0' &&
+			    isdigit((unsigned char)hist[i]->timestamp[1]))
+				hist[i]->timestamp[0] = '#';
+		}
+	}
+	else if (!value && timestamp_comment_char) {
+		history_comment_char = '\0';
+		timestamp_comment_char = 0;
 	}
-	should_auto_add_history = value ? 1 : 0;
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_auto_history,
-"set_auto_history(bool) -> None\n\
-Enable or disable automatic history.");
-
+PyDoc_STRVAR(doc_set_history_write_timestamps,
+"set_history_write_timestamps(bool) -> None\n\
+Enable or disable writing timestamps to history files.\n\
+If the history comment character is not set, enabling timestamps\n\
+sets it to '#'.");
 
-/* Exported function to read the current line buffer */
 
 static PyObject *
-get_line_buffer(PyObject *self, PyObject *noarg)
+get_history_write_timestamps(PyObject *self, PyObject *noarg)
 {
-	return PyString_FromString(rl_line_buffer);
+	return PyBool_FromLong(history_write_timestamps);
 }
 
-PyDoc_STRVAR(doc_get_line_buffer,
-"get_line_buffer() -> string\n\
-Return the current contents of the line buffer.");
+PyDoc_STRVAR(doc_get_history_write_timestamps,
+"get_history_write_timestamps() -> bool\n\
+True if timestamps are written to history files.");
 
 
-/* Exported function to insert text into the line buffer */
+/* Exported function to remove a slice of the history */
 
 static PyObject *
-insert_text(PyObject *self, PyObject *args)
+remove_history_items(PyObject *self, PyObject *args)
+/* Compacts the history array in one pass instead of
+   shifting it once for every removed item. */
 {
-	char *s;
-	PyObject *b = NULL;
+	Py_ssize_t start, stop, step, n, i, j, k;
+	HIST_ENTRY **hist;
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:insert_text", PyUnicode_StrConverter, &b))
+	if (!PyArg_ParseTuple(args, "nnn:remove_history_items", &start, &stop, &step))
 		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:insert_text", &s))
+	if (_py_check_slice(&start, &stop, step) < 0)
 		return NULL;
-#endif
-	rl_insert_text(s);
-	Py_XDECREF(b);
-	Py_RETURN_NONE;
-}
 
-PyDoc_STRVAR(doc_insert_text,
-"insert_text(string) -> None\n\
-Insert text into the command line.");
+	n = _py_slice_length(start, stop, step);
+	if (n == 0)
+		Py_RETURN_NONE;
 
+	/* Walk the slice in ascending order */
+	if (step < 0) {
+		start = start + (n-1) * step;
+		step = -step;
+	}
+	hist = history_list();
+	for (i = j = start, k = 0; i < history_length; i++) {
+		if (k < n && i == start + k * step) {
+			_py_free_history_entry(hist[i]);
+			k++;
+		}
+		else {
+			hist[j++] = hist[i];
+		}
+	}
+	for (i = j; i < history_length; i++)
+		hist[i] = (HIST_ENTRY *)NULL;
+	history_length = j;
+	HistoryIndex_Invalidate();
+	Py_RETURN_NONE;
+}
 
-/* Redisplay the line buffer */
+PyDoc_STRVAR(doc_remove_history_items,
+"remove_history_items(start, stop, step) -> None\n\
+Remove the history items in the given slice. The arguments are\n\
+expected to be normalized as returned by slice.indices().");
 
-extern int rl_display_fixed;
 
+/* Exported function to add many lines to the history */
 
 static PyObject *
-redisplay(PyObject *self, PyObject *args)
+add_history_items(PyObject *self, PyObject *iterable)
 {
-	int force = 0;
+	PyObject *list;
+	PyObject *item;
+	Py_ssize_t n, i;
 
-	if (!PyArg_ParseTuple(args, "|i:redisplay", &force))
+	list = PySequence_List(iterable);
+	if (list == NULL)
 		return NULL;
 
-	if (force) {
-		rl_forced_update_display();
-		rl_display_fixed = 1;
+	/* Convert all items before touching the history */
+	n = PyList_GET_SIZE(list);
+	for (i = 0; i < n; i++) {
+		item = PyList_GET_ITEM(list, i);
+#if (PY_MAJOR_VERSION >= 3)
+		{
+			PyObject *b = NULL;
+			if (!PyUnicode_StrConverter(item, &b))
+				goto error;
+			PyList_SET_ITEM(list, i, b);
+			Py_DECREF(item);
+		}
+#else
+		if (!PyString_Check(item)) {
+			PyErr_SetString(PyExc_TypeError, "expected string");
+			goto error;
+		}
+		if (PyString_Size(item) != (Py_ssize_t)strlen(PyString_AsString(item))) {
+			PyErr_SetString(PyExc_TypeError, "embedded NUL character");
+			goto error;
+		}
+#endif
 	}
-	else {
-		rl_redisplay();
+	HistoryIndex_BeginBulk();
+	for (i = 0; i < n; i++) {
+		item = PyList_GET_ITEM(list, i);
+#if (PY_MAJOR_VERSION >= 3)
+		add_history(PyBytes_AS_STRING(item));
+#else
+		add_history(PyString_AS_STRING(item));
+#endif
+		HistoryIndex_Added();
+		HistoryIndex_BulkAdded();
 	}
-
+	HistoryIndex_EndBulk();
+	Py_DECREF(list);
 	Py_RETURN_NONE;
+  error:
+	Py_DECREF(list);
+	return NULL;
 }
 
-PyDoc_STRVAR(doc_redisplay,
-"redisplay([force]) -> None\n\
-Update the screen to reflect the current \
-contents of the line buffer. If ``force`` is True, readline\n\
-redisplays the prompt area as well as the line.");
-
+PyDoc_STRVAR(doc_add_history_items,
+"add_history_items(iterable) -> None\n\
+Add all lines from an iterable to the readline history.");
 
-/* <rl.readline>
-   https://tiswww.case.edu/php/chet/readline/readline.html#SEC45 */
 
-/* Get/set completion append character */
+/* Exported function to search the history */
 
 static PyObject *
-get_completion_append_character(PyObject *self, PyObject *noarg)
+search_history(PyObject *self, PyObject *args)
 {
+	char *pattern;
+	int regex = 0;
+	int reverse = 1;
+	Py_ssize_t limit = -1;
+	PyObject *b = NULL;
+	PyObject *r;
+
 #if (PY_MAJOR_VERSION >= 3)
-	return PyUnicode_DECODE_CHAR(rl_completion_append_character);
+	if (!PyArg_ParseTuple(args, "O&|iin:search_history", PyUnicode_StrConverter, &b,
+			      &regex, &reverse, &limit))
+		return NULL;
+	pattern = PyBytes_AsString(b);
 #else
-	if (!rl_completion_append_character)
-		return PyString_FromString("");
-	return PyString_FromFormat("%c", rl_completion_append_character);
+	if (!PyArg_ParseTuple(args, "s|iin:search_history", &pattern,
+			      &regex, &reverse, &limit))
+		return NULL;
 #endif
+	r = HistoryIndex_Search(pattern, regex, reverse, limit);
+	Py_XDECREF(b);
+	return r;
 }
 
-PyDoc_STRVAR(doc_get_completion_append_character,
-"get_completion_append_character() -> string\n\
-Get the character appended after the current completion.");
+PyDoc_STRVAR(doc_search_history,
+"search_history(pattern[, regex[, reverse[, limit]]]) -> list\n\
+Return a list of (index, line) tuples for history lines containing\n\
+``pattern``. If ``regex`` is true, ``pattern`` is a POSIX extended\n\
+regular expression. Newest lines are returned first if ``reverse``\n\
+is true. A non-negative ``limit`` caps the number of results.\n\
+Lines of an attached archive are returned with the key\n\
+``('archive', i)`` instead of an index, where ``i`` indexes the archive.");
 
 
+/* Attach a history archive as a cold tier behind the history */
+
 static PyObject *
-set_completion_append_character(PyObject *self, PyObject *args)
+set_history_archive(PyObject *self, PyObject *archive)
 {
-	char *s;
-	PyObject *b = NULL;
-
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:set_completion_append_character", PyUnicode_StrConverter, &b))
-		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:set_completion_append_character", &s))
+	if (HistoryArchive_Attach(archive) < 0)
 		return NULL;
-#endif
-	rl_completion_append_character = (s && *s) ? *s : '\0';
-	Py_XDECREF(b);
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_completion_append_character,
-"set_completion_append_character(string) -> None\n\
-Set the character appended after the current completion. \
-May only be called from within custom completers.");
-
+PyDoc_STRVAR(doc_set_history_archive,
+"set_history_archive(archive) -> None\n\
+Attach an archive returned by :func:`open_history_archive` to the\n\
+history, or detach it if ``archive`` is None. The archive is searched\n\
+by :func:`search_history` and the ``reverse-search-archive`` command\n\
+after the in-memory history.");
 
-/* Get/set completion suppress append */
 
 static PyObject *
-get_completion_suppress_append(PyObject *self, PyObject *noarg)
+get_history_archive(PyObject *self, PyObject *noarg)
 {
-	return PyBool_FromLong(rl_completion_suppress_append);
+	PyObject *archive = HistoryArchive_Attached();
+
+	if (archive == NULL)
+		Py_RETURN_NONE;
+	Py_INCREF(archive);
+	return archive;
 }
 
-PyDoc_STRVAR(doc_get_completion_suppress_append,
-"get_completion_suppress_append() -> bool\n\
-Do not append the completion_append_character after the current completion.");
+PyDoc_STRVAR(doc_get_history_archive,
+"get_history_archive() -> archive\n\
+Return the attached history archive or None.");
+
 
+/* Enable or disable the history search index */
 
 static PyObject *
-set_completion_suppress_append(PyObject *self, PyObject *args)
+set_history_search_index(PyObject *self, PyObject *args)
 {
 	int value;
 
-	if (!PyArg_ParseTuple(args, "i:set_completion_suppress_append", &value)) {
+	if (!PyArg_ParseTuple(args, "i:set_history_search_index", &value))
 		return NULL;
-	}
-	rl_completion_suppress_append = value ? 1 : 0;
+	HistoryIndex_Enable(value ? 1 : 0);
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_completion_suppress_append,
-"set_completion_suppress_append(bool) -> None\n\
-Do not append the completion_append_character after the current completion. \
-May only be called from within custom completers.");
+PyDoc_STRVAR(doc_set_history_search_index,
+"set_history_search_index(bool) -> None\n\
+Enable or disable the n-gram index used by search_history().");
 
 
-/* Get/set completer quote characters */
-
 static PyObject *
-get_completer_quote_characters(PyObject *self, PyObject *noarg)
+get_history_search_index(PyObject *self, PyObject *noarg)
 {
-	if (!rl_completer_quote_characters)
-		return PyString_FromString("");
-	return PyString_FromString(rl_completer_quote_characters);
+	return PyBool_FromLong(HistoryIndex_IsEnabled());
 }
 
-PyDoc_STRVAR(doc_get_completer_quote_characters,
-"get_completer_quote_characters() -> string\n\
-Get list of characters that may be used to quote a substring of the line.");
+PyDoc_STRVAR(doc_get_history_search_index,
+"get_history_search_index() -> bool\n\
+Return True if the history search index is enabled.");
+
+
+/* Set how duplicate history lines are handled */
+
+static const char *dedupe_modes[] = {"none", "consecutive", "all"};
 
 
 static PyObject *
-set_completer_quote_characters(PyObject *self, PyObject *args)
+set_history_dedupe(PyObject *self, PyObject *args)
 {
-	char *s;
-	PyObject *b = NULL;
+	char *mode;
+	int i;
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:set_completer_quote_characters", PyUnicode_StrConverter, &b))
-		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:set_completer_quote_characters", &s))
+	if (!PyArg_ParseTuple(args, "s:set_history_dedupe", &mode))
 		return NULL;
-#endif
-	s = strdup(s);
-	Py_XDECREF(b);
-
-	if (s) {
-		if (rl_completer_quote_characters)
-			free((void*)rl_completer_quote_characters);
-		rl_completer_quote_characters = s;
-		Py_RETURN_NONE;
+	for (i = DEDUPE_NONE; i <= DEDUPE_ALL; i++) {
+		if (strcmp(mode, dedupe_modes[i]) == 0) {
+			HistoryFile_Lock();
+			HistoryIndex_SetDedupe(i);
+			HistoryFile_Unlock();
+			Py_RETURN_NONE;
+		}
 	}
-	else
-		return PyErr_NoMemory();
+	PyErr_Format(PyExc_ValueError,
+		     "dedupe mode must be 'none', 'consecutive', or 'all', not '%s'", mode);
+	return NULL;
 }
 
-PyDoc_STRVAR(doc_set_completer_quote_characters,
-"set_completer_quote_characters(string) -> None\n\
-Set list of characters that may be used to quote a substring of the line.");
-
+PyDoc_STRVAR(doc_set_history_dedupe,
+"set_history_dedupe(mode) -> None\n\
+Set how lines added by readline and loaded from history files are\n\
+deduplicated: 'none' keeps all lines, 'consecutive' drops a line that\n\
+repeats the previous entry, and 'all' moves a repeated line to the end\n\
+of the history.");
 
-/* Get/set filename quote characters */
 
 static PyObject *
-get_filename_quote_characters(PyObject *self, PyObject *noarg)
+get_history_dedupe(PyObject *self, PyObject *noarg)
 {
-	if (!rl_filename_quote_characters)
-		return PyString_FromString("");
-	return PyString_FromString(rl_filename_quote_characters);
+	return PyString_FromString(dedupe_modes[HistoryIndex_GetDedupe()]);
 }
 
-PyDoc_STRVAR(doc_get_filename_quote_characters,
-"get_filename_quote_characters() -> string\n\
-Get list of characters that cause a filename to be quoted by the completer.");
+PyDoc_STRVAR(doc_get_history_dedupe,
+"get_history_dedupe() -> string\n\
+Return the dedupe mode of the history.");
 
 
+/* Exported function returning an iterator over the history */
+
 static PyObject *
-set_filename_quote_characters(PyObject *self, PyObject *args)
+get_history_iter(PyObject *self, PyObject *noarg)
 {
-	char *s;
-	PyObject *b = NULL;
-
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:set_filename_quote_characters", PyUnicode_StrConverter, &b))
-		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:set_filename_quote_characters", &s))
-		return NULL;
-#endif
-	s = strdup(s);
-	Py_XDECREF(b);
-
-	if (s) {
-		if (rl_filename_quote_characters)
-			free((void*)rl_filename_quote_characters);
-		rl_filename_quote_characters = s;
-		Py_RETURN_NONE;
-	}
-	else
-		return PyErr_NoMemory();
+	return HistoryIterator_New();
 }
 
-PyDoc_STRVAR(doc_set_filename_quote_characters,
-"set_filename_quote_characters(string) -> None\n\
-Set list of characters that cause a filename to be quoted by the completer.");
+PyDoc_STRVAR(doc_get_history_iter,
+"get_history_iter() -> iterator\n\
+Return a forward iterator over the history (oldest to newest).");
 
 
-/* Completion quoting */
+/* Exported function returning a reverse iterator over the history */
 
 static PyObject *
-get_completion_found_quote(PyObject *self, PyObject *noarg)
+get_history_reverse_iter(PyObject *self, PyObject *noarg)
 {
-	return PyBool_FromLong(rl_completion_found_quote);
+	return HistoryReverseIterator_New();
 }
 
-PyDoc_STRVAR(doc_get_completion_found_quote,
-"get_completion_found_quote() -> bool\n\
-When readline is completing quoted text, it sets this variable to True \
-if the word being completed contains any quoting character (including backslashes).");
+PyDoc_STRVAR(doc_get_history_reverse_iter,
+"get_history_reverse_iter() -> iterator\n\
+Return a reverse iterator over the history (newest to oldest).");
 
 
+/* Exported function returning a snapshot of the history */
+
 static PyObject *
-set_completion_found_quote(PyObject *self, PyObject *args)
+get_history_snapshot(PyObject *self, PyObject *noarg)
 {
-	int value;
-
-	if (!PyArg_ParseTuple(args, "i:set_completion_found_quote", &value)) {
-		return NULL;
-	}
-	rl_completion_found_quote = value ? 1 : 0;
-	Py_RETURN_NONE;
+	return HistorySnapshot_New();
 }
 
-PyDoc_STRVAR(doc_set_completion_found_quote,
-"set_completion_found_quote(bool) -> None\n\
-When readline is completing quoted text, it sets this variable to True \
-if the word being completed contains any quoting character (including backslashes).");
+PyDoc_STRVAR(doc_get_history_snapshot,
+"get_history_snapshot() -> snapshot\n\
+Return a read-only snapshot of the history. The snapshot supports\n\
+the buffer protocol and decodes lines only when they are accessed.");
+
 
+/* Exported function to get current length of history */
 
 static PyObject *
-get_completion_quote_character(PyObject *self, PyObject *noarg)
+get_current_history_length(PyObject *self, PyObject *noarg)
 {
-#if (PY_MAJOR_VERSION >= 3)
-	return PyUnicode_DECODE_CHAR(rl_completion_quote_character);
-#else
-	if (!rl_completion_quote_character)
-		return PyString_FromString("");
-	return PyString_FromFormat("%c", rl_completion_quote_character);
-#endif
+	return PyInt_FromLong(history_length);
 }
 
-PyDoc_STRVAR(doc_get_completion_quote_character,
-"get_completion_quote_character() -> string\n\
-When readline is completing quoted text, it sets this variable to the quoting character found.");
+PyDoc_STRVAR(doc_get_current_history_length,
+"get_current_history_length() -> int\n\
+Return the current (not the maximum) length of history.");
+
 
+/* Exported function to clear the current history */
 
 static PyObject *
-set_completion_quote_character(PyObject *self, PyObject *args)
+py_clear_history(PyObject *self, PyObject *noarg)
+/* Reimplemented here to avoid a memory leak in GNU Readline. */
 {
-	char *s;
-	PyObject *b = NULL;
+	HIST_ENTRY **hist;
+	Py_ssize_t i;
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:set_completion_quote_character", PyUnicode_StrConverter, &b))
-		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:set_completion_quote_character", &s))
-		return NULL;
-#endif
-	rl_completion_quote_character = (s && *s) ? *s : '\0';
-	Py_XDECREF(b);
+	hist = history_list();
+	for (i = 0; i < history_length; i++) {
+		_py_free_history_entry(hist[i]);
+		hist[i] = (HIST_ENTRY *)NULL;
+	}
+	history_length = 0;
+	clear_history();
+	HistoryIndex_Invalidate();
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_completion_quote_character,
-"set_completion_quote_character(string) -> None\n\
-When readline is completing quoted text, it sets this variable to the quoting character found.");
+PyDoc_STRVAR(doc_clear_history,
+"clear_history() -> None\n\
+Clear the current readline history.");
+
+
+/* Enable or disable automatic history */
+
+static int should_auto_add_history = 1;
+static int history_added_hook_set = 0;	/* Checked without the GIL */
 
 
 static PyObject *
-get_completion_suppress_quote(PyObject *self, PyObject *noarg)
+get_auto_history(PyObject *self, PyObject *noarg)
 {
-	return PyBool_FromLong(rl_completion_suppress_quote);
+	return PyBool_FromLong(should_auto_add_history);
 }
 
-PyDoc_STRVAR(doc_get_completion_suppress_quote,
-"get_completion_suppress_quote() -> bool\n\
-Do not append a matching quote character when performing completion on a quoted string.");
+PyDoc_STRVAR(doc_get_auto_history,
+"get_auto_history() -> bool\n\
+True if automatic history is enabled.");
 
 
 static PyObject *
-set_completion_suppress_quote(PyObject *self, PyObject *args)
+set_auto_history(PyObject *self, PyObject *args)
 {
 	int value;
 
-	if (!PyArg_ParseTuple(args, "i:set_completion_suppress_quote", &value)) {
+	if (!PyArg_ParseTuple(args, "i:set_auto_history", &value)) {
 		return NULL;
 	}
-	rl_completion_suppress_quote = value ? 1 : 0;
+	should_auto_add_history = value ? 1 : 0;
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_completion_suppress_quote,
-"set_completion_suppress_quote(bool) -> None\n\
-Do not append a matching quote character when performing completion on a quoted string. \
-May only be called from within custom completers.");
+PyDoc_STRVAR(doc_set_auto_history,
+"set_auto_history(bool) -> None\n\
+Enable or disable automatic history.");
 
 
-/* Filename completion flags */
+/* History added hook */
+
+static int
+on_history_added_hook(void);
+
 
 static PyObject *
-get_filename_completion_desired(PyObject *self, PyObject *noarg)
+set_history_added_hook(PyObject *self, PyObject *args)
 {
-	return PyBool_FromLong(rl_filename_completion_desired);
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("history_added_hook", &global->history_added_hook, args);
+
+	history_added_hook_set = global->history_added_hook != NULL;
+	return result;
 }
 
-PyDoc_STRVAR(doc_get_filename_completion_desired,
-"get_filename_completion_desired() -> bool\n\
-If True, treat the results of matches as filenames.");
+PyDoc_STRVAR(doc_set_history_added_hook,
+"set_history_added_hook([function]) -> None\n\
+Set or remove the history_added_hook function.\n\
+The function is called with no arguments after readline has added\n\
+a line read from the user to the history.");
 
 
 static PyObject *
-set_filename_completion_desired(PyObject *self, PyObject *args)
+get_history_added_hook(PyObject *self, PyObject *noargs)
 {
-	int value;
+	modulestate *global = PyModule_GetState(self);
 
-	if (!PyArg_ParseTuple(args, "i:set_filename_completion_desired", &value)) {
-		return NULL;
+	if (global->history_added_hook == NULL) {
+		Py_RETURN_NONE;
 	}
-	rl_filename_completion_desired = value ? 1 : 0;
-	Py_RETURN_NONE;
+	Py_INCREF(global->history_added_hook);
+	return global->history_added_hook;
 }
 
-PyDoc_STRVAR(doc_set_filename_completion_desired,
-"set_filename_completion_desired(bool) -> None\n\
-If True, treat the results of matches as filenames. \
-May only be called from within custom completers.");
+PyDoc_STRVAR(doc_get_history_added_hook,
+"get_history_added_hook() -> function\n\
+Get the current history_added_hook function.");
 
 
-static PyObject *
-get_filename_quoting_desired(PyObject *self, PyObject *noarg)
+/* Add a line read from the user to the history, dropping duplicates
+   as configured. May be called without holding the GIL. */
+
+static void
+_py_auto_add_history(const char *p)
 {
-	return PyBool_FromLong(rl_filename_quoting_desired);
+	if (!should_auto_add_history || *p == '\0')
+		return;
+	/* Keep out the history writer */
+	HistoryFile_Lock();
+	HistoryIndex_AddLine(p);
+	HistoryFile_Unlock();
+	if (history_added_hook_set)
+		on_history_added_hook();
 }
 
-PyDoc_STRVAR(doc_get_filename_quoting_desired,
-"get_filename_quoting_desired() -> bool\n\
-If True, filenames will be quoted.");
 
+/* Exported function to read the current line buffer */
 
 static PyObject *
-set_filename_quoting_desired(PyObject *self, PyObject *args)
+get_line_buffer(PyObject *self, PyObject *noarg)
 {
-	int value;
-
-	if (!PyArg_ParseTuple(args, "i:set_filename_quoting_desired", &value)) {
-		return NULL;
-	}
-	rl_filename_quoting_desired = value ? 1 : 0;
-	Py_RETURN_NONE;
+	return PyString_FromString(rl_line_buffer);
 }
 
-PyDoc_STRVAR(doc_set_filename_quoting_desired,
-"set_filename_quoting_desired(bool) -> None\n\
-If True, filenames will be quoted. \
-May only be called from within custom completers.");
-
-
-/* Inhibit completion */
-
-static PyObject *
-get_inhibit_completion(PyObject *self, PyObject *noarg)
-{
-	return PyBool_FromLong(rl_inhibit_completion);
-}
+PyDoc_STRVAR(doc_get_line_buffer,
+"get_line_buffer() -> string\n\
+Return the current contents of the line buffer.");
 
-PyDoc_STRVAR(doc_get_inhibit_completion,
-"get_inhibit_completion() -> bool\n\
-If True, completion is disabled.");
 
+/* Exported function to insert text into the line buffer */
 
 static PyObject *
-set_inhibit_completion(PyObject *self, PyObject *args)
+insert_text(PyObject *self, PyObject *args)
 {
-	int value;
+	char *s;
+	PyObject *b = NULL;
 
-	if (!PyArg_ParseTuple(args, "i:set_inhibit_completion", &value)) {
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&:insert_text", PyUnicode_StrConverter, &b))
 		return NULL;
-	}
-	rl_inhibit_completion = value ? 1 : 0;
+	s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "s:insert_text", &s))
+		return NULL;
+#endif
+	rl_insert_text(s);
+	Py_XDECREF(b);
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_inhibit_completion,
-"set_inhibit_completion(bool) -> None\n\
-If True, completion is disabled and the completion character is inserted \
-as any other character.");
-
+PyDoc_STRVAR(doc_insert_text,
+"insert_text(string) -> None\n\
+Insert text into the command line.");
 
-/* Filename quoting function */
 
-static char *
-on_filename_quoting_function(const char *text, int match_type, char *quote_pointer);
+/* Redisplay the line buffer */
 
-static rl_quote_func_t *default_filename_quoting_function = NULL;
+extern int rl_display_fixed;
 
 
 static PyObject *
-set_filename_quoting_function(PyObject *self, PyObject *args)
+redisplay(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
+	int force = 0;
 
-	PyObject *result = set_hook("filename_quoting_function",
-			&global->filename_quoting_function, args);
+	if (!PyArg_ParseTuple(args, "|i:redisplay", &force))
+		return NULL;
 
-	rl_filename_quoting_function =
-		global->filename_quoting_function ?
-		(rl_quote_func_t *)on_filename_quoting_function :
-		default_filename_quoting_function;
+	if (force) {
+		rl_forced_update_display();
+		rl_display_fixed = 1;
+	}
+	else {
+		rl_redisplay();
+	}
 
-	return result;
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_filename_quoting_function,
-"set_filename_quoting_function([function]) -> None\n\
-Set or remove the filename quoting function. \
-The function is called as ``function(text, single_match, quote_char)`` \
-and should return a string representing a quoted version of ``text``, \
-or None to indicate no change. The ``single_match`` argument is True \
-if the completion has generated only one match.");
+PyDoc_STRVAR(doc_redisplay,
+"redisplay([force]) -> None\n\
+Update the screen to reflect the current \
+contents of the line buffer. If ``force`` is True, readline\n\
+redisplays the prompt area as well as the line.");
+
+
+/* <rl.readline>
+   https://tiswww.case.edu/php/chet/readline/readline.html#SEC45 */
 
+/* Get/set completion append character */
 
 static PyObject *
-get_filename_quoting_function(PyObject *self, PyObject *noargs)
+get_completion_append_character(PyObject *self, PyObject *noarg)
 {
-	modulestate *global = PyModule_GetState(self);
-
-	if (global->filename_quoting_function == NULL) {
-		Py_RETURN_NONE;
-	}
-	Py_INCREF(global->filename_quoting_function);
-	return global->filename_quoting_function;
+#if (PY_MAJOR_VERSION >= 3)
+	return PyUnicode_DECODE_CHAR(rl_completion_append_character);
+#else
+	if (!rl_completion_append_character)
+		return PyString_FromString("");
+	return PyString_FromFormat("%c", rl_completion_append_character);
+#endif
 }
 
-PyDoc_STRVAR(doc_get_filename_quoting_function,
-"get_filename_quoting_function() -> function\n\
-Get the current filename quoting function.");
+PyDoc_STRVAR(doc_get_completion_append_character,
+"get_completion_append_character() -> string\n\
+Get the character appended after the current completion.");
 
 
-static char *
-on_filename_quoting_function(const char *text, int match_type, char *quote_pointer)
-/* This function must return new memory on success and the
-   passed-in 'text' pointer to indicate no change. */
+static PyObject *
+set_completion_append_character(PyObject *self, PyObject *args)
 {
-	char *result = (char*)text;
-	char *s = NULL;
-	char quote_char_string[2] = "\0";
-	PyObject *single_match = NULL;
-	PyObject *r = NULL;
+	char *s;
 	PyObject *b = NULL;
 
-#ifdef WITH_THREAD
-	PyGILState_STATE gilstate = PyGILState_Ensure();
-#endif
-	modulestate *global = PyModule_GetState(readline_module());
-
-	single_match = PyBool_FromLong(match_type == SINGLE_MATCH);
-
-	if (quote_pointer && *quote_pointer) {
-		quote_char_string[0] = *quote_pointer;
-	}
-#if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->filename_quoting_function, "NON",
-				  PyUnicode_DECODE(text), single_match,
-				  PyUnicode_DECODE(quote_char_string));
-#else
-	r = PyObject_CallFunction(global->filename_quoting_function, "sOs",
-				  text, single_match, quote_char_string);
-#endif
-	if (r == NULL)
-		goto error;
-	if (r == Py_None) {
-		result = (char*)text;
-	}
-	else {
 #if (PY_MAJOR_VERSION >= 3)
-		b = PyUnicode_ENCODE(r);
-		if (b != NULL)
-			s = PyBytes_AsString(b);
+	if (!PyArg_ParseTuple(args, "O&:set_completion_append_character", PyUnicode_StrConverter, &b))
+		return NULL;
+	s = PyBytes_AsString(b);
 #else
-		s = PyString_AsString(r);
+	if (!PyArg_ParseTuple(args, "s:set_completion_append_character", &s))
+		return NULL;
 #endif
-		if (s == NULL)
-			goto error;
-		s = strdup(s);
-		if (s != NULL)
-			result = s;
-	}
-	Py_DECREF(single_match);
-	Py_DECREF(r);
-	goto done;
-  error:
-	PyErr_Clear();
-	Py_XDECREF(single_match);
-	Py_XDECREF(r);
-  done:
+	rl_completion_append_character = (s && *s) ? *s : '\0';
 	Py_XDECREF(b);
-#ifdef WITH_THREAD
-	PyGILState_Release(gilstate);
-#endif
-	return result;
+	Py_RETURN_NONE;
 }
 
+PyDoc_STRVAR(doc_set_completion_append_character,
+"set_completion_append_character(string) -> None\n\
+Set the character appended after the current completion. \
+May only be called from within custom completers.");
 
-/* Filename dequoting function */
-
-static char *
-on_filename_dequoting_function(const char *text, int quote_char);
 
+/* Get/set completion suppress append */
 
 static PyObject *
-set_filename_dequoting_function(PyObject *self, PyObject *args)
+get_completion_suppress_append(PyObject *self, PyObject *noarg)
 {
-#if (RL_READLINE_VERSION >= 0x0502)
-	modulestate *global = PyModule_GetState(self);
-
-	PyObject *result = set_hook("filename_dequoting_function",
-			&global->filename_dequoting_function, args);
-
-	rl_filename_dequoting_function =
-		global->filename_dequoting_function ?
-		(rl_dequote_func_t *)on_filename_dequoting_function : NULL;
-
-	return result;
-#else
-	Py_RETURN_NONE;
-#endif
+	return PyBool_FromLong(rl_completion_suppress_append);
 }
 
-PyDoc_STRVAR(doc_set_filename_dequoting_function,
-"set_filename_dequoting_function([function]) -> None\n\
-Set or remove the filename dequoting function. \
-The function is called as ``function(text, quote_char)`` \
-and should return a string representing a dequoted version \
-of ``text``, or None to indicate no change.");
+PyDoc_STRVAR(doc_get_completion_suppress_append,
+"get_completion_suppress_append() -> bool\n\
+Do not append the completion_append_character after the current completion.");
 
 
 static PyObject *
-get_filename_dequoting_function(PyObject *self, PyObject *noargs)
+set_completion_suppress_append(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
+	int value;
 
-	if (global->filename_dequoting_function == NULL) {
-		Py_RETURN_NONE;
+	if (!PyArg_ParseTuple(args, "i:set_completion_suppress_append", &value)) {
+		return NULL;
 	}
-	Py_INCREF(global->filename_dequoting_function);
-	return global->filename_dequoting_function;
+	rl_completion_suppress_append = value ? 1 : 0;
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_get_filename_dequoting_function,
-"get_filename_dequoting_function() -> function\n\
-Get the current filename dequoting function.");
+PyDoc_STRVAR(doc_set_completion_suppress_append,
+"set_completion_suppress_append(bool) -> None\n\
+Do not append the completion_append_character after the current completion. \
+May only be called from within custom completers.");
 
 
-static char *
-on_filename_dequoting_function(const char *text, int quote_char)
-/* This function must always return new memory, which means
-   at least a copy of 'text', and never NULL. */
+/* Get/set completer quote characters */
+
+static PyObject *
+get_completer_quote_characters(PyObject *self, PyObject *noarg)
 {
-	char *result = NULL;
-	char *s = NULL;
-	char quote_char_string[2] = "\0";
-	PyObject *r = NULL;
-	PyObject *b = NULL;
+	if (!rl_completer_quote_characters)
+		return PyString_FromString("");
+	return PyString_FromString(rl_completer_quote_characters);
+}
 
-#ifdef WITH_THREAD
-	PyGILState_STATE gilstate = PyGILState_Ensure();
-#endif
-	modulestate *global = PyModule_GetState(readline_module());
+PyDoc_STRVAR(doc_get_completer_quote_characters,
+"get_completer_quote_characters() -> string\n\
+Get list of characters that may be used to quote a substring of the line.");
+
+
+static PyObject *
+set_completer_quote_characters(PyObject *self, PyObject *args)
+{
+	char *s;
+	PyObject *b = NULL;
 
-	if (quote_char) {
-		quote_char_string[0] = quote_char;
-	}
-#if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->filename_dequoting_function, "NN",
-				  PyUnicode_DECODE(text),
-				  PyUnicode_DECODE(quote_char_string));
-#else
-	r = PyObject_CallFunction(global->filename_dequoting_function, "ss",
-				  text, quote_char_string);
-#endif
-	if (r == NULL) {
-		result = strdup(text);
-		goto error;
-	}
-	if (r == Py_None) {
-		result = strdup(text);
-	}
-	else {
 #if (PY_MAJOR_VERSION >= 3)
-		b = PyUnicode_ENCODE(r);
-		if (b != NULL)
-			s = PyBytes_AsString(b);
+	if (!PyArg_ParseTuple(args, "O&:set_completer_quote_characters", PyUnicode_StrConverter, &b))
+		return NULL;
+	s = PyBytes_AsString(b);
 #else
-		s = PyString_AsString(r);
+	if (!PyArg_ParseTuple(args, "s:set_completer_quote_characters", &s))
+		return NULL;
 #endif
-		if (s == NULL) {
-			result = strdup(text);
-			goto error;
-		}
-		result = strdup(s);
-	}
-	Py_DECREF(r);
-	goto done;
-  error:
-	PyErr_Clear();
-	Py_XDECREF(r);
-  done:
+	s = strdup(s);
 	Py_XDECREF(b);
-#ifdef WITH_THREAD
-	PyGILState_Release(gilstate);
-#endif
-	/* We really can't return NULL here, and since this is a hook
-	   we can't raise a Python exception either. */
-	if (result == NULL) {
-		fprintf(stderr, "readline: out of virtual memory\n");
-		exit(2);
+
+	if (s) {
+		if (rl_completer_quote_characters)
+			free((void*)rl_completer_quote_characters);
+		rl_completer_quote_characters = s;
+		Py_RETURN_NONE;
 	}
-	return result;
+	else
+		return PyErr_NoMemory();
 }
 
+PyDoc_STRVAR(doc_set_completer_quote_characters,
+"set_completer_quote_characters(string) -> None\n\
+Set list of characters that may be used to quote a substring of the line.");
 
-/* Char-is-quoted function */
-
-static int
-on_char_is_quoted_function(const char *text, int index);
 
+/* Get/set filename quote characters */
 
 static PyObject *
-set_char_is_quoted_function(PyObject *self, PyObject *args)
+get_filename_quote_characters(PyObject *self, PyObject *noarg)
 {
-	modulestate *global = PyModule_GetState(self);
-
-	PyObject *result = set_hook("char_is_quoted_function",
-			&global->char_is_quoted_function, args);
-
-	rl_char_is_quoted_p =
-		global->char_is_quoted_function ?
-		(rl_linebuf_func_t *)on_char_is_quoted_function : NULL;
-
-	return result;
+	if (!rl_filename_quote_characters)
+		return PyString_FromString("");
+	return PyString_FromString(rl_filename_quote_characters);
 }
 
-PyDoc_STRVAR(doc_set_char_is_quoted_function,
-"set_char_is_quoted_function([function]) -> None\n\
-Set or remove the function that determines whether or not a \
-specific character in the line buffer is quoted. \
-The function is called as ``function(text, index)`` and should return \
-True if the character at ``index`` is quoted, and False otherwise.");
+PyDoc_STRVAR(doc_get_filename_quote_characters,
+"get_filename_quote_characters() -> string\n\
+Get list of characters that cause a filename to be quoted by the completer.");
 
 
 static PyObject *
-get_char_is_quoted_function(PyObject *self, PyObject *noargs)
+set_filename_quote_characters(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
+	char *s;
+	PyObject *b = NULL;
 
-	if (global->char_is_quoted_function == NULL) {
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&:set_filename_quote_characters", PyUnicode_StrConverter, &b))
+		return NULL;
+	s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "s:set_filename_quote_characters", &s))
+		return NULL;
+#endif
+	s = strdup(s);
+	Py_XDECREF(b);
+
+	if (s) {
+		if (rl_filename_quote_characters)
+			free((void*)rl_filename_quote_characters);
+		rl_filename_quote_characters = s;
 		Py_RETURN_NONE;
 	}
-	Py_INCREF(global->char_is_quoted_function);
-	return global->char_is_quoted_function;
+	else
+		return PyErr_NoMemory();
 }
 
-PyDoc_STRVAR(doc_get_char_is_quoted_function,
-"get_char_is_quoted_function() -> function\n\
-Get the function that determines whether or not a specific character \
-in the line buffer is quoted.");
+PyDoc_STRVAR(doc_set_filename_quote_characters,
+"set_filename_quote_characters(string) -> None\n\
+Set list of characters that cause a filename to be quoted by the completer.");
 
 
-static int
-on_char_is_quoted_function(const char *text, int index)
+/* Completion quoting */
+
+static PyObject *
+get_completion_found_quote(PyObject *self, PyObject *noarg)
 {
-	int result = 0;
-	int i = 0;
-	PyObject *r = NULL;
+	return PyBool_FromLong(rl_completion_found_quote);
+}
 
-#ifdef WITH_THREAD
-	PyGILState_STATE gilstate = PyGILState_Ensure();
-#endif
-	modulestate *global = PyModule_GetState(readline_module());
+PyDoc_STRVAR(doc_get_completion_found_quote,
+"get_completion_found_quote() -> bool\n\
+When readline is completing quoted text, it sets this variable to True \
+if the word being completed contains any quoting character (including backslashes).");
 
-	_py_set_completion_defaults();
 
-#if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->char_is_quoted_function, "Ni",
-				  PyUnicode_DECODE(text),
-				  PyUnicode_INDEX(text, index));
-#else
-	r = PyObject_CallFunction(global->char_is_quoted_function, "si",
-	                          text, index);
-#endif
-	if (r == NULL)
-		goto error;
-	if (r == Py_None) {
-		result = 0;
-	}
-	else {
-		i = PyInt_AsLong(r);
-		if (i == -1 && PyErr_Occurred())
-			goto error;
-		result = i;
+static PyObject *
+set_completion_found_quote(PyObject *self, PyObject *args)
+{
+	int value;
+
+	if (!PyArg_ParseTuple(args, "i:set_completion_found_quote", &value)) {
+		return NULL;
 	}
-	Py_DECREF(r);
-	goto done;
-  error:
-	PyErr_Clear();
-	Py_XDECREF(r);
-  done:
-#ifdef WITH_THREAD
-	PyGILState_Release(gilstate);
-#endif
-	return result;
+	rl_completion_found_quote = value ? 1 : 0;
+	Py_RETURN_NONE;
 }
 
+PyDoc_STRVAR(doc_set_completion_found_quote,
+"set_completion_found_quote(bool) -> None\n\
+When readline is completing quoted text, it sets this variable to True \
+if the word being completed contains any quoting character (including backslashes).");
 
-/* Stock completion functions */
 
 static PyObject *
-filename_completion_function(PyObject *self, PyObject *args)
+get_completion_quote_character(PyObject *self, PyObject *noarg)
 {
-	int state;
-	char *s;
-	char *completion;
-	PyObject *r = NULL;
-	PyObject *b = NULL;
-
 #if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&i:filename_completion_function", PyUnicode_StrConverter, &b, &state))
-		return NULL;
-	s = PyBytes_AsString(b);
+	return PyUnicode_DECODE_CHAR(rl_completion_quote_character);
 #else
-	if (!PyArg_ParseTuple(args, "si:filename_completion_function", &s, &state))
-		return NULL;
+	if (!rl_completion_quote_character)
+		return PyString_FromString("");
+	return PyString_FromFormat("%c", rl_completion_quote_character);
 #endif
-	completion = rl_filename_completion_function(s, state);
-	Py_XDECREF(b);
-	if (!completion)
-		Py_RETURN_NONE;
-	r = PyString_FromString(completion);
-	free(completion);
-	return r;
 }
 
-PyDoc_STRVAR(doc_filename_completion_function,
-"filename_completion_function(text, state) -> string\n\
-A built-in generator function for filename completion.");
+PyDoc_STRVAR(doc_get_completion_quote_character,
+"get_completion_quote_character() -> string\n\
+When readline is completing quoted text, it sets this variable to the quoting character found.");
 
 
 static PyObject *
-username_completion_function(PyObject *self, PyObject *args)
+set_completion_quote_character(PyObject *self, PyObject *args)
 {
-	int state;
 	char *s;
-	char *completion;
-	PyObject *r = NULL;
 	PyObject *b = NULL;
 
 #if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&i:username_completion_function", PyUnicode_StrConverter, &b, &state))
+	if (!PyArg_ParseTuple(args, "O&:set_completion_quote_character", PyUnicode_StrConverter, &b))
 		return NULL;
 	s = PyBytes_AsString(b);
 #else
-	if (!PyArg_ParseTuple(args, "si:username_completion_function", &s, &state))
+	if (!PyArg_ParseTuple(args, "s:set_completion_quote_character", &s))
 		return NULL;
 #endif
-	completion = rl_username_completion_function(s, state);
+	rl_completion_quote_character = (s && *s) ? *s : '\0';
 	Py_XDECREF(b);
-	if (!completion)
-		Py_RETURN_NONE;
-	r = PyString_FromString(completion);
-	free(completion);
-	return r;
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_username_completion_function,
-"username_completion_function(text, state) -> string\n\
-A built-in generator function for username completion.");
-
-
-static PyObject *
-py_tilde_expand(PyObject *self, PyObject *args)
-{
-	char *s;
-	PyObject *r = NULL;
-	PyObject *b = NULL;
-
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:tilde_expand", PyUnicode_StrConverter, &b))
-		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:tilde_expand", &s))
-		return NULL;
-#endif
-	if (*s == '~') {
-		/* tilde_expand aborts when out of memory */
-		s = tilde_expand(s);
-		r = PyString_FromString(s);
-		free(s);
-	}
-	else
-		r = PyString_FromString(s);
-	Py_XDECREF(b);
-	return r;
-}
-
-PyDoc_STRVAR(doc_tilde_expand,
-"tilde_expand(string) -> string\n\
-Return a new string which is the result of tilde expanding string.");
-
+PyDoc_STRVAR(doc_set_completion_quote_character,
+"set_completion_quote_character(string) -> None\n\
+When readline is completing quoted text, it sets this variable to the quoting character found.");
 
-/* Special prefixes */
 
 static PyObject *
-get_special_prefixes(PyObject *self, PyObject *noarg)
+get_completion_suppress_quote(PyObject *self, PyObject *noarg)
 {
-	if (!rl_special_prefixes)
-		return PyString_FromString("");
-	return PyString_FromString(rl_special_prefixes);
+	return PyBool_FromLong(rl_completion_suppress_quote);
 }
 
-PyDoc_STRVAR(doc_get_special_prefixes,
-"get_special_prefixes() -> string\n\
-Characters that are word break characters, but should be left in text \
-when it is passed to the completion function.");
+PyDoc_STRVAR(doc_get_completion_suppress_quote,
+"get_completion_suppress_quote() -> bool\n\
+Do not append a matching quote character when performing completion on a quoted string.");
 
 
 static PyObject *
-set_special_prefixes(PyObject *self, PyObject *args)
+set_completion_suppress_quote(PyObject *self, PyObject *args)
 {
-	char *s;
-	PyObject *b = NULL;
+	int value;
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:set_special_prefixes", PyUnicode_StrConverter, &b))
-		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:set_special_prefixes", &s))
+	if (!PyArg_ParseTuple(args, "i:set_completion_suppress_quote", &value)) {
 		return NULL;
-#endif
-	s = strdup(s);
-	Py_XDECREF(b);
-
-	if (s) {
-		if (rl_special_prefixes)
-			free((void*)rl_special_prefixes);
-		rl_special_prefixes = s;
-		Py_RETURN_NONE;
 	}
-	else
-		return PyErr_NoMemory();
+	rl_completion_suppress_quote = value ? 1 : 0;
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_special_prefixes,
-"set_special_prefixes(string) -> None\n\
-Characters that are word break characters, but should be left in text \
-when it is passed to the completion function.");
+PyDoc_STRVAR(doc_set_completion_suppress_quote,
+"set_completion_suppress_quote(bool) -> None\n\
+Do not append a matching quote character when performing completion on a quoted string. \
+May only be called from within custom completers.");
 
 
-/* Query items */
+/* Filename completion flags */
 
 static PyObject *
-get_completion_query_items(PyObject *self, PyObject *noarg)
+get_filename_completion_desired(PyObject *self, PyObject *noarg)
 {
-	return PyInt_FromLong(rl_completion_query_items);
+	return PyBool_FromLong(rl_filename_completion_desired);
 }
 
-PyDoc_STRVAR(doc_get_completion_query_items,
-"get_completion_query_items() -> int\n\
-Up to this many items will be displayed in response to a possible-completions call.");
+PyDoc_STRVAR(doc_get_filename_completion_desired,
+"get_filename_completion_desired() -> bool\n\
+If True, treat the results of matches as filenames.");
 
 
 static PyObject *
-set_completion_query_items(PyObject *self, PyObject *args)
+set_filename_completion_desired(PyObject *self, PyObject *args)
 {
 	int value;
 
-	if (!PyArg_ParseTuple(args, "i:set_completion_query_items", &value)) {
+	if (!PyArg_ParseTuple(args, "i:set_filename_completion_desired", &value)) {
 		return NULL;
 	}
-	rl_completion_query_items = value;
+	rl_filename_completion_desired = value ? 1 : 0;
 	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_set_completion_query_items,
-"set_completion_query_items(int) -> None\n\
-Up to this many items will be displayed in response to a possible-completions call.");
-
+PyDoc_STRVAR(doc_set_filename_completion_desired,
+"set_filename_completion_desired(bool) -> None\n\
+If True, treat the results of matches as filenames. \
+May only be called from within custom completers.");
 
-/* Readline version */
 
 static PyObject *
-readline_version(PyObject *self, PyObject *noarg)
+get_filename_quoting_desired(PyObject *self, PyObject *noarg)
 {
-	return PyInt_FromLong(rl_readline_version);
+	return PyBool_FromLong(rl_filename_quoting_desired);
 }
 
-PyDoc_STRVAR(doc_readline_version,
-"readline_version() -> int\n\
-Return the readline library version encoded in an integer. \
-The format is ``0xMMmm``, where ``MM`` is the major and ``mm`` \
-the minor version number.");
-
+PyDoc_STRVAR(doc_get_filename_quoting_desired,
+"get_filename_quoting_desired() -> bool\n\
+If True, filenames will be quoted.");
 
-/* Internals */
 
 static PyObject *
-get_rl_point(PyObject *self, PyObject *noarg)
+set_filename_quoting_desired(PyObject *self, PyObject *args)
 {
-	return PyInt_FromLong(rl_point);
+	int value;
+
+	if (!PyArg_ParseTuple(args, "i:set_filename_quoting_desired", &value)) {
+		return NULL;
+	}
+	rl_filename_quoting_desired = value ? 1 : 0;
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_get_rl_point,
-"get_rl_point() -> int\n\
-Return rl_point.");
+PyDoc_STRVAR(doc_set_filename_quoting_desired,
+"set_filename_quoting_desired(bool) -> None\n\
+If True, filenames will be quoted. \
+May only be called from within custom completers.");
+
 
+/* Inhibit completion */
 
 static PyObject *
-get_rl_end(PyObject *self, PyObject *noarg)
+get_inhibit_completion(PyObject *self, PyObject *noarg)
 {
-	return PyInt_FromLong(rl_end);
+	return PyBool_FromLong(rl_inhibit_completion);
 }
 
-PyDoc_STRVAR(doc_get_rl_end,
-"get_rl_end() -> int\n\
-Return rl_end.");
+PyDoc_STRVAR(doc_get_inhibit_completion,
+"get_inhibit_completion() -> bool\n\
+If True, completion is disabled.");
 
 
 static PyObject *
-complete_internal(PyObject *self, PyObject *args)
+set_inhibit_completion(PyObject *self, PyObject *args)
 {
-	char *what_to_do;
-	int result = 1;
-	PyObject *b = NULL;
+	int value;
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:complete_internal", PyUnicode_StrConverter, &b))
-		return NULL;
-	what_to_do = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:complete_internal", &what_to_do))
+	if (!PyArg_ParseTuple(args, "i:set_inhibit_completion", &value)) {
 		return NULL;
-#endif
-	result = rl_complete_internal(*what_to_do);
-	Py_XDECREF(b);
-	return PyInt_FromLong(result);
+	}
+	rl_inhibit_completion = value ? 1 : 0;
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_complete_internal,
-"complete_internal(what_to_do) -> int\n\
-Complete the word at or before the cursor position.");
+PyDoc_STRVAR(doc_set_inhibit_completion,
+"set_inhibit_completion(bool) -> None\n\
+If True, completion is disabled and the completion character is inserted \
+as any other character.");
 
 
-/* Word-break hook */
+/* Filename quoting function */
 
 static char *
-on_completion_word_break_hook(void);
+on_filename_quoting_function(const char *text, int match_type, char *quote_pointer);
 
-extern char
-_rl_find_completion_word(int *fp, int *dp);
+static rl_quote_func_t *default_filename_quoting_function = NULL;
 
 
 static PyObject *
-set_completion_word_break_hook(PyObject *self, PyObject *args)
+set_filename_quoting_function(PyObject *self, PyObject *args)
 {
 	modulestate *global = PyModule_GetState(self);
 
-	PyObject *result = set_hook("completion_word_break_hook",
-			&global->completion_word_break_hook, args);
+	PyObject *result = set_hook("filename_quoting_function",
+			&global->filename_quoting_function, args);
 
-	rl_completion_word_break_hook =
-		global->completion_word_break_hook ?
-		on_completion_word_break_hook : NULL;
+	rl_filename_quoting_function =
+		global->filename_quoting_function ?
+		(rl_quote_func_t *)on_filename_quoting_function :
+		default_filename_quoting_function;
 
 	return result;
 }
 
-PyDoc_STRVAR(doc_set_completion_word_break_hook,
-"set_completion_word_break_hook([function]) -> None\n\
-A function to call when readline is deciding where to separate words for word completion. \
-The function is called as ``function(begidx, endidx)`` once for every completion, \
-and should return a string of word break characters for the current completion, or None \
-to indicate no change.");
+PyDoc_STRVAR(doc_set_filename_quoting_function,
+"set_filename_quoting_function([function]) -> None\n\
+Set or remove the filename quoting function. \
+The function is called as ``function(text, single_match, quote_char)`` \
+and should return a string representing a quoted version of ``text``, \
+or None to indicate no change. The ``single_match`` argument is True \
+if the completion has generated only one match.");
 
 
 static PyObject *
-get_completion_word_break_hook(PyObject *self, PyObject *noargs)
+get_filename_quoting_function(PyObject *self, PyObject *noargs)
 {
 	modulestate *global = PyModule_GetState(self);
 
-	if (global->completion_word_break_hook == NULL) {
+	if (global->filename_quoting_function == NULL) {
 		Py_RETURN_NONE;
 	}
-	Py_INCREF(global->completion_word_break_hook);
-	return global->completion_word_break_hook;
+	Py_INCREF(global->filename_quoting_function);
+	return global->filename_quoting_function;
 }
 
-PyDoc_STRVAR(doc_get_completion_word_break_hook,
-"get_completion_word_break_hook() -> function\n\
-A function to call when readline is deciding where to separate words for word completion.");
+PyDoc_STRVAR(doc_get_filename_quoting_function,
+"get_filename_quoting_function() -> function\n\
+Get the current filename quoting function.");
 
 
 static char *
-on_completion_word_break_hook(void)
-/* Memory returned by this function is never freed. We must keep
-   it around in a static pointer and free it on the next call. */
+on_filename_quoting_function(const char *text, int match_type, char *quote_pointer)
+/* This function must return new memory on success and the
+   passed-in 'text' pointer to indicate no change. */
 {
-	char *result = NULL;
+	char *result = (char*)text;
 	char *s = NULL;
+	char quote_char_string[2] = "\0";
+	PyObject *single_match = NULL;
 	PyObject *r = NULL;
 	PyObject *b = NULL;
-	int start, end;
-	static char *last = NULL;
 
 #ifdef WITH_THREAD
 	PyGILState_STATE gilstate = PyGILState_Ensure();
 #endif
 	modulestate *global = PyModule_GetState(readline_module());
 
-	_py_set_completion_defaults();
+	single_match = PyBool_FromLong(match_type == SINGLE_MATCH);
 
-	/* Determine word boundaries */
-	end = rl_point;
-	if (rl_point) {
-		/* Unhook ourselves to avoid infinite recursion */
-		rl_completion_word_break_hook = NULL;
-		_rl_find_completion_word(NULL, NULL);
-		rl_completion_word_break_hook = on_completion_word_break_hook;
+	if (quote_pointer && *quote_pointer) {
+		quote_char_string[0] = *quote_pointer;
 	}
-	start = rl_point;
-	rl_point = end;
-
 #if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->completion_word_break_hook, "ii",
-				  PyUnicode_INDEX(rl_line_buffer, start),
-				  PyUnicode_INDEX(rl_line_buffer, end));
+	r = PyObject_CallFunction(global->filename_quoting_function, "NON",
+				  PyUnicode_DECODE(text), single_match,
+				  PyUnicode_DECODE(quote_char_string));
 #else
-	r = PyObject_CallFunction(global->completion_word_break_hook, "ii",
-	                          start, end);
+	r = PyObject_CallFunction(global->filename_quoting_function, "sOs",
+				  text, single_match, quote_char_string);
 #endif
 	if (r == NULL)
 		goto error;
 	if (r == Py_None) {
-		result = NULL;
+		result = (char*)text;
 	}
 	else {
 #if (PY_MAJOR_VERSION >= 3)
@@ -2074,15 +2650,16 @@ on_completion_word_break_hook(void)
 #endif
 		if (s == NULL)
 			goto error;
-		result = strdup(s);
-		if (last != NULL)
-			free(last);
-		last = result;
+		s = strdup(s);
+		if (s != NULL)
+			result = s;
 	}
+	Py_DECREF(single_match);
 	Py_DECREF(r);
 	goto done;
   error:
 	PyErr_Clear();
+	Py_XDECREF(single_match);
 	Py_XDECREF(r);
   done:
 	Py_XDECREF(b);
@@ -2093,57 +2670,64 @@ on_completion_word_break_hook(void)
 }
 
 
-/* Directory rewrite hook */
+/* Filename dequoting function */
 
-static int
-on_directory_rewrite_hook(char **directory);
+static char *
+on_filename_dequoting_function(const char *text, int quote_char);
 
 
 static PyObject *
-set_directory_rewrite_hook(PyObject *self, PyObject *args)
+set_filename_dequoting_function(PyObject *self, PyObject *args)
 {
+#if (RL_READLINE_VERSION >= 0x0502)
 	modulestate *global = PyModule_GetState(self);
 
-	PyObject *result = set_hook("directory_rewrite_hook",
-			&global->directory_rewrite_hook, args);
+	PyObject *result = set_hook("filename_dequoting_function",
+			&global->filename_dequoting_function, args);
 
-	rl_directory_rewrite_hook =
-		global->directory_rewrite_hook ?
-		on_directory_rewrite_hook : NULL;
+	rl_filename_dequoting_function =
+		global->filename_dequoting_function ?
+		(rl_dequote_func_t *)on_filename_dequoting_function : NULL;
 
 	return result;
+#else
+	Py_RETURN_NONE;
+#endif
 }
 
-PyDoc_STRVAR(doc_set_directory_rewrite_hook,
-"set_directory_rewrite_hook([function]) -> None\n\
-This function is used to prepare the director name passed to ``opendir()`` during filename completion. \
-The function is called as ``function(dirname)`` and should return a new directory name or \
-None to indicate no change. At the least, the function must perform all necessary \
-dequoting.");
+PyDoc_STRVAR(doc_set_filename_dequoting_function,
+"set_filename_dequoting_function([function]) -> None\n\
+Set or remove the filename dequoting function. \
+The function is called as ``function(text, quote_char)`` \
+and should return a string representing a dequoted version \
+of ``text``, or None to indicate no change.");
 
 
 static PyObject *
-get_directory_rewrite_hook(PyObject *self, PyObject *noargs)
+get_filename_dequoting_function(PyObject *self, PyObject *noargs)
 {
 	modulestate *global = PyModule_GetState(self);
 
-	if (global->directory_rewrite_hook == NULL) {
+	if (global->filename_dequoting_function == NULL) {
 		Py_RETURN_NONE;
 	}
-	Py_INCREF(global->directory_rewrite_hook);
-	return global->directory_rewrite_hook;
+	Py_INCREF(global->filename_dequoting_function);
+	return global->filename_dequoting_function;
 }
 
-PyDoc_STRVAR(doc_get_directory_rewrite_hook,
-"get_directory_rewrite_hook() -> function\n\
-Get the current directory rewrite hook function.");
+PyDoc_STRVAR(doc_get_filename_dequoting_function,
+"get_filename_dequoting_function() -> function\n\
+Get the current filename dequoting function.");
 
 
-static int
-on_directory_rewrite_hook(char **directory)
+static char *
+on_filename_dequoting_function(const char *text, int quote_char)
+/* This function must always return new memory, which means
+   at least a copy of 'text', and never NULL. */
 {
-	int result = 0;
+	char *result = NULL;
 	char *s = NULL;
+	char quote_char_string[2] = "\0";
 	PyObject *r = NULL;
 	PyObject *b = NULL;
 
@@ -2152,34 +2736,37 @@ on_directory_rewrite_hook(char **directory)
 #endif
 	modulestate *global = PyModule_GetState(readline_module());
 
+	if (quote_char) {
+		quote_char_string[0] = quote_char;
+	}
 #if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->directory_rewrite_hook, "N",
-				  PyUnicode_DECODE(*directory));
+	r = PyObject_CallFunction(global->filename_dequoting_function, "NN",
+				  PyUnicode_DECODE(text),
+				  PyUnicode_DECODE(quote_char_string));
 #else
-	r = PyObject_CallFunction(global->directory_rewrite_hook, "s",
-				  *directory);
+	r = PyObject_CallFunction(global->filename_dequoting_function, "ss",
+				  text, quote_char_string);
 #endif
-	if (r == NULL)
+	if (r == NULL) {
+		result = strdup(text);
 		goto error;
+	}
 	if (r == Py_None) {
-		result = 0;
+		result = strdup(text);
 	}
 	else {
 #if (PY_MAJOR_VERSION >= 3)
-		b = PyUnicode_FS_ENCODE(r);
+		b = PyUnicode_ENCODE(r);
 		if (b != NULL)
 			s = PyBytes_AsString(b);
 #else
 		s = PyString_AsString(r);
 #endif
-		if (s == NULL)
+		if (s == NULL) {
+			result = strdup(text);
 			goto error;
-		s = strdup(s);
-		if (s != NULL) {
-			free(*directory);
-			*directory = s;
-			result = 1;
 		}
+		result = strdup(s);
 	}
 	Py_DECREF(r);
 	goto done;
@@ -2191,75 +2778,84 @@ on_directory_rewrite_hook(char **directory)
 #ifdef WITH_THREAD
 	PyGILState_Release(gilstate);
 #endif
+	/* We really can't return NULL here, and since this is a hook
+	   we can't raise a Python exception either. */
+	if (result == NULL) {
+		fprintf(stderr, "readline: out of virtual memory\n");
+		exit(2);
+	}
 	return result;
 }
 
 
-/* Directory completion hook */
+/* Char-is-quoted function */
 
 static int
-on_directory_completion_hook(char **directory);
+on_char_is_quoted_function(const char *text, int index);
 
 
 static PyObject *
-set_directory_completion_hook(PyObject *self, PyObject *args)
+set_char_is_quoted_function(PyObject *self, PyObject *args)
 {
 	modulestate *global = PyModule_GetState(self);
 
-	PyObject *result = set_hook("directory_completion_hook",
-			&global->directory_completion_hook, args);
+	PyObject *result = set_hook("char_is_quoted_function",
+			&global->char_is_quoted_function, args);
 
-	rl_directory_completion_hook =
-		global->directory_completion_hook ?
-		on_directory_completion_hook : NULL;
+	rl_char_is_quoted_p =
+		global->char_is_quoted_function ?
+		(rl_linebuf_func_t *)on_char_is_quoted_function : NULL;
 
 	return result;
 }
 
-PyDoc_STRVAR(doc_set_directory_completion_hook,
-"set_directory_completion_hook([function]) -> None\n\
-This function is allowed to modify the directory portion of filenames readline completes. \
-The function is called as ``function(dirname)`` and should return a new directory name or \
-None to indicate no change. At the least, the function must perform all necessary \
-dequoting.");
+PyDoc_STRVAR(doc_set_char_is_quoted_function,
+"set_char_is_quoted_function([function]) -> None\n\
+Set or remove the function that determines whether or not a \
+specific character in the line buffer is quoted. \
+The function is called as ``function(text, index)`` and should return \
+True if the character at ``index`` is quoted, and False otherwise.");
 
 
 static PyObject *
-get_directory_completion_hook(PyObject *self, PyObject *noargs)
+get_char_is_quoted_function(PyObject *self, PyObject *noargs)
 {
 	modulestate *global = PyModule_GetState(self);
 
-	if (global->directory_completion_hook == NULL) {
+	if (global->char_is_quoted_function == NULL) {
 		Py_RETURN_NONE;
 	}
-	Py_INCREF(global->directory_completion_hook);
-	return global->directory_completion_hook;
+	Py_INCREF(global->char_is_quoted_function);
+	return global->char_is_quoted_function;
 }
 
-PyDoc_STRVAR(doc_get_directory_completion_hook,
-"get_directory_completion_hook() -> function\n\
-Get the current directory completion hook function.");
+PyDoc_STRVAR(doc_get_char_is_quoted_function,
+"get_char_is_quoted_function() -> function\n\
+Get the function that determines whether or not a specific character \
+in the line buffer is quoted.");
 
 
 static int
-on_directory_completion_hook(char **directory)
+on_char_is_quoted_function(const char *text, int index)
 {
 	int result = 0;
-	char *s = NULL;
+	int i = 0;
 	PyObject *r = NULL;
-	PyObject *b = NULL;
 
 #ifdef WITH_THREAD
 	PyGILState_STATE gilstate = PyGILState_Ensure();
 #endif
 	modulestate *global = PyModule_GetState(readline_module());
 
+	_py_set_completion_defaults();
+
 #if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->directory_completion_hook, "N",
-				  PyUnicode_DECODE(*directory));
+	r = PyObject_CallFunction(global->char_is_quoted_function, "Ni",
+				  PyUnicode_DECODE_CACHED(text),
+				  PyUnicode_INDEX_CACHED(text, index));
 #else
-	r = PyObject_CallFunction(global->directory_completion_hook, "s",
-				  *directory);
+	r = PyObject_CallFunction(global->char_is_quoted_function, "si",
+	                          text, index);
 #endif
 	if (r == NULL)
 		goto error;
@@ -2267,21 +2863,10 @@ on_directory_completion_hook(char **directory)
 		result = 0;
 	}
 	else {
-#if (PY_MAJOR_VERSION >= 3)
-		b = PyUnicode_ENCODE(r);
-		if (b != NULL)
-			s = PyBytes_AsString(b);
-#else
-		s = PyString_AsString(r);
-#endif
-		if (s == NULL)
+		i = PyInt_AsLong(r);
+		if (i == -1 && PyErr_Occurred())
 			goto error;
-		s = strdup(s);
-		if (s != NULL) {
-			free(*directory);
-			*directory = s;
-			result = 1;
-		}
+		result = i;
 	}
 	Py_DECREF(r);
 	goto done;
@@ -2289,7 +2874,6 @@ on_directory_completion_hook(char **directory)
 	PyErr_Clear();
 	Py_XDECREF(r);
   done:
-	Py_XDECREF(b);
 #ifdef WITH_THREAD
 	PyGILState_Release(gilstate);
 #endif
@@ -2297,103 +2881,1067 @@ on_directory_completion_hook(char **directory)
 }
 
 
-/* Filename rewrite hook */
-
-static char *
-on_filename_rewrite_hook(const char *text, int num_bytes);
-
+/* Stock completion functions */
 
 static PyObject *
-set_filename_rewrite_hook(PyObject *self, PyObject *args)
+filename_completion_function(PyObject *self, PyObject *args)
 {
-#if (RL_READLINE_VERSION >= 0x0601)
-	modulestate *global = PyModule_GetState(self);
-
-	PyObject *result = set_hook("filename_rewrite_hook",
-			&global->filename_rewrite_hook, args);
-
-	rl_filename_rewrite_hook =
-		global->filename_rewrite_hook ?
-		(rl_dequote_func_t *)on_filename_rewrite_hook : NULL;
+	int state;
+	char *s;
+	char *completion;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
 
-	return result;
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&i:filename_completion_function", PyUnicode_StrConverter, &b, &state))
+		return NULL;
+	s = PyBytes_AsString(b);
 #else
-	Py_RETURN_NONE;
+	if (!PyArg_ParseTuple(args, "si:filename_completion_function", &s, &state))
+		return NULL;
 #endif
+	completion = rl_filename_completion_function(s, state);
+	Py_XDECREF(b);
+	if (!completion)
+		Py_RETURN_NONE;
+	r = PyString_FromString(completion);
+	free(completion);
+	return r;
 }
 
-PyDoc_STRVAR(doc_set_filename_rewrite_hook,
-"set_filename_rewrite_hook([function]) -> None\n\
-This function is called for every filename before it is compared against the completion word. \
-The function is called as ``function(filename)`` and should return a new filename or \
-None to indicate no change.");
+PyDoc_STRVAR(doc_filename_completion_function,
+"filename_completion_function(text, state) -> string\n\
+A built-in generator function for filename completion.");
 
 
 static PyObject *
-get_filename_rewrite_hook(PyObject *self, PyObject *noargs)
+username_completion_function(PyObject *self, PyObject *args)
 {
-	modulestate *global = PyModule_GetState(self);
+	int state;
+	char *s;
+	char *completion;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
 
-	if (global->filename_rewrite_hook == NULL) {
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&i:username_completion_function", PyUnicode_StrConverter, &b, &state))
+		return NULL;
+	s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "si:username_completion_function", &s, &state))
+		return NULL;
+#endif
+	completion = rl_username_completion_function(s, state);
+	Py_XDECREF(b);
+	if (!completion)
 		Py_RETURN_NONE;
-	}
-	Py_INCREF(global->filename_rewrite_hook);
-	return global->filename_rewrite_hook;
+	r = PyString_FromString(completion);
+	free(completion);
+	return r;
 }
 
-PyDoc_STRVAR(doc_get_filename_rewrite_hook,
-"get_filename_rewrite_hook() -> function\n\
-Get the current filename rewrite hook function.");
-
+PyDoc_STRVAR(doc_username_completion_function,
+"username_completion_function(text, state) -> string\n\
+A built-in generator function for username completion.");
+
+
+static PyObject *
+py_tilde_expand(PyObject *self, PyObject *args)
+{
+	char *s;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&:tilde_expand", PyUnicode_StrConverter, &b))
+		return NULL;
+	s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "s:tilde_expand", &s))
+		return NULL;
+#endif
+	if (*s == '~') {
+		/* tilde_expand aborts when out of memory */
+		s = tilde_expand(s);
+		r = PyString_FromString(s);
+		free(s);
+	}
+	else
+		r = PyString_FromString(s);
+	Py_XDECREF(b);
+	return r;
+}
+
+PyDoc_STRVAR(doc_tilde_expand,
+"tilde_expand(string) -> string\n\
+Return a new string which is the result of tilde expanding string.");
+
+
+/* Special prefixes */
+
+static PyObject *
+get_special_prefixes(PyObject *self, PyObject *noarg)
+{
+	if (!rl_special_prefixes)
+		return PyString_FromString("");
+	return PyString_FromString(rl_special_prefixes);
+}
+
+PyDoc_STRVAR(doc_get_special_prefixes,
+"get_special_prefixes() -> string\n\
+Characters that are word break characters, but should be left in text \
+when it is passed to the completion function.");
+
+
+static PyObject *
+set_special_prefixes(PyObject *self, PyObject *args)
+{
+	char *s;
+	PyObject *b = NULL;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&:set_special_prefixes", PyUnicode_StrConverter, &b))
+		return NULL;
+	s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "s:set_special_prefixes", &s))
+		return NULL;
+#endif
+	s = strdup(s);
+	Py_XDECREF(b);
+
+	if (s) {
+		if (rl_special_prefixes)
+			free((void*)rl_special_prefixes);
+		rl_special_prefixes = s;
+		Py_RETURN_NONE;
+	}
+	else
+		return PyErr_NoMemory();
+}
+
+PyDoc_STRVAR(doc_set_special_prefixes,
+"set_special_prefixes(string) -> None\n\
+Characters that are word break characters, but should be left in text \
+when it is passed to the completion function.");
+
+
+/* Query items */
+
+static PyObject *
+get_completion_query_items(PyObject *self, PyObject *noarg)
+{
+	return PyInt_FromLong(rl_completion_query_items);
+}
+
+PyDoc_STRVAR(doc_get_completion_query_items,
+"get_completion_query_items() -> int\n\
+Up to this many items will be displayed in response to a possible-completions call.");
+
+
+static PyObject *
+set_completion_query_items(PyObject *self, PyObject *args)
+{
+	int value;
+
+	if (!PyArg_ParseTuple(args, "i:set_completion_query_items", &value)) {
+		return NULL;
+	}
+	rl_completion_query_items = value;
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_set_completion_query_items,
+"set_completion_query_items(int) -> None\n\
+Up to this many items will be displayed in response to a possible-completions call.");
+
+
+/* Readline version */
+
+static PyObject *
+readline_version(PyObject *self, PyObject *noarg)
+{
+	return PyInt_FromLong(rl_readline_version);
+}
+
+PyDoc_STRVAR(doc_readline_version,
+"readline_version() -> int\n\
+Return the readline library version encoded in an integer. \
+The format is ``0xMMmm``, where ``MM`` is the major and ``mm`` \
+the minor version number.");
+
+
+/* Internals */
+
+static PyObject *
+get_rl_point(PyObject *self, PyObject *noarg)
+{
+	return PyInt_FromLong(rl_point);
+}
+
+PyDoc_STRVAR(doc_get_rl_point,
+"get_rl_point() -> int\n\
+Return rl_point.");
+
+
+static PyObject *
+get_rl_end(PyObject *self, PyObject *noarg)
+{
+	return PyInt_FromLong(rl_end);
+}
+
+PyDoc_STRVAR(doc_get_rl_end,
+"get_rl_end() -> int\n\
+Return rl_end.");
+
+
+static PyObject *
+complete_internal(PyObject *self, PyObject *args)
+{
+	char *what_to_do;
+	int result = 1;
+	PyObject *b = NULL;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&:complete_internal", PyUnicode_StrConverter, &b))
+		return NULL;
+	what_to_do = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "s:complete_internal", &what_to_do))
+		return NULL;
+#endif
+	result = rl_complete_internal(*what_to_do);
+	Py_XDECREF(b);
+	return PyInt_FromLong(result);
+}
+
+PyDoc_STRVAR(doc_complete_internal,
+"complete_internal(what_to_do) -> int\n\
+Complete the word at or before the cursor position.");
+
+
+/* Word-break hook */
+
+static char *
+on_completion_word_break_hook(void);
+
+extern char
+_rl_find_completion_word(int *fp, int *dp);
+
+
+static PyObject *
+set_completion_word_break_hook(PyObject *self, PyObject *args)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("completion_word_break_hook",
+			&global->completion_word_break_hook, args);
+
+	rl_completion_word_break_hook =
+		global->completion_word_break_hook ?
+		on_completion_word_break_hook : NULL;
+
+	return result;
+}
+
+PyDoc_STRVAR(doc_set_completion_word_break_hook,
+"set_completion_word_break_hook([function]) -> None\n\
+A function to call when readline is deciding where to separate words for word completion. \
+The function is called as ``function(begidx, endidx)`` once for every completion, \
+and should return a string of word break characters for the current completion, or None \
+to indicate no change.");
+
+
+static PyObject *
+get_completion_word_break_hook(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->completion_word_break_hook == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->completion_word_break_hook);
+	return global->completion_word_break_hook;
+}
+
+PyDoc_STRVAR(doc_get_completion_word_break_hook,
+"get_completion_word_break_hook() -> function\n\
+A function to call when readline is deciding where to separate words for word completion.");
+
+
+static char *
+on_completion_word_break_hook(void)
+/* Memory returned by this function is never freed. We must keep
+   it around in a static pointer and free it on the next call. */
+{
+	char *result = NULL;
+	char *s = NULL;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
+	int start, end;
+	static char *last = NULL;
+
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+	modulestate *global = PyModule_GetState(readline_module());
+
+	_py_set_completion_defaults();
+
+	/* Determine word boundaries */
+	end = rl_point;
+	if (rl_point) {
+		/* Unhook ourselves to avoid infinite recursion */
+		rl_completion_word_break_hook = NULL;
+		_rl_find_completion_word(NULL, NULL);
+		rl_completion_word_break_hook = on_completion_word_break_hook;
+	}
+	start = rl_point;
+	rl_point = end;
+
+#if (PY_MAJOR_VERSION >= 3)
+	r = PyObject_CallFunction(global->completion_word_break_hook, "ii",
+				  PyUnicode_INDEX_CACHED(rl_line_buffer, start),
+				  PyUnicode_INDEX_CACHED(rl_line_buffer, end));
+#else
+	r = PyObject_CallFunction(global->completion_word_break_hook, "ii",
+	                          start, end);
+#endif
+	if (r == NULL)
+		goto error;
+	if (r == Py_None) {
+		result = NULL;
+	}
+	else {
+#if (PY_MAJOR_VERSION >= 3)
+		b = PyUnicode_ENCODE(r);
+		if (b != NULL)
+			s = PyBytes_AsString(b);
+#else
+		s = PyString_AsString(r);
+#endif
+		if (s == NULL)
+			goto error;
+		result = strdup(s);
+		if (last != NULL)
+			free(last);
+		last = result;
+	}
+	Py_DECREF(r);
+	goto done;
+  error:
+	PyErr_Clear();
+	Py_XDECREF(r);
+  done:
+	Py_XDECREF(b);
+#ifdef WITH_THREAD
+	PyGILState_Release(gilstate);
+#endif
+	return result;
+}
+
+
+/* Directory rewrite hook */
+
+static int
+on_directory_rewrite_hook(char **directory);
+
+
+static PyObject *
+set_directory_rewrite_hook(PyObject *self, PyObject *args)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("directory_rewrite_hook",
+			&global->directory_rewrite_hook, args);
+
+	rl_directory_rewrite_hook =
+		global->directory_rewrite_hook ?
+		on_directory_rewrite_hook : NULL;
+
+	return result;
+}
+
+PyDoc_STRVAR(doc_set_directory_rewrite_hook,
+"set_directory_rewrite_hook([function]) -> None\n\
+This function is used to prepare the director name passed to ``opendir()`` during filename completion. \
+The function is called as ``function(dirname)`` and should return a new directory name or \
+None to indicate no change. At the least, the function must perform all necessary \
+dequoting.");
+
+
+static PyObject *
+get_directory_rewrite_hook(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->directory_rewrite_hook == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->directory_rewrite_hook);
+	return global->directory_rewrite_hook;
+}
+
+PyDoc_STRVAR(doc_get_directory_rewrite_hook,
+"get_directory_rewrite_hook() -> function\n\
+Get the current directory rewrite hook function.");
+
+
+static int
+on_directory_rewrite_hook(char **directory)
+{
+	int result = 0;
+	char *s = NULL;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
+
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+	modulestate *global = PyModule_GetState(readline_module());
+
+#if (PY_MAJOR_VERSION >= 3)
+	r = PyObject_CallFunction(global->directory_rewrite_hook, "N",
+				  PyUnicode_DECODE(*directory));
+#else
+	r = PyObject_CallFunction(global->directory_rewrite_hook, "s",
+				  *directory);
+#endif
+	if (r == NULL)
+		goto error;
+	if (r == Py_None) {
+		result = 0;
+	}
+	else {
+#if (PY_MAJOR_VERSION >= 3)
+		b = PyUnicode_FS_ENCODE(r);
+		if (b != NULL)
+			s = PyBytes_AsString(b);
+#else
+		s = PyString_AsString(r);
+#endif
+		if (s == NULL)
+			goto error;
+		s = strdup(s);
+		if (s != NULL) {
+			free(*directory);
+			*directory = s;
+			result = 1;
+		}
+	}
+	Py_DECREF(r);
+	goto done;
+  error:
+	PyErr_Clear();
+	Py_XDECREF(r);
+  done:
+	Py_XDECREF(b);
+#ifdef WITH_THREAD
+	PyGILState_Release(gilstate);
+#endif
+	return result;
+}
+
+
+/* Directory completion hook */
+
+static int
+on_directory_completion_hook(char **directory);
+
+
+static PyObject *
+set_directory_completion_hook(PyObject *self, PyObject *args)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("directory_completion_hook",
+			&global->directory_completion_hook, args);
+
+	rl_directory_completion_hook =
+		global->directory_completion_hook ?
+		on_directory_completion_hook : NULL;
+
+	return result;
+}
+
+PyDoc_STRVAR(doc_set_directory_completion_hook,
+"set_directory_completion_hook([function]) -> None\n\
+This function is allowed to modify the directory portion of filenames readline completes. \
+The function is called as ``function(dirname)`` and should return a new directory name or \
+None to indicate no change. At the least, the function must perform all necessary \
+dequoting.");
+
+
+static PyObject *
+get_directory_completion_hook(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->directory_completion_hook == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->directory_completion_hook);
+	return global->directory_completion_hook;
+}
+
+PyDoc_STRVAR(doc_get_directory_completion_hook,
+"get_directory_completion_hook() -> function\n\
+Get the current directory completion hook function.");
+
+
+static int
+on_directory_completion_hook(char **directory)
+{
+	int result = 0;
+	char *s = NULL;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
+
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+	modulestate *global = PyModule_GetState(readline_module());
+
+#if (PY_MAJOR_VERSION >= 3)
+	r = PyObject_CallFunction(global->directory_completion_hook, "N",
+				  PyUnicode_DECODE(*directory));
+#else
+	r = PyObject_CallFunction(global->directory_completion_hook, "s",
+				  *directory);
+#endif
+	if (r == NULL)
+		goto error;
+	if (r == Py_None) {
+		result = 0;
+	}
+	else {
+#if (PY_MAJOR_VERSION >= 3)
+		b = PyUnicode_ENCODE(r);
+		if (b != NULL)
+			s = PyBytes_AsString(b);
+#else
+		s = PyString_AsString(r);
+#endif
+		if (s == NULL)
+			goto error;
+		s = strdup(s);
+		if (s != NULL) {
+			free(*directory);
+			*directory = s;
+			result = 1;
+		}
+	}
+	Py_DECREF(r);
+	goto done;
+  error:
+	PyErr_Clear();
+	Py_XDECREF(r);
+  done:
+	Py_XDECREF(b);
+#ifdef WITH_THREAD
+	PyGILState_Release(gilstate);
+#endif
+	return result;
+}
+
+
+/* Filename rewrite hook */
+
+static char *
+on_filename_rewrite_hook(const char *text, int num_bytes);
+
+
+static PyObject *
+set_filename_rewrite_hook(PyObject *self, PyObject *args)
+{
+#if (RL_READLINE_VERSION >= 0x0601)
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("filename_rewrite_hook",
+			&global->filename_rewrite_hook, args);
+
+	rl_filename_rewrite_hook =
+		global->filename_rewrite_hook ?
+		(rl_dequote_func_t *)on_filename_rewrite_hook : NULL;
+
+	return result;
+#else
+	Py_RETURN_NONE;
+#endif
+}
+
+PyDoc_STRVAR(doc_set_filename_rewrite_hook,
+"set_filename_rewrite_hook([function]) -> None\n\
+This function is called for every filename before it is compared against the completion word. \
+The function is called as ``function(filename)`` and should return a new filename or \
+None to indicate no change.");
+
+
+static PyObject *
+get_filename_rewrite_hook(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->filename_rewrite_hook == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->filename_rewrite_hook);
+	return global->filename_rewrite_hook;
+}
+
+PyDoc_STRVAR(doc_get_filename_rewrite_hook,
+"get_filename_rewrite_hook() -> function\n\
+Get the current filename rewrite hook function.");
+
+
+static char *
+on_filename_rewrite_hook(const char *text, int num_bytes)
+/* This function must return new memory on success and the
+   passed-in 'text' pointer to indicate no change. */
+{
+	char *result = (char*)text;
+	char *s = NULL;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
+
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+	modulestate *global = PyModule_GetState(readline_module());
+
+#if (PY_MAJOR_VERSION >= 3)
+	r = PyObject_CallFunction(global->filename_rewrite_hook, "N",
+				  PyUnicode_FS_DECODE(text));
+#else
+	r = PyObject_CallFunction(global->filename_rewrite_hook, "s",
+				  text);
+#endif
+	if (r == NULL)
+		goto error;
+	if (r == Py_None) {
+		result = (char *)text;
+	}
+	else {
+#if (PY_MAJOR_VERSION >= 3)
+		b = PyUnicode_ENCODE(r);
+		if (b != NULL)
+			s = PyBytes_AsString(b);
+#else
+		s = PyString_AsString(r);
+#endif
+		if (s == NULL)
+			goto error;
+		s = strdup(s);
+		if (s != NULL)
+			result = s;
+	}
+	Py_DECREF(r);
+	goto done;
+  error:
+	PyErr_Clear();
+	Py_XDECREF(r);
+  done:
+	Py_XDECREF(b);
+#ifdef WITH_THREAD
+	PyGILState_Release(gilstate);
+#endif
+	return result;
+}
+
+
+/* Filename stat hook */
+
+static int
+on_filename_stat_hook(char **directory);
+
+
+static PyObject *
+set_filename_stat_hook(PyObject *self, PyObject *args)
+{
+#if (RL_READLINE_VERSION >= 0x0603)
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("filename_stat_hook",
+			&global->filename_stat_hook, args);
+
+	rl_filename_stat_hook =
+		global->filename_stat_hook ?
+		on_filename_stat_hook : NULL;
+
+	return result;
+#else
+	Py_RETURN_NONE;
+#endif
+}
+
+PyDoc_STRVAR(doc_set_filename_stat_hook,
+"set_filename_stat_hook([function]) -> None\n\
+This function is used to prepare the filename passed to ``stat()`` during match display. \
+The function is called as ``function(filename)`` and should return a new filename name or \
+None to indicate no change.");
+
+
+static PyObject *
+get_filename_stat_hook(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->filename_stat_hook == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->filename_stat_hook);
+	return global->filename_stat_hook;
+}
+
+PyDoc_STRVAR(doc_get_filename_stat_hook,
+"get_filename_stat_hook() -> function\n\
+Get the current filename stat hook function.");
+
+
+static int
+on_filename_stat_hook(char **directory)
+{
+	int result = 0;
+	char *s = NULL;
+	PyObject *r = NULL;
+	PyObject *b = NULL;
+
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+	modulestate *global = PyModule_GetState(readline_module());
+
+#if (PY_MAJOR_VERSION >= 3)
+	r = PyObject_CallFunction(global->filename_stat_hook, "N",
+				  PyUnicode_DECODE(*directory));
+#else
+	r = PyObject_CallFunction(global->filename_stat_hook, "s",
+				  *directory);
+#endif
+	if (r == NULL)
+		goto error;
+	if (r == Py_None) {
+		result = 0;
+	}
+	else {
+#if (PY_MAJOR_VERSION >= 3)
+		b = PyUnicode_FS_ENCODE(r);
+		if (b != NULL)
+			s = PyBytes_AsString(b);
+#else
+		s = PyString_AsString(r);
+#endif
+		if (s == NULL)
+			goto error;
+		s = strdup(s);
+		if (s != NULL) {
+			free(*directory);
+			*directory = s;
+			result = 1;
+		}
+	}
+	Py_DECREF(r);
+	goto done;
+  error:
+	PyErr_Clear();
+	Py_XDECREF(r);
+  done:
+	Py_XDECREF(b);
+#ifdef WITH_THREAD
+	PyGILState_Release(gilstate);
+#endif
+	return result;
+}
 
-static char *
-on_filename_rewrite_hook(const char *text, int num_bytes)
-/* This function must return new memory on success and the
-   passed-in 'text' pointer to indicate no change. */
+
+/* Replace line buffer contents */
+
+static PyObject *
+replace_line(PyObject *self, PyObject *args)
 {
-	char *result = (char*)text;
 	char *s = NULL;
-	PyObject *r = NULL;
 	PyObject *b = NULL;
 
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&:replace_line", PyUnicode_StrConverter, &b))
+		return NULL;
+	s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "s:replace_line", &s))
+		return NULL;
+#endif
+	if (s) {
+		rl_replace_line(s, 0);
+		/* Move rl_point to end of line */
+		rl_point = rl_end;
+	}
+	Py_XDECREF(b);
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_replace_line,
+"replace_line(string) -> None\n\
+Replace the line buffer contents with string.");
+
+
+/* Read a key (from the keyboard) */
+
+static PyObject *
+read_key(PyObject *self, PyObject *noargs)
+{
+	int c;
+
+	RL_SETSTATE(RL_STATE_MOREINPUT);
+	c = rl_read_key();
+	RL_UNSETSTATE(RL_STATE_MOREINPUT);
+
+	/* Clear KeyboardInterrupt since it's too late
+	   now anyway */
+	if (PyErr_CheckSignals() == -1 &&
+	    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
+		PyErr_Clear();
+
+#if (PY_MAJOR_VERSION >= 3)
+	return PyUnicode_DECODE_CHAR(c);
+#else
+	return PyString_FromFormat("%c", c);
+#endif
+}
+
+PyDoc_STRVAR(doc_read_key,
+"read_key() -> string\n\
+Read a key from readline's input stream, typically the keyboard. \
+Returns characters inserted with :func:`stuff_char` before starting to read \
+from the stream.");
+
+
+/* Stuff a character into the input stream */
+
+static PyObject *
+stuff_char(PyObject *self, PyObject *args)
+{
+	char *s = NULL;
+	int r = 0;
+	PyObject *b = NULL;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&:stuff_char", PyUnicode_StrConverter, &b))
+		return NULL;
+	s = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "s:stuff_char", &s))
+		return NULL;
+#endif
+	if (s && *s)
+		r = rl_stuff_char(*s);
+	Py_XDECREF(b);
+	return PyBool_FromLong(r);
+}
+
+PyDoc_STRVAR(doc_stuff_char,
+"stuff_char(string) -> bool\n\
+Insert a character into readline's input stream. \
+Returns True if the insert was successful.");
+
+
+/* Display match list function */
+
+static PyObject*
+display_match_list(PyObject *self, PyObject *args)
+{
+	char *substitution = NULL;
+	PyObject *matches = NULL;
+	Py_ssize_t num_matches = 0;
+	int max_length = 0;
+	stringarray strings = {NULL, 0};
+	PyObject *b = NULL;
+
+#if (PY_MAJOR_VERSION >= 3)
+	if (!PyArg_ParseTuple(args, "O&Oi:display_match_list",
+			      PyUnicode_StrConverter, &b, &matches, &max_length))
+		return NULL;
+	substitution = PyBytes_AsString(b);
+#else
+	if (!PyArg_ParseTuple(args, "sOi:display_match_list",
+			      &substitution, &matches, &max_length))
+		return NULL;
+#endif
+	/* Put the substitution back into the list at position 0 */
+	if (StringArray_FromPyListPacked(substitution, matches, &strings) == -1)
+		goto error;
+	num_matches = strings.size - 1;
+
+	/* Temporarily unset callback state so the pager works */
+	if (RL_ISSTATE(RL_STATE_CALLBACK)) {
+		RL_UNSETSTATE(RL_STATE_CALLBACK);
+		rl_display_match_list(strings.strings, num_matches, max_length);
+		RL_SETSTATE(RL_STATE_CALLBACK);
+	}
+	else
+		rl_display_match_list(strings.strings, num_matches, max_length);
+
+	/* Clear KeyboardInterrupt */
+	if (PyErr_CheckSignals() == -1 &&
+	    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
+		PyErr_Clear();
+
+	Py_XDECREF(b);
+	StringArray_FreePacked(strings.strings);
+	Py_RETURN_NONE;
+  error:
+	Py_XDECREF(b);
+	StringArray_FreePacked(strings.strings);
+	return NULL;
+}
+
+PyDoc_STRVAR(doc_display_match_list,
+"display_match_list(substitution, matches, longest_match_length) -> None\n\
+Display a list of matches in columnar format on readline's output stream.");
+
+
+static PyObject*
+display_match_pages(PyObject *self, PyObject *args)
+{
+	PyObject *matches;
+	int max_length = 0;
+	int result;
+
+	if (!PyArg_ParseTuple(args, "O|i:display_match_pages",
+			      &matches, &max_length))
+		return NULL;
+
+	/* Temporarily unset callback state so the pager works */
+	if (RL_ISSTATE(RL_STATE_CALLBACK)) {
+		RL_UNSETSTATE(RL_STATE_CALLBACK);
+		result = MatchPager_Display(matches, max_length);
+		RL_SETSTATE(RL_STATE_CALLBACK);
+	}
+	else
+		result = MatchPager_Display(matches, max_length);
+
+	if (result == -1) {
+		/* Clear KeyboardInterrupt */
+		if (PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
+			PyErr_Clear();
+		else
+			return NULL;
+	}
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_display_match_pages,
+"display_match_pages(matches[, longest_match_length]) -> None\n\
+Display matches from an iterable in columnar format on readline's \
+output stream, one page at a time. Matches are pulled from the \
+iterable as pages are displayed.");
+
+
+/* Ignore some completions function */
+
+static int
+on_ignore_some_completions_function(char **matches);
+
+
+static PyObject *
+set_ignore_some_completions_function(PyObject *self, PyObject *args)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	PyObject *result = set_hook("ignore_some_completions_function",
+			&global->ignore_some_completions_function, args);
+
+	rl_ignore_some_completions_function =
+		global->ignore_some_completions_function ?
+		on_ignore_some_completions_function : NULL;
+
+	return result;
+}
+
+PyDoc_STRVAR(doc_set_ignore_some_completions_function,
+"set_ignore_some_completions_function([function]) -> None\n\
+This function may filter the results of filename completion. \
+The function is called as ``function(substitution, matches)`` and \
+should return a filtered subset of matches or None to indicate no \
+change.");
+
+
+static PyObject *
+get_ignore_some_completions_function(PyObject *self, PyObject *noargs)
+{
+	modulestate *global = PyModule_GetState(self);
+
+	if (global->ignore_some_completions_function == NULL) {
+		Py_RETURN_NONE;
+	}
+	Py_INCREF(global->ignore_some_completions_function);
+	return global->ignore_some_completions_function;
+}
+
+PyDoc_STRVAR(doc_get_ignore_some_completions_function,
+"get_ignore_some_completions_function() -> function\n\
+This function may filter the results of filename completion.");
+
+
+static int
+on_ignore_some_completions_function(char **matches)
+{
+	int result = 0;
+	stringarray strings;
+	Py_ssize_t i;
+	Py_ssize_t old_size, new_size;
+	PyObject *m = NULL;
+	PyObject *r = NULL;
+
 #ifdef WITH_THREAD
 	PyGILState_STATE gilstate = PyGILState_Ensure();
 #endif
 	modulestate *global = PyModule_GetState(readline_module());
 
+	m = PyList_FromStringArray(matches+1);
+	if (m == NULL)
+		goto error;
+
 #if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->filename_rewrite_hook, "N",
-				  PyUnicode_FS_DECODE(text));
+	r = PyObject_CallFunction(global->ignore_some_completions_function, "NO",
+				  PyUnicode_DECODE(matches[0]), m);
 #else
-	r = PyObject_CallFunction(global->filename_rewrite_hook, "s",
-				  text);
+	r = PyObject_CallFunction(global->ignore_some_completions_function, "sO",
+				  matches[0], m);
 #endif
 	if (r == NULL)
 		goto error;
 	if (r == Py_None) {
-		result = (char *)text;
+		result = 0;
 	}
 	else {
-#if (PY_MAJOR_VERSION >= 3)
-		b = PyUnicode_ENCODE(r);
-		if (b != NULL)
-			s = PyBytes_AsString(b);
-#else
-		s = PyString_AsString(r);
-#endif
-		if (s == NULL)
+		new_size = PyList_Size(r);
+		if (new_size == -1)
 			goto error;
-		s = strdup(s);
-		if (s != NULL)
-			result = s;
+
+		old_size = PyList_Size(m);
+		if (new_size > old_size)
+			goto error;
+
+		if (StringArray_FromPyList(r, &strings) == -1)
+			goto error;
+
+		for (i=1; i <= old_size; i++)
+			free(matches[i]);
+
+		for (i=1; i <= strings.size; i++)
+			matches[i] = strings.strings[i-1];
+		matches[i] = NULL;
+		free(strings.strings);
+		result = 1;
 	}
+	Py_DECREF(m);
 	Py_DECREF(r);
 	goto done;
   error:
 	PyErr_Clear();
+	Py_XDECREF(m);
 	Py_XDECREF(r);
   done:
-	Py_XDECREF(b);
 #ifdef WITH_THREAD
 	PyGILState_Release(gilstate);
 #endif
@@ -2401,521 +3949,786 @@ on_filename_rewrite_hook(const char *text, int num_bytes)
 }
 
 
-/* Filename stat hook */
-
-static int
-on_filename_stat_hook(char **directory);
-
+/* History stifling */
 
-static PyObject *
-set_filename_stat_hook(PyObject *self, PyObject *args)
+PyObject *
+get_history_max_entries(PyObject *self, PyObject *noargs)
 {
-#if (RL_READLINE_VERSION >= 0x0603)
-	modulestate *global = PyModule_GetState(self);
+	return PyInt_FromLong(history_max_entries);
+}
 
-	PyObject *result = set_hook("filename_stat_hook",
-			&global->filename_stat_hook, args);
+PyDoc_STRVAR(doc_get_history_max_entries,
+"get_history_max_entries() -> int\n\
+Return the current history size limit.");
 
-	rl_filename_stat_hook =
-		global->filename_stat_hook ?
-		on_filename_stat_hook : NULL;
 
-	return result;
-#else
+PyObject *
+py_stifle_history(PyObject *self, PyObject *args)
+{
+	int max;
+
+	if (!PyArg_ParseTuple(args, "i:stifle_history", &max))
+		return NULL;
+	/* Drop entries ourselves; stifle_history() leaks their undo
+	   lists and resets history_base */
+	HistoryIndex_Trim(max);
+	stifle_history(max);
+	HistoryIndex_Invalidate();
 	Py_RETURN_NONE;
-#endif
 }
 
-PyDoc_STRVAR(doc_set_filename_stat_hook,
-"set_filename_stat_hook([function]) -> None\n\
-This function is used to prepare the filename passed to ``stat()`` during match display. \
-The function is called as ``function(filename)`` and should return a new filename name or \
-None to indicate no change.");
+PyDoc_STRVAR(doc_stifle_history,
+"stifle_history(max_entries) -> None\n\
+Limit the history size to ``max_entries`` entries.");
 
 
-static PyObject *
-get_filename_stat_hook(PyObject *self, PyObject *noargs)
+PyObject *
+py_unstifle_history(PyObject *self, PyObject *noargs)
 {
-	modulestate *global = PyModule_GetState(self);
+	return PyInt_FromLong(unstifle_history());
+}
 
-	if (global->filename_stat_hook == NULL) {
-		Py_RETURN_NONE;
-	}
-	Py_INCREF(global->filename_stat_hook);
-	return global->filename_stat_hook;
+PyDoc_STRVAR(doc_unstifle_history,
+"unstifle_history() -> int\n\
+Remove the history size limit.");
+
+
+PyObject *
+py_history_is_stifled(PyObject *self, PyObject *noargs)
+{
+	return PyBool_FromLong(history_is_stifled());
 }
 
-PyDoc_STRVAR(doc_get_filename_stat_hook,
-"get_filename_stat_hook() -> function\n\
-Get the current filename stat hook function.");
+PyDoc_STRVAR(doc_history_is_stifled,
+"history_is_stifled() -> bool\n\
+True if a history size limit is set.");
 
 
+/* Default display matches hook */
+
 static int
-on_filename_stat_hook(char **directory)
+get_y_or_n(void)
+/* Readline's implementation of get_y_or_n() is private. */
 {
-	int result = 0;
-	char *s = NULL;
-	PyObject *r = NULL;
-	PyObject *b = NULL;
+	int c;
 
-#ifdef WITH_THREAD
-	PyGILState_STATE gilstate = PyGILState_Ensure();
-#endif
-	modulestate *global = PyModule_GetState(readline_module());
+	for (;;) {
+		RL_SETSTATE(RL_STATE_MOREINPUT);
+		c = rl_read_key();
+		RL_UNSETSTATE(RL_STATE_MOREINPUT);
 
-#if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->filename_stat_hook, "N",
-				  PyUnicode_DECODE(*directory));
-#else
-	r = PyObject_CallFunction(global->filename_stat_hook, "s",
-				  *directory);
-#endif
-	if (r == NULL)
-		goto error;
-	if (r == Py_None) {
-		result = 0;
+		if (c == 'y' || c == 'Y' || c == ' ')
+			return 1;
+		if (c == 'n' || c == 'N' || c == RUBOUT)
+			return 0;
+		rl_ding();
 	}
-	else {
-#if (PY_MAJOR_VERSION >= 3)
-		b = PyUnicode_FS_ENCODE(r);
-		if (b != NULL)
-			s = PyBytes_AsString(b);
-#else
-		s = PyString_AsString(r);
+}
+
+
+static void
+default_display_matches_hook(char **matches, int num_matches, int max_length)
+/* Readline's implementation does not read from the keyboard in
+   callback mode. */
+{
+	int completion_y_or_n = 1;
+
+	if (rl_completion_query_items > 0 && num_matches >= rl_completion_query_items)
+	{
+		rl_crlf();
+		fprintf(rl_outstream, "Display all %d possibilities? (y or n)", num_matches);
+		fflush(rl_outstream);
+
+		/* Temporarily unset callback state */
+		if (RL_ISSTATE(RL_STATE_CALLBACK)) {
+			RL_UNSETSTATE(RL_STATE_CALLBACK);
+			completion_y_or_n = get_y_or_n();
+			RL_SETSTATE(RL_STATE_CALLBACK);
+		}
+		else
+			completion_y_or_n = get_y_or_n();
+#ifdef WITH_THREAD
+		PyGILState_STATE gilstate = PyGILState_Ensure();
 #endif
-		if (s == NULL)
-			goto error;
-		s = strdup(s);
-		if (s != NULL) {
-			free(*directory);
-			*directory = s;
-			result = 1;
+		/* Clear KeyboardInterrupt */
+		if (PyErr_CheckSignals() == -1 &&
+		    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
+			PyErr_Clear();
+#ifdef WITH_THREAD
+		PyGILState_Release(gilstate);
+#endif
+		if (completion_y_or_n == 0) {
+			rl_crlf();
+			rl_forced_update_display();
+			rl_display_fixed = 1;
+			return;
 		}
 	}
-	Py_DECREF(r);
-	goto done;
-  error:
-	PyErr_Clear();
-	Py_XDECREF(r);
-  done:
-	Py_XDECREF(b);
+
+	/* Temporarily unset callback state so the pager works */
+	if (RL_ISSTATE(RL_STATE_CALLBACK)) {
+		RL_UNSETSTATE(RL_STATE_CALLBACK);
+		rl_display_match_list(matches, num_matches, max_length);
+		RL_SETSTATE(RL_STATE_CALLBACK);
+	}
+	else
+		rl_display_match_list(matches, num_matches, max_length);
+
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+	/* Clear KeyboardInterrupt */
+	if (PyErr_CheckSignals() == -1 &&
+	    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
+		PyErr_Clear();
 #ifdef WITH_THREAD
 	PyGILState_Release(gilstate);
 #endif
-	return result;
+	rl_forced_update_display();
+	rl_display_fixed = 1;
 }
 
+/* </rl.readline> */
 
-/* Replace line buffer contents */
 
-static PyObject *
-replace_line(PyObject *self, PyObject *args)
+/* Locale handling for call_readline */
+
+#ifdef SAVE_LOCALE
+
+/* The locale computed from the environment is cached together with
+   the variables it was computed from. setlocale() is only called when
+   the current locale differs from the cached one. */
+
+static struct {
+	int pinned;		/* True if the locale is left alone */
+	char *lc_all;		/* Environment of the cached locale */
+	char *lc_ctype;
+	char *lang;
+	char *name;		/* Name of the cached locale */
+} locale_cache = {0, NULL, NULL, NULL, NULL};
+
+
+static int
+_py_env_equal(const char *cached, const char *name)
 {
-	char *s = NULL;
-	PyObject *b = NULL;
+	const char *value = getenv(name);
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:replace_line", PyUnicode_StrConverter, &b))
+	if (cached == NULL || value == NULL)
+		return cached == value;
+	return strcmp(cached, value) == 0;
+}
+
+
+static int
+_py_env_changed(void)
+{
+	return locale_cache.name == NULL ||
+		!_py_env_equal(locale_cache.lc_all, "LC_ALL") ||
+		!_py_env_equal(locale_cache.lc_ctype, "LC_CTYPE") ||
+		!_py_env_equal(locale_cache.lang, "LANG");
+}
+
+
+static char *
+_py_strdup_env(const char *name)
+{
+	const char *value = getenv(name);
+	return value ? strdup(value) : NULL;
+}
+
+
+/* Set LC_CTYPE from the environment and update the cache */
+
+static void
+_py_apply_env_locale(void)
+{
+	char *name = _Py_SetLocaleFromEnv(LC_CTYPE);
+
+	free(locale_cache.lc_all);
+	free(locale_cache.lc_ctype);
+	free(locale_cache.lang);
+	free(locale_cache.name);
+	locale_cache.lc_all = _py_strdup_env("LC_ALL");
+	locale_cache.lc_ctype = _py_strdup_env("LC_CTYPE");
+	locale_cache.lang = _py_strdup_env("LANG");
+	/* Without a name the cache stays invalid */
+	locale_cache.name = name ? strdup(name) : NULL;
+}
+
+
+/* Switch LC_CTYPE to the locale of the environment. Returns the locale
+   to restore afterwards, or NULL if nothing needs to be restored. */
+
+static char *
+_py_enter_locale(int *error)
+{
+	const char *current;
+	char *saved;
+
+	*error = 0;
+	if (locale_cache.pinned)
 		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:replace_line", &s))
+	current = setlocale(LC_CTYPE, NULL);
+	if (!_py_env_changed() && current != NULL &&
+	    strcmp(current, locale_cache.name) == 0)
+		return NULL;
+	saved = current ? strdup(current) : NULL;
+	if (saved == NULL) {
+		*error = 1;
 		return NULL;
-#endif
-	if (s) {
-		rl_replace_line(s, 0);
-		/* Move rl_point to end of line */
-		rl_point = rl_end;
 	}
-	Py_XDECREF(b);
-	Py_RETURN_NONE;
+	if (_py_env_changed())
+		_py_apply_env_locale();
+	else
+		setlocale(LC_CTYPE, locale_cache.name);
+	return saved;
 }
 
-PyDoc_STRVAR(doc_replace_line,
-"replace_line(string) -> None\n\
-Replace the line buffer contents with string.");
 
+static void
+_py_leave_locale(char *saved)
+{
+	if (saved != NULL) {
+		setlocale(LC_CTYPE, saved);
+		free(saved);
+	}
+}
+
+#endif /* SAVE_LOCALE */
 
-/* Read a key (from the keyboard) */
+
+/* Pin the locale */
 
 static PyObject *
-read_key(PyObject *self, PyObject *noargs)
+set_pin_locale(PyObject *self, PyObject *args)
 {
-	int c;
+	int value;
+
+	if (!PyArg_ParseTuple(args, "i:set_pin_locale", &value))
+		return NULL;
+#ifdef SAVE_LOCALE
+	if (value && !locale_cache.pinned)
+		_py_apply_env_locale();
+	locale_cache.pinned = value ? 1 : 0;
+#endif
+	Py_RETURN_NONE;
+}
 
-	RL_SETSTATE(RL_STATE_MOREINPUT);
-	c = rl_read_key();
-	RL_UNSETSTATE(RL_STATE_MOREINPUT);
+PyDoc_STRVAR(doc_set_pin_locale,
+"set_pin_locale(bool) -> None\n\
+Pin the LC_CTYPE locale. When enabled, the locale is set from the\n\
+environment once, and readline no longer saves, sets, and restores it\n\
+for every input line.");
 
-	/* Clear KeyboardInterrupt since it's too late
-	   now anyway */
-	if (PyErr_CheckSignals() == -1 &&
-	    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
-		PyErr_Clear();
 
-#if (PY_MAJOR_VERSION >= 3)
-	return PyUnicode_DECODE_CHAR(c);
+static PyObject *
+get_pin_locale(PyObject *self, PyObject *noarg)
+{
+#ifdef SAVE_LOCALE
+	return PyBool_FromLong(locale_cache.pinned);
 #else
-	return PyString_FromFormat("%c", c);
+	Py_RETURN_FALSE;
 #endif
 }
 
-PyDoc_STRVAR(doc_read_key,
-"read_key() -> string\n\
-Read a key from readline's input stream, typically the keyboard. \
-Returns characters inserted with :func:`stuff_char` before starting to read \
-from the stream.");
+PyDoc_STRVAR(doc_get_pin_locale,
+"get_pin_locale() -> bool\n\
+True if the LC_CTYPE locale is pinned.");
 
 
-/* Stuff a character into the input stream */
+/* Input hook sources */
+
+/* File descriptors the input hook waits on. The input loop reads
+   them without holding the GIL, so the array is never reallocated. */
+
+#define MAX_INPUT_HOOK_FDS 32
+
+static int input_hook_fds[MAX_INPUT_HOOK_FDS];
+static int input_hook_nfds = 0;
+static double input_hook_timeout = 0.1;
+
+/* Longest wait in seconds, so the timeout fits an int of milliseconds */
+#define MAX_INPUT_HOOK_TIMEOUT (INT_MAX / 1000)
+
 
 static PyObject *
-stuff_char(PyObject *self, PyObject *args)
+add_input_hook_fd(PyObject *self, PyObject *args)
 {
-	char *s = NULL;
-	int r = 0;
-	PyObject *b = NULL;
+	PyObject *obj;
+	int fd, i;
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&:stuff_char", PyUnicode_StrConverter, &b))
+	if (!PyArg_ParseTuple(args, "O:add_input_hook_fd", &obj))
 		return NULL;
-	s = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "s:stuff_char", &s))
+	fd = PyObject_AsFileDescriptor(obj);
+	if (fd < 0)
 		return NULL;
+#ifndef USE_POLL
+	if (fd >= FD_SETSIZE) {
+		PyErr_SetString(PyExc_ValueError, "file descriptor out of range for select()");
+		return NULL;
+	}
 #endif
-	if (s && *s)
-		r = rl_stuff_char(*s);
-	Py_XDECREF(b);
-	return PyBool_FromLong(r);
+	for (i = 0; i < input_hook_nfds; i++) {
+		if (input_hook_fds[i] == fd)
+			Py_RETURN_NONE;
+	}
+	if (input_hook_nfds == MAX_INPUT_HOOK_FDS) {
+		PyErr_SetString(PyExc_ValueError, "too many input hook file descriptors");
+		return NULL;
+	}
+	input_hook_fds[input_hook_nfds] = fd;
+	input_hook_nfds++;
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_stuff_char,
-"stuff_char(string) -> bool\n\
-Insert a character into readline's input stream. \
-Returns True if the insert was successful.");
-
+PyDoc_STRVAR(doc_add_input_hook_fd,
+"add_input_hook_fd(fd) -> None\n\
+Register a file descriptor, or an object with a ``fileno()`` method,\n\
+as a source of the input hook. While file descriptors are registered,\n\
+readline waits for them together with its input and calls the input\n\
+hook only when one of them is ready or the input hook timeout expires.\n\
+The hook must consume the data that made its source ready.");
 
-/* Display match list function */
 
-static PyObject*
-display_match_list(PyObject *self, PyObject *args)
+static PyObject *
+remove_input_hook_fd(PyObject *self, PyObject *args)
 {
-	char *substitution = NULL;
-	PyObject *matches = NULL;
-	Py_ssize_t num_matches = 0;
-	int max_length = 0;
-	char **strings = NULL;
-	char *s;
-	PyObject *b = NULL;
+	PyObject *obj;
+	int fd, i;
 
-#if (PY_MAJOR_VERSION >= 3)
-	if (!PyArg_ParseTuple(args, "O&Oi:display_match_list",
-			      PyUnicode_StrConverter, &b, &matches, &max_length))
+	if (!PyArg_ParseTuple(args, "O:remove_input_hook_fd", &obj))
 		return NULL;
-	substitution = PyBytes_AsString(b);
-#else
-	if (!PyArg_ParseTuple(args, "sOi:display_match_list",
-			      &substitution, &matches, &max_length))
+	fd = PyObject_AsFileDescriptor(obj);
+	if (fd < 0)
 		return NULL;
-#endif
-	num_matches = PyList_Size(matches);
-	if (num_matches == -1)
-		goto error;
-
-	strings = StringArray_FromPyList(matches);
-	if (strings == NULL)
-		goto error;
-
-	s = strdup(substitution);
-	if (s == NULL) {
-		PyErr_NoMemory();
-		goto error;
+	for (i = 0; i < input_hook_nfds; i++) {
+		if (input_hook_fds[i] == fd) {
+			input_hook_nfds--;
+			input_hook_fds[i] = input_hook_fds[input_hook_nfds];
+			Py_RETURN_NONE;
+		}
 	}
+	PyErr_Format(PyExc_ValueError, "file descriptor %d is not registered", fd);
+	return NULL;
+}
 
-	/* Put the substitution back into the list at position 0 */
-	if (StringArray_Insert(&strings, 0, s) == -1)
-		goto error;
+PyDoc_STRVAR(doc_remove_input_hook_fd,
+"remove_input_hook_fd(fd) -> None\n\
+Unregister an input hook file descriptor.");
 
-	/* Temporarily unset callback state so the pager works */
-	if (RL_ISSTATE(RL_STATE_CALLBACK)) {
-		RL_UNSETSTATE(RL_STATE_CALLBACK);
-		rl_display_match_list(strings, num_matches, max_length);
-		RL_SETSTATE(RL_STATE_CALLBACK);
-	}
-	else
-		rl_display_match_list(strings, num_matches, max_length);
 
-	/* Clear KeyboardInterrupt */
-	if (PyErr_CheckSignals() == -1 &&
-	    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
-		PyErr_Clear();
+static PyObject *
+get_input_hook_fds(PyObject *self, PyObject *noarg)
+{
+	PyObject *list;
+	PyObject *item;
+	int i;
 
-	Py_XDECREF(b);
-	StringArray_Free(strings);
-	Py_RETURN_NONE;
-  error:
-	Py_XDECREF(b);
-	StringArray_Free(strings);
-	return NULL;
+	list = PyList_New(input_hook_nfds);
+	if (list == NULL)
+		return NULL;
+	for (i = 0; i < input_hook_nfds; i++) {
+		item = PyInt_FromLong(input_hook_fds[i]);
+		if (item == NULL) {
+			Py_DECREF(list);
+			return NULL;
+		}
+		PyList_SET_ITEM(list, i, item);
+	}
+	return list;
 }
 
-PyDoc_STRVAR(doc_display_match_list,
-"display_match_list(substitution, matches, longest_match_length) -> None\n\
-Display a list of matches in columnar format on readline's output stream.");
+PyDoc_STRVAR(doc_get_input_hook_fds,
+"get_input_hook_fds() -> list\n\
+Return the registered input hook file descriptors.");
 
 
-/* Ignore some completions function */
+static PyObject *
+set_input_hook_timeout(PyObject *self, PyObject *args)
+{
+	double timeout;
 
-static int
-on_ignore_some_completions_function(char **matches);
+	if (!PyArg_ParseTuple(args, "d:set_input_hook_timeout", &timeout))
+		return NULL;
+	input_hook_timeout = timeout < 0.0 ? -1.0 : timeout;
+	Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(doc_set_input_hook_timeout,
+"set_input_hook_timeout(seconds) -> None\n\
+Set how long readline waits for input before calling the input hook.\n\
+A negative value waits until input or a registered input hook file\n\
+descriptor is ready. Defaults to 0.1.");
 
 
 static PyObject *
-set_ignore_some_completions_function(PyObject *self, PyObject *args)
+get_input_hook_timeout(PyObject *self, PyObject *noarg)
 {
-	modulestate *global = PyModule_GetState(self);
+	return PyFloat_FromDouble(input_hook_timeout);
+}
 
-	PyObject *result = set_hook("ignore_some_completions_function",
-			&global->ignore_some_completions_function, args);
+PyDoc_STRVAR(doc_get_input_hook_timeout,
+"get_input_hook_timeout() -> float\n\
+Return the input hook timeout in seconds.");
 
-	rl_ignore_some_completions_function =
-		global->ignore_some_completions_function ?
-		on_ignore_some_completions_function : NULL;
 
-	return result;
-}
+/* Non-interactive input */
 
-PyDoc_STRVAR(doc_set_ignore_some_completions_function,
-"set_ignore_some_completions_function([function]) -> None\n\
-This function may filter the results of filename completion. \
-The function is called as ``function(substitution, matches)`` and \
-should return a filtered subset of matches or None to indicate no \
-change.");
+/* When the input of async_input() is not a terminal, lines are read in
+   large blocks and split here instead of being fed to readline one byte
+   at a time. call_readline() never sees such input: PyOS_Readline()
+   only calls it when stdin and stdout are terminals. The data after
+   the returned line stays here, so other readers of the descriptor,
+   sys.stdin included, do not see it; nor does the buffer see data
+   already read by stdio. */
 
+static struct {
+	int fd;			/* Descriptor the data was read from */
+	char *buffer;		/* Data read from fd */
+	size_t start;		/* Offset of the data not yet returned */
+	size_t end;		/* End of the data */
+	size_t allocated;	/* Size of the buffer */
+} pending_input = {-1, NULL, 0, 0, 0};
 
-static PyObject *
-get_ignore_some_completions_function(PyObject *self, PyObject *noargs)
+
+/* Read more data into the buffer. Returns the number of bytes read,
+   0 at EOF, or -1 with errno set. */
+
+static ssize_t
+pending_fill(int fd)
 {
-	modulestate *global = PyModule_GetState(self);
+	char *buffer;
+	size_t size;
+	ssize_t n;
 
-	if (global->ignore_some_completions_function == NULL) {
-		Py_RETURN_NONE;
+	if (pending_input.fd != fd) {
+		pending_input.fd = fd;
+		pending_input.start = pending_input.end = 0;
 	}
-	Py_INCREF(global->ignore_some_completions_function);
-	return global->ignore_some_completions_function;
+	/* Move the unreturned data to the front */
+	if (pending_input.start > 0) {
+		memmove(pending_input.buffer, pending_input.buffer + pending_input.start,
+			pending_input.end - pending_input.start);
+		pending_input.end -= pending_input.start;
+		pending_input.start = 0;
+	}
+	if (pending_input.allocated - pending_input.end < 4096) {
+		size = pending_input.allocated * 2 + 65536;
+		buffer = realloc(pending_input.buffer, size);
+		if (buffer == NULL) {
+			errno = ENOMEM;
+			return -1;
+		}
+		pending_input.buffer = buffer;
+		pending_input.allocated = size;
+	}
+	n = read(fd, pending_input.buffer + pending_input.end,
+		 pending_input.allocated - pending_input.end);
+	if (n > 0)
+		pending_input.end += n;
+	return n;
 }
 
-PyDoc_STRVAR(doc_get_ignore_some_completions_function,
-"get_ignore_some_completions_function() -> function\n\
-This function may filter the results of filename completion.");
 
+/* Return the next line from the buffer without its newline, or NULL if
+   there is no complete line. At EOF an unterminated line is complete.
+   The line is malloc'ed like the result of readline(). */
 
-static int
-on_ignore_some_completions_function(char **matches)
+static char *
+pending_line(int fd, int eof)
 {
-	int result = 0;
-	char **strings;
-	Py_ssize_t i;
-	Py_ssize_t old_size, new_size;
-	PyObject *m = NULL;
-	PyObject *r = NULL;
+	char *p, *nl, *line;
+	size_t avail, n, skip;
 
-#ifdef WITH_THREAD
-	PyGILState_STATE gilstate = PyGILState_Ensure();
-#endif
-	modulestate *global = PyModule_GetState(readline_module());
+	if (pending_input.fd != fd || pending_input.start == pending_input.end)
+		return NULL;
+	p = pending_input.buffer + pending_input.start;
+	avail = pending_input.end - pending_input.start;
+	nl = memchr(p, '\n', avail);
+	if (nl != NULL) {
+		n = nl - p;
+		skip = n + 1;
+	}
+	else if (eof) {
+		n = skip = avail;
+	}
+	else
+		return NULL;
+	line = malloc(n + 1);
+	if (line == NULL)
+		return NULL;
+	memcpy(line, p, n);
+	line[n] = '\0';
+	pending_input.start += skip;
+	return line;
+}
 
-	m = PyList_FromStringArray(matches+1);
-	if (m == NULL)
-		goto error;
 
-#if (PY_MAJOR_VERSION >= 3)
-	r = PyObject_CallFunction(global->ignore_some_completions_function, "NO",
-				  PyUnicode_DECODE(matches[0]), m);
-#else
-	r = PyObject_CallFunction(global->ignore_some_completions_function, "sO",
-				  matches[0], m);
-#endif
-	if (r == NULL)
-		goto error;
-	if (r == Py_None) {
-		result = 0;
-	}
-	else {
-		new_size = PyList_Size(r);
-		if (new_size == -1)
-			goto error;
+/* Read a line from an asyncio event loop */
 
-		old_size = PyList_Size(m);
-		if (new_size > old_size)
-			goto error;
+#if (PY_MAJOR_VERSION >= 3)
 
-		strings = StringArray_FromPyList(r);
-		if (strings == NULL)
-			goto error;
+static struct {
+	PyObject *loop;		/* Event loop watching the input */
+	PyObject *future;	/* Future receiving the line */
+	int fd;			/* Input file descriptor */
+	int interactive;	/* False if reading from a pipe or file */
+	int done;		/* True when the line is complete */
+	char *line;		/* The line, NULL at EOF */
+} async_state = {NULL, NULL, -1, 0, 0, NULL};
 
-		for (i=1; i <= old_size; i++)
-			free(matches[i]);
 
-		for (i=1; i <= new_size; i++) {
-			matches[i] = strings[i-1];
-			matches[i+1] = NULL;
-		}
-		free(strings);
-		result = 1;
-	}
-	Py_DECREF(m);
-	Py_DECREF(r);
-	goto done;
-  error:
-	PyErr_Clear();
-	Py_XDECREF(m);
-	Py_XDECREF(r);
-  done:
-#ifdef WITH_THREAD
-	PyGILState_Release(gilstate);
-#endif
-	return result;
+static void
+async_rlhandler(char *text)
+{
+	async_state.done = 1;
+	async_state.line = text;
+	rl_callback_handler_remove();
 }
 
 
-/* History stifling */
+/* Stop watching the input. Returns the future, passing on the reference. */
 
-PyObject *
-get_history_max_entries(PyObject *self, PyObject *noargs)
+static PyObject *
+async_finish(void)
 {
-	return PyInt_FromLong(history_max_entries);
+	PyObject *future = async_state.future;
+	PyObject *r;
+	PyObject *exc_type, *exc_value, *exc_tb;
+
+	PyErr_Fetch(&exc_type, &exc_value, &exc_tb);
+	r = PyObject_CallMethod(async_state.loop, "remove_reader", "i", async_state.fd);
+	if (r == NULL)
+		PyErr_Clear();
+	Py_XDECREF(r);
+	PyErr_Restore(exc_type, exc_value, exc_tb);
+
+	Py_CLEAR(async_state.loop);
+	async_state.future = NULL;
+	async_state.fd = -1;
+	return future;
 }
 
-PyDoc_STRVAR(doc_get_history_max_entries,
-"get_history_max_entries() -> int\n\
-Return the current history size limit.");
 
+/* Resolve the future with a line read by readline, NULL meaning EOF.
+   Frees the line. */
 
-PyObject *
-py_stifle_history(PyObject *self, PyObject *args)
+static PyObject *
+async_resolve(PyObject *future, char *line)
 {
-	int max;
+	PyObject *result;
+	PyObject *r;
 
-	if (!PyArg_ParseTuple(args, "i:stifle_history", &max))
-		return NULL;
-	stifle_history(max);
-	Py_RETURN_NONE;
-}
+	if (line == NULL)
+		return PyObject_CallMethod(future, "set_exception", "O", PyExc_EOFError);
 
-PyDoc_STRVAR(doc_stifle_history,
-"stifle_history(max_entries) -> None\n\
-Limit the history size to ``max_entries`` entries.");
+	_py_auto_add_history(line);
+	HistoryIndex_Invalidate();
+	result = PyUnicode_DECODE(line);
+	free(line);
+	if (result == NULL) {
+		PyObject *exc_type, *exc_value, *exc_tb;
+		PyErr_Fetch(&exc_type, &exc_value, &exc_tb);
+		PyErr_NormalizeException(&exc_type, &exc_value, &exc_tb);
+		r = PyObject_CallMethod(future, "set_exception", "O", exc_value);
+		Py_XDECREF(exc_type);
+		Py_XDECREF(exc_value);
+		Py_XDECREF(exc_tb);
+	}
+	else {
+		r = PyObject_CallMethod(future, "set_result", "O", result);
+		Py_DECREF(result);
+	}
+	return r;
+}
 
 
-PyObject *
-py_unstifle_history(PyObject *self, PyObject *noargs)
+static PyObject *
+async_on_readable(PyObject *self, PyObject *noarg)
 {
-	return PyInt_FromLong(unstifle_history());
+	PyObject *future;
+	PyObject *r;
+	char *line;
+	ssize_t n;
+
+	if (async_state.future == NULL)
+		Py_RETURN_NONE;
+
+	if (async_state.interactive) {
+		rl_callback_read_char();
+		if (!async_state.done)
+			Py_RETURN_NONE;
+		line = async_state.line;
+		async_state.line = NULL;
+	}
+	else {
+		/* Take whole lines from the pipe or file */
+		n = pending_fill(async_state.fd);
+		if (n < 0 && errno == EINTR)
+			Py_RETURN_NONE;
+		line = pending_line(async_state.fd, n <= 0);
+		if (line == NULL && n > 0)
+			Py_RETURN_NONE;
+	}
+
+	future = async_finish();
+	r = async_resolve(future, line);
+	Py_DECREF(future);
+	if (r == NULL)
+		return NULL;
+	Py_DECREF(r);
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_unstifle_history,
-"unstifle_history() -> int\n\
-Remove the history size limit.");
 
+/* Called when the future is done, also when it was cancelled */
 
-PyObject *
-py_history_is_stifled(PyObject *self, PyObject *noargs)
+static PyObject *
+async_on_done(PyObject *self, PyObject *future)
 {
-	return PyBool_FromLong(history_is_stifled());
+	if (async_state.future != future)
+		Py_RETURN_NONE;
+
+	/* Cancelled while reading; drop the partial line */
+	Py_DECREF(async_finish());
+	if (!async_state.interactive)
+		Py_RETURN_NONE;
+	rl_free_line_state();
+#if (RL_READLINE_VERSION >= 0x0700)
+	rl_callback_sigcleanup();
+#endif
+	rl_cleanup_after_signal();
+	rl_callback_handler_remove();
+	Py_RETURN_NONE;
 }
 
-PyDoc_STRVAR(doc_history_is_stifled,
-"history_is_stifled() -> bool\n\
-True if a history size limit is set.");
 
+static PyMethodDef async_on_readable_def = {
+	"_on_readable", (PyCFunction)async_on_readable, METH_NOARGS, NULL
+};
 
-/* Default display matches hook */
+static PyMethodDef async_on_done_def = {
+	"_on_done", (PyCFunction)async_on_done, METH_O, NULL
+};
 
-static int
-get_y_or_n(void)
-/* Readline's implementation of get_y_or_n() is private. */
+
+static PyObject *
+async_input(PyObject *self, PyObject *args)
 {
-	int c;
+	PyObject *prompt = NULL;
+	PyObject *asyncio = NULL;
+	PyObject *loop = NULL;
+	PyObject *future = NULL;
+	PyObject *callback = NULL;
+	PyObject *r;
+	char *s = "";
+	char *line;
+	int fd;
 
-	for (;;) {
-		RL_SETSTATE(RL_STATE_MOREINPUT);
-		c = rl_read_key();
-		RL_UNSETSTATE(RL_STATE_MOREINPUT);
+	if (!PyArg_ParseTuple(args, "|O&:async_input", PyUnicode_StrConverter, &prompt))
+		return NULL;
+	if (prompt != NULL)
+		s = PyBytes_AsString(prompt);
 
-		if (c == 'y' || c == 'Y' || c == ' ')
-			return 1;
-		if (c == 'n' || c == 'N' || c == RUBOUT)
-			return 0;
-		rl_ding();
+	if (async_state.future != NULL) {
+		PyErr_SetString(PyExc_RuntimeError, "async_input is already reading a line");
+		goto error;
 	}
-}
-
 
-static void
-default_display_matches_hook(char **matches, int num_matches, int max_length)
-/* Readline's implementation does not read from the keyboard in
-   callback mode. */
-{
-	int completion_y_or_n = 1;
+	asyncio = PyImport_ImportModule("asyncio");
+	if (asyncio == NULL)
+		goto error;
+	loop = PyObject_CallMethod(asyncio, "get_running_loop", NULL);
+	if (loop == NULL)
+		goto error;
+	future = PyObject_CallMethod(loop, "create_future", NULL);
+	if (future == NULL)
+		goto error;
 
-	if (rl_completion_query_items > 0 && num_matches >= rl_completion_query_items)
-	{
-		rl_crlf();
-		fprintf(rl_outstream, "Display all %d possibilities? (y or n)", num_matches);
-		fflush(rl_outstream);
+	if (rl_instream == NULL)
+		rl_instream = stdin;
+	if (rl_outstream == NULL)
+		rl_outstream = stdout;
+	fd = fileno(rl_instream);
 
-		/* Temporarily unset callback state */
-		if (RL_ISSTATE(RL_STATE_CALLBACK)) {
-			RL_UNSETSTATE(RL_STATE_CALLBACK);
-			completion_y_or_n = get_y_or_n();
-			RL_SETSTATE(RL_STATE_CALLBACK);
+	if (!isatty(fd)) {
+		if (*s) {
+			fputs(s, rl_outstream);
+			fflush(rl_outstream);
 		}
-		else
-			completion_y_or_n = get_y_or_n();
-#ifdef WITH_THREAD
-		PyGILState_STATE gilstate = PyGILState_Ensure();
-#endif
-		/* Clear KeyboardInterrupt */
-		if (PyErr_CheckSignals() == -1 &&
-		    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
-			PyErr_Clear();
-#ifdef WITH_THREAD
-		PyGILState_Release(gilstate);
-#endif
-		if (completion_y_or_n == 0) {
-			rl_crlf();
-			rl_forced_update_display();
-			rl_display_fixed = 1;
-			return;
+		/* A complete line may be buffered already */
+		line = pending_line(fd, 0);
+		if (line != NULL) {
+			r = async_resolve(future, line);
+			if (r == NULL)
+				goto error;
+			Py_DECREF(r);
+			Py_DECREF(asyncio);
+			Py_DECREF(loop);
+			Py_XDECREF(prompt);
+			return future;
 		}
 	}
 
-	/* Temporarily unset callback state so the pager works */
-	if (RL_ISSTATE(RL_STATE_CALLBACK)) {
-		RL_UNSETSTATE(RL_STATE_CALLBACK);
-		rl_display_match_list(matches, num_matches, max_length);
-		RL_SETSTATE(RL_STATE_CALLBACK);
+	callback = PyCFunction_New(&async_on_readable_def, NULL);
+	if (callback == NULL)
+		goto error;
+	r = PyObject_CallMethod(loop, "add_reader", "iO", fd, callback);
+	Py_CLEAR(callback);
+	if (r == NULL)
+		goto error;
+	Py_DECREF(r);
+
+	callback = PyCFunction_New(&async_on_done_def, NULL);
+	if (callback == NULL)
+		goto error_reader;
+	r = PyObject_CallMethod(future, "add_done_callback", "O", callback);
+	Py_CLEAR(callback);
+	if (r == NULL)
+		goto error_reader;
+	Py_DECREF(r);
+
+	async_state.loop = loop;
+	Py_INCREF(future);
+	async_state.future = future;
+	async_state.fd = fd;
+	async_state.interactive = isatty(fd);
+	async_state.done = 0;
+	async_state.line = NULL;
+
+	if (async_state.interactive) {
+		rl_catch_signals = 0;
+		rl_callback_handler_install(s, async_rlhandler);
 	}
-	else
-		rl_display_match_list(matches, num_matches, max_length);
 
-#ifdef WITH_THREAD
-	PyGILState_STATE gilstate = PyGILState_Ensure();
-#endif
-	/* Clear KeyboardInterrupt */
-	if (PyErr_CheckSignals() == -1 &&
-	    PyErr_ExceptionMatches(PyExc_KeyboardInterrupt))
-		PyErr_Clear();
-#ifdef WITH_THREAD
-	PyGILState_Release(gilstate);
-#endif
-	rl_forced_update_display();
-	rl_display_fixed = 1;
+	Py_DECREF(asyncio);
+	Py_XDECREF(prompt);
+	return future;
+
+  error_reader:
+	r = PyObject_CallMethod(loop, "remove_reader", "i", fd);
+	Py_XDECREF(r);
+  error:
+	Py_XDECREF(asyncio);
+	Py_XDECREF(loop);
+	Py_XDECREF(future);
+	Py_XDECREF(prompt);
+	return NULL;
 }
 
-/* </rl.readline> */
+PyDoc_STRVAR(doc_async_input,
+"async_input([prompt]) -> Future\n\
+Read a line from the running asyncio event loop. Readline's input is\n\
+watched with ``loop.add_reader()`` and keystrokes are processed as they\n\
+arrive, so the loop keeps running while the user types. Await the\n\
+returned future to get the line; EOFError is raised at end of file.\n\
+Completion and history work like in :func:`input`.\n\
+If the input is not a terminal, it is read in large blocks and the data\n\
+after the returned line is kept for the next call. Do not mix\n\
+:func:`async_input` with other reads of the same input, such as\n\
+``sys.stdin.read()``: neither sees the data buffered by the other.");
+
+#endif /* PY_MAJOR_VERSION >= 3 */
 
 
 /* Table of functions exported by the module */
@@ -2933,6 +4746,8 @@ static struct PyMethodDef readline_methods[] =
 	 METH_VARARGS, doc_write_history_file},
 	{"append_history_file", append_history_file,
 	 METH_VARARGS, doc_append_history_file},
+	{"truncate_history_file", truncate_history_file,
+	 METH_VARARGS, doc_truncate_history_file},
 	{"get_history_item", get_history_item,
 	 METH_VARARGS, doc_get_history_item},
 	{"get_current_history_length", (PyCFunction)get_current_history_length,
@@ -2962,6 +4777,8 @@ static struct PyMethodDef readline_methods[] =
 	 METH_VARARGS, doc_set_startup_hook},
 	{"set_pre_input_hook", set_pre_input_hook,
 	 METH_VARARGS, doc_set_pre_input_hook},
+	{"set_history_added_hook", set_history_added_hook,
+	 METH_VARARGS, doc_set_history_added_hook},
 	{"clear_history", py_clear_history, METH_NOARGS, doc_clear_history},
 	{"set_auto_history", set_auto_history, METH_VARARGS, doc_set_auto_history},
 
@@ -3036,6 +4853,8 @@ static struct PyMethodDef readline_methods[] =
 	 METH_VARARGS, doc_set_completion_type},
 	{"get_pre_input_hook", get_pre_input_hook,
 	 METH_NOARGS, doc_get_pre_input_hook},
+	{"get_history_added_hook", get_history_added_hook,
+	 METH_NOARGS, doc_get_history_added_hook},
 	{"get_inhibit_completion", get_inhibit_completion,
 	 METH_NOARGS, doc_get_inhibit_completion},
 	{"set_inhibit_completion", set_inhibit_completion,
@@ -3070,6 +4889,8 @@ static struct PyMethodDef readline_methods[] =
 	{"stuff_char", stuff_char, METH_VARARGS, doc_stuff_char},
 	{"display_match_list", display_match_list,
 	 METH_VARARGS, doc_display_match_list},
+	{"display_match_pages", display_match_pages,
+	 METH_VARARGS, doc_display_match_pages},
 	{"get_rl_point", get_rl_point, METH_NOARGS, doc_get_rl_point},
 	{"get_rl_end", get_rl_end, METH_NOARGS, doc_get_rl_end},
 	{"complete_internal", complete_internal,
@@ -3091,6 +4912,90 @@ static struct PyMethodDef readline_methods[] =
 	{"get_history_reverse_iter", get_history_reverse_iter,
 	 METH_NOARGS, doc_get_history_reverse_iter},
 	{"get_auto_history", get_auto_history, METH_NOARGS, doc_get_auto_history},
+	{"get_history_snapshot", get_history_snapshot,
+	 METH_NOARGS, doc_get_history_snapshot},
+	{"get_history_items", get_history_items,
+	 METH_VARARGS, doc_get_history_items},
+	{"remove_history_items", remove_history_items,
+	 METH_VARARGS, doc_remove_history_items},
+	{"add_history_items", add_history_items,
+	 METH_O, doc_add_history_items},
+	{"search_history", search_history,
+	 METH_VARARGS, doc_search_history},
+	{"read_history_stream", read_history_stream,
+	 METH_VARARGS, doc_read_history_stream},
+	{"read_history_tail", read_history_tail,
+	 METH_VARARGS, doc_read_history_tail},
+	{"sync_history_file", sync_history_file,
+	 METH_VARARGS, doc_sync_history_file},
+	{"read_history_binary", read_history_binary,
+	 METH_VARARGS, doc_read_history_binary},
+	{"write_history_binary", write_history_binary,
+	 METH_VARARGS, doc_write_history_binary},
+	{"append_history_binary", append_history_binary,
+	 METH_VARARGS, doc_append_history_binary},
+	{"import_history_binary", import_history_binary,
+	 METH_VARARGS, doc_import_history_binary},
+	{"export_history_binary", export_history_binary,
+	 METH_VARARGS, doc_export_history_binary},
+	{"open_history_archive", open_history_archive,
+	 METH_VARARGS, doc_open_history_archive},
+	{"set_history_archive", set_history_archive,
+	 METH_O, doc_set_history_archive},
+	{"get_history_archive", (PyCFunction)get_history_archive,
+	 METH_NOARGS, doc_get_history_archive},
+	{"set_pin_locale", set_pin_locale,
+	 METH_VARARGS, doc_set_pin_locale},
+	{"get_pin_locale", (PyCFunction)get_pin_locale,
+	 METH_NOARGS, doc_get_pin_locale},
+	{"add_input_hook_fd", add_input_hook_fd,
+	 METH_VARARGS, doc_add_input_hook_fd},
+	{"remove_input_hook_fd", remove_input_hook_fd,
+	 METH_VARARGS, doc_remove_input_hook_fd},
+	{"get_input_hook_fds", (PyCFunction)get_input_hook_fds,
+	 METH_NOARGS, doc_get_input_hook_fds},
+	{"set_input_hook_timeout", set_input_hook_timeout,
+	 METH_VARARGS, doc_set_input_hook_timeout},
+	{"get_input_hook_timeout", (PyCFunction)get_input_hook_timeout,
+	 METH_NOARGS, doc_get_input_hook_timeout},
+#if (PY_MAJOR_VERSION >= 3)
+	{"async_input", async_input,
+	 METH_VARARGS, doc_async_input},
+#endif
+	{"append_history_since", append_history_since,
+	 METH_VARARGS, doc_append_history_since},
+	{"get_history_position", (PyCFunction)get_history_position,
+	 METH_NOARGS, doc_get_history_position},
+	{"get_history_entries", get_history_entries,
+	 METH_VARARGS, doc_get_history_entries},
+	{"bisect_history_time", bisect_history_time,
+	 METH_VARARGS, doc_bisect_history_time},
+	{"set_history_write_timestamps", set_history_write_timestamps,
+	 METH_VARARGS, doc_set_history_write_timestamps},
+	{"get_history_write_timestamps", (PyCFunction)get_history_write_timestamps,
+	 METH_NOARGS, doc_get_history_write_timestamps},
+	{"set_history_dedupe", set_history_dedupe,
+	 METH_VARARGS, doc_set_history_dedupe},
+	{"get_history_dedupe", (PyCFunction)get_history_dedupe,
+	 METH_NOARGS, doc_get_history_dedupe},
+	{"set_history_search_index", set_history_search_index,
+	 METH_VARARGS, doc_set_history_search_index},
+	{"get_history_search_index", get_history_search_index,
+	 METH_NOARGS, doc_get_history_search_index},
+	{"set_completer_batch", set_completer_batch,
+	 METH_VARARGS, doc_set_completer_batch},
+	{"get_completer_batch", get_completer_batch,
+	 METH_NOARGS, doc_get_completer_batch},
+	{"set_completion_cache_size", set_completion_cache_size,
+	 METH_VARARGS, doc_set_completion_cache_size},
+	{"get_completion_cache_size", get_completion_cache_size,
+	 METH_NOARGS, doc_get_completion_cache_size},
+	{"set_completion_cache_ttl", set_completion_cache_ttl,
+	 METH_VARARGS, doc_set_completion_cache_ttl},
+	{"get_completion_cache_ttl", get_completion_cache_ttl,
+	 METH_NOARGS, doc_get_completion_cache_ttl},
+	{"clear_completion_cache", clear_completion_cache,
+	 METH_NOARGS, doc_clear_completion_cache},
 	/* </rl.readline> */
 
 	{0, 0}
@@ -3156,6 +5061,21 @@ on_pre_input_hook(void)
 	return result;
 }
 
+static int
+on_history_added_hook(void)
+{
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+	modulestate *global = PyModule_GetState(readline_module());
+
+	int result = on_hook(global->history_added_hook);
+#ifdef WITH_THREAD
+	PyGILState_Release(gilstate);
+#endif
+	return result;
+}
+
 
 /* C function to call the Python completion_display_matches_hook. */
 
@@ -3170,7 +5090,7 @@ on_completion_display_matches_hook(char **matches,
 #endif
 	modulestate *global = PyModule_GetState(readline_module());
 
-	m = PyList_FromStringArray(matches+1);
+	m = PyList_FromStringArrayAndSize(matches+1, num_matches);
 	if (m == NULL)
 		goto error;
 
@@ -3255,29 +5175,188 @@ on_completion(const char *text, int state)
 }
 
 
+/* C function to call the Python batch completer. */
+
+static stringarray batch_matches = {NULL, 0};
+
+
+static void
+on_completion_batch(const char *text, stringarray *matches)
+/* Must be called with the GIL held. Stores a StringArray in
+   matches or leaves it empty if there are no matches. */
+{
+	PyObject *r = NULL;
+	PyObject *m = NULL;
+
+	modulestate *global = PyModule_GetState(readline_module());
+
+	rl_attempted_completion_over = 1;
+#if (PY_MAJOR_VERSION >= 3)
+	r = PyObject_CallFunction(global->completer_batch, "N", PyUnicode_DECODE(text));
+#else
+	r = PyObject_CallFunction(global->completer_batch, "s", text);
+#endif
+	if (r == NULL)
+		goto error;
+	if (r != Py_None) {
+		m = PySequence_List(r);
+		if (m == NULL)
+			goto error;
+		if (StringArray_FromPyList(m, matches) == -1)
+			goto error;
+	}
+	Py_DECREF(r);
+	Py_XDECREF(m);
+	return;
+  error:
+	PyErr_Clear();
+	Py_XDECREF(r);
+	Py_XDECREF(m);
+}
+
+
+static char *
+on_batch_completion(const char *text, int state)
+/* Hand out the matches collected by the batch completer
+   without entering the interpreter. Readline takes ownership
+   of the returned strings. */
+{
+	if (state >= batch_matches.size)
+		return NULL;
+	return batch_matches.strings[state];
+}
+
+
 /* A more flexible constructor that saves "begidx" and "endidx"
  * before calling the normal completer */
 
+static int
+is_prefix_monotone(PyObject *completer)
+/* True if the completer declared that the matches for a word can be
+   found by filtering the matches for any prefix of it */
+{
+	PyObject *r;
+	int result;
+
+	r = PyObject_GetAttrString(completer, "prefix_monotone");
+	if (r == NULL) {
+		PyErr_Clear();
+		return 0;
+	}
+	result = PyObject_IsTrue(r);
+	Py_DECREF(r);
+	if (result == -1) {
+		PyErr_Clear();
+		return 0;
+	}
+	return result;
+}
+
+
 static char **
 flex_completer(const char *text, int start, int end)
 {
+	char **matches;
+	int batch = 0;
+	PyObject *source = NULL;
+	char *line = NULL;
+	int type = rl_completion_type;
+	int monotone = 0;
+
 #ifdef WITH_THREAD
 	PyGILState_STATE gilstate = PyGILState_Ensure();
 #endif
+	modulestate *global = PyModule_GetState(readline_module());
+
 	_py_set_completion_defaults();
 
 #if (PY_MAJOR_VERSION >= 3)
-	begidx = PyUnicode_INDEX(rl_line_buffer, start);
-	endidx = PyUnicode_INDEX(rl_line_buffer, end);
+	begidx = PyUnicode_INDEX_CACHED(rl_line_buffer, start);
+	endidx = PyUnicode_INDEX_CACHED(rl_line_buffer, end);
 #else
 	begidx = start;
 	endidx = end;
 #endif
 
+	if (global->completer_batch != NULL)
+		source = global->completer_batch;
+	else if (global->completer != NULL &&
+		 !PyPrefixIndex_CheckExact(global->completer))
+		source = global->completer;
+
+	/* Serve repeated completions of the same line from the cache */
+	if (source != NULL && CompletionCache_Enabled()) {
+		matches = CompletionCache_Lookup(source, rl_line_buffer,
+						 start, end, type);
+		if (matches != NULL) {
+#ifdef WITH_THREAD
+			PyGILState_Release(gilstate);
+#endif
+			return matches;
+		}
+	}
+
+	if (source != NULL) {
+		monotone = is_prefix_monotone(source);
+		if (!monotone && !CompletionCache_Enabled())
+			source = NULL;
+	}
+	if (source != NULL) {
+		/* The completer may change the line */
+		line = strdup(rl_line_buffer);
+		if (line == NULL)
+			source = NULL;
+		else
+			Py_INCREF(source);
+	}
+
+	/* Narrow the previous matches if the word was extended */
+	if (monotone && source != NULL &&
+	    CompletionCache_Narrow(source, line, start, end, text,
+				   &batch_matches)) {
+		batch = 1;
+	}
+	else if (global->completer_batch != NULL) {
+		on_completion_batch(text, &batch_matches);
+		batch = 1;
+	}
+	else if (global->completer != NULL &&
+		 PyPrefixIndex_CheckExact(global->completer)) {
+		rl_attempted_completion_over = 1;
+		if (PrefixIndex_Complete(global->completer, text,
+					 &batch_matches) == -1)
+			PyErr_Clear();
+		batch = 1;
+	}
+
 #ifdef WITH_THREAD
 	PyGILState_Release(gilstate);
 #endif
-	return completion_matches(text, *on_completion);
+	if (batch) {
+		matches = completion_matches(text, *on_batch_completion);
+		/* The strings now belong to readline */
+		free(batch_matches.strings);
+		batch_matches.strings = NULL;
+		batch_matches.size = 0;
+	}
+	else
+		matches = completion_matches(text, *on_completion);
+
+	if (source != NULL) {
+#ifdef WITH_THREAD
+		gilstate = PyGILState_Ensure();
+#endif
+		CompletionCache_Store(source, line, start, end, type, matches);
+		if (monotone)
+			CompletionCache_Remember(source, line, start, end,
+						 text, matches);
+		Py_DECREF(source);
+#ifdef WITH_THREAD
+		PyGILState_Release(gilstate);
+#endif
+		free(line);
+	}
+	return matches;
 }
 
 
@@ -3342,6 +5421,8 @@ setup_readline(PyObject *module)
 	/* Bind both ESC-TAB and ESC-ESC to the completion function */
 	rl_bind_key_in_map ('\t', rl_complete, emacs_meta_keymap);
 	rl_bind_key_in_map ('\033', rl_complete, emacs_meta_keymap);
+	/* Make the archive search available to .inputrc */
+	rl_add_defun("reverse-search-archive", HistoryArchive_ReverseSearch, -1);
 	/* Set up signal handler for window resize */
 	sigwinch_ohandler = PyOS_setsig(SIGWINCH, readline_sigwinch_handler);
 	/* Set our hook functions */
@@ -3393,17 +5474,136 @@ rlhandler(char *text)
 }
 
 
+/* Unregister an input hook file descriptor that was closed behind our
+   back. Called without the GIL. */
+
+static void
+drop_input_hook_fd(int fd)
+{
+	int i;
+#ifdef WITH_THREAD
+	PyGILState_STATE gilstate = PyGILState_Ensure();
+#endif
+
+	for (i = 0; i < input_hook_nfds; i++) {
+		if (input_hook_fds[i] == fd) {
+			input_hook_nfds--;
+			input_hook_fds[i] = input_hook_fds[input_hook_nfds];
+			break;
+		}
+	}
+#ifdef WITH_THREAD
+	PyGILState_Release(gilstate);
+#endif
+}
+
+
+/* Wait until fd has input, an input hook source is ready, or the input
+   hook timeout expires. Returns 1 if fd has input, 0 if not, and -1 on
+   error. Sets run_hook if the input hook should be called. Closed input
+   hook sources are unregistered, else they would be ready forever. */
+
+static int
+wait_for_input(int fd, int *run_hook)
+{
+	double seconds = input_hook_timeout;
+	int ready, has_input, i;
+#ifdef USE_POLL
+	struct pollfd fds[MAX_INPUT_HOOK_FDS + 1];
+	int nfds = 1;
+	int timeout = -1;
+
+	if (seconds > MAX_INPUT_HOOK_TIMEOUT)
+		seconds = MAX_INPUT_HOOK_TIMEOUT;
+	fds[0].fd = fd;
+	fds[0].events = POLLIN;
+	fds[0].revents = 0;
+	if (PyOS_InputHook) {
+		/* [Bug #1552726] Only limit the pause if an input hook has been
+		   defined.  */
+		if (seconds >= 0.0)
+			timeout = (int)(seconds * 1000.0 + 0.5);
+		for (i = 0; i < input_hook_nfds; i++) {
+			fds[nfds].fd = input_hook_fds[i];
+			fds[nfds].events = POLLIN;
+			fds[nfds].revents = 0;
+			nfds++;
+		}
+	}
+	ready = poll(fds, nfds, timeout);
+	if (ready > 0) {
+		for (i = 1; i < nfds; i++) {
+			if (fds[i].revents & POLLNVAL) {
+				drop_input_hook_fd(fds[i].fd);
+				ready--;
+			}
+		}
+		if (ready == 0) {
+			/* Not a timeout, wait again */
+			*run_hook = 0;
+			return 0;
+		}
+	}
+	/* Let readline see end of file and errors */
+	has_input = ready > 0 ?
+		(fds[0].revents & (POLLIN | POLLHUP | POLLERR | POLLNVAL)) != 0 : ready;
+#else
+	fd_set selectset;
+	struct timeval timeout;
+	struct timeval *timeoutp = NULL;
+	int maxfd = fd;
+
+	if (seconds > MAX_INPUT_HOOK_TIMEOUT)
+		seconds = MAX_INPUT_HOOK_TIMEOUT;
+	FD_ZERO(&selectset);
+	FD_SET(fd, &selectset);
+	if (PyOS_InputHook) {
+		/* [Bug #1552726] Only limit the pause if an input hook has been
+		   defined.  */
+		if (seconds >= 0.0) {
+			timeout.tv_sec = (long)seconds;
+			timeout.tv_usec = (long)((seconds - timeout.tv_sec) * 1e6);
+			timeoutp = &timeout;
+		}
+		for (i = 0; i < input_hook_nfds; i++) {
+			FD_SET(input_hook_fds[i], &selectset);
+			if (input_hook_fds[i] > maxfd)
+				maxfd = input_hook_fds[i];
+		}
+	}
+	ready = select(maxfd + 1, &selectset, NULL, NULL, timeoutp);
+	if (ready < 0 && errno == EBADF) {
+		/* Let readline see the error if fd itself is bad */
+		if (fcntl(fd, F_GETFD) < 0) {
+			*run_hook = 0;
+			return 1;
+		}
+		for (i = input_hook_nfds - 1; i >= 0; i--) {
+			if (fcntl(input_hook_fds[i], F_GETFD) < 0)
+				drop_input_hook_fd(input_hook_fds[i]);
+		}
+		*run_hook = 0;
+		return 0;
+	}
+	has_input = ready > 0 ? FD_ISSET(fd, &selectset) != 0 : ready;
+#endif
+	/* With registered sources, run the hook only when one of them is
+	   ready or the timeout expired */
+	*run_hook = PyOS_InputHook != NULL &&
+		(input_hook_nfds == 0 || ready == 0 || ready > (has_input > 0));
+	return has_input;
+}
+
+
 static char *
 readline_until_enter_or_signal(const char *prompt, int *signal)
 {
 	char * not_done_reading = "";
-	fd_set selectset;
 
 	*signal = 0;
 	rl_catch_signals = 0;
 
 	rl_callback_handler_install (prompt, rlhandler);
-	FD_ZERO(&selectset);
 
 	completed_input_string = not_done_reading;
 
@@ -3411,24 +5611,16 @@ readline_until_enter_or_signal(const char *prompt, int *signal)
 		int has_input = 0, saved_errno = 0;
 
 		while (!has_input) {
-			struct timeval timeout = {0, 100000}; /* 0.1 seconds */
+			int run_hook;
 
-			/* [Bug #1552726] Only limit the pause if an input hook has been
-			   defined.  */
-			struct timeval *timeoutp = NULL;
-			if (PyOS_InputHook)
-				timeoutp = &timeout;
 			/* Update readline's view of the window size after SIGWINCH */
 			if (sigwinch_received) {
 				sigwinch_received = 0;
 				rl_resize_terminal();
 			}
-			FD_SET(fileno(rl_instream), &selectset);
-			/* select resets selectset if no input was available */
-			has_input = select(fileno(rl_instream) + 1, &selectset,
-					   NULL, NULL, timeoutp);
+			has_input = wait_for_input(fileno(rl_instream), &run_hook);
 			saved_errno = errno;
-			if (PyOS_InputHook)
+			if (run_hook)
 				PyOS_InputHook();
 		}
 
@@ -3515,10 +5707,10 @@ call_readline(FILE *sys_stdin, FILE *sys_stdout, const char *prompt)
 	int signal;
 
 #ifdef SAVE_LOCALE
-	char *saved_locale = strdup(setlocale(LC_CTYPE, NULL));
-	if (!saved_locale)
+	int error = 0;
+	char *saved_locale = _py_enter_locale(&error);
+	if (error)
 		return (void*)PyErr_NoMemory();
-	_Py_SetLocaleFromEnv(LC_CTYPE);
 #endif
 
 	if (sys_stdin != rl_instream || sys_stdout != rl_outstream) {
@@ -3531,7 +5723,7 @@ call_readline(FILE *sys_stdin, FILE *sys_stdout, const char *prompt)
 
 	/* we got an interrupt signal */
 	if (signal) {
-		RESTORE_LOCALE(saved_locale)
+		LEAVE_LOCALE(saved_locale)
 		return NULL;
 	}
 
@@ -3540,24 +5732,13 @@ call_readline(FILE *sys_stdin, FILE *sys_stdout, const char *prompt)
 		p = PyMem_RawMalloc(1);
 		if (p != NULL)
 			*p = '\0';
-		RESTORE_LOCALE(saved_locale)
+		LEAVE_LOCALE(saved_locale)
 		return p;
 	}
 
 	/* we have a valid line */
 	n = strlen(p);
-	if (should_auto_add_history && n > 0) {
-		HIST_ENTRY *hist_ent;
-		char *line;
-		if (history_length > 0) {
-			hist_ent = history_get(history_base + history_length - 1);
-			line = hist_ent ? hist_ent->line : "";
-		}
-		else
-			line = "";
-		if (strcmp(p, line) != 0)
-			add_history(p);
-	}
+	_py_auto_add_history(p);
 	/* Copy the malloc'ed buffer into a PyMem_Malloc'ed one and
 	   release the original. */
 	q = p;
@@ -3568,7 +5749,7 @@ call_readline(FILE *sys_stdin, FILE *sys_stdout, const char *prompt)
 		p[n+1] = '\0';
 	}
 	free(q);
-	RESTORE_LOCALE(saved_locale)
+	LEAVE_LOCALE(saved_locale)
 	return p;
 }
 
@@ -3605,6 +5786,19 @@ PyInit_readline(void)
 	   This means: "Do not re-enable the GIL when importing rl.readline." */ 
 	PyUnstable_Module_SetGIL(m, Py_MOD_GIL_NOT_USED);
 #endif
+	if (PyType_Ready(&PyPrefixIndex_Type) < 0 ||
+	    PyType_Ready(&PyHistSnapshot_Type) < 0 ||
+	    PyType_Ready(&PyHistArchive_Type) < 0) {
+		Py_DECREF(m);
+		return NULL;
+	}
+	Py_INCREF(&PyPrefixIndex_Type);
+	if (PyModule_AddObject(m, "PrefixIndex", (PyObject *)&PyPrefixIndex_Type) < 0) {
+		Py_DECREF(&PyPrefixIndex_Type);
+		Py_DECREF(m);
+		return NULL;
+	}
+
 	PyOS_ReadlineFunctionPointer = call_readline;
 
 	if (setup_readline(m) < 0) {
@@ -3625,6 +5819,13 @@ initreadline(void)
 	if (m == NULL)
 		return;
 
+	if (PyType_Ready(&PyPrefixIndex_Type) < 0 ||
+	    PyType_Ready(&PyHistSnapshot_Type) < 0 ||
+	    PyType_Ready(&PyHistArchive_Type) < 0)
+		return;
+	Py_INCREF(&PyPrefixIndex_Type);
+	PyModule_AddObject(m, "PrefixIndex", (PyObject *)&PyPrefixIndex_Type);
+
 	PyOS_ReadlineFunctionPointer = call_readline;
 
 	if (setup_readline(m) < 0) {
@@ -0,0 +1,272 @@
+#include "Python.h"
+#include <string.h>
+
+/* GNU Readline definitions */
+#undef HAVE_CONFIG_H  /* Else readline/chardefs.h includes strings.h */
+#define _FUNCTION_DEF /* Else readline/rltypedefs.h defines old-style types */
+#ifdef __STDC__
+#define PREFER_STDARG /* Use ANSI C function prototypes */
+#define USE_VARARGS
+#endif
+#include <readline/history.h>
+
+/* Custom definitions */
+#include "unicode.h"
+#include "snapshot.h"
+
+/* Python 3 compatibility */
+#if (PY_MAJOR_VERSION >= 3)
+#define PyInt_FromSsize_t PyLong_FromSsize_t
+#define PyString_FromStringAndSize PyUnicode_DECODE_SIZE
+#endif
+
+
+/*********************** History Snapshot **************************/
+
+/* A snapshot copies all history lines into one contiguous arena,
+   each line terminated by a NUL byte. Line i occupies the bytes
+   offsets[i] to offsets[i+1]-1. The arena is exposed read-only
+   through the buffer protocol; lines are decoded on access only. */
+
+typedef struct {
+	PyObject_HEAD
+	char *arena;		/* NUL-separated lines */
+	Py_ssize_t *offsets;	/* Start of each line, plus end of arena */
+	Py_ssize_t size;	/* Number of lines */
+} snapshotobject;
+
+static void snapshot_dealloc(snapshotobject *);
+
+
+PyObject *
+HistorySnapshot_New(void)
+{
+	snapshotobject *self;
+	HIST_ENTRY **hist;
+	Py_ssize_t i, n, total = 0;
+
+	self = PyObject_New(snapshotobject, &PyHistSnapshot_Type);
+	if (self == NULL)
+		return NULL;
+	self->arena = NULL;
+	self->offsets = NULL;
+	self->size = 0;
+
+	hist = history_list();
+	n = hist ? history_length : 0;
+
+	self->offsets = PyMem_Malloc((n+1) * sizeof(Py_ssize_t));
+	if (self->offsets == NULL)
+		goto nomemory;
+	for (i = 0; i < n; i++) {
+		self->offsets[i] = total;
+		total += strlen(hist[i]->line) + 1;
+	}
+	self->offsets[n] = total;
+
+	self->arena = PyMem_Malloc(total ? total : 1);
+	if (self->arena == NULL)
+		goto nomemory;
+	for (i = 0; i < n; i++) {
+		memcpy(self->arena + self->offsets[i], hist[i]->line,
+		       self->offsets[i+1] - self->offsets[i]);
+	}
+	self->size = n;
+	return (PyObject *)self;
+
+  nomemory:
+	Py_DECREF(self);
+	return PyErr_NoMemory();
+}
+
+
+static void
+snapshot_dealloc(snapshotobject *self)
+{
+	PyMem_Free(self->arena);
+	PyMem_Free(self->offsets);
+	PyObject_Del(self);
+}
+
+
+static Py_ssize_t
+snapshot_length(snapshotobject *self)
+{
+	return self->size;
+}
+
+
+static int
+snapshot_norm_index(snapshotobject *self, Py_ssize_t *index)
+{
+	if (*index < 0)
+		*index += self->size;
+	if (*index < 0 || *index >= self->size) {
+		PyErr_SetString(PyExc_IndexError, "snapshot index out of range");
+		return -1;
+	}
+	return 0;
+}
+
+
+static PyObject *
+snapshot_item(snapshotobject *self, Py_ssize_t index)
+{
+	if (index < 0 || index >= self->size) {
+		PyErr_SetString(PyExc_IndexError, "snapshot index out of range");
+		return NULL;
+	}
+	return PyString_FromStringAndSize(self->arena + self->offsets[index],
+		self->offsets[index+1] - self->offsets[index] - 1);
+}
+
+
+static PyObject *
+snapshot_subscript(snapshotobject *self, PyObject *item)
+{
+	Py_ssize_t index;
+
+	if (!PyIndex_Check(item)) {
+		PyErr_SetString(PyExc_TypeError, "an integer is required");
+		return NULL;
+	}
+	index = PyNumber_AsSsize_t(item, PyExc_IndexError);
+	if (index == -1 && PyErr_Occurred())
+		return NULL;
+	if (snapshot_norm_index(self, &index) < 0)
+		return NULL;
+	return snapshot_item(self, index);
+}
+
+
+static PyObject *
+snapshot_span(snapshotobject *self, PyObject *args)
+{
+	Py_ssize_t index;
+
+	if (!PyArg_ParseTuple(args, "n:span", &index))
+		return NULL;
+	if (snapshot_norm_index(self, &index) < 0)
+		return NULL;
+	return Py_BuildValue("(nn)", self->offsets[index],
+		self->offsets[index+1] - 1);
+}
+
+PyDoc_STRVAR(doc_span,
+"span(index) -> (start, end)\n\
+Return the byte range of the line at ``index`` in the buffer.");
+
+
+static PyObject *
+snapshot_index(snapshotobject *self, PyObject *args)
+{
+	Py_ssize_t offset, lo = 0, hi, mid;
+
+	if (!PyArg_ParseTuple(args, "n:index", &offset))
+		return NULL;
+	if (offset < 0 || offset >= self->offsets[self->size]) {
+		PyErr_SetString(PyExc_IndexError, "snapshot offset out of range");
+		return NULL;
+	}
+	/* Find the last line starting at or before offset */
+	hi = self->size;
+	while (hi - lo > 1) {
+		mid = lo + (hi - lo) / 2;
+		if (self->offsets[mid] <= offset)
+			lo = mid;
+		else
+			hi = mid;
+	}
+	return PyInt_FromSsize_t(lo);
+}
+
+PyDoc_STRVAR(doc_index,
+"index(offset) -> int\n\
+Return the index of the line containing the byte at ``offset``.");
+
+
+static int
+snapshot_getbuffer(snapshotobject *self, Py_buffer *view, int flags)
+{
+	return PyBuffer_FillInfo(view, (PyObject *)self, self->arena,
+		self->offsets[self->size], 1, flags);
+}
+
+
+static PyMethodDef snapshot_methods[] = {
+	{"span", (PyCFunction)snapshot_span, METH_VARARGS, doc_span},
+	{"index", (PyCFunction)snapshot_index, METH_VARARGS, doc_index},
+	{0, 0}
+};
+
+static PySequenceMethods snapshot_as_sequence = {
+	(lenfunc)snapshot_length,			/* sq_length */
+	0,						/* sq_concat */
+	0,						/* sq_repeat */
+	(ssizeargfunc)snapshot_item,			/* sq_item */
+};
+
+static PyMappingMethods snapshot_as_mapping = {
+	(lenfunc)snapshot_length,			/* mp_length */
+	(binaryfunc)snapshot_subscript,			/* mp_subscript */
+	0,						/* mp_ass_subscript */
+};
+
+static PyBufferProcs snapshot_as_buffer = {
+#if (PY_MAJOR_VERSION < 3)
+	0,						/* bf_getreadbuffer */
+	0,						/* bf_getwritebuffer */
+	0,						/* bf_getsegcount */
+	0,						/* bf_getcharbuffer */
+#endif
+	(getbufferproc)snapshot_getbuffer,		/* bf_getbuffer */
+	0,						/* bf_releasebuffer */
+};
+
+PyDoc_STRVAR(doc_snapshot,
+"Read-only copy of the history taken at one point in time.\n\
+Lines are stored NUL-terminated in one contiguous buffer that\n\
+is accessible through the buffer protocol. Indexing decodes a\n\
+single line.");
+
+PyTypeObject PyHistSnapshot_Type = {
+#if (PY_VERSION_HEX < 0x02060000)
+	PyObject_HEAD_INIT(&PyType_Type)
+	0,						/* ob_size */
+#else
+	PyVarObject_HEAD_INIT(&PyType_Type, 0)
+#endif
+	"historysnapshot",				/* tp_name */
+	sizeof(snapshotobject),				/* tp_basicsize */
+	0,						/* tp_itemsize */
+	/* methods */
+	(destructor)snapshot_dealloc,			/* tp_dealloc */
+	0,						/* tp_print */
+	0,						/* tp_getattr */
+	0,						/* tp_setattr */
+	0,						/* tp_compare */
+	0,						/* tp_repr */
+	0,						/* tp_as_number */
+	&snapshot_as_sequence,				/* tp_as_sequence */
+	&snapshot_as_mapping,				/* tp_as_mapping */
+	0,						/* tp_hash */
+	0,						/* tp_call */
+	0,						/* tp_str */
+	PyObject_GenericGetAttr,			/* tp_getattro */
+	0,						/* tp_setattro */
+	&snapshot_as_buffer,				/* tp_as_buffer */
+#if (PY_MAJOR_VERSION < 3)
+	Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_NEWBUFFER,	/* tp_flags */
+#else
+	Py_TPFLAGS_DEFAULT,				/* tp_flags */
+#endif
+	doc_snapshot,					/* tp_doc */
+	0,						/* tp_traverse */
+	0,						/* tp_clear */
+	0,						/* tp_richcompare */
+	0,						/* tp_weaklistoffset */
+	0,						/* tp_iter */
+	0,						/* tp_iternext */
+	snapshot_methods,				/* tp_methods */
+	0,						/* tp_members */
+};
@@ -0,0 +1,10 @@
+#ifndef __SNAPSHOT_H__
+#define __SNAPSHOT_H__
+
+#include "Python.h"
+
+extern PyTypeObject PyHistSnapshot_Type;
+
+PyObject *HistorySnapshot_New(void);
+
+#endif /* __SNAPSHOT_H__ */
@@ -1,4 +1,5 @@
 #include "Python.h"
+#include <string.h>
 
 /* Custom definitions */
 #include "stringarray.h"
@@ -9,6 +10,75 @@
 #define PyString_FromString PyUnicode_DECODE
 #endif
 
+/* Compact ASCII strings appeared in Python 3.3 */
+#if (PY_VERSION_HEX >= 0x03030000)
+#define HAVE_ASCII_STRINGS
+#if (PY_VERSION_HEX >= 0x030C0000)
+#define PyUnicode_IS_ASCII_READY(u) PyUnicode_IS_ASCII(u)
+#else
+#define PyUnicode_IS_ASCII_READY(u) \
+	(PyUnicode_READY(u) == 0 && PyUnicode_IS_ASCII(u))
+#endif
+#endif
+
+
+/* String conversion
+ *
+ * Match lists are mostly ASCII. ASCII strings are the same in every
+ * locale encoding readline supports, so they are copied directly
+ * instead of going through the locale codec.
+ */
+
+static PyObject *
+string_decode(const char *text)
+{
+#ifdef HAVE_ASCII_STRINGS
+	const unsigned char *p;
+	PyObject *u;
+
+	for (p = (const unsigned char *)text; *p; p++) {
+		if (*p >= 0x80)
+			return PyString_FromString(text);
+	}
+	u = PyUnicode_New(p - (const unsigned char *)text, 127);
+	if (u == NULL)
+		return NULL;
+	memcpy(PyUnicode_1BYTE_DATA(u), text, PyUnicode_GET_LENGTH(u));
+	return u;
+#else
+	return PyString_FromString(text);
+#endif
+}
+
+
+const char *
+StringArray_EncodeItem(PyObject *text, Py_ssize_t *size, PyObject **bytes)
+/* Return the encoded text and its size. If a bytes object had to be
+   created, it is stored in bytes and must be released by the caller. */
+{
+	char *s;
+
+	*bytes = NULL;
+#if (PY_MAJOR_VERSION >= 3)
+#ifdef HAVE_ASCII_STRINGS
+	if (PyUnicode_Check(text) && PyUnicode_IS_ASCII_READY(text)) {
+		*size = PyUnicode_GET_LENGTH(text);
+		return (const char *)PyUnicode_1BYTE_DATA(text);
+	}
+#endif
+	*bytes = PyUnicode_ENCODE(text);
+	if (*bytes == NULL)
+		return NULL;
+	s = PyBytes_AS_STRING(*bytes);
+#else
+	s = PyString_AsString(text);
+	if (s == NULL)
+		return NULL;
+#endif
+	*size = strlen(s);
+	return s;
+}
+
 
 /* StringArray support */
 
@@ -49,57 +119,34 @@ StringArray_Size(char **strings)
 }
 
 
-int
-StringArray_Insert(char ***strings, Py_ssize_t pos, char *string)
+/* PyList from StringArray */
+
+PyObject *
+PyList_FromStringArray(char **strings)
 {
-	char **new;
-	char **p;
-	Py_ssize_t size, i;
-	int inserted = 0;
+	Py_ssize_t size;
 
-	size = StringArray_Size(*strings);
+	size = StringArray_Size(strings);
 	if (size == -1)
-		return -1;
-
-	new = StringArray_New(size+1);
-	if (new == NULL)
-		return -1;
-
-	for (p = *strings, i = 0; *p; p++) {
-		if (i == pos) {
-			new[i++] = string;
-			inserted = 1;
-		}
-		new[i++] = *p;
-	}
-	if (!inserted)
-		new[i] = string;
+		return NULL;
 
-	free(*strings);
-	*strings = new;
-	return 0;
+	return PyList_FromStringArrayAndSize(strings, size);
 }
 
 
-/* PyList from StringArray */
-
 PyObject *
-PyList_FromStringArray(char **strings)
+PyList_FromStringArrayAndSize(char **strings, Py_ssize_t size)
 {
 	PyObject *list;
 	PyObject *s;
-	Py_ssize_t size, i;
-
-	size = StringArray_Size(strings);
-	if (size == -1)
-		return NULL;
+	Py_ssize_t i;
 
 	list = PyList_New(size);
 	if (list == NULL)
 		return NULL;
 
 	for (i = 0; i < size; i++) {
-		s = PyString_FromString(strings[i]);
+		s = string_decode(strings[i]);
 		if (s == NULL)
 			goto error;
 		PyList_SET_ITEM(list, i, s);
@@ -113,50 +160,132 @@ PyList_FromStringArray(char **strings)
 
 /* StringArray from PyList */
 
-char **
-StringArray_FromPyList(PyObject *list)
+int
+StringArray_FromPyList(PyObject *list, stringarray *array)
 {
 	char **strings;
 	char **p;
-	char *s = NULL;
+	const char *s;
 	PyObject *r;
-	Py_ssize_t size, i;
+	Py_ssize_t size, i, n;
 	PyObject *b = NULL;
 
 	size = PyList_Size(list);
 	if (size == -1)
-		return NULL;
+		return -1;
 
 	strings = StringArray_New(size);
 	if (strings == NULL)
-		return NULL;
+		return -1;
 
 	for (p = strings, i = 0; i < size; i++) {
 		r = PyList_GET_ITEM(list, i);
-#if (PY_MAJOR_VERSION >= 3)
-		b = PyUnicode_ENCODE(r);
-		if (b != NULL)
-			s = PyBytes_AsString(b);
-#else
-		s = PyString_AsString(r);
-#endif
+		s = StringArray_EncodeItem(r, &n, &b);
 		if (s == NULL)
 			goto error;
-		s = strdup(s);
-		if (s == NULL) {
+		*p = malloc(n+1);
+		if (*p == NULL) {
 			PyErr_NoMemory();
 			goto error;
 		}
-		*p++ = s;
-#if (PY_MAJOR_VERSION >= 3)
+		memcpy(*p, s, n);
+		(*p++)[n] = '\0';
 		Py_CLEAR(b);
-		s = NULL;
-#endif
 	}
-	return strings;
+	array->strings = strings;
+	array->size = size;
+	return 0;
   error:
 	Py_XDECREF(b);
 	StringArray_Free(strings);
-	return NULL;
+	return -1;
+}
+
+
+/* Packed StringArray from PyList
+ *
+ * The pointer array and all strings are stored in a single block,
+ * which is released with one call to StringArray_FreePacked. The
+ * strings must not be freed or handed to readline individually.
+ * If head is not NULL, it is stored in front of the list items.
+ */
+
+typedef struct {
+	const char *s;
+	Py_ssize_t size;
+	PyObject *bytes;
+} packitem;
+
+
+int
+StringArray_FromPyListPacked(const char *head, PyObject *list,
+			     stringarray *array)
+{
+	char **strings = NULL;
+	char **p;
+	char *arena;
+	packitem *items;
+	PyObject *r;
+	Py_ssize_t size, total, i;
+	Py_ssize_t offset = head ? 1 : 0;
+	int result = -1;
+
+	size = PyList_Size(list);
+	if (size == -1)
+		return -1;
+
+	items = PyMem_Malloc((size+offset) * sizeof(packitem) + 1);
+	if (items == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+
+	/* Encode the items and add up their sizes */
+	total = 0;
+	if (head) {
+		items[0].s = head;
+		items[0].size = strlen(head);
+		items[0].bytes = NULL;
+		total += items[0].size + 1;
+	}
+	for (i = 0; i < size; i++) {
+		r = PyList_GET_ITEM(list, i);
+		items[offset+i].s = StringArray_EncodeItem(r, &items[offset+i].size,
+						  &items[offset+i].bytes);
+		if (items[offset+i].s == NULL) {
+			size = i;
+			goto done;
+		}
+		total += items[offset+i].size + 1;
+	}
+
+	/* Copy them into one block */
+	strings = malloc((size+offset+1) * sizeof(char*) + total);
+	if (strings == NULL) {
+		PyErr_NoMemory();
+		goto done;
+	}
+	arena = (char *)(strings + size+offset+1);
+	for (p = strings, i = 0; i < size+offset; i++) {
+		memcpy(arena, items[i].s, items[i].size);
+		arena[items[i].size] = '\0';
+		*p++ = arena;
+		arena += items[i].size + 1;
+	}
+	*p = NULL;
+	array->strings = strings;
+	array->size = size+offset;
+	result = 0;
+  done:
+	for (i = offset; i < size+offset; i++)
+		Py_XDECREF(items[i].bytes);
+	PyMem_Free(items);
+	return result;
 }
 
+
+void
+StringArray_FreePacked(char **strings)
+{
+	free(strings);
+}
@@ -3,11 +3,22 @@
 
 #include "Python.h"
 
+/* A NULL-terminated string array that knows its size */
+typedef struct {
+	char **strings;
+	Py_ssize_t size;
+} stringarray;
+
 char **StringArray_New(Py_ssize_t size);
 void StringArray_Free(char **strings);
 Py_ssize_t StringArray_Size(char **strings);
-int StringArray_Insert(char ***strings, Py_ssize_t pos, char *string);
 PyObject *PyList_FromStringArray(char **strings);
-char **StringArray_FromPyList(PyObject *list);
+PyObject *PyList_FromStringArrayAndSize(char **strings, Py_ssize_t size);
+int StringArray_FromPyList(PyObject *list, stringarray *array);
+int StringArray_FromPyListPacked(const char *head, PyObject *list,
+				 stringarray *array);
+void StringArray_FreePacked(char **strings);
+const char *StringArray_EncodeItem(PyObject *text, Py_ssize_t *size,
+				   PyObject **bytes);
 
 #endif /* __STRINGARRAY_H__ */
@@ -1,11 +1,13 @@
 """Test helpers."""
 
 import unittest
+import sys
 import os
 import tempfile
 import shutil
+import subprocess
 
-from os.path import realpath, isdir
+from os.path import realpath, isdir, dirname, abspath
 
 from rl import completer
 from rl import completion
@@ -22,6 +24,52 @@ def reset():
     completer.parse_and_bind('set enable-active-region off')
 
 
+def run_script(script, input=b'', **env):
+    """Run script in a subprocess with stdin connected to a pipe.
+    Returns the combined output as text.
+    """
+    environ = dict(os.environ)
+    environ['PYTHONPATH'] = dirname(dirname(abspath(__file__)))
+    environ['INPUTRC'] = os.devnull
+    environ.update(env)
+    p = subprocess.Popen([sys.executable, '-c', script],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                         stderr=subprocess.STDOUT, env=environ)
+    out, err = p.communicate(input)
+    return out.decode('utf-8', 'replace')
+
+
+def run_tty(script, input, **env):
+    """Run script in a subprocess with stdin and stdout connected to a
+    pseudo terminal, so readline handles the input. Returns what the
+    script writes to stderr as text.
+    """
+    import pty
+    import select
+    environ = dict(os.environ)
+    environ['PYTHONPATH'] = dirname(dirname(abspath(__file__)))
+    environ['INPUTRC'] = os.devnull
+    environ.update(env)
+    master, slave = pty.openpty()
+    p = subprocess.Popen([sys.executable, '-c', script],
+                         stdin=slave, stdout=slave, stderr=subprocess.PIPE,
+                         env=environ)
+    os.close(slave)
+    try:
+        os.write(master, input)
+        # Drain the terminal until the script exits
+        while select.select([master], [], [], 10)[0]:
+            try:
+                if not os.read(master, 1024):
+                    break
+            except OSError:
+                break
+        err = p.communicate()[1]
+    finally:
+        os.close(master)
+    return err.decode('utf-8', 'replace')
+
+
 class JailSetup(unittest.TestCase):
 
     origdir = None
@@ -0,0 +1,160 @@
+import unittest
+import sys
+
+import rl
+from rl.testing import run_script
+
+# Run scripts in a subprocess with stdin connected to a pipe
+SCRIPT = """\
+import asyncio
+from rl import readline, history
+
+async def main():
+%s
+
+asyncio.run(main())
+"""
+
+
+def run(body, input):
+    out = run_script(SCRIPT % '\n'.join('    ' + x for x in body.splitlines()),
+                     input)
+    for line in out.splitlines():
+        if 'result:' in line:
+            return line[line.index('result:'):]
+    return out
+
+
+@unittest.skipIf(sys.version_info[0] < 3, 'asyncio required')
+class AsyncInputTests(unittest.TestCase):
+
+    def test_line(self):
+        out = run("print('result:', repr(await readline.async_input('> ')))",
+                  b'fred\n')
+        self.assertEqual(out, "result: 'fred'")
+
+    def test_history(self):
+        out = run("await readline.async_input()\n"
+                  "await readline.async_input()\n"
+                  "print('result:', list(history))",
+                  b'fred\nwilma\n')
+        self.assertEqual(out, "result: ['fred', 'wilma']")
+
+    def test_buffered_lines(self):
+        out = run("lines = []\n"
+                  "for i in range(3):\n"
+                  "    lines.append(await readline.async_input())\n"
+                  "print('result:', lines)",
+                  b'fred\nwilma\nbarney\n')
+        self.assertEqual(out, "result: ['fred', 'wilma', 'barney']")
+
+    def test_mixed_with_stdin(self):
+        # The lines after the first stay in async_input's buffer
+        out = run("import sys\n"
+                  "a = await readline.async_input()\n"
+                  "b = sys.stdin.read()\n"
+                  "c = await readline.async_input()\n"
+                  "print('result:', repr(a), repr(b), repr(c))",
+                  b'fred\nwilma\n')
+        self.assertEqual(out, "result: 'fred' '' 'wilma'")
+
+    def test_unterminated_line(self):
+        out = run("a = await readline.async_input()\n"
+                  "b = await readline.async_input()\n"
+                  "print('result:', a, b)",
+                  b'fred\nwilma')
+        self.assertEqual(out, "result: fred wilma")
+
+    def test_empty_line(self):
+        out = run("a = await readline.async_input()\n"
+                  "b = await readline.async_input()\n"
+                  "print('result:', repr(a), b, list(history))",
+                  b'\nwilma\n')
+        self.assertEqual(out, "result: '' wilma ['wilma']")
+
+    def test_dedupe_consecutive(self):
+        out = run("for i in range(4):\n"
+                  "    await readline.async_input()\n"
+                  "print('result:', list(history))",
+                  b'fred\nfred\nwilma\nfred\n')
+        self.assertEqual(out, "result: ['fred', 'wilma', 'fred']")
+
+    def test_dedupe_none(self):
+        out = run("history.dedupe = 'none'\n"
+                  "for i in range(3):\n"
+                  "    await readline.async_input()\n"
+                  "print('result:', list(history))",
+                  b'fred\nfred\nwilma\n')
+        self.assertEqual(out, "result: ['fred', 'fred', 'wilma']")
+
+    def test_dedupe_all(self):
+        out = run("history.dedupe = 'all'\n"
+                  "history.extend(['barney', 'fred'])\n"
+                  "for i in range(4):\n"
+                  "    await readline.async_input()\n"
+                  "print('result:', list(history))",
+                  b'fred\nwilma\nbarney\nwilma\n')
+        self.assertEqual(out, "result: ['fred', 'barney', 'wilma']")
+
+    def test_dedupe_all_stifled(self):
+        out = run("history.dedupe = 'all'\n"
+                  "history.max_entries = 2\n"
+                  "for i in range(4):\n"
+                  "    await readline.async_input()\n"
+                  "print('result:', list(history))",
+                  b'fred\nwilma\nbarney\nfred\n')
+        self.assertEqual(out, "result: ['barney', 'fred']")
+
+    def test_dedupe_all_zero_max_entries(self):
+        out = run("history.dedupe = 'all'\n"
+                  "history.max_entries = 0\n"
+                  "for i in range(2):\n"
+                  "    await readline.async_input()\n"
+                  "print('result:', list(history))",
+                  b'fred\nfred\n')
+        self.assertEqual(out, "result: []")
+
+    def test_no_auto_history(self):
+        out = run("history.auto = False\n"
+                  "await readline.async_input()\n"
+                  "print('result:', list(history))",
+                  b'fred\n')
+        self.assertEqual(out, "result: []")
+
+    def test_eof(self):
+        out = run("try:\n"
+                  "    await readline.async_input()\n"
+                  "except EOFError:\n"
+                  "    print('result: EOFError')",
+                  b'')
+        self.assertEqual(out, "result: EOFError")
+
+    def test_loop_keeps_running(self):
+        out = run("ticks = []\n"
+                  "loop = asyncio.get_running_loop()\n"
+                  "loop.call_soon(ticks.append, 1)\n"
+                  "line = await readline.async_input()\n"
+                  "print('result:', line, ticks)",
+                  b'fred\n')
+        self.assertEqual(out, "result: fred [1]")
+
+    def test_already_reading(self):
+        out = run("f = readline.async_input()\n"
+                  "try:\n"
+                  "    readline.async_input()\n"
+                  "except RuntimeError:\n"
+                  "    print('result: RuntimeError')\n"
+                  "await f",
+                  b'fred\n')
+        self.assertEqual(out, "result: RuntimeError")
+
+    def test_cancel(self):
+        out = run("f = readline.async_input()\n"
+                  "f.cancel()\n"
+                  "await asyncio.sleep(0)\n"
+                  "print('result:', repr(await readline.async_input()))",
+                  b'fred\n')
+        self.assertEqual(out, "result: 'fred'")
+
+    def test_no_running_loop(self):
+        self.assertRaises(RuntimeError, rl.readline.async_input)
@@ -1,4 +1,5 @@
 import unittest
+import time
 
 from rl import completer
 from rl import completion
@@ -175,6 +176,229 @@ class CompleterTests(unittest.TestCase):
         self.assertEqual(completion.line_buffer, 'fr ') # XXX Single match?
 
 
+class CompleterBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+        called[:] = []
+
+    def test_called_once(self):
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer_batch = func
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(called, ['fr'])
+
+    def test_complete(self):
+        def func(text):
+            return ['fred']
+        completer.completer_batch = func
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fred ')
+
+    def test_common_prefix(self):
+        def func(text):
+            return ['fred', 'freddy']
+        completer.completer_batch = func
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fred')
+
+    def test_iterable(self):
+        def func(text):
+            return (x for x in ['fred'])
+        completer.completer_batch = func
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fred ')
+
+    def test_no_matches(self):
+        def func(text):
+            return []
+        completer.completer_batch = func
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fr')
+
+    def test_none_result(self):
+        def func(text):
+            return None
+        completer.completer_batch = func
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fr')
+
+    def test_bad_completer(self):
+        def func(text):
+            raise RuntimeError()
+        completer.completer_batch = func
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fr')
+
+    def test_takes_precedence(self):
+        @generator
+        def func1(text):
+            return ['barney']
+        def func2(text):
+            return ['fred']
+        completer.completer = func1
+        completer.completer_batch = func2
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fred ')
+
+
+class CompletionCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+        called[:] = []
+        completer.cache_size = 10
+
+    def complete(self, line, key=TAB):
+        completion.line_buffer = line
+        readline.complete_internal(key)
+
+    def test_disabled(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.cache_size = 0
+        completer.completer = func
+        self.complete('fr')
+        self.complete('fr')
+        self.assertEqual(called, ['fr', 'fr'])
+
+    def test_cached(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer = func
+        self.complete('fr')
+        self.complete('fr')
+        self.assertEqual(called, ['fr'])
+        self.assertEqual(completion.line_buffer, 'fr')
+
+    def test_cached_batch(self):
+        def func(text):
+            called.append(text)
+            return ['fred', 'freddy']
+        completer.completer_batch = func
+        self.complete('fr')
+        self.assertEqual(completion.line_buffer, 'fred')
+        self.complete('fr')
+        self.assertEqual(completion.line_buffer, 'fred')
+        self.assertEqual(called, ['fr'])
+
+    def test_line_changed(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer = func
+        self.complete('fr')
+        self.complete('x fr')
+        self.complete('fr ')
+        self.assertEqual(called, ['fr', 'fr', ''])
+
+    def test_completion_type(self):
+        @generator
+        def func(text):
+            called.append(completion.completion_type)
+            return ['fred', 'frank']
+        completer.completer = func
+        completer.display_matches_hook = lambda *args: None
+        self.complete('fr', TAB)
+        self.complete('fr', '?')
+        self.complete('fr', '?')
+        self.assertEqual(called, [TAB, '?'])
+
+    def test_variables_restored(self):
+        @generator
+        def func(text):
+            called.append(text)
+            completion.append_character = '/'
+            return ['fred']
+        completer.completer = func
+        self.complete('fr')
+        self.assertEqual(completion.line_buffer, 'fred/')
+        self.complete('fr')
+        self.assertEqual(completion.line_buffer, 'fred/')
+        self.assertEqual(called, ['fr'])
+
+    def test_ttl(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer = func
+        completer.cache_ttl = 0.05
+        self.complete('fr')
+        self.complete('fr')
+        time.sleep(0.1)
+        self.complete('fr')
+        self.assertEqual(called, ['fr', 'fr'])
+
+    def test_evicted(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return [text + 'ed', text + 'ank']
+        completer.completer = func
+        completer.cache_size = 2
+        self.complete('fr')
+        self.complete('wi')
+        self.complete('fr')
+        self.complete('ba')
+        self.complete('fr')
+        self.complete('wi')
+        self.assertEqual(called, ['fr', 'wi', 'ba', 'wi'])
+
+    def test_clear_cache(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer = func
+        self.complete('fr')
+        completer.clear_cache()
+        self.complete('fr')
+        self.assertEqual(called, ['fr', 'fr'])
+
+    def test_new_completer(self):
+        @generator
+        def func1(text):
+            called.append(1)
+            return ['fred', 'frank']
+        @generator
+        def func2(text):
+            called.append(2)
+            return ['fred', 'frank']
+        completer.completer = func1
+        self.complete('fr')
+        completer.completer = func2
+        self.complete('fr')
+        completer.completer = func1
+        self.complete('fr')
+        self.assertEqual(called, [1, 2, 1])
+
+    def test_no_matches_not_cached(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return []
+        completer.completer = func
+        self.complete('fr')
+        self.complete('fr')
+        self.assertEqual(called, ['fr', 'fr'])
+
+
 class DisplayMatchesHookTests(JailSetup):
 
     def setUp(self):
@@ -195,6 +419,10 @@ class DisplayMatchesHookTests(JailSetup):
         completer.completer = filecomplete
         readline.complete_internal('?')
 
+    def test_display_match_list_bad_item(self):
+        self.assertRaises(TypeError, readline.display_match_list,
+            'fr', ['fred', 23], 4)
+
 
 class WordBreakHookTests(unittest.TestCase):
 
@@ -540,6 +768,17 @@ class IgnoreSomeCompletionsFunctionTests(JailSetup):
         self.assertEqual(called, [('fred.', ['fred.gif', 'fred.txt'])])
         self.assertEqual(completion.line_buffer, "fred.txt ")
 
+    def test_ignore_all(self):
+        def func(substitution, matches):
+            called.append((substitution, matches))
+            return []
+        self.mkfile('fred.txt')
+        self.mkfile('fred.gif')
+        completer.ignore_some_completions_function = func
+        readline.complete_internal(TAB)
+        self.assertEqual(called, [('fred.', ['fred.gif', 'fred.txt'])])
+        self.assertEqual(completion.line_buffer, "fred. ")
+
     def test_no_ignore(self):
         def func(substitution, matches):
             called.append((substitution, matches))
@@ -868,3 +1107,143 @@ class FilenameStatHookTests(JailSetup):
         self.assertEqual(called, []) # Not called
         self.assertEqual(completion.line_buffer, "flintstone/fr")
 
+
+class PrefixMonotoneTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+        called[:] = []
+
+    def complete(self, line, key=TAB):
+        completion.line_buffer = line
+        readline.complete_internal(key)
+
+    def test_narrowed(self):
+        @generator(prefix_monotone=True)
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank', 'freddy']
+        completer.completer = func
+        self.complete('fr')
+        self.assertEqual(completion.line_buffer, 'fr')
+        self.complete('fra')
+        self.assertEqual(completion.line_buffer, 'frank ')
+        self.assertEqual(called, ['fr'])
+
+    def test_narrowed_twice(self):
+        @generator(prefix_monotone=True)
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank', 'freddy']
+        completer.completer = func
+        self.complete('f')
+        self.complete('fr')
+        self.complete('fre')
+        self.assertEqual(completion.line_buffer, 'fred')
+        self.assertEqual(called, ['f'])
+
+    def test_not_declared(self):
+        @generator
+        def func(text):
+            called.append(text)
+            return [x for x in ['fred', 'frank'] if x.startswith(text)]
+        completer.completer = func
+        self.complete('fr')
+        self.complete('fra')
+        self.assertEqual(completion.line_buffer, 'frank ')
+        self.assertEqual(called, ['fr', 'fra'])
+
+    def test_not_extended(self):
+        @generator(prefix_monotone=True)
+        def func(text):
+            called.append(text)
+            return [x for x in ['fred', 'frank', 'wilma'] if x.startswith(text)]
+        completer.completer = func
+        self.complete('fr')
+        self.complete('f')
+        self.complete('wi')
+        self.assertEqual(completion.line_buffer, 'wilma ')
+        self.assertEqual(called, ['fr', 'f', 'wi'])
+
+    def test_line_changed(self):
+        @generator(prefix_monotone=True)
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer = func
+        self.complete('fr')
+        self.complete('x fra')
+        self.complete('y fran')
+        self.assertEqual(called, ['fr', 'fra', 'fran'])
+
+    def test_batch(self):
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank', 'freddy']
+        func.prefix_monotone = True
+        completer.completer_batch = func
+        self.complete('fr')
+        self.complete('fre')
+        self.assertEqual(completion.line_buffer, 'fred')
+        self.assertEqual(called, ['fr'])
+
+    def test_method(self):
+        class Completer(object):
+            @generator(prefix_monotone=True)
+            def complete(self, text):
+                called.append(text)
+                return ['fred', 'frank']
+        completer.completer = Completer().complete
+        self.complete('fr')
+        self.complete('fra')
+        self.assertEqual(completion.line_buffer, 'frank ')
+        self.assertEqual(called, ['fr'])
+
+    def test_no_matches_left(self):
+        @generator(prefix_monotone=True)
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer = func
+        self.complete('fr')
+        self.complete('frx')
+        self.assertEqual(completion.line_buffer, 'frx')
+        self.assertEqual(called, ['fr'])
+
+    def test_variables_restored(self):
+        @generator(prefix_monotone=True)
+        def func(text):
+            called.append(text)
+            completion.append_character = '/'
+            return ['fred', 'frank']
+        completer.completer = func
+        self.complete('fr')
+        self.complete('fra')
+        self.assertEqual(completion.line_buffer, 'frank/')
+        self.assertEqual(called, ['fr'])
+
+    def test_clear_cache(self):
+        @generator(prefix_monotone=True)
+        def func(text):
+            called.append(text)
+            return ['fred', 'frank']
+        completer.completer = func
+        self.complete('fr')
+        completer.clear_cache()
+        self.complete('fra')
+        self.assertEqual(called, ['fr', 'fra'])
+
+    def test_new_completer(self):
+        @generator(prefix_monotone=True)
+        def func1(text):
+            called.append(1)
+            return ['fred', 'frank']
+        @generator(prefix_monotone=True)
+        def func2(text):
+            called.append(2)
+            return ['fred', 'frank']
+        completer.completer = func1
+        self.complete('fr')
+        completer.completer = func2
+        self.complete('fra')
+        self.assertEqual(called, [1, 2])
@@ -1,12 +1,17 @@
 import unittest
 import sys
 import os
+import time
+import re
+import shutil
 
 from os.path import isfile, expanduser, abspath
 
 from rl import history
 from rl import readline
+from rl import _history
 from rl.testing import JailSetup
+from rl.testing import run_tty
 from rl.testing import reset
 
 
@@ -306,3 +311,862 @@ class HistoryFileTests(JailSetup):
         self.assertEqual(history[1], 'betty')
         self.assertEqual(history[2], 'bammbamm')
 
+
+class HistoryFileStreamTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+
+    def mkhistory(self, data):
+        with open('my_history', 'wb') as f:
+            f.write(data)
+
+    def read_both(self, **kw):
+        history.clear()
+        history.read_file('my_history', raise_exc=True, **kw)
+        expected = list(history)
+        history.clear()
+        history.read_file('my_history', raise_exc=True, stream=True, **kw)
+        self.assertEqual(list(history), expected)
+        return expected
+
+    def test_read_stream(self):
+        self.mkhistory(b'fred\nwilma\nbarney\n')
+        self.assertEqual(self.read_both(), ['fred', 'wilma', 'barney'])
+
+    def test_read_stream_empty(self):
+        self.mkhistory(b'')
+        self.assertEqual(self.read_both(), [])
+
+    def test_read_stream_raises_exception(self):
+        self.assertRaises(IOError,
+            history.read_file, 'my_history', raise_exc=True, stream=True)
+
+    def test_read_stream_directory(self):
+        os.mkdir('my_history')
+        self.assertRaises(IOError,
+            history.read_file, 'my_history', raise_exc=True, stream=True)
+
+    def test_read_stream_range(self):
+        self.mkhistory(b'fred\nwilma\nbarney\nbetty\n')
+        self.assertEqual(self.read_both(from_line=1), ['wilma', 'barney', 'betty'])
+        self.assertEqual(self.read_both(from_line=1, to_line=3), ['wilma', 'barney'])
+        self.assertEqual(self.read_both(to_line=1), ['fred'])
+        self.assertEqual(self.read_both(from_line=10), [])
+
+    def test_read_stream_empty_lines(self):
+        self.mkhistory(b'fred\n\nwilma\n\n\nbarney\n')
+        self.assertEqual(self.read_both(), ['fred', 'wilma', 'barney'])
+        self.assertEqual(self.read_both(from_line=2), ['wilma', 'barney'])
+
+    def test_read_stream_crlf(self):
+        self.mkhistory(b'fred\r\nwilma\r\n')
+        self.assertEqual(self.read_both(), ['fred', 'wilma'])
+
+    def test_read_stream_unterminated(self):
+        self.mkhistory(b'fred\nwilma')
+        self.assertEqual(self.read_both(), ['fred'])
+
+    def test_read_stream_timestamps(self):
+        self.mkhistory(b'#1600000000\nfred\n#1600000001\nwilma\n#1600000002\nbarney\n')
+        self.assertEqual(self.read_both(), ['fred', 'wilma', 'barney'])
+        self.assertEqual(self.read_both(from_line=1), ['wilma', 'barney'])
+
+    def test_read_stream_long_lines(self):
+        lines = ['%d' % i * 10000 for i in range(30)]
+        self.mkhistory(''.join(x + '\n' for x in lines).encode('ascii'))
+        self.assertEqual(self.read_both(), lines)
+
+    def test_read_stream_many_lines(self):
+        lines = ['line %d' % i for i in range(50000)]
+        self.mkhistory(''.join(x + '\n' for x in lines).encode('ascii'))
+        history.read_file('my_history', raise_exc=True, stream=True, from_line=49990)
+        self.assertEqual(list(history), lines[49990:])
+
+    def test_read_stream_appends(self):
+        self.mkhistory(b'wilma\n')
+        history.append('fred')
+        history.read_file('my_history', raise_exc=True, stream=True)
+        self.assertEqual(list(history), ['fred', 'wilma'])
+
+    def test_read_stream_stifled(self):
+        self.mkhistory(b'fred\nwilma\nbarney\nbetty\n')
+        history.max_entries = 2
+        history.read_file('my_history', raise_exc=True, stream=True)
+        self.assertEqual(list(history), ['barney', 'betty'])
+
+
+class HistoryFileTailTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+
+    def mkhistory(self, data):
+        with open('my_history', 'wb') as f:
+            f.write(data)
+
+    def read_tail(self, n):
+        history.clear()
+        history.read_tail(n, 'my_history', raise_exc=True)
+        return list(history)
+
+    def test_read_tail(self):
+        self.mkhistory(b'fred\nwilma\nbarney\nbetty\n')
+        self.assertEqual(self.read_tail(2), ['barney', 'betty'])
+        self.assertEqual(self.read_tail(1), ['betty'])
+
+    def test_read_tail_all(self):
+        self.mkhistory(b'fred\nwilma\n')
+        self.assertEqual(self.read_tail(2), ['fred', 'wilma'])
+        self.assertEqual(self.read_tail(10), ['fred', 'wilma'])
+
+    def test_read_tail_zero(self):
+        self.mkhistory(b'fred\nwilma\n')
+        self.assertEqual(self.read_tail(0), [])
+
+    def test_read_tail_empty(self):
+        self.mkhistory(b'')
+        self.assertEqual(self.read_tail(3), [])
+
+    def test_read_tail_raises_exception(self):
+        self.assertRaises(IOError,
+            history.read_tail, 1, 'my_history', raise_exc=True)
+
+    def test_read_tail_empty_lines(self):
+        self.mkhistory(b'fred\n\nwilma\n\n\nbarney\n\n')
+        self.assertEqual(self.read_tail(2), ['wilma', 'barney'])
+
+    def test_read_tail_crlf(self):
+        self.mkhistory(b'fred\r\nwilma\r\n\r\nbarney\r\n')
+        self.assertEqual(self.read_tail(2), ['wilma', 'barney'])
+
+    def test_read_tail_unterminated(self):
+        self.mkhistory(b'fred\nwilma\nbarney')
+        self.assertEqual(self.read_tail(1), ['wilma'])
+
+    def test_read_tail_timestamps(self):
+        self.mkhistory(b'#1600000000\nfred\n#1600000001\nwilma\n#1600000002\nbarney\n')
+        self.assertEqual(self.read_tail(2), ['wilma', 'barney'])
+
+    def test_read_tail_long_lines(self):
+        lines = ['%d' % i * 10000 for i in range(30)]
+        self.mkhistory(''.join(x + '\n' for x in lines).encode('ascii'))
+        self.assertEqual(self.read_tail(5), lines[-5:])
+        self.assertEqual(self.read_tail(30), lines)
+
+    def test_read_tail_many_lines(self):
+        lines = ['line %d' % i for i in range(50000)]
+        self.mkhistory(''.join(x + '\n' for x in lines).encode('ascii'))
+        self.assertEqual(self.read_tail(10), lines[-10:])
+        self.assertEqual(self.read_tail(20000), lines[-20000:])
+
+    def test_read_tail_matches_read_file(self):
+        data = b'fred\n\n#1\nwilma\nbarney\r\n\nbetty\n'
+        self.mkhistory(data)
+        for n in range(6):
+            history.clear()
+            history.read_file('my_history', raise_exc=True)
+            expected = list(history)[-n:] if n else []
+            self.assertEqual(self.read_tail(n), expected)
+
+
+class HistoryFileSyncTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+        # The sync state is kept per filename
+        self.filename = abspath('my_history')
+
+    def mkhistory(self, data):
+        with open(self.filename, 'wb') as f:
+            f.write(data)
+
+    def readhistory(self):
+        with open(self.filename, 'rb') as f:
+            return f.read()
+
+    def sync(self):
+        history.sync_file(self.filename, raise_exc=True)
+        return list(history)
+
+    def test_sync_creates_file(self):
+        history.append('fred')
+        history.append('wilma')
+        self.assertEqual(self.sync(), ['fred', 'wilma'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\n')
+
+    def test_sync_loads_file(self):
+        self.mkhistory(b'fred\nwilma\n')
+        self.assertEqual(self.sync(), ['fred', 'wilma'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\n')
+
+    def test_sync_merges_first_time(self):
+        self.mkhistory(b'fred\nwilma\n')
+        history.append('barney')
+        self.assertEqual(self.sync(), ['barney', 'fred', 'wilma'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\nbarney\n')
+
+    def test_sync_twice(self):
+        self.mkhistory(b'fred\n')
+        self.sync()
+        self.assertEqual(self.sync(), ['fred'])
+        self.assertEqual(self.readhistory(), b'fred\n')
+
+    def test_sync_local_entries(self):
+        self.mkhistory(b'fred\n')
+        self.sync()
+        history.append('wilma')
+        self.assertEqual(self.sync(), ['fred', 'wilma'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\n')
+
+    def test_sync_other_process(self):
+        self.mkhistory(b'fred\n')
+        self.sync()
+        # Another process syncs
+        self.mkhistory(b'fred\nbarney\n')
+        history.append('wilma')
+        self.assertEqual(self.sync(), ['fred', 'wilma', 'barney'])
+        self.assertEqual(self.readhistory(), b'fred\nbarney\nwilma\n')
+        self.assertEqual(self.sync(), ['fred', 'wilma', 'barney'])
+        self.assertEqual(self.readhistory(), b'fred\nbarney\nwilma\n')
+
+    def test_sync_other_process_truncated(self):
+        self.mkhistory(b'fred\nwilma\n')
+        self.sync()
+        # Another process syncs and truncates the file
+        self.mkhistory(b'wilma\nbarney\n')
+        self.assertEqual(self.sync(), ['fred', 'wilma', 'barney'])
+
+    def test_sync_repeated_lines(self):
+        self.mkhistory(b'fred\nls\nls\nls\n')
+        self.sync()
+        # Another process syncs the same lines again
+        self.mkhistory(b'fred\nls\nls\nls\nwilma\nls\nls\nls\n')
+        self.assertEqual(self.sync(),
+            ['fred', 'ls', 'ls', 'ls', 'wilma', 'ls', 'ls', 'ls'])
+
+    def test_sync_other_process_truncated_repeated_lines(self):
+        self.mkhistory(b'fred\nls\nls\n')
+        self.sync()
+        self.mkhistory(b'ls\nls\nwilma\nls\n')
+        self.assertEqual(self.sync(), ['fred', 'ls', 'ls', 'wilma', 'ls'])
+
+    def test_sync_after_read_file(self):
+        self.mkhistory(b'fred\nwilma\nbarney\n')
+        history.read_file(self.filename, raise_exc=True)
+        self.assertEqual(self.sync(), ['fred', 'wilma', 'barney'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\nbarney\n')
+
+    def test_sync_after_read_file_local_entries(self):
+        self.mkhistory(b'fred\nwilma\n')
+        history.read_file(self.filename, raise_exc=True)
+        history.append('barney')
+        # Another process syncs
+        self.mkhistory(b'fred\nwilma\nbetty\n')
+        self.assertEqual(self.sync(), ['fred', 'wilma', 'barney', 'betty'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\nbetty\nbarney\n')
+
+    def test_sync_after_read_stream(self):
+        self.mkhistory(b'fred\nwilma\nbarney\n')
+        history.read_file(self.filename, raise_exc=True, stream=True)
+        self.assertEqual(self.sync(), ['fred', 'wilma', 'barney'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\nbarney\n')
+
+    def test_sync_after_read_tail(self):
+        self.mkhistory(b'fred\nwilma\nbarney\n')
+        history.read_tail(2, self.filename, raise_exc=True)
+        self.assertEqual(self.sync(), ['wilma', 'barney'])
+        self.assertEqual(self.readhistory(), b'fred\nwilma\nbarney\n')
+
+    def test_sync_max_file(self):
+        history.max_file = 2
+        self.mkhistory(b'fred\nwilma\n')
+        self.sync()
+        history.append('barney')
+        self.assertEqual(self.sync(), ['fred', 'wilma', 'barney'])
+        self.assertEqual(self.readhistory(), b'wilma\nbarney\n')
+
+    def test_sync_timestamps(self):
+        self.mkhistory(b'#1000\nfred\n')
+        self.sync()
+        self.mkhistory(b'#1000\nfred\n#2000\nwilma\n')
+        self.assertEqual(self.sync(), ['fred', 'wilma'])
+        self.assertEqual(self.readhistory(), b'#1000\nfred\n#2000\nwilma\n')
+
+    def test_sync_replaces_file(self):
+        self.mkhistory(b'fred\n')
+        ino = os.stat(self.filename).st_ino
+        history.append('wilma')
+        self.sync()
+        self.assertNotEqual(os.stat(self.filename).st_ino, ino)
+        self.assertEqual(os.listdir('.'), ['my_history'])
+
+    def test_sync_raises_exception(self):
+        self.filename = abspath('nonexisting/my_history')
+        self.assertRaises(IOError,
+            history.sync_file, self.filename, raise_exc=True)
+
+
+# Read two lines with autosave running
+AUTOSAVE_SCRIPT = """\
+import sys, time
+from rl import history
+history.autosave('my_history', interval=1000, max_pending=2)
+try:
+    input = raw_input
+except NameError:
+    pass
+input()
+input()
+for i in range(200):
+    with open('my_history', 'a+') as f:
+        f.seek(0)
+        data = f.read()
+    if data.count('\\n') == 2:
+        break
+    time.sleep(0.01)
+sys.stderr.write('result: %r\\n' % data)
+"""
+
+
+class HistoryAutosaveTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+        self.filename = abspath('my_history')
+
+    def tearDown(self):
+        history.stop_autosave()
+        JailSetup.tearDown(self)
+
+    def readhistory(self):
+        if not isfile(self.filename):
+            return b''
+        with open(self.filename, 'rb') as f:
+            return f.read()
+
+    def wait_for(self, data):
+        for i in range(200):
+            if self.readhistory() == data:
+                break
+            time.sleep(0.01)
+        return self.readhistory()
+
+    def test_position(self):
+        position = readline.get_history_position()
+        history.append('fred')
+        history.append('wilma')
+        self.assertEqual(readline.get_history_position(), position + 2)
+
+    def test_position_stifled(self):
+        history.max_entries = 2
+        history.append('fred')
+        history.append('wilma')
+        position = readline.get_history_position()
+        history.append('barney')
+        self.assertEqual(readline.get_history_position(), position + 1)
+
+    def test_append_history_since(self):
+        history.append('fred')
+        position = readline.get_history_position()
+        history.append('wilma')
+        history.append('barney')
+        self.assertEqual(
+            readline.append_history_since(position, self.filename),
+            position + 2)
+        self.assertEqual(self.readhistory(), b'wilma\nbarney\n')
+
+    def test_append_history_since_nothing(self):
+        position = readline.get_history_position()
+        self.assertEqual(
+            readline.append_history_since(position, self.filename), position)
+        self.assertFalse(isfile(self.filename))
+
+    def test_truncate_history_file(self):
+        history.extend(['fred', 'wilma', 'barney'])
+        history.write_file(self.filename, raise_exc=True)
+        readline.truncate_history_file(2, self.filename)
+        self.assertEqual(self.readhistory(), b'wilma\nbarney\n')
+
+    def test_autosave_interval(self):
+        history.autosave(self.filename, interval=0.01)
+        history.append('fred')
+        history.append('wilma')
+        self.assertEqual(self.wait_for(b'fred\nwilma\n'), b'fred\nwilma\n')
+
+    def test_autosave_max_pending(self):
+        history.autosave(self.filename, interval=1000, max_pending=2)
+        history.append('fred')
+        history.append('wilma')
+        self.assertEqual(self.wait_for(b'fred\nwilma\n'), b'fred\nwilma\n')
+
+    def test_autosave_max_pending_readline(self):
+        # Lines added by readline bypass the history object
+        out = run_tty(AUTOSAVE_SCRIPT, b'fred\rwilma\r')
+        self.assertEqual(out.splitlines(), ["result: 'fred\\nwilma\\n'"])
+
+    def test_autosave_hook(self):
+        history.autosave(self.filename, interval=1000)
+        self.assertNotEqual(readline.get_history_added_hook(), None)
+        history.stop_autosave()
+        self.assertEqual(readline.get_history_added_hook(), None)
+
+    def test_autosave_error_raised_on_stop(self):
+        history.autosave(abspath('nonexisting/my_history'), interval=0.01)
+        history.append('fred')
+        for i in range(200):
+            if _history._autosaver.error is not None:
+                break
+            time.sleep(0.01)
+        os.mkdir('nonexisting')
+        self.assertRaises(IOError, history.stop_autosave, raise_exc=True)
+        with open('nonexisting/my_history', 'rb') as f:
+            self.assertEqual(f.read(), b'fred\n')
+
+    def test_autosave_skips_old_entries(self):
+        history.append('fred')
+        history.autosave(self.filename, interval=1000)
+        history.append('wilma')
+        history.stop_autosave()
+        self.assertEqual(self.readhistory(), b'wilma\n')
+
+    def test_stop_autosave_flushes(self):
+        history.autosave(self.filename, interval=1000)
+        history.append('fred')
+        history.extend(['wilma', 'barney'])
+        history.stop_autosave()
+        self.assertEqual(self.readhistory(), b'fred\nwilma\nbarney\n')
+
+    def test_stop_autosave_truncates(self):
+        history.max_file = 2
+        history.autosave(self.filename, interval=1000)
+        history.extend(['fred', 'wilma', 'barney'])
+        history.stop_autosave()
+        self.assertEqual(self.readhistory(), b'wilma\nbarney\n')
+
+    def test_stop_autosave_raises_exception(self):
+        history.autosave(abspath('nonexisting/my_history'), interval=1000)
+        history.append('fred')
+        self.assertRaises(IOError, history.stop_autosave, raise_exc=True)
+
+
+class HistoryFileDedupeTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+        with open('my_history', 'wb') as f:
+            f.write(b'fred\nfred\nwilma\nfred\nbarney\nwilma\n')
+
+    def test_none(self):
+        history.dedupe = 'none'
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(list(history),
+            ['fred', 'fred', 'wilma', 'fred', 'barney', 'wilma'])
+
+    def test_consecutive(self):
+        # Files are loaded as they are
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(list(history),
+            ['fred', 'fred', 'wilma', 'fred', 'barney', 'wilma'])
+
+    def test_consecutive_existing_entries(self):
+        history.append('betty')
+        history.append('betty')
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(list(history),
+            ['betty', 'betty', 'fred', 'fred', 'wilma', 'fred', 'barney', 'wilma'])
+
+    def test_all(self):
+        history.dedupe = 'all'
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(list(history), ['fred', 'barney', 'wilma'])
+
+    def test_all_existing_entries(self):
+        history.dedupe = 'all'
+        history.append('barney')
+        history.append('betty')
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(list(history), ['betty', 'fred', 'barney', 'wilma'])
+
+    def test_all_existing_repeats(self):
+        history.dedupe = 'all'
+        history.append('betty')
+        history.append('betty')
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(list(history),
+            ['betty', 'betty', 'fred', 'barney', 'wilma'])
+
+    def test_all_stream(self):
+        history.dedupe = 'all'
+        history.read_file('my_history', raise_exc=True, stream=True)
+        self.assertEqual(list(history), ['fred', 'barney', 'wilma'])
+
+    def test_all_tail(self):
+        history.dedupe = 'all'
+        history.read_tail(3, 'my_history', raise_exc=True)
+        self.assertEqual(list(history), ['fred', 'barney', 'wilma'])
+
+    def test_all_position(self):
+        history.dedupe = 'all'
+        position = readline.get_history_position()
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(readline.get_history_position(), position + 6)
+
+
+class HistoryFileTimestampTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+        with open('my_history', 'wb') as f:
+            f.write(b'#1000\nfred\n#1010\nwilma\n#1020\nbarney\n#1030\nbetty\n')
+
+    def test_entries(self):
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual([(e.line, e.timestamp) for e in history.entries()],
+            [('fred', 1000), ('wilma', 1010), ('barney', 1020), ('betty', 1030)])
+
+    def test_entries_between(self):
+        history.read_file('my_history', raise_exc=True)
+        lines = lambda *args: [e.line for e in history.entries_between(*args)]
+        self.assertEqual(lines(1010, 1030), ['wilma', 'barney'])
+        self.assertEqual(lines(1005, 1025), ['wilma', 'barney'])
+        self.assertEqual(lines(1010), ['wilma', 'barney', 'betty'])
+        self.assertEqual(lines(0, 1000), [])
+        self.assertEqual(lines(2000), [])
+        self.assertEqual(lines(1030, 1000), [])
+
+    def test_bisect_history_time(self):
+        history.read_file('my_history', raise_exc=True)
+        self.assertEqual(readline.bisect_history_time(0), 0)
+        self.assertEqual(readline.bisect_history_time(1010), 1)
+        self.assertEqual(readline.bisect_history_time(1005.5), 1)
+        self.assertEqual(readline.bisect_history_time(5000), 4)
+
+    def test_write_timestamps(self):
+        history.read_file('my_history', raise_exc=True)
+        history.write_timestamps = True
+        history.write_file('other_history', raise_exc=True)
+        with open('other_history', 'rb') as f:
+            self.assertEqual(f.read().count(b'#10'), 4)
+
+    def test_write_timestamps_appended(self):
+        history.write_timestamps = True
+        history.append('fred')
+        history.write_file('other_history', raise_exc=True)
+        with open('other_history', 'rb') as f:
+            lines = f.read().split(b'\n')
+        self.assertTrue(re.match(br'#\d+$', lines[0]))
+        self.assertEqual(lines[1:], [b'fred', b''])
+
+    def test_write_timestamps_appended_before(self):
+        history.append('fred')
+        history.write_timestamps = True
+        history.write_file('other_history', raise_exc=True)
+        with open('other_history', 'rb') as f:
+            lines = f.read().split(b'\n')
+        self.assertTrue(re.match(br'#\d+$', lines[0]))
+        self.assertEqual(lines[1:], [b'fred', b''])
+
+    def test_write_timestamps_read_back(self):
+        history.write_timestamps = True
+        history.append('fred')
+        history.append('wilma')
+        history.write_file('other_history', raise_exc=True)
+        history.clear()
+        history.read_file('other_history', raise_exc=True)
+        self.assertEqual(list(history), ['fred', 'wilma'])
+
+    def test_no_write_timestamps(self):
+        history.read_file('my_history', raise_exc=True)
+        history.write_file('other_history', raise_exc=True)
+        with open('other_history', 'rb') as f:
+            self.assertEqual(f.read(), b'fred\nwilma\nbarney\nbetty\n')
+
+
+class HistoryFileBinaryTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+        history.extend(['fred', 'wilma', 'barney'])
+
+    def test_write_read(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        self.assertTrue(isfile('my_history.idx'))
+        history.clear()
+        history.read_file('my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(history), ['fred', 'wilma', 'barney'])
+
+    def test_timestamps(self):
+        timestamps = [e.timestamp for e in history.entries()]
+        history.write_file('my_history', raise_exc=True, format='binary')
+        history.clear()
+        history.read_file('my_history', raise_exc=True, format='binary')
+        self.assertEqual([e.timestamp for e in history.entries()], timestamps)
+
+    def test_read_range(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        history.clear()
+        history.read_file('my_history', raise_exc=True, format='binary',
+                          from_line=1, to_line=2)
+        self.assertEqual(list(history), ['wilma'])
+
+    def test_append_new_file(self):
+        history.append_file(2, 'my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['wilma', 'barney'])
+
+    def test_append(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        history.append('betty')
+        history.append_file(1, 'my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['fred', 'wilma', 'barney', 'betty'])
+
+    def test_truncate_rewrites_index(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        inode = os.stat('my_history').st_ino
+        history.max_file = 3
+        history.append('betty')
+        history.append_file(1, 'my_history', raise_exc=True, format='binary')
+        self.assertEqual(os.stat('my_history').st_ino, inode)
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['wilma', 'barney', 'betty'])
+
+    def test_truncate_compacts_log(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        history.max_file = 2
+        for i in range(10):
+            history.append('betty %d' % i)
+            history.append_file(1, 'my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['betty 8', 'betty 9'])
+        self.assertTrue(os.stat('my_history').st_size < 100)
+
+    def test_write_truncates(self):
+        history.max_file = 2
+        history.write_file('my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['wilma', 'barney'])
+
+    def test_archive(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        archive = history.open_archive('my_history')
+        self.assertEqual(len(archive), 3)
+        self.assertEqual(archive[0], 'fred')
+        self.assertEqual(archive[-1], 'barney')
+        self.assertRaises(IndexError, archive.__getitem__, 3)
+        self.assertRaises(IndexError, archive.__getitem__, -4)
+        self.assertRaises(TypeError, archive.__getitem__, 'x')
+        line, timestamp = archive.entry(1)
+        self.assertEqual(line, 'wilma')
+        self.assertTrue(abs(timestamp - time.time()) < 5)
+
+    def test_archive_keeps_view(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        archive = history.open_archive('my_history')
+        history.clear()
+        history.append('betty')
+        history.write_file('my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(archive), ['fred', 'wilma', 'barney'])
+        self.assertEqual(list(history.open_archive('my_history')), ['betty'])
+
+    def test_convert(self):
+        with open('my_history', 'wb') as f:
+            f.write(b'#1000\nfred\n#1010\nwilma\nbarney\n')
+        history.convert_file('my_history', 'my_history.bin', 'binary', raise_exc=True)
+        archive = history.open_archive('my_history.bin')
+        self.assertEqual([archive.entry(i) for i in range(len(archive))],
+            [('fred', 1000), ('wilma', 1010), ('barney', None)])
+        history.convert_file('my_history.bin', 'other_history', 'text', raise_exc=True)
+        with open('other_history', 'rb') as f:
+            self.assertEqual(f.read(), b'#1000\nfred\n#1010\nwilma\nbarney\n')
+
+    def test_not_binary(self):
+        history.write_file('my_history', raise_exc=True)
+        with open('my_history.idx', 'wb') as f:
+            f.write(b'\0' * 32)
+        self.assertRaises(IOError, history.read_file, 'my_history',
+            raise_exc=True, format='binary')
+        self.assertRaises(IOError, history.append_file, 1, 'my_history',
+            raise_exc=True, format='binary')
+
+    def test_missing_index(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        os.remove('my_history.idx')
+        self.assertRaises(IOError, history.open_archive, 'my_history')
+
+    def test_stale_index(self):
+        # A writer died between renaming the log and the index
+        history.write_file('my_history', raise_exc=True, format='binary')
+        shutil.copy('my_history.idx', 'old.idx')
+        history.append('betty')
+        history.write_file('my_history', raise_exc=True, format='binary')
+        os.rename('old.idx', 'my_history.idx')
+        history.clear()
+        history.read_file('my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(history), ['fred', 'wilma', 'barney', 'betty'])
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['fred', 'wilma', 'barney', 'betty'])
+
+    def test_stale_index_append(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        shutil.copy('my_history.idx', 'old.idx')
+        history.append('betty')
+        history.write_file('my_history', raise_exc=True, format='binary')
+        os.rename('old.idx', 'my_history.idx')
+        history.append('pebbles')
+        history.append_file(1, 'my_history', raise_exc=True, format='binary')
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['fred', 'wilma', 'barney', 'betty', 'pebbles'])
+
+    def test_stale_index_torn_record(self):
+        history.write_file('my_history', raise_exc=True, format='binary')
+        with open('my_history', 'ab') as f:
+            f.write(b'\x40\0\0\0partial')
+        with open('my_history.idx', 'r+b') as f:
+            f.seek(8)
+            f.write(b'\1' * 8)
+        self.assertEqual(list(history.open_archive('my_history')),
+            ['fred', 'wilma', 'barney'])
+
+    def test_default_filename(self):
+        home = os.environ.get('HOME')
+        os.environ['HOME'] = self.tempdir
+        try:
+            history.write_file(raise_exc=True, format='binary')
+            self.assertTrue(isfile('.history.bin'))
+            self.assertTrue(isfile('.history.bin.idx'))
+            self.assertFalse(isfile('.history'))
+            history.clear()
+            history.read_file(raise_exc=True, format='binary')
+            self.assertEqual(list(history), ['fred', 'wilma', 'barney'])
+        finally:
+            os.environ['HOME'] = home
+
+    def test_bad_format(self):
+        self.assertRaises(ValueError, history.write_file, 'my_history',
+            format='json')
+
+
+# Run readline in a subprocess with a reverse-search-archive binding
+REVERSE_SEARCH = """\
+import sys
+from rl import readline, history
+history.extend(['fred 1', 'wilma 1', 'fred 2'])
+history.write_file('my_archive', format='binary')
+history.clear()
+history.extend(['wilma 2', 'barney 3'])
+history.attach_archive('my_archive', raise_exc=True)
+readline.parse_and_bind(r'"\\C-xa": reverse-search-archive')
+try:
+    input = raw_input
+except NameError:
+    pass
+for i in range(4):
+    sys.stderr.write('result: %s\\n' % input())
+"""
+
+
+class HistoryArchiveTests(JailSetup):
+
+    def setUp(self):
+        JailSetup.setUp(self)
+        reset()
+        history.extend(['fred 1', 'wilma 1', 'barney 1', 'fred 2'])
+        history.write_file('my_archive', raise_exc=True, format='binary')
+        history.clear()
+        history.extend(['wilma 2', 'fred 3'])
+
+    def tearDown(self):
+        history.detach_archive()
+        JailSetup.tearDown(self)
+
+    def test_attach(self):
+        self.assertEqual(history.archive, None)
+        history.attach_archive('my_archive', raise_exc=True)
+        self.assertEqual(len(history.archive), 4)
+        self.assertEqual(len(history), 2)
+        history.detach_archive()
+        self.assertEqual(history.archive, None)
+
+    def test_attach_missing(self):
+        history.attach_archive('no_archive')
+        self.assertEqual(history.archive, None)
+        self.assertRaises(IOError, history.attach_archive, 'no_archive',
+            raise_exc=True)
+
+    def test_set_archive(self):
+        archive = history.open_archive('my_archive')
+        history.archive = archive
+        self.assertTrue(history.archive is archive)
+        self.assertRaises(TypeError, setattr, history, 'archive', 'my_archive')
+
+    def test_search(self):
+        history.attach_archive('my_archive', raise_exc=True)
+        self.assertEqual(history.search('fred'),
+            [(1, 'fred 3'), (('archive', 3), 'fred 2'),
+             (('archive', 0), 'fred 1')])
+        self.assertEqual(history.search('fred', reverse=False),
+            [(('archive', 0), 'fred 1'), (('archive', 3), 'fred 2'),
+             (1, 'fred 3')])
+
+    def test_search_limit(self):
+        history.attach_archive('my_archive', raise_exc=True)
+        self.assertEqual(history.search('fred', limit=2),
+            [(1, 'fred 3'), (('archive', 3), 'fred 2')])
+        self.assertEqual(history.search('fred', reverse=False, limit=1),
+            [(('archive', 0), 'fred 1')])
+
+    def test_search_regex(self):
+        history.attach_archive('my_archive', raise_exc=True)
+        self.assertEqual(history.search('^(wilma|barney)', regex=True),
+            [(0, 'wilma 2'), (('archive', 2), 'barney 1'),
+             (('archive', 1), 'wilma 1')])
+
+    def test_search_index(self):
+        history.search_index = True
+        history.attach_archive('my_archive', raise_exc=True)
+        self.assertEqual(history.search('wilma'),
+            [(0, 'wilma 2'), (('archive', 1), 'wilma 1')])
+
+    def test_archive_index(self):
+        history.attach_archive('my_archive', raise_exc=True)
+        archive = history.archive
+        for key, line in history.search('fred'):
+            if isinstance(key, tuple):
+                self.assertEqual(key[0], 'archive')
+                self.assertEqual(archive[key[1]], line)
+            else:
+                self.assertEqual(history[key], line)
+
+    def test_reverse_search_archive(self):
+        out = run_tty(REVERSE_SEARCH,
+                      b'barney\x18a\r'        # In the history
+                      b'wilma\x18a\x18a\r'    # Continues in the archive
+                      b'fred\x18a\x18a\r'     # Oldest match
+                      b'fred\x18a\x18a\x18a\r') # No more matches
+        self.assertEqual(out.splitlines(), ['result: barney 3',
+            'result: wilma 1', 'result: fred 1', 'result: fred 1'])
+
+    def test_lines(self):
+        history.attach_archive('my_archive', raise_exc=True)
+        self.assertEqual(list(history.lines()),
+            ['fred 1', 'wilma 1', 'barney 1', 'fred 2', 'wilma 2', 'fred 3'])
+        self.assertEqual(list(history.lines(reverse=True)),
+            ['fred 3', 'wilma 2', 'fred 2', 'barney 1', 'wilma 1', 'fred 1'])
+        self.assertEqual(list(history), ['wilma 2', 'fred 3'])
+
+    def test_lines_no_archive(self):
+        self.assertEqual(list(history.lines()), ['wilma 2', 'fred 3'])
+
+    def test_reset_detaches(self):
+        history.attach_archive('my_archive', raise_exc=True)
+        reset()
+        self.assertEqual(history.archive, None)
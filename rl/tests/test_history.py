@@ -1,7 +1,11 @@
 import unittest
+import time
 
 from rl import history
+from rl import readline
+from rl import HistoryEntry
 from rl.testing import reset
+from rl.testing import run_tty
 
 
 class HistoryTests(unittest.TestCase):
@@ -164,7 +168,20 @@ class HistoryTests(unittest.TestCase):
         history.append('wilma')
         history.append('barney')
         history.append('betty')
-        self.assertRaises(TypeError, history.__getitem__, slice(2, -1))
+        self.assertEqual(history[2:-1], ['barney'])
+        self.assertEqual(history[:], ['fred', 'wilma', 'barney', 'betty'])
+        self.assertEqual(history[1:], ['wilma', 'barney', 'betty'])
+        self.assertEqual(history[-2:], ['barney', 'betty'])
+        self.assertEqual(history[::2], ['fred', 'barney'])
+        self.assertEqual(history[::-1], ['betty', 'barney', 'wilma', 'fred'])
+        self.assertEqual(history[-1:0:-2], ['betty', 'wilma'])
+        self.assertEqual(history[10:20], [])
+        self.assertEqual(history[3:1], [])
+        self.assertRaises(ValueError, history.__getitem__, slice(None, None, 0))
+
+    def test_get_slice_empty(self):
+        self.assertEqual(history[:], [])
+        self.assertEqual(history[::-1], [])
 
     def test_set_slice(self):
         history.append('fred')
@@ -178,7 +195,46 @@ class HistoryTests(unittest.TestCase):
         history.append('wilma')
         history.append('barney')
         history.append('betty')
-        self.assertRaises(TypeError, history.__delitem__, slice(2, -1))
+        del history[2:-1]
+        self.assertEqual(list(history), ['fred', 'wilma', 'betty'])
+        del history[:1]
+        self.assertEqual(list(history), ['wilma', 'betty'])
+        del history[5:]
+        self.assertEqual(list(history), ['wilma', 'betty'])
+        del history[:]
+        self.assertEqual(list(history), [])
+
+    def test_del_extended_slice(self):
+        history.extend(['fred', 'wilma', 'barney', 'betty', 'pebbles'])
+        del history[::2]
+        self.assertEqual(list(history), ['wilma', 'betty'])
+        history.extend(['dino', 'bammbamm'])
+        del history[::-3]
+        self.assertEqual(list(history), ['betty', 'dino'])
+        self.assertRaises(ValueError, history.__delitem__, slice(None, None, 0))
+
+    def test_del_slice_then_append(self):
+        history.extend(['fred', 'wilma', 'barney'])
+        del history[1:]
+        history.append('betty')
+        self.assertEqual(list(history), ['fred', 'betty'])
+        self.assertEqual(history[-1], 'betty')
+
+    def test_extend(self):
+        history.append('fred')
+        history.extend(['wilma', 'barney'])
+        history.extend(x for x in ['betty'])
+        self.assertEqual(list(history), ['fred', 'wilma', 'barney', 'betty'])
+
+    def test_extend_invalid(self):
+        history.append('fred')
+        self.assertRaises(TypeError, history.extend, ['wilma', 1])
+        self.assertEqual(list(history), ['fred'])
+
+    def test_extend_stifled(self):
+        history.max_entries = 3
+        history.extend(['fred', 'wilma', 'barney', 'betty'])
+        self.assertEqual(list(history), ['wilma', 'barney', 'betty'])
 
     def test_max_file(self):
         self.assertEqual(history.max_file, -1)
@@ -343,6 +399,62 @@ class HistoryStiflingTests(unittest.TestCase):
         self.assertEqual([x for x in reversed(history)], ['dino', 'bammbamm', 'pebbles', 'betty', 'hopper'])
 
 
+class HistoryBulkStiflingTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+
+    def test_extend_stifled(self):
+        history.max_entries = 3
+        history.extend(['fred', 'wilma', 'barney', 'betty', 'pebbles'])
+        self.assertEqual(list(history), ['barney', 'betty', 'pebbles'])
+        self.assertEqual(history.max_entries, 3)
+
+    def test_extend_stifled_position(self):
+        history.max_entries = 3
+        position = readline.get_history_position()
+        history.extend(['fred', 'wilma', 'barney', 'betty', 'pebbles'])
+        self.assertEqual(readline.get_history_position(), position + 5)
+
+    def test_extend_zero_max_entries(self):
+        history.max_entries = 0
+        history.extend(['fred', 'wilma'])
+        self.assertEqual(len(history), 0)
+
+    def test_stifle_keeps_position(self):
+        history.extend(['fred', 'wilma', 'barney', 'betty', 'pebbles'])
+        position = readline.get_history_position()
+        history.max_entries = 2
+        self.assertEqual(list(history), ['betty', 'pebbles'])
+        self.assertEqual(readline.get_history_position(), position)
+
+    def timed(self, function, *args):
+        start = time.time()
+        function(*args)
+        return time.time() - start
+
+    def test_extend_large_stifled(self):
+        # Stifling must not make extend quadratic: compare against
+        # extending an unstifled history by the same lines
+        lines = [str(i) for i in range(200000)]
+        baseline = self.timed(history.extend, lines)
+        history.clear()
+        history.max_entries = 50000
+        elapsed = self.timed(history.extend, lines)
+        self.assertTrue(elapsed < 10 * baseline + 0.1)
+        self.assertEqual(len(history), 50000)
+        self.assertEqual(history[0], '150000')
+        self.assertEqual(history[-1], '199999')
+        self.assertEqual(history.max_entries, 50000)
+
+    def test_stifle_large(self):
+        baseline = self.timed(history.extend, [str(i) for i in range(200000)])
+        elapsed = self.timed(setattr, history, 'max_entries', 1000)
+        elapsed += self.timed(history.clear)
+        self.assertTrue(elapsed < 10 * baseline + 0.1)
+        self.assertEqual(len(history), 0)
+
+
 class HistoryIteratorTests(unittest.TestCase):
 
     def setUp(self):
@@ -528,3 +640,261 @@ class HistoryReverseIteratorTests(unittest.TestCase):
         for n, x in enumerate(i):
             self.assertEqual(i.__length_hint__(), len(history)-n-1)
 
+
+class HistorySnapshotTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+        history.append('fred')
+        history.append('wilma')
+        history.append('barney')
+
+    def test_snapshot_class(self):
+        s = history.snapshot()
+        self.assertEqual(s.__class__.__name__, 'historysnapshot')
+
+    def test_len(self):
+        self.assertEqual(len(history.snapshot()), 3)
+
+    def test_empty(self):
+        history.clear()
+        s = history.snapshot()
+        self.assertEqual(len(s), 0)
+        self.assertEqual(list(s), [])
+        self.assertEqual(memoryview(s).tobytes(), b'')
+
+    def test_getitem(self):
+        s = history.snapshot()
+        self.assertEqual(s[0], 'fred')
+        self.assertEqual(s[2], 'barney')
+        self.assertEqual(s[-1], 'barney')
+        self.assertEqual(s[-3], 'fred')
+        self.assertRaises(IndexError, s.__getitem__, 3)
+        self.assertRaises(IndexError, s.__getitem__, -4)
+        self.assertRaises(TypeError, s.__getitem__, 'a')
+
+    def test_iterate(self):
+        s = history.snapshot()
+        self.assertEqual(list(s), ['fred', 'wilma', 'barney'])
+
+    def test_buffer(self):
+        m = memoryview(history.snapshot())
+        self.assertTrue(m.readonly)
+        self.assertEqual(m.tobytes(), b'fred\0wilma\0barney\0')
+
+    def test_span(self):
+        s = history.snapshot()
+        m = memoryview(s)
+        start, end = s.span(1)
+        self.assertEqual((start, end), (5, 10))
+        self.assertEqual(m[start:end].tobytes(), b'wilma')
+        self.assertEqual(s.span(-1), (11, 17))
+        self.assertRaises(IndexError, s.span, 3)
+
+    def test_index(self):
+        s = history.snapshot()
+        self.assertEqual(s.index(0), 0)
+        self.assertEqual(s.index(4), 0)
+        self.assertEqual(s.index(5), 1)
+        self.assertEqual(s.index(17), 2)
+        self.assertRaises(IndexError, s.index, 18)
+        self.assertRaises(IndexError, s.index, -1)
+
+    def test_unaffected_by_changes(self):
+        s = history.snapshot()
+        history.clear()
+        history.append('betty')
+        self.assertEqual(list(s), ['fred', 'wilma', 'barney'])
+
+
+# Edit a history line with readline after the index was built
+EDIT_SCRIPT = """\
+import sys
+from rl import history
+history.search_index = True
+history.extend(['fred 1', 'wilma 1'])
+sys.stderr.write('result: %r\\n' % history.search('fred'))
+try:
+    input = raw_input
+except NameError:
+    pass
+input()
+sys.stderr.write('result: %r\\n' % list(history))
+sys.stderr.write('result: %r\\n' % history.search('fred'))
+sys.stderr.write('result: %r\\n' % history.search('barney'))
+"""
+
+
+class HistorySearchTests(unittest.TestCase):
+
+    search_index = False
+
+    def setUp(self):
+        reset()
+        history.search_index = self.search_index
+        history.extend(['fred flintstone', 'wilma flintstone',
+                        'barney rubble', 'betty rubble'])
+
+    def tearDown(self):
+        reset()
+
+    def test_search(self):
+        self.assertEqual(history.search('rubble'),
+            [(3, 'betty rubble'), (2, 'barney rubble')])
+
+    def test_search_forward(self):
+        self.assertEqual(history.search('rubble', reverse=False),
+            [(2, 'barney rubble'), (3, 'betty rubble')])
+
+    def test_search_limit(self):
+        self.assertEqual(history.search('stone', limit=1),
+            [(1, 'wilma flintstone')])
+        self.assertEqual(history.search('stone', limit=0), [])
+
+    def test_search_short_pattern(self):
+        self.assertEqual(history.search('wi'), [(1, 'wilma flintstone')])
+        self.assertEqual(len(history.search('')), 4)
+
+    def test_search_no_match(self):
+        self.assertEqual(history.search('dino'), [])
+
+    def test_search_empty(self):
+        history.clear()
+        self.assertEqual(history.search('fred'), [])
+
+    def test_search_regex(self):
+        self.assertEqual(history.search('^b.*e$', regex=True),
+            [(3, 'betty rubble'), (2, 'barney rubble')])
+        self.assertEqual(history.search('^(fred|wilma) ', regex=True, reverse=False),
+            [(0, 'fred flintstone'), (1, 'wilma flintstone')])
+
+    def test_search_bad_regex(self):
+        self.assertRaises(ValueError, history.search, '(', regex=True)
+
+    def test_search_after_append(self):
+        history.search('rubble')
+        history.append('bammbamm rubble')
+        self.assertEqual(history.search('rubble', limit=1),
+            [(4, 'bammbamm rubble')])
+
+    def test_search_after_replace(self):
+        history.search('rubble')
+        history[3] = 'pebbles flintstone'
+        self.assertEqual(history.search('rubble'), [(2, 'barney rubble')])
+        self.assertEqual(history.search('pebbles'), [(3, 'pebbles flintstone')])
+
+    def test_search_after_remove(self):
+        history.search('rubble')
+        del history[0]
+        self.assertEqual(history.search('rubble'),
+            [(2, 'betty rubble'), (1, 'barney rubble')])
+        del history[0:2]
+        self.assertEqual(history.search('rubble'), [(0, 'betty rubble')])
+
+    def test_search_stifled(self):
+        history.max_entries = 4
+        history.search('rubble')
+        history.append('dino rubble')
+        history.append('pebbles flintstone')
+        self.assertEqual(history.search('rubble'),
+            [(2, 'dino rubble'), (1, 'betty rubble'), (0, 'barney rubble')])
+        self.assertEqual(history.search('flintstone'),
+            [(3, 'pebbles flintstone')])
+
+    def test_search_after_clear(self):
+        history.search('rubble')
+        history.clear()
+        history.append('dino rubble')
+        self.assertEqual(history.search('rubble'), [(0, 'dino rubble')])
+
+
+class HistoryIndexedSearchTests(HistorySearchTests):
+
+    search_index = True
+
+    def test_search_index(self):
+        self.assertEqual(history.search_index, True)
+        history.search_index = False
+        self.assertEqual(history.search_index, False)
+
+    def test_search_after_readline_edits(self):
+        # Each edit makes readline replace the entry, and malloc may
+        # hand the freed addresses back for the next one
+        keys = b''.join(b'\x01\x0bdino %d\x1b[B\x1b[A' % i for i in range(4))
+        out = run_tty(EDIT_SCRIPT.replace('barney', 'dino'),
+                      b'\x1b[A\x1b[A' + keys + b'\x1b[B\x1b[Bx\r')
+        self.assertEqual(out.splitlines(), [
+            "result: [(0, 'fred 1')]",
+            "result: ['dino 3', 'wilma 1', 'x']",
+            "result: []",
+            "result: [(0, 'dino 3')]"])
+
+    def test_search_after_readline_edit(self):
+        # Readline changes history lines behind the index's back
+        out = run_tty(EDIT_SCRIPT,
+                      b'\x1b[A\x1b[A\x01\x0bbarney 1\x1b[B\x1b[Bx\r')
+        self.assertEqual(out.splitlines(), [
+            "result: [(0, 'fred 1')]",
+            "result: ['barney 1', 'wilma 1', 'x']",
+            "result: []",
+            "result: [(0, 'barney 1')]"])
+
+
+class HistoryDedupeTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+
+    def test_default(self):
+        self.assertEqual(history.dedupe, 'consecutive')
+
+    def test_set_mode(self):
+        for mode in ('none', 'all', 'consecutive'):
+            history.dedupe = mode
+            self.assertEqual(history.dedupe, mode)
+
+    def test_bad_mode(self):
+        self.assertRaises(ValueError, setattr, history, 'dedupe', 'some')
+        self.assertEqual(history.dedupe, 'consecutive')
+
+    def test_append_is_literal(self):
+        history.dedupe = 'all'
+        history.append('fred')
+        history.append('fred')
+        self.assertEqual(list(history), ['fred', 'fred'])
+
+
+class HistoryEntryTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+
+    def test_entries(self):
+        history.append('fred')
+        history.append('wilma')
+        self.assertEqual([(e.line, e.index) for e in history.entries()],
+            [('fred', 0), ('wilma', 1)])
+
+    def test_entries_slice(self):
+        history.extend(['fred', 'wilma', 'barney'])
+        self.assertEqual([e.line for e in history.entries(1)], ['wilma', 'barney'])
+        self.assertEqual([e.index for e in history.entries(-2, -1)], [1])
+        self.assertEqual(list(history.entries(5)), [])
+
+    def test_entry_attributes(self):
+        history.append('fred')
+        entry = next(history.entries())
+        self.assertEqual(entry.line, 'fred')
+        self.assertTrue(abs(entry.timestamp - time.time()) < 5)
+        self.assertEqual(entry.index, 0)
+        self.assertEqual(entry, HistoryEntry('fred', entry.timestamp, 0))
+        self.assertEqual(repr(HistoryEntry('fred', None, 0)),
+            "HistoryEntry('fred', None, 0)")
+        self.assertRaises(AttributeError, setattr, entry, 'foo', 1)
+
+    def test_write_timestamps(self):
+        self.assertEqual(history.write_timestamps, False)
+        history.write_timestamps = True
+        self.assertEqual(history.write_timestamps, True)
+        history.write_timestamps = False
+        self.assertEqual(history.write_timestamps, False)
@@ -0,0 +1,118 @@
+import unittest
+
+import rl
+from rl.testing import run_script
+
+# Run scripts in a subprocess with stdin connected to a pipe
+SCRIPT = """\
+import sys
+from rl import readline, completer, completion
+readline.parse_and_bind('set page-completions on')
+pulled = []
+def matches(n, width=8):
+    for i in range(n):
+        pulled.append(i)
+        yield 'm%%0*d' %% (width-1, i)
+%s
+sys.stdout.write('pulled: %%d\\n' %% len(pulled))
+"""
+
+
+def run(body, input=b''):
+    out = run_script(SCRIPT % body, input, LINES='24', COLUMNS='80')
+    return out.rstrip('\n').split('\n')
+
+
+class DisplayMatchPagesTests(unittest.TestCase):
+
+    def test_columns(self):
+        out = run("completer.query_items = 0\n"
+                  "completion.display_match_pages(matches(100))")
+        self.assertEqual(out[1].split(), ['m0000000', 'm0000015', 'm0000030',
+            'm0000045', 'm0000060', 'm0000075', 'm0000090'])
+        self.assertEqual(out[15].split(), ['m0000014', 'm0000029', 'm0000044',
+            'm0000059', 'm0000074', 'm0000089'])
+        self.assertEqual(out[-1], 'pulled: 100')
+
+    def test_horizontal(self):
+        out = run("completer.query_items = 0\n"
+                  "readline.parse_and_bind('set print-completions-horizontally on')\n"
+                  "completion.display_match_pages(matches(10))")
+        self.assertEqual(out[1].split(), ['m0000000', 'm0000001', 'm0000002',
+            'm0000003', 'm0000004', 'm0000005', 'm0000006'])
+        self.assertEqual(out[2].split(), ['m0000007', 'm0000008', 'm0000009'])
+
+    def test_list(self):
+        out = run("completer.query_items = 0\n"
+                  "completion.display_match_pages(['fred', 'wilma'])")
+        self.assertEqual(out[1].split(), ['fred', 'wilma'])
+
+    def test_longest_match_length(self):
+        out = run("completer.query_items = 0\n"
+                  "completion.display_match_pages(['fred', 'wilma'], 20)")
+        self.assertEqual(out[1], 'fred' + ' ' * 18 + 'wilma')
+
+    def test_query_items(self):
+        out = run("completer.query_items = 100\n"
+                  "completion.display_match_pages(matches(200000))",
+                  b'n')
+        self.assertEqual(out[1], 'Display more than 100 possibilities? (y or n)')
+        self.assertEqual(out[-1], 'pulled: 101')
+
+    def test_query_items_all(self):
+        out = run("completer.query_items = 100\n"
+                  "completion.display_match_pages(matches(100))",
+                  b'n')
+        self.assertEqual(out[1], 'Display all 100 possibilities? (y or n)')
+
+    def test_query_items_yes(self):
+        out = run("completer.query_items = 100\n"
+                  "readline.parse_and_bind('set page-completions off')\n"
+                  "completion.display_match_pages(matches(200000))",
+                  b'y')
+        self.assertEqual(out[-1], 'pulled: 200000')
+
+    def test_pages(self):
+        out = run("completer.query_items = 0\n"
+                  "completion.display_match_pages(matches(200000))",
+                  b' q')
+        self.assertEqual(out[24], '--More--\r        \rm0000161  m0000184  '
+            'm0000207  m0000230  m0000253  m0000276  m0000299')
+        self.assertEqual(out[-1], '--More--\r        \rpulled: 323')
+
+    def test_next_line(self):
+        out = run("completer.query_items = 0\n"
+                  "completion.display_match_pages(matches(200000))",
+                  b'\nq')
+        self.assertEqual(out[24], '--More--\r        \rm0000161  m0000162  '
+            'm0000163  m0000164  m0000165  m0000166  m0000167')
+        self.assertEqual(out[-1], '--More--\r        \rpulled: 169')
+
+    def test_width_grows(self):
+        out = run("completer.query_items = 0\n"
+                  "readline.parse_and_bind('set page-completions off')\n"
+                  "completion.display_match_pages(list(matches(161)) + ['m' * 30])")
+        self.assertEqual(len(out[1].split()), 7)
+        self.assertEqual(out[24], 'm' * 30)
+
+    def test_error(self):
+        out = run("completer.query_items = 0\n"
+                  "def bad():\n"
+                  "    yield 'fred'\n"
+                  "    raise ValueError('bad')\n"
+                  "try:\n"
+                  "    completion.display_match_pages(bad())\n"
+                  "except ValueError as e:\n"
+                  "    sys.stdout.write('result: %s\\n' % e)")
+        self.assertTrue('result: bad' in out)
+
+    def test_bad_item(self):
+        out = run("completer.query_items = 0\n"
+                  "try:\n"
+                  "    completion.display_match_pages(['fred', 23])\n"
+                  "except TypeError:\n"
+                  "    print('result: TypeError')")
+        self.assertTrue('result: TypeError' in out)
+
+    def test_not_iterable(self):
+        self.assertRaises(TypeError, rl.readline.display_match_pages, 23)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import unittest
+
+from rl import PrefixIndex
+from rl import completer
+from rl import completion
+from rl import readline
+
+from rl.testing import reset
+
+TAB = '\t'
+
+
+class PrefixIndexTests(unittest.TestCase):
+
+    def test_empty(self):
+        index = PrefixIndex()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(list(index), [])
+        self.assertEqual(index.complete(''), [])
+        self.assertEqual(index.complete('foo'), [])
+
+    def test_init(self):
+        index = PrefixIndex(['peng', 'foo', 'bar', 'baz'])
+        self.assertEqual(len(index), 4)
+        self.assertEqual(list(index), ['bar', 'baz', 'foo', 'peng'])
+
+    def test_duplicates(self):
+        index = PrefixIndex(['foo', 'bar', 'foo'])
+        index.update(['bar', 'baz'])
+        index.add('baz')
+        self.assertEqual(list(index), ['bar', 'baz', 'foo'])
+
+    def test_add(self):
+        index = PrefixIndex()
+        index.add('foo')
+        index.add('bar')
+        self.assertEqual(list(index), ['bar', 'foo'])
+
+    def test_remove(self):
+        index = PrefixIndex(['foo', 'bar'])
+        index.remove('foo')
+        self.assertEqual(list(index), ['bar'])
+        self.assertRaises(KeyError, index.remove, 'foo')
+
+    def test_discard(self):
+        index = PrefixIndex(['foo', 'bar'])
+        index.discard('foo')
+        index.discard('foo')
+        self.assertEqual(list(index), ['bar'])
+
+    def test_clear(self):
+        index = PrefixIndex(['foo', 'bar'])
+        index.clear()
+        self.assertEqual(len(index), 0)
+
+    def test_contains(self):
+        index = PrefixIndex(['foo', 'bar'])
+        self.assertTrue('foo' in index)
+        self.assertFalse('fo' in index)
+        self.assertFalse('FOO' in index)
+
+    def test_complete(self):
+        index = PrefixIndex(['foo', 'food', 'fool', 'bar', 'fo'])
+        self.assertEqual(index.complete('fo'), ['fo', 'foo', 'food', 'fool'])
+        self.assertEqual(index.complete('foo'), ['foo', 'food', 'fool'])
+        self.assertEqual(index.complete('food'), ['food'])
+        self.assertEqual(index.complete('foods'), [])
+        self.assertEqual(index.complete('b'), ['bar'])
+        self.assertEqual(index.complete(''), ['bar', 'fo', 'foo', 'food', 'fool'])
+
+    def test_call(self):
+        index = PrefixIndex(['foo', 'food', 'bar'])
+        self.assertEqual(index('fo', 0), 'foo')
+        self.assertEqual(index('fo', 1), 'food')
+        self.assertEqual(index('fo', 2), None)
+
+    def test_bad_type(self):
+        index = PrefixIndex()
+        self.assertRaises(TypeError, index.add, 1)
+        self.assertRaises(TypeError, index.update, [1])
+        self.assertRaises(TypeError, PrefixIndex, 1)
+
+    def test_bad_update_keeps_index(self):
+        index = PrefixIndex(['foo'])
+        self.assertRaises(TypeError, index.update, ['bar', 1])
+        self.assertEqual(list(index), ['foo'])
+
+    if sys.version_info[0] >= 3:
+        def test_unicode(self):
+            index = PrefixIndex(['äpfel', 'ärger', 'apfel'])
+            self.assertEqual(index.complete('ä'), ['äpfel', 'ärger'])
+            self.assertEqual(index.complete('äp'), ['äpfel'])
+
+
+class IgnoreCaseTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+
+    def tearDown(self):
+        completer.parse_and_bind('set completion-ignore-case off')
+
+    def test_case_sensitive(self):
+        index = PrefixIndex(['Foo', 'foo', 'FOOD'], ignore_case=False)
+        self.assertEqual(index.ignore_case, False)
+        self.assertEqual(index.complete('fo'), ['foo'])
+        self.assertEqual(index.complete('F'), ['FOOD', 'Foo'])
+
+    def test_ignore_case(self):
+        index = PrefixIndex(['Foo', 'foo', 'FOOD', 'bar'], ignore_case=True)
+        self.assertEqual(index.ignore_case, True)
+        self.assertEqual(index.complete('fo'), ['Foo', 'foo', 'FOOD'])
+        self.assertEqual(index.complete('FO'), ['Foo', 'foo', 'FOOD'])
+        self.assertEqual(index.complete('food'), ['FOOD'])
+        self.assertTrue('foo' in index)
+        self.assertTrue('Foo' in index)
+        self.assertFalse('FOO' in index)
+
+    def test_follow_readline(self):
+        index = PrefixIndex(['Foo', 'foo', 'bar'])
+        self.assertEqual(index.ignore_case, None)
+        self.assertEqual(index.complete('fo'), ['foo'])
+        completer.parse_and_bind('set completion-ignore-case on')
+        self.assertEqual(index.complete('fo'), ['Foo', 'foo'])
+        completer.parse_and_bind('set completion-ignore-case off')
+        self.assertEqual(index.complete('fo'), ['foo'])
+
+
+class CompleterTests(unittest.TestCase):
+
+    def setUp(self):
+        reset()
+
+    def test_complete(self):
+        completer.completer = PrefixIndex(['fred', 'barney'])
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fred ')
+
+    def test_common_prefix(self):
+        completer.completer = PrefixIndex(['fred', 'freddy', 'barney'])
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fred')
+
+    def test_no_matches(self):
+        completer.completer = PrefixIndex(['barney'])
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fr')
+
+    def test_updated_index(self):
+        index = PrefixIndex()
+        completer.completer = index
+        index.add('fred')
+        completion.line_buffer = 'fr'
+        readline.complete_internal(TAB)
+        self.assertEqual(completion.line_buffer, 'fred ')
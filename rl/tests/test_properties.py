@@ -65,6 +65,27 @@ class CompleterTests(unittest.TestCase):
         completer.completer = None
         self.assertEqual(completer.completer, None)
 
+    def test_completer_batch(self):
+        self.assertEqual(completer.completer_batch, None)
+        completer.completer_batch = hook
+        self.assertEqual(completer.completer_batch, hook)
+        completer.completer_batch = None
+        self.assertEqual(completer.completer_batch, None)
+
+    def test_cache_size(self):
+        self.assertEqual(completer.cache_size, 0)
+        completer.cache_size = 10
+        self.assertEqual(completer.cache_size, 10)
+        completer.cache_size = -1
+        self.assertEqual(completer.cache_size, 0)
+
+    def test_cache_ttl(self):
+        self.assertEqual(completer.cache_ttl, 0.0)
+        completer.cache_ttl = 1.5
+        self.assertEqual(completer.cache_ttl, 1.5)
+        completer.cache_ttl = -1
+        self.assertEqual(completer.cache_ttl, 0.0)
+
     def test_startup_hook(self):
         self.assertEqual(completer.startup_hook, None)
         completer.startup_hook = hook
@@ -7,6 +7,7 @@ from os.path import isfile, expanduser
 from rl import readline
 from rl.testing import reset
 from rl.testing import JailSetup
+from rl.testing import run_tty
 
 
 class ReadlineTests(JailSetup):
@@ -103,3 +104,126 @@ class ReadlineTests(JailSetup):
         readline.set_auto_history(True)
         self.assertEqual(readline.get_auto_history(), True)
 
+
+# Read a line with an input hook installed through ctypes
+INPUT_HOOK = """\
+import os, sys, ctypes
+from rl import readline
+calls = []
+HOOK = ctypes.CFUNCTYPE(ctypes.c_int)
+hook = HOOK(lambda: calls.append(1) or 0)
+ctypes.c_void_p.in_dll(ctypes.pythonapi, 'PyOS_InputHook').value = \\
+    ctypes.cast(hook, ctypes.c_void_p).value
+r, w = os.pipe()
+readline.add_input_hook_fd(r)
+readline.set_input_hook_timeout(%s)
+%s
+try:
+    input = raw_input
+except NameError:
+    pass
+line = input()
+sys.stderr.write('result: %%s %%r %%d\\n' %% (line, readline.get_input_hook_fds(),
+                                             len(calls)))
+"""
+
+
+class InputHookTests(unittest.TestCase):
+
+    def setUp(self):
+        self.r, self.w = os.pipe()
+
+    def tearDown(self):
+        for fd in readline.get_input_hook_fds():
+            readline.remove_input_hook_fd(fd)
+        readline.set_input_hook_timeout(0.1)
+        os.close(self.r)
+        os.close(self.w)
+
+    def test_no_fds(self):
+        self.assertEqual(readline.get_input_hook_fds(), [])
+
+    def test_add_fd(self):
+        readline.add_input_hook_fd(self.r)
+        self.assertEqual(readline.get_input_hook_fds(), [self.r])
+
+    def test_add_fd_twice(self):
+        readline.add_input_hook_fd(self.r)
+        readline.add_input_hook_fd(self.r)
+        self.assertEqual(readline.get_input_hook_fds(), [self.r])
+
+    def test_add_fileno(self):
+        f = os.fdopen(os.dup(self.r), 'rb')
+        try:
+            readline.add_input_hook_fd(f)
+            self.assertEqual(readline.get_input_hook_fds(), [f.fileno()])
+        finally:
+            readline.remove_input_hook_fd(f)
+            f.close()
+
+    def test_add_large_fd(self):
+        try:
+            import resource
+            limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        except (ImportError, ValueError):
+            limit = 0
+        # RLIM_INFINITY is negative
+        if 0 <= limit <= 2048:
+            self.skipTest('file descriptor limit too low')
+        fd = os.dup2(self.r, 2000) or 2000
+        try:
+            readline.add_input_hook_fd(fd)
+            self.assertEqual(readline.get_input_hook_fds(), [fd])
+        finally:
+            readline.remove_input_hook_fd(fd)
+            os.close(fd)
+
+    def test_add_bad_fd(self):
+        self.assertRaises(ValueError, readline.add_input_hook_fd, -1)
+        self.assertRaises(TypeError, readline.add_input_hook_fd, 'foo')
+
+    def test_remove_fd(self):
+        readline.add_input_hook_fd(self.r)
+        readline.add_input_hook_fd(self.w)
+        readline.remove_input_hook_fd(self.r)
+        self.assertEqual(readline.get_input_hook_fds(), [self.w])
+
+    def test_remove_unknown_fd(self):
+        self.assertRaises(ValueError, readline.remove_input_hook_fd, self.r)
+
+    def test_timeout_default(self):
+        self.assertEqual(readline.get_input_hook_timeout(), 0.1)
+
+    def test_timeout(self):
+        readline.set_input_hook_timeout(0.5)
+        self.assertEqual(readline.get_input_hook_timeout(), 0.5)
+
+    def test_timeout_negative(self):
+        readline.set_input_hook_timeout(-5)
+        self.assertEqual(readline.get_input_hook_timeout(), -1.0)
+
+    def test_closed_fd_dropped(self):
+        # A closed source must not keep the input loop spinning
+        out = run_tty(INPUT_HOOK % ('-1', 'os.close(r)'), b'fred\r')
+        line, fds, calls = out.split()[1:]
+        self.assertEqual((line, fds), ('fred', '[]'))
+        self.assertTrue(int(calls) < 10)
+
+    def test_timeout_huge(self):
+        out = run_tty(INPUT_HOOK % ('1e12', ''), b'fred\r')
+        self.assertEqual(out.split()[1], 'fred')
+
+
+class PinLocaleTests(unittest.TestCase):
+
+    def tearDown(self):
+        readline.set_pin_locale(False)
+
+    def test_pin_locale_default(self):
+        self.assertEqual(readline.get_pin_locale(), False)
+
+    def test_pin_locale(self):
+        readline.set_pin_locale(True)
+        self.assertEqual(readline.get_pin_locale(), True)
+        readline.set_pin_locale(False)
+        self.assertEqual(readline.get_pin_locale(), False)
@@ -108,6 +108,18 @@ class DisplayMatchesHookTests(unittest.TestCase):
         self.assertEqual(called,
             [('Mädchen.', ['Mädchen.gif', 'Mädchen.txt'], 11)]) # "maximum printed length"
 
+    @utf8_only
+    def test_display_matches_hook_mixed(self):
+        @generator
+        def func(text):
+            return ['Madchen', 'Mädchen', 'Mädels', 'Maden']
+        completer.completer = func
+        completer.display_matches_hook = hook
+        completion.line_buffer = 'M'
+        readline.complete_internal('?')
+        self.assertEqual(called,
+            [('M', ['Madchen', 'Maden', 'Mädchen', 'Mädels'], 7)])
+
 
 class WordBreakHookTests(unittest.TestCase):
 
@@ -139,6 +151,30 @@ class WordBreakHookTests(unittest.TestCase):
             self.assertEqual(completion.begidx, 4)
             self.assertEqual(completion.endidx, 9)
 
+    @utf8_only
+    def test_word_break_hook_line_changes(self):
+        completer.word_break_hook = hook
+        completer.word_break_characters = ' '
+        completion.line_buffer = 'Mä dchen'
+        readline.complete_internal(TAB)
+        completion.line_buffer = 'Määä dchen'
+        readline.complete_internal(TAB)
+        if sys.version_info[0] >= 3:
+            self.assertEqual(called, [(3, 8), (5, 10)])
+            self.assertEqual(completion.begidx, 5)
+            self.assertEqual(completion.endidx, 10)
+
+    @utf8_only
+    def test_word_break_hook_undecodable(self):
+        if sys.version_info[0] >= 3:
+            completer.word_break_hook = hook
+            completer.word_break_characters = ' '
+            completion.line_buffer = 'M\udcc3\udcffä dchen'
+            readline.complete_internal(TAB)
+            self.assertEqual(called, [(5, 10)])
+            self.assertEqual(completion.begidx, 5)
+            self.assertEqual(completion.endidx, 10)
+
 
 class CharIsQuotedFunctionTests(unittest.TestCase):
 
@@ -1,4 +1,6 @@
 #include "Python.h"
+#include <string.h>
+#include <wchar.h>
 #include "unicode.h"
 
 #if (PY_MAJOR_VERSION >= 3)
@@ -22,6 +24,13 @@ PyUnicode_DECODE(const char *text)
 }
 
 
+PyObject *
+PyUnicode_DECODE_SIZE(const char *text, Py_ssize_t size)
+{
+	return PyUnicode_DecodeLocaleAndSize(text, size, _ERRORS);
+}
+
+
 PyObject *
 PyUnicode_ENCODE(PyObject *text)
 {
@@ -83,6 +92,143 @@ PyUnicode_INDEX(const char *text, Py_ssize_t index)
 }
 
 
+/* Cached index conversion
+ *
+ * Completion hooks convert byte offsets into the line buffer to
+ * character offsets several times per completion attempt. Instead of
+ * decoding the prefix for every conversion, the line is decoded once
+ * and a byte-to-character map is built from it. The cache is keyed on
+ * the line contents and rebuilt when the line changes.
+ */
+
+static struct {
+	char *text;		/* Copy of the cached line */
+	Py_ssize_t size;	/* Length of the cached line in bytes */
+	PyObject *decoded;	/* Decoded line */
+	Py_ssize_t *map;	/* Byte to character offsets, size+1 items */
+	int usable;		/* False if the map disagrees with the decoder */
+} line_cache = {NULL, 0, NULL, NULL, 0};
+
+
+void
+PyUnicode_ClearCache(void)
+{
+	PyMem_RawFree(line_cache.text);
+	PyMem_RawFree(line_cache.map);
+	Py_CLEAR(line_cache.decoded);
+	line_cache.text = NULL;
+	line_cache.map = NULL;
+	line_cache.size = 0;
+	line_cache.usable = 0;
+}
+
+
+static int
+line_cache_update(const char *text)
+{
+	Py_ssize_t size = strlen(text);
+
+	if (line_cache.text != NULL && line_cache.size == size &&
+	    memcmp(line_cache.text, text, size) == 0)
+		return 0;
+
+	PyUnicode_ClearCache();
+	line_cache.text = PyMem_RawMalloc(size+1);
+	if (line_cache.text == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+	memcpy(line_cache.text, text, size+1);
+	line_cache.size = size;
+	return 0;
+}
+
+
+static int
+line_cache_build_map(void)
+{
+	const char *text = line_cache.text;
+	Py_ssize_t size = line_cache.size;
+	Py_ssize_t *map;
+	Py_ssize_t o = 0, c = 0, k;
+	mbstate_t ps;
+	wchar_t wc;
+	size_t n;
+
+	if (line_cache.decoded == NULL) {
+		line_cache.decoded = PyUnicode_DECODE(text);
+		if (line_cache.decoded == NULL)
+			return -1;
+	}
+	map = PyMem_RawMalloc((size+1) * sizeof(Py_ssize_t));
+	if (map == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+	memset(&ps, 0, sizeof(mbstate_t));
+	while (o < size) {
+		if ((unsigned char)text[o] < 0x80) {
+			map[o++] = c++;
+			continue;
+		}
+		n = mbrtowc(&wc, text+o, size-o, &ps);
+		if (n == (size_t)-1 || n == (size_t)-2 || n == 0) {
+			/* Undecodable bytes are escaped one by one */
+			memset(&ps, 0, sizeof(mbstate_t));
+			map[o++] = c++;
+			continue;
+		}
+		/* A prefix ending inside a character decodes to one
+		   escaped code point per byte */
+		for (k = 0; k < (Py_ssize_t)n; k++)
+			map[o+k] = c+k;
+		o += n;
+		c++;
+	}
+	map[size] = c;
+	line_cache.map = map;
+	/* Fall back to decoding if the locale decoder sees it differently */
+	line_cache.usable = (c == PyUnicode_GET_LENGTH(line_cache.decoded));
+	return 0;
+}
+
+
+Py_ssize_t
+PyUnicode_INDEX_CACHED(const char *text, Py_ssize_t index)
+{
+	/* Short-circuit */
+	if (index == 0)
+		return 0;
+
+	if (line_cache_update(text) < 0)
+		return -1;
+	if (line_cache.map == NULL) {
+		if (line_cache_build_map() < 0)
+			return -1;
+	}
+	if (!line_cache.usable)
+		return PyUnicode_INDEX(text, index);
+	if (index > line_cache.size)
+		index = line_cache.size;
+	return line_cache.map[index];
+}
+
+
+PyObject *
+PyUnicode_DECODE_CACHED(const char *text)
+{
+	if (line_cache_update(text) < 0)
+		return NULL;
+	if (line_cache.decoded == NULL) {
+		line_cache.decoded = PyUnicode_DECODE(text);
+		if (line_cache.decoded == NULL)
+			return NULL;
+	}
+	Py_INCREF(line_cache.decoded);
+	return line_cache.decoded;
+}
+
+
 int
 PyUnicode_StrConverter(PyObject *text, void *addr)
 {
@@ -5,6 +5,7 @@
 
 #if (PY_MAJOR_VERSION >= 3)
 PyObject *PyUnicode_DECODE(const char *text);
+PyObject *PyUnicode_DECODE_SIZE(const char *text, Py_ssize_t size);
 PyObject *PyUnicode_ENCODE(PyObject *text);
 
 PyObject *PyUnicode_FS_DECODE(const char *text);
@@ -13,6 +14,10 @@ PyObject *PyUnicode_FS_ENCODE(PyObject *text);
 PyObject *PyUnicode_DECODE_CHAR(char character);
 Py_ssize_t PyUnicode_INDEX(const char *text, Py_ssize_t index);
 
+PyObject *PyUnicode_DECODE_CACHED(const char *text);
+Py_ssize_t PyUnicode_INDEX_CACHED(const char *text, Py_ssize_t index);
+void PyUnicode_ClearCache(void);
+
 int PyUnicode_StrConverter(PyObject *text, void *addr);
 int PyUnicode_FSOrNoneConverter(PyObject *text, void *addr);
 #endif
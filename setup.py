@@ -38,6 +38,13 @@ class readline_ext(Extension):
             'rl/unicode.c',
             'rl/iterator.c',
             'rl/modulestate.c',
+            'rl/prefixindex.c',
+            'rl/snapshot.c',
+            'rl/histindex.c',
+            'rl/histio.c',
+            'rl/histbin.c',
+            'rl/matchpager.c',
+            'rl/compcache.c',
         ]
         Extension.__init__(self, name, sources)
 